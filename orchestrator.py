@@ -9,9 +9,12 @@ import os
 import re
 import subprocess
 import sys
+import tempfile
 import time
 from collections.abc import Callable
-from dataclasses import dataclass
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextvars import copy_context
+from dataclasses import dataclass, replace
 from datetime import UTC, datetime
 from pathlib import Path
 
@@ -34,19 +37,75 @@ from automation_core.adapters import (  # noqa: E402
     preview_from_publish_request,
 )
 from automation_core.adapters.noop import NoopAdapter  # noqa: E402
-from automation_core.utils.env import parse_pipeline_enabled  # noqa: E402
-from steps.approval_gate import (  # noqa: E402
-    ApprovalPendingHold,
-    ApprovalRejectedError,
-    run_approval_gate,
+from automation_core.agent_registry import LazyAgentRegistry  # noqa: E402
+from automation_core.batch import (  # noqa: E402
+    DEFAULT_BATCH_CONCURRENCY,
+    BatchRunSpec,
+    BatchSpecError,
+    build_batch_runs,
+    load_batch_specs,
+    load_batch_topics,
+    run_batch,
+)
+from automation_core.checkpoint import (  # noqa: E402
+    CHECKPOINT_FILENAME,
+    CheckpointJournal,
+)
+from automation_core.params import PIPELINE_PARAMS_ENV  # noqa: E402
+from automation_core.pipeline_graph import (  # noqa: E402
+    build_step_dependencies,
+    resolve_max_workers,
+    topological_order,
+)
+from automation_core.render_profiles import get_render_profile  # noqa: E402
+from automation_core.run_context import (  # noqa: E402
+    RunContext,
+    activate_run_context,
+    current_run_context,
+)
+from automation_core.step_cache import (  # noqa: E402
+    STEP_CACHE_ENV,
+    StepCache,
+    compute_code_version,
+    compute_step_cache_key,
+    detach_materialized,
+    parse_step_cache_enabled,
+    split_artifact_path,
 )
-from steps.decision_support import run_decision_support  # noqa: E402
-from steps.notify_webhook import step as notify_step  # noqa: E402
-from steps.soft_live_enforce import run_soft_live_enforce  # noqa: E402
-from steps.trend_scout import TrendScoutStep  # noqa: E402
-from steps.topic_prioritizer import TopicPrioritizerStep  # noqa: E402
+from automation_core.step_metrics import (  # noqa: E402
+    build_trace_events,
+    measure_step,
+    track_subprocess,
+)
+from automation_core.utils.env import parse_pipeline_enabled  # noqa: E402
 
 POST_TEMPLATES_ALIASES = {"post_templates", "post.templates"}
+# video.render (render_mode: still_loop): ความยาวคลิปภาพนิ่งที่เข้ารหัสครั้งเดียว
+# แล้ววนซ้ำ และ frame rate ค่าเริ่มต้น (ภาพนิ่งไม่ต้องการ frame rate สูง)
+STILL_LOOP_CLIP_SECONDS = 10
+STILL_LOOP_FPS = 1
+
+
+def current_topic() -> str | None:
+    """คืนหัวข้อที่ผู้ใช้ระบุสำหรับ run ปัจจุบัน (หรือ None)"""
+    context = current_run_context()
+    if context is not None:
+        return context.topic
+    return os.environ.get("DHAMMA_TOPIC")
+
+
+def _current_params_json() -> str | None:
+    """params ของ run ปัจจุบันในรูป JSON (ถ้าไม่มี context ใช้ PIPELINE_PARAMS_JSON)"""
+    context = current_run_context()
+    if context is not None and context.params is not None:
+        return context.params_json()
+    return os.environ.get(PIPELINE_PARAMS_ENV)
+
+
+def _current_run_time() -> datetime | None:
+    """เวลาตามนาฬิกาของ run ปัจจุบัน (None ถ้าไม่มี context ให้ผู้เรียกใช้ค่าเริ่มต้น)"""
+    context = current_run_context()
+    return context.now() if context is not None else None
 
 
 def ensure_dir(p: Path):
@@ -171,7 +230,12 @@ def _run_post_templates_step(run_id: str, root_dir: Path) -> str:
         return output_rel
 
     log(f"Post templates: invoking post_templates CLI with args: {cli_args}")
-    exit_code = post_templates.cli_main(cli_args, base_dir=root_dir)
+    exit_code = post_templates.cli_main(
+        cli_args,
+        base_dir=root_dir,
+        pipeline_params_json=_current_params_json(),
+        checked_at=_current_run_time(),
+    )
     if exit_code != 0:
         raise RuntimeError(
             f"post_templates failed with exit code {exit_code} "
@@ -238,7 +302,9 @@ def _run_artifact_generation_step(
     step_label: str,
 ) -> str:
     """Generic runner for artifact generation steps."""
-    _, artifact_path = generation_func(run_id, base_dir=root_dir)
+    _, artifact_path = generation_func(
+        run_id, base_dir=root_dir, checked_at=_current_run_time()
+    )
     if artifact_path is None:
         log(f"{step_label}: skipped (PIPELINE_ENABLED=false)")
         return "skipped"
@@ -836,7 +902,7 @@ def agent_topic_prioritizer(step, run_dir: Path):
     out = run_dir / step["output"]
 
     # Check if topic is provided via environment variable
-    topic_override = os.environ.get("DHAMMA_TOPIC")
+    topic_override = current_topic()
 
     data = read_json(in_path)
     candidates = data["candidates"]
@@ -1701,41 +1767,45 @@ def agent_seo_metadata(step, run_dir: Path):
 def run_data_enrichment_step(step: dict, run_dir: Path) -> Path:
     """Wrapper for DataEnrichmentStep class with input_from support"""
     from steps.data_enrichment import DataEnrichmentStep
-    
+
     config = step.get("config", {})
-    
+
     # Handle input_from (file from previous step)
     input_from = step.get("input_from")
     input_file = ""
     if input_from:
         path_direct = run_dir / input_from
         path_artifacts = run_dir / "artifacts" / input_from
-        
+
         if path_direct.exists():
             input_file = str(path_direct)
         elif path_artifacts.exists():
             input_file = str(path_artifacts)
         else:
             input_file = str(path_direct)
-    
+
     # Direct items from input
     items = step.get("input", {}).get("items", [])
-    
+
     context = {
         "input_file": input_file,
         "items": items,
         "output_dir": str(run_dir / "artifacts"),
         "data_type": config.get("data_type", "video"),
-        "enrichment_schema": step.get("input", {}).get("enrichment_schema") or config.get("enrichment_schema"),
-        "min_confidence_pct": step.get("input", {}).get("min_confidence_pct") or config.get("min_confidence_pct", 70),
+        "enrichment_schema": step.get("input", {}).get("enrichment_schema")
+        or config.get("enrichment_schema"),
+        "min_confidence_pct": step.get("input", {}).get("min_confidence_pct")
+        or config.get("min_confidence_pct", 70),
     }
-    
+
     result = DataEnrichmentStep().execute(context)
-    
+
     if result["status"] == "success":
         return Path(result["output_file"])
     else:
-        raise RuntimeError(f"DataEnrichment failed: {result.get('error', 'Unknown error')}")
+        raise RuntimeError(
+            f"DataEnrichment failed: {result.get('error', 'Unknown error')}"
+        )
 
 
 def agent_legal_compliance(step, run_dir: Path):
@@ -2057,7 +2127,7 @@ def agent_voiceover_tts(step, run_dir: Path):
         Path("output") / run_id / "artifacts" / "voiceover_summary.json"
     ).as_posix()
 
-    from automation_core import voiceover_tts
+    from automation_core import tts_cache, voiceover_store, voiceover_tts
 
     config = step.get("config") or {}
     if not isinstance(config, dict):
@@ -2080,6 +2150,15 @@ def agent_voiceover_tts(step, run_dir: Path):
     if not isinstance(dry_run, bool):
         raise TypeError("dry_run must be a boolean")
 
+    segment_unit = config.get("segment_unit")
+    if segment_unit is not None and segment_unit not in ("paragraph", "sentence"):
+        raise ValueError("segment_unit must be 'paragraph' or 'sentence'")
+    tts_workers = config.get("tts_workers", voiceover_tts.DEFAULT_ENGINE_POOL_SIZE)
+    if not isinstance(tts_workers, int) or isinstance(tts_workers, bool):
+        raise TypeError("tts_workers must be an integer")
+    if tts_workers < 1:
+        raise ValueError("tts_workers must be >= 1")
+
     root_dir = ROOT.resolve()
     script_path = _resolve_script_path(script_path_value, root_dir)
     script_text = script_path.read_text(encoding="utf-8")
@@ -2110,11 +2189,28 @@ def agent_voiceover_tts(step, run_dir: Path):
             dry_run=True,
         )
 
+    store = None
+    if voiceover_store.parse_voiceover_store_enabled(
+        os.environ.get(voiceover_store.VOICEOVER_STORE_ENV)
+    ):
+        store = voiceover_store.VoiceoverStore(root_dir / "data" / "voiceover_store")
+    cache = None
+    if tts_cache.parse_tts_cache_enabled(os.environ.get(tts_cache.TTS_CACHE_ENV)):
+        cache = tts_cache.TTSCache(root_dir / "data" / "tts_cache")
+    engine_pool = None
+    if segment_unit is not None:
+        engine_pool = voiceover_tts.TTSEnginePool(
+            voiceover_tts.NullTTSEngine, size=tts_workers
+        )
     metadata = voiceover_tts.generate_voiceover(
         script_text,
         run_id,
         slug,
         root_dir=root_dir,
+        cache=cache,
+        store=store,
+        engine_pool=engine_pool,
+        segment_unit=segment_unit or "paragraph",
     )
 
     if metadata is None:
@@ -2177,11 +2273,21 @@ def agent_video_render(step, run_dir: Path):
     if not isinstance(dry_run, bool):
         raise TypeError("dry_run must be a boolean")
 
-    fps = config.get("fps", 30)
+    render_profile_name = config.get("render_profile")
+    render_profile = None
+    if render_profile_name is not None:
+        if not isinstance(render_profile_name, str):
+            raise TypeError("render_profile must be a string")
+        render_profile = get_render_profile(render_profile_name)
+
+    # fps/resolution ใน config มีผลเหนือค่าเริ่มต้นของโปรไฟล์
+    fps = config.get("fps", (render_profile and render_profile.fps) or 30)
     if not isinstance(fps, int) or fps <= 0:
         raise ValueError("fps must be a positive integer")
 
-    resolution = config.get("resolution", "1920x1080")
+    resolution = config.get(
+        "resolution", (render_profile and render_profile.resolution) or "1920x1080"
+    )
     if not isinstance(resolution, str) or not resolution.strip():
         raise TypeError("resolution must be a non-empty string")
     if not re.fullmatch(r"\d+x\d+", resolution):
@@ -2194,6 +2300,20 @@ def agent_video_render(step, run_dir: Path):
     if not isinstance(bg_color, str) or not bg_color.strip():
         raise ValueError("bg_color must be a non-empty string")
 
+    render_mode = config.get("render_mode", "single")
+    if render_mode not in ("single", "segmented", "still_loop"):
+        raise ValueError("render_mode must be 'single', 'segmented' or 'still_loop'")
+    render_segments = config.get("render_segments", os.cpu_count() or 1)
+    if (
+        not isinstance(render_segments, int)
+        or isinstance(render_segments, bool)
+        or render_segments <= 0
+    ):
+        raise ValueError("render_segments must be a positive integer")
+    still_fps = config.get("still_fps", STILL_LOOP_FPS)
+    if not isinstance(still_fps, int) or isinstance(still_fps, bool) or still_fps <= 0:
+        raise ValueError("still_fps must be a positive integer")
+
     root_dir = ROOT.resolve()
 
     def _resolve_relative_path(value: str, field_name: str) -> tuple[Path, str]:
@@ -2220,6 +2340,8 @@ def agent_video_render(step, run_dir: Path):
         image_abs, image_rel = _resolve_relative_path(image_path_value, "image_path")
         if not image_abs.is_file():
             raise FileNotFoundError(f"Image input not found: {image_rel}")
+    if render_mode == "still_loop" and image_abs is None:
+        raise ValueError("render_mode 'still_loop' requires image_path")
 
     voiceover_summary_value = config.get("voiceover_summary_path")
     if voiceover_summary_value is None:
@@ -2312,96 +2434,97 @@ def agent_video_render(step, run_dir: Path):
     output_mp4_abs.parent.mkdir(parents=True, exist_ok=True)
 
     if image_abs is not None:
-        cmd_exec = [
-            "ffmpeg",
-            "-y",
-            "-loop",
-            "1",
-            "-i",
-            str(image_abs),
-            "-i",
-            str(wav_abs),
-            "-c:v",
-            "libx264",
-            "-tune",
-            "stillimage",
-            "-pix_fmt",
-            "yuv420p",
-            "-c:a",
-            "aac",
-            "-shortest",
-            str(output_mp4_abs),
-        ]
-        cmd_recorded = [
-            "ffmpeg",
-            "-y",
-            "-loop",
-            "1",
-            "-i",
-            image_rel,
-            "-i",
-            wav_rel,
-            "-c:v",
-            "libx264",
-            "-tune",
-            "stillimage",
-            "-pix_fmt",
-            "yuv420p",
-            "-c:a",
-            "aac",
-            "-shortest",
-            output_mp4_rel,
-        ]
+        video_input_exec = ["-loop", "1", "-i", str(image_abs)]
+        video_input_recorded = ["-loop", "1", "-i", image_rel]
+        video_codec = ["-c:v", "libx264", "-tune", "stillimage", "-pix_fmt", "yuv420p"]
     else:
         color_filter = f"color=c={bg_color}:s={resolution}:r={fps}"
+        video_input_exec = video_input_recorded = ["-f", "lavfi", "-i", color_filter]
+        video_codec = ["-c:v", "libx264", "-pix_fmt", "yuv420p"]
+    audio_codec = ["-c:a", "aac"]
+    if render_profile is not None:
+        video_codec += render_profile.video_args()
+        audio_codec += render_profile.audio_args()
+        if image_abs is not None:
+            # โปรไฟล์กำหนดขนาดภาพ: ย่อภาพให้พอดีแล้วเติมขอบให้เต็มเฟรม
+            width, height = resolution.split("x")
+            video_codec += [
+                "-vf",
+                f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+                f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,setsar=1",
+            ]
+
+    def _run_ffmpeg(cmd: list[str]) -> None:
+        try:
+            subprocess.run(cmd, check=True, capture_output=True, text=True)
+        except FileNotFoundError as exc:
+            raise RuntimeError("ffmpeg not found in PATH") from exc
+        except subprocess.CalledProcessError as exc:
+            stderr = exc.stderr or ""
+            tail = "\n".join(stderr.splitlines()[-20:]) if stderr else ""
+            message = "ffmpeg failed"
+            if tail:
+                message = f"ffmpeg failed:\n{tail}"
+            raise RuntimeError(message) from exc
+
+    segmented_details: dict[str, object] = {}
+    if render_mode == "still_loop":
+        assert image_abs is not None and image_rel is not None
+        with track_subprocess():
+            cmd_recorded, segmented_details = _render_video_still_loop(
+                image_abs=image_abs,
+                image_rel=image_rel,
+                wav_abs=wav_abs,
+                wav_rel=wav_rel,
+                output_mp4_abs=output_mp4_abs,
+                output_mp4_rel=output_mp4_rel,
+                video_codec=video_codec,
+                audio_codec=audio_codec,
+                still_fps=still_fps,
+                run_ffmpeg=_run_ffmpeg,
+            )
+    elif render_mode == "segmented":
+        # ภาพนิ่งต้องกำหนด framerate ของ input เพื่อให้จำนวน frame ตรงกับเวลา
+        segment_input = video_input_exec
+        if image_abs is not None:
+            segment_input = ["-loop", "1", "-framerate", str(fps), "-i", str(image_abs)]
+        with track_subprocess():
+            cmd_recorded, segmented_details = _render_video_segmented(
+                wav_abs=wav_abs,
+                wav_rel=wav_rel,
+                output_mp4_abs=output_mp4_abs,
+                output_mp4_rel=output_mp4_rel,
+                segment_input=segment_input,
+                video_codec=video_codec,
+                audio_codec=audio_codec,
+                fps=fps,
+                count=render_segments,
+                run_ffmpeg=_run_ffmpeg,
+            )
+    else:
+        audio_tail = [*audio_codec, "-shortest"]
         cmd_exec = [
             "ffmpeg",
             "-y",
-            "-f",
-            "lavfi",
-            "-i",
-            color_filter,
+            *video_input_exec,
             "-i",
             str(wav_abs),
-            "-c:v",
-            "libx264",
-            "-pix_fmt",
-            "yuv420p",
-            "-c:a",
-            "aac",
-            "-shortest",
+            *video_codec,
+            *audio_tail,
             str(output_mp4_abs),
         ]
         cmd_recorded = [
             "ffmpeg",
             "-y",
-            "-f",
-            "lavfi",
-            "-i",
-            color_filter,
+            *video_input_recorded,
             "-i",
             wav_rel,
-            "-c:v",
-            "libx264",
-            "-pix_fmt",
-            "yuv420p",
-            "-c:a",
-            "aac",
-            "-shortest",
+            *video_codec,
+            *audio_tail,
             output_mp4_rel,
         ]
-
-    try:
-        subprocess.run(cmd_exec, check=True, capture_output=True, text=True)
-    except FileNotFoundError as exc:
-        raise RuntimeError("ffmpeg not found in PATH") from exc
-    except subprocess.CalledProcessError as exc:
-        stderr = exc.stderr or ""
-        tail = "\n".join(stderr.splitlines()[-20:]) if stderr else ""
-        message = "ffmpeg failed"
-        if tail:
-            message = f"ffmpeg failed:\n{tail}"
-        raise RuntimeError(message) from exc
+        with track_subprocess():
+            _run_ffmpeg(cmd_exec)
 
     render_summary = {
         "schema_version": "v1",
@@ -2413,7 +2536,10 @@ def agent_video_render(step, run_dir: Path):
         "output_mp4_path": output_mp4_rel,
         "engine": "ffmpeg",
         "ffmpeg_cmd": cmd_recorded,
+        **segmented_details,
     }
+    if render_profile is not None:
+        render_summary["render_profile"] = render_profile.name
 
     summary_path = root_dir / summary_rel
     write_json(summary_path, render_summary)
@@ -2421,6 +2547,159 @@ def agent_video_render(step, run_dir: Path):
     return summary_rel
 
 
+def _voiceover_cut_points(wav_abs: Path) -> list[float]:
+    """จุดตัดที่เหมาะสม: ขอบ segment จาก metadata ของ voiceover หรือช่วงเงียบใน WAV"""
+    from automation_core import segmented_render
+
+    try:
+        metadata = read_json(wav_abs.with_suffix(".json"))
+    except (OSError, json.JSONDecodeError):
+        metadata = None
+    segments = metadata.get("segments") if isinstance(metadata, dict) else None
+    if isinstance(segments, list) and segments:
+        return [
+            float(item["end_seconds"])
+            for item in segments
+            if isinstance(item, dict)
+            and isinstance(item.get("end_seconds"), (int, float))
+        ]
+    return segmented_render.find_silence_boundaries(wav_abs)
+
+
+def _render_video_segmented(
+    *,
+    wav_abs: Path,
+    wav_rel: str,
+    output_mp4_abs: Path,
+    output_mp4_rel: str,
+    segment_input: list[str],
+    video_codec: list[str],
+    audio_codec: list[str],
+    fps: int,
+    count: int,
+    run_ffmpeg: Callable[[list[str]], None],
+) -> tuple[list[str], dict[str, object]]:
+    """
+    เข้ารหัสวิดีโอทีละช่วงพร้อมกันแล้วต่อด้วย concat demuxer (ไม่เข้ารหัสวิดีโอซ้ำ)
+
+    Returns:
+        (คำสั่ง concat แบบ relative สำหรับบันทึก, ฟิลด์เพิ่มเติมของ render summary)
+    """
+    from automation_core import segmented_render
+    from automation_core.voiceover_tts import get_wav_duration_seconds
+
+    duration_seconds = get_wav_duration_seconds(wav_abs)
+    segments = segmented_render.plan_render_segments(
+        duration_seconds, fps, count, _voiceover_cut_points(wav_abs)
+    )
+    concat_tail = ["-map", "0:v:0", "-map", "1:a:0", "-c:v", "copy"]
+    concat_tail += [*audio_codec, "-shortest"]
+    with tempfile.TemporaryDirectory(
+        prefix=".render_segments-", dir=output_mp4_abs.parent
+    ) as temp_dir:
+        work_dir = Path(temp_dir)
+        segment_paths = [work_dir / f"segment_{s.index:03d}.mp4" for s in segments]
+        # จำกัดจำนวน process และ thread ของ libx264 ให้รวมกันไม่เกินจำนวนคอร์
+        workers, threads = segmented_render.plan_encoder_threads(len(segments))
+        segment_codec = segmented_render.with_encoder_threads(video_codec, threads)
+        commands = [
+            ["ffmpeg", "-y", *segment_input, "-frames:v", str(segment.frames)]
+            + [*segment_codec, "-an", str(path)]
+            for segment, path in zip(segments, segment_paths, strict=True)
+        ]
+        encode_seconds = segmented_render.encode_segments(
+            commands, run_ffmpeg, max_workers=workers
+        )
+        list_path = work_dir / "segments.txt"
+        segmented_render.write_concat_list(segment_paths, list_path)
+        started = time.perf_counter()
+        run_ffmpeg(
+            ["ffmpeg", "-y", "-f", "concat", "-i", str(list_path)]
+            + ["-i", str(wav_abs), *concat_tail, str(output_mp4_abs)]
+        )
+        concat_seconds = round(time.perf_counter() - started, 6)
+
+    cmd_recorded = ["ffmpeg", "-y", "-f", "concat", "-i", list_path.name]
+    cmd_recorded += ["-i", wav_rel, *concat_tail, output_mp4_rel]
+    details: dict[str, object] = {
+        "render_mode": "segmented",
+        "segments": [
+            {
+                "index": segment.index,
+                "start_seconds": segment.start_seconds,
+                "end_seconds": segment.end_seconds,
+                "frames": segment.frames,
+                "encode_seconds": seconds,
+            }
+            for segment, seconds in zip(segments, encode_seconds, strict=True)
+        ],
+        "segment_workers": workers,
+        "segment_threads": threads,
+        "concat_seconds": concat_seconds,
+        "expected_duration_seconds": round(duration_seconds, 6),
+    }
+    return cmd_recorded, details
+
+
+def _render_video_still_loop(
+    *,
+    image_abs: Path,
+    image_rel: str,
+    wav_abs: Path,
+    wav_rel: str,
+    output_mp4_abs: Path,
+    output_mp4_rel: str,
+    video_codec: list[str],
+    audio_codec: list[str],
+    still_fps: int,
+    run_ffmpeg: Callable[[list[str]], None],
+) -> tuple[list[str], dict[str, object]]:
+    """
+    เรนเดอร์ภาพนิ่ง: เข้ารหัสคลิปสั้นครั้งเดียว (GOP เดียวทั้งคลิป) แล้ววนคลิปแบบ
+    stream copy ให้ยาวเท่าเสียง โดยเข้ารหัส AAC จาก WAV ตอน mux
+
+    Returns:
+        (คำสั่ง mux แบบ relative สำหรับบันทึก, ฟิลด์เพิ่มเติมของ render summary)
+    """
+    from automation_core.voiceover_tts import get_wav_duration_seconds
+
+    duration_seconds = round(get_wav_duration_seconds(wav_abs), 6)
+    if duration_seconds <= 0:
+        raise ValueError("WAV input has zero duration")
+    clip_frames = max(1, round(STILL_LOOP_CLIP_SECONDS * still_fps))
+    clip_args = ["-frames:v", str(clip_frames), *video_codec, "-g", str(clip_frames)]
+    mux_args = ["-map", "0:v:0", "-map", "1:a:0", "-c:v", "copy", *audio_codec]
+    mux_args += ["-t", f"{duration_seconds:g}"]
+    clip_name = "still_clip.mp4"
+    with tempfile.TemporaryDirectory(
+        prefix=".render_still-", dir=output_mp4_abs.parent
+    ) as temp_dir:
+        clip_abs = Path(temp_dir) / clip_name
+        started = time.perf_counter()
+        run_ffmpeg(
+            ["ffmpeg", "-y", "-loop", "1", "-framerate", str(still_fps)]
+            + ["-i", str(image_abs), *clip_args, "-an", str(clip_abs)]
+        )
+        clip_seconds = round(time.perf_counter() - started, 6)
+        started = time.perf_counter()
+        run_ffmpeg(
+            ["ffmpeg", "-y", "-stream_loop", "-1", "-i", str(clip_abs)]
+            + ["-i", str(wav_abs), *mux_args, str(output_mp4_abs)]
+        )
+        mux_seconds = round(time.perf_counter() - started, 6)
+
+    cmd_recorded = ["ffmpeg", "-y", "-stream_loop", "-1", "-i", clip_name]
+    cmd_recorded += ["-i", wav_rel, *mux_args, output_mp4_rel]
+    details: dict[str, object] = {
+        "render_mode": "still_loop",
+        "still_clip_cmd": ["ffmpeg", "-y", "-loop", "1", "-framerate", str(still_fps)]
+        + ["-i", image_rel, *clip_args, "-an", clip_name],
+        "render_timings": {"clip_seconds": clip_seconds, "mux_seconds": mux_seconds},
+        "expected_duration_seconds": duration_seconds,
+    }
+    return cmd_recorded, details
+
+
 def agent_quality_gate(step, run_dir: Path):
     """Quality Gate - ตรวจสอบคุณภาพวิดีโอที่เรนเดอร์แล้วแบบ deterministic."""
     run_id = run_dir.name
@@ -2433,6 +2712,10 @@ def agent_quality_gate(step, run_dir: Path):
     CODE_FFPROBE_FAILED = "ffprobe_failed"
     CODE_DURATION_ZERO_OR_MISSING = "duration_zero_or_missing"
     CODE_AUDIO_STREAM_MISSING = "audio_stream_missing"
+    CODE_DURATION_MISMATCH = "duration_mismatch"
+    # ยอมให้คลาดจากความยาวเสียงได้ไม่เกิน max(1 วินาที, 1%) (frame สุดท้าย/AAC padding)
+    DURATION_TOLERANCE_SECONDS = 1.0
+    DURATION_TOLERANCE_RATIO = 0.01
 
     summary_rel = (
         Path("output") / run_id / "artifacts" / "video_render_summary.json"
@@ -2529,9 +2812,10 @@ def agent_quality_gate(step, run_dir: Path):
             str(output_mp4_abs),
         ]
         try:
-            completed = subprocess.run(
-                ffprobe_cmd, check=False, capture_output=True, text=True
-            )
+            with track_subprocess():
+                completed = subprocess.run(
+                    ffprobe_cmd, check=False, capture_output=True, text=True
+                )
         except OSError:
             _add_reason(CODE_FFPROBE_FAILED, "ffprobe execution failed", SEVERITY_ERROR)
             checks["ffprobe_ok"] = False
@@ -2576,6 +2860,20 @@ def agent_quality_gate(step, run_dir: Path):
         else:
             checks["duration_seconds"] = duration_seconds
 
+    def _check_expected_duration() -> None:
+        # render summary ที่บันทึกความยาวเสียงไว้ (still_loop/segmented) ต้องยาวตรงกัน
+        expected = summary.get("expected_duration_seconds")
+        actual = checks["duration_seconds"]
+        if not isinstance(expected, (int, float)) or actual is None:
+            return
+        tolerance = max(DURATION_TOLERANCE_SECONDS, expected * DURATION_TOLERANCE_RATIO)
+        if abs(actual - expected) > tolerance:
+            _add_reason(
+                CODE_DURATION_MISMATCH,
+                f"MP4 duration {actual:g}s differs from audio duration {expected:g}s",
+                SEVERITY_ERROR,
+            )
+
     def _check_audio_stream(ffprobe_data: dict) -> None:
         streams = ffprobe_data.get("streams", [])
         has_audio = any(
@@ -2601,6 +2899,7 @@ def agent_quality_gate(step, run_dir: Path):
         if checks["ffprobe_ok"]:
             assert ffprobe_data is not None
             _check_duration(ffprobe_data)
+            _check_expected_duration()
             _check_audio_stream(ffprobe_data)
 
     decision = "pass"
@@ -3048,7 +3347,7 @@ def agent_youtube_upload(step, run_dir: Path):
             video_id = youtube_upload.upload_video(
                 output_mp4_abs, title, description, tags, privacy_status
             )
-            
+
             # Check for Soft-Live dry-run mock ID
             decision = "uploaded"
             if video_id and video_id.startswith("soft-live-dry-"):
@@ -3709,6 +4008,8 @@ def agent_publish(step, run_dir: Path):
 
 def agent_soft_live_enforce(step: dict, run_dir: Path):
     """Adapter for soft_live.enforce step"""
+    from steps.soft_live_enforce import run_soft_live_enforce
+
     run_id = run_dir.name
     _summary, path = run_soft_live_enforce(run_id, run_dir.parent.parent)
     return path
@@ -3716,17 +4017,19 @@ def agent_soft_live_enforce(step: dict, run_dir: Path):
 
 def run_trend_scout_step(step: dict, run_dir: Path) -> Path:
     """Wrapper for TrendScoutStep class-based step"""
+    from steps.trend_scout import TrendScoutStep
+
     # Convert orchestrator step/run_dir to step context
     context = {
         "niches": step.get("input", {}).get("niches", []),
         "horizon_days": step.get("input", {}).get("horizon_days", 30),
         "output_dir": str(run_dir / "artifacts"),
     }
-    
+
     # TrendScoutStep expects output in trend_candidates.json
     # The execute method handles the output saving
     result = TrendScoutStep().execute(context)
-    
+
     if result["status"] == "success":
         return Path(result["output_file"])
     else:
@@ -3735,8 +4038,10 @@ def run_trend_scout_step(step: dict, run_dir: Path) -> Path:
 
 def run_topic_prioritizer_step(step: dict, run_dir: Path) -> Path:
     """Wrapper for TopicPrioritizerStep class-based step"""
+    from steps.topic_prioritizer import TopicPrioritizerStep
+
     config = step.get("config", {})
-    
+
     # Handle both direct path or relative to run_dir
     input_from = step.get("input_from")
     input_file = ""
@@ -3744,18 +4049,18 @@ def run_topic_prioritizer_step(step: dict, run_dir: Path) -> Path:
         # Try both locations
         path_direct = run_dir / input_from
         path_artifacts = run_dir / "artifacts" / input_from
-        
+
         if path_direct.exists():
             input_file = str(path_direct)
         elif path_artifacts.exists():
             input_file = str(path_artifacts)
         else:
-            input_file = str(path_direct) # Will fail in execute() with clear error
+            input_file = str(path_direct)  # Will fail in execute() with clear error
     else:
         # Fallback to config if input_from is missing
         input_file = config.get("input_file", "data/mock_topics.json")
         if not Path(input_file).is_absolute():
-             input_file = str(ROOT / input_file)
+            input_file = str(ROOT / input_file)
 
     context = {
         "input_file": input_file,
@@ -3771,15 +4076,17 @@ def run_topic_prioritizer_step(step: dict, run_dir: Path) -> Path:
     if result["status"] == "success":
         return Path(result["output_file"])
     else:
-        raise RuntimeError(f"TopicPrioritizer failed: {result.get('error', 'Unknown error')}")
+        raise RuntimeError(
+            f"TopicPrioritizer failed: {result.get('error', 'Unknown error')}"
+        )
 
 
 def run_research_retrieval_step(step: dict, run_dir: Path) -> Path:
     """Wrapper for ResearchRetrievalStep class with input_from support"""
     from steps.research_retrieval import ResearchRetrievalStep
-    
+
     config = step.get("config", {})
-    
+
     # Handle input_from (file from previous step)
     input_from = step.get("input_from")
     input_file = ""
@@ -3787,7 +4094,7 @@ def run_research_retrieval_step(step: dict, run_dir: Path) -> Path:
         # Try both locations
         path_direct = run_dir / input_from
         path_artifacts = run_dir / "artifacts" / input_from
-        
+
         if path_direct.exists():
             input_file = str(path_direct)
         elif path_artifacts.exists():
@@ -3799,7 +4106,7 @@ def run_research_retrieval_step(step: dict, run_dir: Path) -> Path:
         input_file = config.get("input_file", "")
         if input_file and not Path(input_file).is_absolute():
             input_file = str(run_dir / input_file)
-    
+
     context = {
         "input_file": input_file,
         "output_dir": str(run_dir / "artifacts"),
@@ -3813,69 +4120,426 @@ def run_research_retrieval_step(step: dict, run_dir: Path) -> Path:
         "forbidden_sources": config.get("forbidden_sources", []),
         "context_language": config.get("context_language", "th"),
     }
-    
+
     result = ResearchRetrievalStep().execute(context)
-    
+
     if result["status"] == "success":
         return Path(result["output_file"])
     else:
-        raise RuntimeError(f"ResearchRetrieval failed: {result.get('error', 'Unknown error')}")
+        raise RuntimeError(
+            f"ResearchRetrieval failed: {result.get('error', 'Unknown error')}"
+        )
 
 
 # ========== AGENT REGISTRY ==========
 
-AGENTS = {
-    # System Setup Phase
-    "PromptPack": agent_prompt_pack,
-    "AgentTemplate": agent_template,
-    "Security": agent_security,
-    "Integration": agent_integration,
-    "DataSync": agent_data_sync,
-    "InventoryIndex": agent_inventory_index,
-    "Monitoring": agent_monitoring,
-    "Notification": agent_notification,
-    "ErrorFlag": agent_error_flag,
-    "Dashboard": agent_dashboard,
-    "BackupArchive": agent_backup_archive,
-    # Video Workflow Phase
-    "TrendScout": run_trend_scout_step,
-    "TopicPrioritizer": run_topic_prioritizer_step,
-    "ResearchRetrieval": run_research_retrieval_step,
-    "DataEnrichment": run_data_enrichment_step,
-    "ScriptOutline": agent_script_outline,
-    "ScriptWriter": agent_script_writer,
-    "DoctrineValidator": agent_doctrine_validator,
-    "LegalCompliance": agent_legal_compliance,
-    "VisualAsset": agent_visual_asset,
-    "Voiceover": agent_voiceover,
-    "voiceover.tts": agent_voiceover_tts,
-    "video.render": agent_video_render,
-    "quality.gate": agent_quality_gate,
-    "post_templates": agent_post_templates,
-    "post.templates": agent_post_templates,
-    "dispatch.v0": agent_dispatch_v0,
-    "publish_request.v0": agent_publish_request_v0,
-    "preview": agent_preview,
-    "youtube.upload": agent_youtube_upload,
-    "Localization": agent_localization,
-    "ThumbnailGenerator": agent_thumbnail_generator,
-    "SEOAndMetadata": agent_seo_metadata,
-    "FormatConversion": agent_format_conversion,
-    "MultiChannelPublish": agent_multi_channel_publish,
-    "SchedulingPublishing": agent_publish,
-    "decision.support": run_decision_support,
-    "approval.gate": run_approval_gate,
-    "notify.webhook": notify_step.run,
-    "soft_live.enforce": agent_soft_live_enforce,
+# เอเจนต์ที่อยู่นอกไฟล์นี้ลงทะเบียนเป็นสตริง "module:attr" และถูก import
+# เมื่อ step แรกที่ใช้ถูกรันเท่านั้น (ลดเวลาเริ่มต้นของ orchestrator/worker)
+AGENTS = LazyAgentRegistry(
+    {
+        # System Setup Phase
+        "PromptPack": agent_prompt_pack,
+        "AgentTemplate": agent_template,
+        "Security": agent_security,
+        "Integration": agent_integration,
+        "DataSync": agent_data_sync,
+        "InventoryIndex": agent_inventory_index,
+        "Monitoring": agent_monitoring,
+        "Notification": agent_notification,
+        "ErrorFlag": agent_error_flag,
+        "Dashboard": agent_dashboard,
+        "BackupArchive": agent_backup_archive,
+        # Video Workflow Phase
+        "TrendScout": run_trend_scout_step,
+        "TopicPrioritizer": run_topic_prioritizer_step,
+        "ResearchRetrieval": run_research_retrieval_step,
+        "DataEnrichment": run_data_enrichment_step,
+        "ScriptOutline": agent_script_outline,
+        "ScriptWriter": agent_script_writer,
+        "DoctrineValidator": agent_doctrine_validator,
+        "LegalCompliance": agent_legal_compliance,
+        "VisualAsset": agent_visual_asset,
+        "Voiceover": agent_voiceover,
+        "voiceover.tts": agent_voiceover_tts,
+        "video.render": agent_video_render,
+        "quality.gate": agent_quality_gate,
+        "post_templates": agent_post_templates,
+        "post.templates": agent_post_templates,
+        "dispatch.v0": agent_dispatch_v0,
+        "publish_request.v0": agent_publish_request_v0,
+        "preview": agent_preview,
+        "youtube.upload": agent_youtube_upload,
+        "Localization": agent_localization,
+        "ThumbnailGenerator": agent_thumbnail_generator,
+        "SEOAndMetadata": agent_seo_metadata,
+        "FormatConversion": agent_format_conversion,
+        "MultiChannelPublish": agent_multi_channel_publish,
+        "SchedulingPublishing": agent_publish,
+        "decision.support": "steps.decision_support:run_decision_support",
+        "approval.gate": "steps.approval_gate:run_approval_gate",
+        "notify.webhook": "steps.notify_webhook.step:run",
+        "soft_live.enforce": agent_soft_live_enforce,
+    }
+)
+
+
+# ========== STEP RESULT CACHE ==========
+
+# step ที่ผลลัพธ์ขึ้นกับ input/config เท่านั้นจึงใช้แคชได้
+# (step ที่มี side effect ภายนอก เช่น upload/dispatch/approval จะรันทุกครั้ง)
+STEP_CACHE_USES = frozenset(
+    {
+        "TrendScout",
+        "TopicPrioritizer",
+        "ResearchRetrieval",
+        "DataEnrichment",
+        "ScriptOutline",
+        "ScriptWriter",
+        "DoctrineValidator",
+        "LegalCompliance",
+        "VisualAsset",
+        "Voiceover",
+        "voiceover.tts",
+        "video.render",
+        "Localization",
+        "ThumbnailGenerator",
+        "SEOAndMetadata",
+        "FormatConversion",
+    }
+)
+# step ที่เขียนไฟล์ใต้ path ของ run_id (data/voiceovers/<run_id>/ ฯลฯ) ต้องรวม run_id ในคีย์
+STEP_CACHE_RUN_SCOPED_USES = frozenset({"voiceover.tts", "video.render"})
+STEP_CACHE_INPUT_CONFIG_KEYS = (
+    "script_path",
+    "image_path",
+    "voiceover_summary_path",
+    "input_file",
+)
+# ค่าเริ่มต้นของ config path ที่ step อ่านเมื่อไม่ได้ระบุไว้
+STEP_CACHE_DEFAULT_INPUTS = {
+    "video.render": {
+        "voiceover_summary_path": "output/{run_id}/artifacts/voiceover_summary.json"
+    },
+}
+# คีย์ใน JSON artifact ที่อ้างถึงไฟล์อื่นซึ่งต้องแคช/แฮชไปด้วย
+STEP_CACHE_REFERENCED_KEYS = ("wav_path", "metadata_path", "output_mp4_path")
+# ไฟล์ที่ step เขียนเพิ่มจากผลลัพธ์หลัก (path ใต้ run_dir) ต้องแคชไปด้วย
+# มิฉะนั้น cache hit ใน run ใหม่จะไม่มีไฟล์เหล่านี้ให้ step ถัดไปใช้
+STEP_CACHE_SIDE_OUTPUTS = {
+    "DoctrineValidator": ("validation_report.json",),
+    "Localization": ("subtitles_th.srt",),
 }
 
 
+def _step_cache_dir() -> Path:
+    return ROOT / "data" / "step_cache"
+
+
+def _agent_code_version(agent_func: Callable) -> str:
+    """เวอร์ชันโค้ดของเอเจนต์ รวมโค้ดใน steps/, agents/ และ src/ ที่เอเจนต์เรียกใช้"""
+    return compute_code_version(agent_func, [Path(__file__).resolve().parent])
+
+
+def _step_cache_referenced_files(path: Path, root_dir: Path) -> list[Path]:
+    """คืนไฟล์ที่ JSON artifact อ้างถึงผ่าน STEP_CACHE_REFERENCED_KEYS"""
+    if path.suffix != ".json":
+        return []
+    try:
+        data = read_json(path)
+    except (OSError, ValueError):
+        return []
+    if not isinstance(data, dict):
+        return []
+    found: list[Path] = []
+    for key in STEP_CACHE_REFERENCED_KEYS:
+        value = data.get(key)
+        if not isinstance(value, str) or not value.strip():
+            continue
+        candidate = Path(value)
+        if candidate.is_absolute() or ".." in candidate.parts:
+            continue
+        if (root_dir / candidate).is_file():
+            found.append(root_dir / candidate)
+    return found
+
+
+def _step_cache_inputs(step: dict, run_dir: Path, root_dir: Path) -> list[Path] | None:
+    """
+    รวบรวมไฟล์ input ของ step สำหรับคำนวณคีย์แคช
+
+    Returns:
+        รายการไฟล์ input หรือ None ถ้าไฟล์ที่ step ต้องใช้ยังไม่มี (ไม่ใช้แคช
+        เพื่อให้ step รันจริงและรายงานข้อผิดพลาดตามปกติ)
+    """
+    inputs: list[Path] = []
+    input_from = step.get("input_from")
+    if isinstance(input_from, dict):
+        names = list(input_from.values())
+    else:
+        names = [input_from] if input_from else []
+    for name in names:
+        if not isinstance(name, str):
+            return None
+        for candidate in (run_dir / name, run_dir / "artifacts" / name):
+            if candidate.is_file():
+                inputs.append(candidate)
+                break
+        else:
+            return None
+
+    config = step.get("config") or {}
+    if not isinstance(config, dict):
+        return None
+    defaults = STEP_CACHE_DEFAULT_INPUTS.get(step["uses"], {})
+    for key in STEP_CACHE_INPUT_CONFIG_KEYS:
+        value = config.get(key, defaults.get(key))
+        if value is None:
+            continue
+        if not isinstance(value, str) or not value.strip():
+            return None
+        value = value.format(run_id=run_dir.name) if key in defaults else value
+        candidates = [root_dir / value, run_dir / value]
+        found = next((c for c in candidates if c.is_file()), None)
+        if found is None:
+            return None
+        inputs.append(found)
+
+    for path in list(inputs):
+        inputs.extend(_step_cache_referenced_files(path, root_dir))
+    return inputs
+
+
+def _step_cache_key(
+    agent_func: Callable, step: dict, run_dir: Path, root_dir: Path
+) -> str | None:
+    """คำนวณคีย์แคชของ step หรือคืน None ถ้า step นี้ไม่ใช้แคช"""
+    uses = step["uses"]
+    if uses not in STEP_CACHE_USES or step.get("cache") is False:
+        return None
+    if not parse_step_cache_enabled(os.environ.get(STEP_CACHE_ENV)):
+        return None
+    config = step.get("config")
+    if isinstance(config, dict) and config.get("dry_run"):
+        return None
+    inputs = _step_cache_inputs(step, run_dir, root_dir)
+    if inputs is None:
+        return None
+    extra = {
+        "topic": current_topic(),
+        "params": _current_params_json(),
+    }
+    if uses in STEP_CACHE_RUN_SCOPED_USES:
+        extra["run_id"] = run_dir.name
+    return compute_step_cache_key(
+        uses=uses,
+        step_config={k: v for k, v in step.items() if k not in ("id", "needs")},
+        input_files=inputs,
+        code_version=_agent_code_version(agent_func),
+        extra=extra,
+    )
+
+
+def _result_artifact_files(
+    result: object,
+    root_dir: Path,
+    *,
+    uses: str | None = None,
+    run_dir: Path | None = None,
+) -> list[Path]:
+    """
+    คืนไฟล์ผลลัพธ์ของ step: ไฟล์ที่ step คืนค่ามา (ต้องอยู่ใน root_dir)
+    ตามด้วยไฟล์ที่ JSON นั้นอ้างถึงและไฟล์ใน STEP_CACHE_SIDE_OUTPUTS ของ uses
+    (เมื่อระบุ run_dir); คืนลิสต์ว่างถ้าผลลัพธ์ไม่ใช่ไฟล์
+    """
+    if isinstance(result, PlannedArtifacts) or not isinstance(result, str | Path):
+        return []
+    output_path = Path(result)
+    if not output_path.is_absolute():
+        output_path = root_dir / output_path
+    if not output_path.is_file():
+        return []
+    try:
+        output_path.resolve().relative_to(root_dir)
+    except ValueError:
+        return []
+    files = [output_path, *_step_cache_referenced_files(output_path, root_dir)]
+    if uses is not None and run_dir is not None:
+        for name in STEP_CACHE_SIDE_OUTPUTS.get(uses, ()):
+            if (run_dir / name).is_file():
+                files.append(run_dir / name)
+    return files
+
+
+def _store_step_result(
+    cache: StepCache,
+    key: str,
+    step: dict,
+    result: object,
+    run_dir: Path,
+    root_dir: Path,
+) -> None:
+    """บันทึกผลลัพธ์ของ step ลงแคช (ข้ามถ้าผลลัพธ์ไม่ใช่ไฟล์ใน repo)"""
+    files = _result_artifact_files(result, root_dir, uses=step["uses"], run_dir=run_dir)
+    if not files:
+        return
+    output = split_artifact_path(files[0], run_dir, root_dir)
+    if output is None:
+        return
+    artifacts = [(output[0], output[1], files[0])]
+    for ref in files[1:]:
+        ref_split = split_artifact_path(ref, run_dir, root_dir)
+        if ref_split is not None:
+            artifacts.append((ref_split[0], ref_split[1], ref))
+    cache.store(
+        key,
+        uses=step["uses"],
+        output=output,
+        output_kind="path" if isinstance(result, Path) else "str",
+        artifacts=artifacts,
+    )
+
+
+def _execute_step(
+    agent_func: Callable, step: dict, run_dir: Path
+) -> tuple[object, bool]:
+    """
+    รัน step หนึ่งครั้งโดยใช้แคชผลลัพธ์ถ้ามี (ถูกเรียกจาก worker thread)
+
+    Returns:
+        (ผลลัพธ์ของ step, True ถ้าผลลัพธ์มาจากแคช)
+    """
+    root_dir = ROOT.resolve()
+    cache_run_dir = root_dir / "output" / run_dir.name
+    key = _step_cache_key(agent_func, step, cache_run_dir, root_dir)
+    if key is None:
+        # ไฟล์จากแคชครั้งก่อนเป็น hardlink ของ blob ต้อง unlink ก่อนเขียนทับเสมอ
+        detach_materialized(
+            run_dir=cache_run_dir, root_dir=root_dir, step_id=step["id"]
+        )
+        return agent_func(step, run_dir), False
+
+    cache = StepCache(_step_cache_dir())
+    entry = cache.lookup(key)
+    if entry is not None:
+        cached = cache.materialize(entry, run_dir=cache_run_dir, root_dir=root_dir)
+        if cached is not None:
+            cache.record_links(entry, run_dir=cache_run_dir, step_id=step["id"])
+            log(f"Step cache hit: {step['id']} (key={key[:12]})")
+            return cached, True
+
+    # ไฟล์จากแคชครั้งก่อนเป็น hardlink ของ blob ต้อง unlink ก่อนเขียนทับ
+    detach_materialized(run_dir=cache_run_dir, root_dir=root_dir, step_id=step["id"])
+    result = agent_func(step, run_dir)
+    try:
+        _store_step_result(cache, key, step, result, cache_run_dir, root_dir)
+    except OSError as e:
+        log(f"Step cache store failed for {step['id']}: {e}", "WARNING")
+    return result, False
+
+
+def _execute_step_measured(
+    agent_func: Callable, step: dict, run_dir: Path, collectors: dict
+) -> tuple[object, bool]:
+    """รัน _execute_step พร้อมวัดเวลา/CPU/หน่วยความจำ/I-O ของ step (ใน worker thread)"""
+    with measure_step() as collector:
+        collectors[step["id"]] = collector
+        return _execute_step(agent_func, step, run_dir)
+
+
+def _pipeline_metrics(
+    steps: list[dict], step_metrics: dict, wall_time_s: float
+) -> dict:
+    """สรุปบล็อก metrics ของ pipeline_summary.json (ราย step และรวมตาม uses)"""
+    per_step = {}
+    by_uses: dict[str, dict] = {}
+    for step in steps:
+        metrics = step_metrics.get(step["id"])
+        if metrics is None:
+            continue
+        per_step[step["id"]] = {"uses": step["uses"], **metrics.to_dict()}
+        totals = by_uses.setdefault(
+            step["uses"],
+            {
+                "count": 0,
+                "wall_time_s": 0.0,
+                "cpu_time_s": 0.0,
+                "subprocess_time_s": 0.0,
+            },
+        )
+        totals["count"] += 1
+        for key in ("wall_time_s", "cpu_time_s", "subprocess_time_s"):
+            totals[key] = round(totals[key] + getattr(metrics, key), 6)
+    return {
+        "wall_time_s": round(wall_time_s, 6),
+        "steps": per_step,
+        "by_uses": by_uses,
+    }
+
+
 # ========== PIPELINE RUNNER ==========
 
 
-def run_pipeline(pipeline_path: Path, run_id: str):
-    """รัน pipeline ตามไฟล์ YAML"""
+def run_pipeline(
+    pipeline_path: Path,
+    run_id: str,
+    max_workers: int | None = None,
+    resume: bool = False,
+    trace: bool = False,
+    topic: str | None = None,
+    params: dict | None = None,
+    context: RunContext | None = None,
+):
+    """
+    รัน pipeline ตามไฟล์ YAML
+
+    step ที่ระบุ needs จะถูกรันแบบ DAG โดย step ที่ไม่ขึ้นต่อกันรันพร้อมกันได้
+    ไม่เกิน max_workers (ค่าเริ่มต้นจากคีย์ max_workers ในไฟล์ pipeline)
+
+    ทุก step ที่สำเร็จจะถูกบันทึกลง output/<run_id>/pipeline_checkpoint.json
+    เมื่อ resume=True จะข้าม step ที่ journal ยืนยันว่าเสร็จแล้วและไฟล์ผลลัพธ์
+    ยังตรงกับแฮชเดิม แล้วรันต่อจาก step แรกที่ยังไม่เสร็จ
+
+    เวลา/CPU/หน่วยความจำ/I-O ของแต่ละ step ถูกบันทึกใต้ metrics ใน
+    pipeline_summary.json และเมื่อ trace=True จะเขียน output/<run_id>/trace.json
+    (Chrome trace-event) เพิ่มด้วย
+
+    ค่าประจำ run (topic, params, นาฬิกา) มาจาก context หรือ topic/params ที่ส่งมา
+    ถ้าไม่ระบุจะอ่านจาก DHAMMA_TOPIC/PIPELINE_PARAMS_JSON แบบเดิม ระหว่างรัน
+    เอเจนต์อ่านค่าเหล่านี้ได้จาก current_run_context() ซึ่งแยกตาม run
+    จึงรันหลาย pipeline พร้อมกันใน process เดียวได้
+    """
+    if context is None:
+        context = RunContext.from_env(run_id, ROOT)
+        if topic is not None:
+            context = replace(context, topic=topic)
+        if params is not None:
+            context = replace(context, params=params)
+    elif context.run_id != run_id:
+        raise ValueError(
+            f"run_id mismatch: run_pipeline({run_id!r}) with context "
+            f"for {context.run_id!r}"
+        )
+
+    with activate_run_context(context):
+        return _run_pipeline_in_context(
+            pipeline_path,
+            run_id,
+            max_workers=max_workers,
+            resume=resume,
+            trace=trace,
+        )
+
+
+def _run_pipeline_in_context(
+    pipeline_path: Path,
+    run_id: str,
+    max_workers: int | None = None,
+    resume: bool = False,
+    trace: bool = False,
+):
+    """ตัวรัน pipeline จริง (เรียกผ่าน run_pipeline ซึ่งตั้ง RunContext ไว้แล้ว)"""
     log(f"Loading pipeline: {pipeline_path}")
+    pipeline_started = time.perf_counter()
 
     pipeline_enabled = parse_pipeline_enabled(os.environ.get("PIPELINE_ENABLED"))
     if not pipeline_enabled:
@@ -4030,46 +4694,33 @@ def run_pipeline(pipeline_path: Path, run_id: str):
                 )
                 raise
 
-    for i, step in enumerate(steps, 1):
+    dependencies = build_step_dependencies(steps)
+    workers = resolve_max_workers(
+        max_workers if max_workers is not None else cfg.get("max_workers")
+    )
+    step_index = {step["id"]: i for i, step in enumerate(steps, 1)}
+    total_steps = len(steps)
+    started: set[str] = set()
+    completed: set[str] = set()
+    in_flight: dict[Future, dict] = {}
+    collectors: dict = {}
+    step_metrics: dict = {}
+    halted = False
+
+    def _record_success(step: dict, result: object, status: str = "success") -> None:
+        """บันทึกผลลัพธ์ของ step ที่สำเร็จ (หรือได้จากแคช) และรันขั้นตอนต่อเนื่องอัตโนมัติ"""
+        nonlocal dispatch_ran, publish_request_ran, preview_ran
         step_id = step["id"]
         uses = step["uses"]
-
-        log(f"[{i}/{len(steps)}] Running: {step_id} (uses: {uses})")
-
-        if uses == "preview" and preview_ran:
-            log(f"[{i}/{len(steps)}] Preview already ran; skipping {step_id}")
-            results[step_id] = {"status": "success", "output": "skipped"}
-            continue
-
-        agent_func = AGENTS.get(uses)
-        if not agent_func:
-            log(f"ERROR: Agent not implemented: {uses}", "ERROR")
-            raise RuntimeError(f"Agent not implemented: {uses}")
-
+        i = step_index[step_id]
         try:
-            result = agent_func(step, run_dir)
-        except ApprovalPendingHold as e:
-            # Graceful stop for manual approval or wait
-            log(f"⏸ Pipeline HELD at {step_id}: {e}", "WARNING")
-            results[step_id] = {"status": "held", "reason": str(e)}
-            # Do NOT mark as failure, but stop pipeline
-            break
-        except ApprovalRejectedError as e:
-            # Hard stop for rejection
-            log(f"⛔ Pipeline REJECTED at {step_id}: {e}", "ERROR")
-            results[step_id] = {"status": "rejected", "reason": str(e)}
-            break
-
-        try:
-            # Continue with normal success processing assuming result is valid
-            pass  # result already set above
             output_path = result
             planned_paths = None
             if isinstance(result, PlannedArtifacts):
                 output_path = result.output_path
                 if dry_run_only_pipeline:
                     planned_paths = result.planned_paths
-            entry = {"status": "success", "output": str(output_path)}
+            entry = {"status": status, "output": str(output_path)}
             if planned_paths is not None:
                 entry["planned_paths"] = planned_paths
             results[step_id] = entry
@@ -4084,22 +4735,232 @@ def run_pipeline(pipeline_path: Path, run_id: str):
                     _run_preview_once()
             if uses == "preview":
                 preview_ran = True
-            log(f"[{i}/{len(steps)}] ✓ {step_id} completed", "SUCCESS")
+            suffix = " (cached)" if status == "cached" else ""
+            if step_id in step_metrics:
+                suffix += f" in {step_metrics[step_id].wall_time_s:.2f}s"
+            log(f"[{i}/{total_steps}] ✓ {step_id} completed{suffix}", "SUCCESS")
             _maybe_run_post_templates(uses, result)
         except Exception as e:
             log(f"ERROR in {step_id}: {e}", "ERROR")
             results[step_id] = {"status": "error", "error": str(e)}
             raise
 
+    def _handle_finished(step: dict, future: Future) -> None:
+        """รับผลลัพธ์จาก step ที่รันเสร็จ (เรียกจาก thread หลักเท่านั้น)"""
+        nonlocal halted
+        step_id = step["id"]
+        collector = collectors.pop(step_id, None)
+        if collector is not None and collector.metrics is not None:
+            step_metrics[step_id] = collector.metrics
+        try:
+            result, from_cache = future.result()
+        except Exception as e:
+            # import เฉพาะเมื่อ step ล้มเหลว: approval_gate ถูกโหลดแล้วถ้า
+            # exception นี้มาจาก approval.gate จึงไม่เพิ่มเวลาเริ่มต้น
+            from steps.approval_gate import (
+                ApprovalPendingHold,
+                ApprovalRejectedError,
+            )
+
+            if isinstance(e, ApprovalPendingHold):
+                # Graceful stop for manual approval or wait
+                log(f"⏸ Pipeline HELD at {step_id}: {e}", "WARNING")
+                results[step_id] = {"status": "held", "reason": str(e)}
+                # Do NOT mark as failure, but stop scheduling new steps
+                halted = True
+                return
+            if isinstance(e, ApprovalRejectedError):
+                # Hard stop for rejection
+                log(f"⛔ Pipeline REJECTED at {step_id}: {e}", "ERROR")
+                results[step_id] = {"status": "rejected", "reason": str(e)}
+                halted = True
+                return
+            raise
+        status = "cached" if from_cache else "success"
+        try:
+            _record_success(step, result, status)
+        finally:
+            _checkpoint_flags()
+        completed.add(step_id)
+        if journal is not None:
+            journal.record_step(
+                step_id,
+                step=step,
+                status=status,
+                output=results[step_id]["output"],
+                artifacts=[
+                    (path.resolve().relative_to(root_dir).as_posix(), path)
+                    for path in _result_artifact_files(
+                        result, root_dir, uses=step["uses"], run_dir=run_dir
+                    )
+                ],
+            )
+
+    def _launch_ready_steps(pool: ThreadPoolExecutor) -> None:
+        """ส่ง step ที่ needs ครบแล้วเข้า worker pool ตามลำดับในไฟล์"""
+        progressed = True
+        while progressed and not halted:
+            progressed = False
+            for step in steps:
+                if len(in_flight) >= workers:
+                    return
+                step_id = step["id"]
+                if step_id in started:
+                    continue
+                if not all(need in completed for need in dependencies[step_id]):
+                    continue
+                uses = step["uses"]
+                i = step_index[step_id]
+                started.add(step_id)
+
+                log(f"[{i}/{total_steps}] Running: {step_id} (uses: {uses})")
+
+                if uses == "preview" and preview_ran:
+                    log(f"[{i}/{total_steps}] Preview already ran; skipping {step_id}")
+                    results[step_id] = {"status": "success", "output": "skipped"}
+                    completed.add(step_id)
+                    progressed = True
+                    continue
+
+                agent_func = AGENTS.get(uses)
+                if not agent_func:
+                    log(f"ERROR: Agent not implemented: {uses}", "ERROR")
+                    raise RuntimeError(f"Agent not implemented: {uses}")
+
+                # ส่ง context ของ run (เช่น topic) ต่อไปยัง worker thread
+                future = pool.submit(
+                    copy_context().run,
+                    _execute_step_measured,
+                    agent_func,
+                    step,
+                    run_dir,
+                    collectors,
+                )
+                in_flight[future] = step
+
+    journal = None
+    if not dry_run_only_pipeline:
+        checkpoint_path = run_dir / CHECKPOINT_FILENAME
+        if resume:
+            journal = CheckpointJournal.load(checkpoint_path, run_id, pipeline_name)
+        else:
+            journal = CheckpointJournal(checkpoint_path, run_id, pipeline_name)
+            if checkpoint_path.exists():
+                # ล้าง journal ของรันก่อนหน้าเพื่อไม่ให้ถูกนำไป resume ผิด
+                journal.write()
+
+    def _checkpoint_flags() -> None:
+        """บันทึกสถานะขั้นตอนอัตโนมัติที่รันแล้วลง journal"""
+        if journal is None:
+            return
+        for name, ran in (
+            ("post_templates", post_templates_ran),
+            ("dispatch_v0", dispatch_ran),
+            ("publish_request_v0", publish_request_ran),
+            ("preview", preview_ran),
+        ):
+            if ran:
+                journal.set_flag(name)
+
+    if resume and journal is not None:
+        previous_summary_path = run_dir / "pipeline_summary.json"
+        if previous_summary_path.is_file():
+            previous = read_json(previous_summary_path)
+            log(
+                f"Resuming run {run_id}: previous summary "
+                f"{previous.get('successful', 0)}/{previous.get('total_steps', 0)} "
+                "steps successful"
+            )
+        resumable = journal.resumable_steps(
+            steps, dependencies, topological_order(dependencies), root_dir
+        )
+        post_templates_ran = journal.flags.get("post_templates", False)
+        dispatch_ran = journal.flags.get("dispatch_v0", False)
+        publish_request_ran = journal.flags.get("publish_request_v0", False)
+        preview_ran = journal.flags.get("preview", False)
+        for step in steps:
+            step_id = step["id"]
+            entry = resumable.get(step_id)
+            if entry is None:
+                continue
+            i = step_index[step_id]
+            log(f"[{i}/{total_steps}] Resuming: {step_id} (checkpoint valid)")
+            started.add(step_id)
+            try:
+                _record_success(step, entry["output"], "resumed")
+            finally:
+                _checkpoint_flags()
+            completed.add(step_id)
+        # ต่อ auto-chaining ที่อาจค้างอยู่จาก run ก่อน (แต่ละขั้นตอนรันครั้งเดียว)
+        try:
+            if post_templates_ran:
+                _run_dispatch_once()
+            if dispatch_ran:
+                _run_publish_request_once()
+            if publish_request_ran:
+                _run_preview_once()
+        finally:
+            _checkpoint_flags()
+        log(f"Resume: {len(resumable)}/{total_steps} steps restored from checkpoint")
+
+    # ขั้นตอนที่ needs ครบจะถูกรันพร้อมกันใน pool ส่วนการบันทึกผลและ
+    # auto-chaining (post_templates → dispatch_v0 → publish_request_v0 → preview)
+    # ทำใน thread หลักเพียงที่เดียวเพื่อไม่ให้ state ข้างบนชนกัน
+    try:
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="pipeline-step"
+        ) as pool:
+            while True:
+                _launch_ready_steps(pool)
+                if not in_flight:
+                    break
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in sorted(
+                    done, key=lambda f: step_index[in_flight[f]["id"]]
+                ):
+                    _handle_finished(in_flight.pop(future), future)
+    finally:
+        # เขียน trace แม้ pipeline จะล้มเหลว เพื่อดูว่า step ไหนใช้เวลาก่อนพัง
+        if trace and not dry_run_only_pipeline and step_metrics:
+            uses_by_id = {step["id"]: step["uses"] for step in steps}
+            trace_path = run_dir / "trace.json"
+            write_json(
+                trace_path,
+                build_trace_events(
+                    [
+                        (step_id, uses_by_id[step_id], metrics)
+                        for step_id, metrics in step_metrics.items()
+                    ],
+                    pipeline=pipeline_name,
+                    run_id=run_id,
+                ),
+            )
+            log(f"Trace written: {trace_path}")
+
+    results = {
+        step["id"]: results[step["id"]] for step in steps if step["id"] in results
+    }
+
     # สรุปผล
     summary = {
         "pipeline": pipeline_name,
         "run_id": run_id,
         "started_at": datetime.now().isoformat(),
         "total_steps": len(steps),
-        "successful": len([r for r in results.values() if r["status"] == "success"]),
+        "successful": len(
+            [
+                r
+                for r in results.values()
+                if r["status"] in ("success", "cached", "resumed")
+            ]
+        ),
+        "cached": len([r for r in results.values() if r["status"] == "cached"]),
+        "resumed": len([r for r in results.values() if r["status"] == "resumed"]),
         "failed": len([r for r in results.values() if r["status"] == "error"]),
         "results": results,
+        "metrics": _pipeline_metrics(
+            steps, step_metrics, time.perf_counter() - pipeline_started
+        ),
         "output_dir": str(run_dir),
     }
 
@@ -4122,6 +4983,57 @@ def run_pipeline(pipeline_path: Path, run_id: str):
     return summary
 
 
+def _run_batch_cli(args: argparse.Namespace, pipeline_path: Path) -> int:
+    """รันหลาย run ใน process เดียวตาม --batch-topics หรือ --batch"""
+    batch_id = args.run_id or f"batch_{int(time.time())}"
+    try:
+        if args.batch_topics:
+            entries = [
+                {"topic": topic} for topic in load_batch_topics(Path(args.batch_topics))
+            ]
+        else:
+            entries = load_batch_specs(Path(args.batch))
+        runs = build_batch_runs(entries, batch_id)
+    except (OSError, BatchSpecError) as e:
+        print(f"ERROR: invalid batch: {e}")
+        return 1
+
+    def _run_one(spec: BatchRunSpec) -> dict:
+        return run_pipeline(
+            spec.pipeline or pipeline_path,
+            spec.run_id,
+            max_workers=args.max_workers,
+            trace=args.trace,
+            topic=spec.topic,
+        )
+
+    log(f"Batch {batch_id}: {len(runs)} runs (concurrency={args.batch_concurrency})")
+    started_at = datetime.now().isoformat()
+    results = run_batch(runs, _run_one, concurrency=args.batch_concurrency)
+    failed = [r for r in results if r.status not in ("success", "disabled")]
+    for result in failed:
+        log(f"Batch run {result.run_id} {result.status}: {result.error}", "ERROR")
+
+    summary_path = ROOT / "output" / batch_id / "batch_summary.json"
+    write_json(
+        summary_path,
+        {
+            "batch_id": batch_id,
+            "started_at": started_at,
+            "concurrency": args.batch_concurrency,
+            "total_runs": len(results),
+            "successful": len(results) - len(failed),
+            "failed": len(failed),
+            "runs": [r.to_dict() for r in results],
+        },
+    )
+    log(
+        f"Batch completed: {len(results) - len(failed)}/{len(results)} runs "
+        f"successful ({summary_path})"
+    )
+    return 1 if failed else 0
+
+
 def main():
     parser = argparse.ArgumentParser(description="FlowBiz Client Dhamma - Orchestrator")
     parser.add_argument("--pipeline", required=True, help="Path to YAML pipeline file")
@@ -4129,6 +5041,38 @@ def main():
     parser.add_argument(
         "--topic", default=None, help="Topic title to use (overrides mock data)"
     )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=None,
+        help="Max steps to run concurrently (default: pipeline max_workers or 4)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Resume --run-id from its checkpoint, skipping verified steps",
+    )
+    parser.add_argument(
+        "--trace",
+        action="store_true",
+        help="Write a Chrome trace-event file to output/<run_id>/trace.json",
+    )
+    parser.add_argument(
+        "--batch-topics",
+        default=None,
+        help="Run the pipeline once per topic (JSON list, mock_topics.json, or text)",
+    )
+    parser.add_argument(
+        "--batch",
+        default=None,
+        help="JSONL of run specs (run_id/topic/pipeline per line) to run in-process",
+    )
+    parser.add_argument(
+        "--batch-concurrency",
+        type=int,
+        default=DEFAULT_BATCH_CONCURRENCY,
+        help=f"Max batch runs at once (default: {DEFAULT_BATCH_CONCURRENCY})",
+    )
 
     args = parser.parse_args()
 
@@ -4140,21 +5084,42 @@ def main():
         print("Pipeline disabled by PIPELINE_ENABLED=false")
         return 0  # Exit successfully (no-op)
 
-    if args.run_id is None:
-        args.run_id = f"run_{int(time.time())}"
+    batch_mode = bool(args.batch_topics or args.batch)
+    if args.batch_topics and args.batch:
+        print("ERROR: --batch-topics and --batch are mutually exclusive")
+        return 1
+    if batch_mode and (args.topic or args.resume):
+        print("ERROR: --topic/--resume cannot be combined with batch mode")
+        return 1
 
-    # Store topic in environment for agents to access
-    if args.topic:
-        os.environ["DHAMMA_TOPIC"] = args.topic
+    if args.resume and args.run_id is None:
+        print("ERROR: --resume requires --run-id")
+        return 1
 
     pipeline_path = Path(args.pipeline)
 
+    if batch_mode:
+        if not pipeline_path.exists():
+            print(f"ERROR: Pipeline file not found: {pipeline_path}")
+            return 1
+        return _run_batch_cli(args, pipeline_path)
+
+    if args.run_id is None:
+        args.run_id = f"run_{int(time.time())}"
+
     if not pipeline_path.exists():
         print(f"ERROR: Pipeline file not found: {pipeline_path}")
         return 1
 
     try:
-        run_pipeline(pipeline_path, args.run_id)
+        run_pipeline(
+            pipeline_path,
+            args.run_id,
+            max_workers=args.max_workers,
+            resume=args.resume,
+            trace=args.trace,
+            topic=args.topic,
+        )
         return 0
     except Exception as e:
         log(f"Pipeline failed: {e}", "ERROR")
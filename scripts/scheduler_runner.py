@@ -5,11 +5,21 @@
 from __future__ import annotations
 
 import argparse
+import functools
 import json
 import os
+import signal
+import sqlite3
 import sys
+import threading
 from collections.abc import Callable
-from datetime import UTC, datetime
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from datetime import UTC, datetime, timedelta
 from pathlib import Path
 from typing import Any
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
@@ -21,18 +31,48 @@ if str(SRC_ROOT) not in sys.path:
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
+from automation_core.isolation import (  # noqa: E402
+    IsolatedJob,
+    IsolatedResult,
+    ResourceLimits,
+    run_isolated,
+)
 from automation_core.params import (  # noqa: E402
     ParamsSerializationError,
     inject_pipeline_params,
+    serialize_pipeline_params,
+)
+from automation_core.queue import (  # noqa: E402
+    DEFAULT_LEASE_TTL_SECONDS,
+    DEFAULT_MAX_ATTEMPTS,
+    FileQueue,
+    JobError,
+    JobQueue,
+    LeaseLostError,
+    QueueItem,
+    parse_class_limits,
+)
+from automation_core.queue_archive import (  # noqa: E402
+    DEFAULT_COMPACT_AFTER_DAYS,
+    compact_queue,
 )
-from automation_core.queue import FileQueue, JobError, QueueItem  # noqa: E402
+from automation_core.queue_sqlite import SQLiteQueue, migrate_file_queue  # noqa: E402
+from automation_core.queue_watch import QueueWaker, open_watcher  # noqa: E402
 from automation_core.scheduler import (  # noqa: E402
     DEFAULT_TIMEZONE,
     SchedulePlanError,
     parse_iso_datetime,
     schedule_due_jobs,
 )
-from orchestrator import parse_pipeline_enabled  # noqa: E402
+from automation_core.utils.env import parse_pipeline_enabled  # noqa: E402
+
+_INVALID_JOB_ERROR = JobError(code="job_invalid", message="invalid job payload")
+_PARAMS_ERROR = JobError(code="job_invalid", message="job params not JSON serializable")
+DEFAULT_POLL_INTERVAL_SECONDS = 5.0
+QUEUE_BACKENDS = ("file", "sqlite")
+WATCH_MODES = ("auto", "poll")
+IONICE_CLASSES = ("best-effort", "idle")
+_PIPELINE_TARGET = "orchestrator:run_pipeline"
 
 
 def _utc_now() -> datetime:
@@ -73,6 +113,15 @@ def _relative_path(base_dir: Path, path: Path) -> str:
         return path.as_posix()
 
 
+def _open_queue(queue_dir: Path, backend: str = "file", **options: Any) -> JobQueue:
+    """เปิดคิวตาม backend ("file" = FileQueue, "sqlite" = SQLiteQueue)"""
+    if backend == "sqlite":
+        return SQLiteQueue(queue_dir, **options)
+    if backend != "file":
+        raise ValueError(f"unknown queue backend: {backend}")
+    return FileQueue(queue_dir, **options)
+
+
 def _schedule_summary_path(base_dir: Path, now_utc: datetime, tz_name: str) -> Path:
     try:
         local_dt = now_utc.astimezone(ZoneInfo(tz_name))
@@ -108,8 +157,9 @@ def _build_schedule_summary(
     skipped_entries: list[dict[str, Any]],
     dry_run: bool,
     base_dir: Path,
+    not_due_count: int | None = None,
 ) -> dict[str, Any]:
-    return {
+    summary = {
         "schema_version": "v1",
         "engine": "scheduler",
         "checked_at": _utc_iso(_utc_now()),
@@ -120,6 +170,9 @@ def _build_schedule_summary(
         "skipped_entries": skipped_entries,
         "dry_run": dry_run,
     }
+    if not_due_count is not None:
+        summary["not_due_count"] = not_due_count
+    return summary
 
 
 def _handle_plan_error(
@@ -160,6 +213,9 @@ def run_schedule(
     window_minutes: int,
     dry_run: bool,
     base_dir: Path = ROOT,
+    *,
+    backend: str = "file",
+    summarize_not_due: bool = False,
 ) -> dict[str, Any] | None:
     pipeline_enabled = parse_pipeline_enabled(os.environ.get("PIPELINE_ENABLED"))
     if not pipeline_enabled:
@@ -188,7 +244,7 @@ def run_schedule(
 
     plan_path = _resolve_path(base_dir, plan_path)
     queue_dir = _resolve_path(base_dir, queue_dir)
-    queue = FileQueue(queue_dir)
+    queue = _open_queue(queue_dir, backend)
 
     try:
         result = schedule_due_jobs(
@@ -199,6 +255,8 @@ def run_schedule(
             dry_run=dry_run,
             scheduler_enabled=scheduler_enabled,
             created_at_utc=_utc_now(),
+            cache_dir=base_dir / "output" / "scheduler" / "cache",
+            report_not_due=not summarize_not_due,
         )
         skipped_entries = [
             {
@@ -218,6 +276,7 @@ def run_schedule(
             skipped_entries=skipped_entries,
             dry_run=dry_run,
             base_dir=base_dir,
+            not_due_count=result.not_due_count if summarize_not_due else None,
         )
         summary_path = _schedule_summary_path(base_dir, now_utc, result.timezone)
         _write_json(summary_path, summary)
@@ -240,6 +299,7 @@ def _build_worker_summary(
     decision: str,
     error: JobError | None,
     dry_run: bool,
+    resources: dict[str, Any] | None = None,
 ) -> dict[str, Any]:
     payload = {
         "schema_version": "v1",
@@ -254,6 +314,8 @@ def _build_worker_summary(
     }
     if error is not None:
         payload["error"] = {"code": error.code, "message": error.message}
+    if resources is not None:
+        payload["resources"] = resources
     return payload
 
 
@@ -266,11 +328,67 @@ def _extract_job_fields(item: QueueItem | None) -> tuple[str, str, str]:
     return job_id, item.job.run_id, item.job.pipeline_path
 
 
+def _resolve_job_pipeline_path(item: QueueItem, base_dir: Path) -> Path:
+    assert item.job is not None
+    pipeline_path_obj = Path(item.job.pipeline_path)
+    if not pipeline_path_obj.is_absolute():
+        pipeline_path_obj = base_dir / pipeline_path_obj
+    # ป้องกัน path traversal โดย resolve path และตรวจสอบว่าต้องอยู่ภายใน base_dir เท่านั้น
+    base_dir_resolved = base_dir.resolve()
+    pipeline_path_obj = pipeline_path_obj.resolve()
+    try:
+        pipeline_path_obj.relative_to(base_dir_resolved)
+    except ValueError as exc:
+        raise ValueError(
+            f"invalid pipeline path outside base dir: {pipeline_path_obj}"
+        ) from exc
+    return pipeline_path_obj
+
+
+def _finish_job(
+    queue: JobQueue,
+    item: QueueItem,
+    error: JobError | None,
+    dry_run: bool,
+    base_dir: Path,
+    resources: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """ย้ายงานไป done/failed แล้วเขียน worker_summary ของงานนั้น"""
+    job_id, run_id, pipeline_path = _extract_job_fields(item)
+    try:
+        if error is None:
+            queue.mark_done(item)
+        else:
+            queue.mark_failed(item, error)
+    except LeaseLostError as exc:
+        # lease หมดอายุระหว่างรันและงานถูก reap ไปแล้ว ผลของรอบนี้จึงไม่ถูกบันทึกในคิว
+        print(f"WARNING: {exc}")
+        error = JobError(code="lease_lost", message=str(exc))
+    summary = _build_worker_summary(
+        job_id=job_id,
+        run_id=run_id,
+        pipeline_path=pipeline_path,
+        decision="done" if error is None else "failed",
+        error=error,
+        dry_run=dry_run,
+        resources=resources,
+    )
+    summary_path = _worker_summary_path(base_dir, job_id)
+    _write_json(summary_path, summary)
+    return summary
+
+
 def run_worker(
     queue_dir: str | Path,
     dry_run: bool,
     base_dir: Path = ROOT,
     pipeline_runner: Callable[[Path, str], Any] | None = None,
+    *,
+    lease_ttl: float = DEFAULT_LEASE_TTL_SECONDS,
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    backend: str = "file",
+    isolation: ResourceLimits | None = None,
+    class_limits: dict[str, int] | None = None,
 ) -> dict[str, Any] | None:
     pipeline_enabled = parse_pipeline_enabled(os.environ.get("PIPELINE_ENABLED"))
     if not pipeline_enabled:
@@ -279,7 +397,9 @@ def run_worker(
 
     worker_enabled = dry_run or _parse_enabled_flag(os.environ.get("WORKER_ENABLED"))
     queue_dir = _resolve_path(base_dir, queue_dir)
-    queue = FileQueue(queue_dir)
+    queue = _open_queue(
+        queue_dir, backend, lease_ttl_seconds=lease_ttl, max_attempts=max_attempts
+    )
 
     if not worker_enabled:
         peek = queue.peek_next()
@@ -317,7 +437,8 @@ def run_worker(
         _write_json(summary_path, summary)
         return summary
 
-    item = queue.dequeue_next()
+    queue.reap_expired()
+    item = queue.dequeue_next(class_limits=class_limits)
     if item is None:
         summary = _build_worker_summary(
             job_id="none",
@@ -331,23 +452,26 @@ def run_worker(
         _write_json(summary_path, summary)
         return summary
 
-    job_id, run_id, pipeline_path = _extract_job_fields(item)
     if item.job is None:
-        queue.mark_failed(
-            item,
-            JobError(code="job_invalid", message="invalid job payload"),
-        )
-        summary = _build_worker_summary(
-            job_id=job_id,
-            run_id=run_id,
-            pipeline_path=pipeline_path,
-            decision="failed",
-            error=JobError(code="job_invalid", message="invalid job payload"),
-            dry_run=dry_run,
+        return _finish_job(queue, item, _INVALID_JOB_ERROR, dry_run, base_dir)
+
+    if isolation is not None and pipeline_runner is None:
+        try:
+            pipeline_path_obj = _resolve_job_pipeline_path(item, base_dir)
+            if item.job.params:
+                serialize_pipeline_params(item.job.params)
+        except ParamsSerializationError:
+            return _finish_job(queue, item, _PARAMS_ERROR, dry_run, base_dir)
+        except ValueError as exc:
+            error = JobError(code="orchestrator_failed", message=str(exc))
+            return _finish_job(queue, item, error, dry_run, base_dir)
+        with queue.hold_lease(item):
+            result = _execute_isolated(
+                isolation, str(pipeline_path_obj), item.job.run_id, item.job.params
+            )
+        return _finish_job(
+            queue, item, result.error, dry_run, base_dir, result.resources()
         )
-        summary_path = _worker_summary_path(base_dir, job_id)
-        _write_json(summary_path, summary)
-        return summary
 
     if pipeline_runner is None:
         from orchestrator import run_pipeline  # noqa: E402
@@ -355,68 +479,306 @@ def run_worker(
         pipeline_runner = run_pipeline
 
     try:
-        pipeline_path_obj = Path(item.job.pipeline_path)
-        if not pipeline_path_obj.is_absolute():
-            pipeline_path_obj = base_dir / pipeline_path_obj
-        # ป้องกัน path traversal โดย resolve path และตรวจสอบว่าต้องอยู่ภายใน base_dir เท่านั้น
-        base_dir_resolved = base_dir.resolve()
-        pipeline_path_obj = pipeline_path_obj.resolve()
-        try:
-            pipeline_path_obj.relative_to(base_dir_resolved)
-        except ValueError as exc:
-            raise ValueError(
-                f"invalid pipeline path outside base dir: {pipeline_path_obj}"
-            ) from exc
-        with inject_pipeline_params(item.job.params):
+        pipeline_path_obj = _resolve_job_pipeline_path(item, base_dir)
+        with queue.hold_lease(item), inject_pipeline_params(item.job.params):
             pipeline_runner(pipeline_path_obj, item.job.run_id)
-        queue.mark_done(item)
-        summary = _build_worker_summary(
-            job_id=job_id,
-            run_id=run_id,
-            pipeline_path=pipeline_path,
-            decision="done",
-            error=None,
-            dry_run=dry_run,
-        )
-        summary_path = _worker_summary_path(base_dir, job_id)
-        _write_json(summary_path, summary)
-        return summary
     except ParamsSerializationError:
-        error = JobError(code="job_invalid", message="job params not JSON serializable")
-        queue.mark_failed(item, error)
-        summary = _build_worker_summary(
-            job_id=job_id,
-            run_id=run_id,
-            pipeline_path=pipeline_path,
-            decision="failed",
-            error=error,
-            dry_run=dry_run,
-        )
-        summary_path = _worker_summary_path(base_dir, job_id)
-        _write_json(summary_path, summary)
-        return summary
+        return _finish_job(queue, item, _PARAMS_ERROR, dry_run, base_dir)
     except Exception as exc:  # noqa: BLE001
-        queue.mark_failed(item, JobError(code="orchestrator_failed", message=str(exc)))
-        summary = _build_worker_summary(
-            job_id=job_id,
-            run_id=run_id,
-            pipeline_path=pipeline_path,
-            decision="failed",
-            error=JobError(code="orchestrator_failed", message=str(exc)),
-            dry_run=dry_run,
-        )
-        summary_path = _worker_summary_path(base_dir, job_id)
-        _write_json(summary_path, summary)
-        return summary
+        error = JobError(code="orchestrator_failed", message=str(exc))
+        return _finish_job(queue, item, error, dry_run, base_dir)
+    return _finish_job(queue, item, None, dry_run, base_dir)
+
+
+def _init_executor_process() -> None:
+    """
+    initializer ของ process ใน pool
 
+    ละเว้น SIGTERM/SIGINT เพื่อให้ parent เป็นผู้ drain งาน และ import orchestrator
+    ไว้ล่วงหน้าเพื่อให้งานแรกไม่ต้องรอ import
+    """
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    import orchestrator  # noqa: F401
 
-def run_queue_list(queue_dir: str | Path, base_dir: Path = ROOT) -> None:
+
+def _execute_job(
+    pipeline_path: str, run_id: str, params: dict[str, Any] | None
+) -> None:
+    """รัน pipeline ของงานหนึ่งงานใน process ของ pool (params ส่งผ่าน RunContext)"""
+    from orchestrator import run_pipeline  # noqa: E402
+
+    run_pipeline(Path(pipeline_path), run_id, params=params)
+
+
+def _execute_isolated(
+    limits: ResourceLimits,
+    pipeline_path: str,
+    run_id: str,
+    params: dict[str, Any] | None,
+) -> IsolatedResult:
+    """รัน pipeline ของงานใน child process แยกพร้อมข้อจำกัดทรัพยากร"""
+    job = IsolatedJob(
+        target=_PIPELINE_TARGET,
+        pipeline_path=pipeline_path,
+        run_id=run_id,
+        params=params,
+    )
+    return run_isolated(job, limits, extra_paths=[str(ROOT)])
+
+
+def _default_executor(concurrency: int) -> Executor:
+    return ProcessPoolExecutor(
+        max_workers=concurrency, initializer=_init_executor_process
+    )
+
+
+def _thread_executor(concurrency: int) -> Executor:
+    return ThreadPoolExecutor(max_workers=concurrency)
+
+
+def _install_stop_handlers(stop_event: threading.Event) -> Callable[[], None]:
+    """ให้ SIGTERM/SIGINT ตั้ง stop_event แทนการหยุดทันที คืนฟังก์ชันคืนค่า handler เดิม"""
+    if threading.current_thread() is not threading.main_thread():
+        return lambda: None
+
+    def _handle(signum: int, _frame: object) -> None:
+        print(f"Received signal {signum}; draining in-flight jobs")
+        stop_event.set()
+
+    previous = {
+        signum: signal.signal(signum, _handle)
+        for signum in (signal.SIGTERM, signal.SIGINT)
+    }
+
+    def _restore() -> None:
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
+
+    return _restore
+
+
+def run_daemon(
+    queue_dir: str | Path,
+    concurrency: int = 1,
+    base_dir: Path = ROOT,
+    *,
+    poll_interval: float = DEFAULT_POLL_INTERVAL_SECONDS,
+    until_empty: bool = False,
+    stop_event: threading.Event | None = None,
+    executor_factory: Callable[[int], Executor] | None = None,
+    job_runner: Callable[[str, str, dict[str, Any] | None], Any] | None = None,
+    lease_ttl: float = DEFAULT_LEASE_TTL_SECONDS,
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    backend: str = "file",
+    watch: str = "auto",
+    hold_until_scheduled: bool = False,
+    isolation: ResourceLimits | None = None,
+    class_limits: dict[str, int] | None = None,
+) -> list[dict[str, Any]] | None:
+    """
+    worker แบบรันต่อเนื่อง: ดึงงานจาก FileQueue ไปรันใน pool ครั้งละไม่เกิน concurrency
+
+    SIGTERM/SIGINT จะหยุดรับงานใหม่และรอให้งานที่กำลังรันเสร็จก่อนออก
+    ทุกงานเขียน worker_summary_<job_id>.json เหมือน run_worker
+    ระหว่างรัน daemon ต่ออายุ lease ของงานที่กำลังรันและ reap งานที่ lease หมดอายุ
+    backend file จะรอไฟล์งานใหม่ใน pending/ แบบ event-driven (inotify หรือ polling
+    mtime ของโฟลเดอร์) แทนการตรวจคิวทุก poll_interval
+
+    Args:
+        queue_dir: โฟลเดอร์คิว
+        concurrency: จำนวนงานที่รันพร้อมกันสูงสุด
+        base_dir: โฟลเดอร์รากของโปรเจกต์
+        poll_interval: ช่วงตรวจคิว (วินาที) เมื่อไม่ได้ใช้ inotify
+        until_empty: ออกเมื่อคิวว่างและไม่มีงานค้าง (สำหรับเคลียร์ backlog)
+        stop_event: event สำหรับสั่งหยุดจากภายนอก
+        executor_factory: สร้าง executor (ค่าเริ่มต้น ProcessPoolExecutor)
+        job_runner: ฟังก์ชันรันงาน (pipeline_path, run_id, params)
+        lease_ttl: อายุ lease ของงาน (วินาที)
+        max_attempts: จำนวนครั้งสูงสุดที่งานที่ lease หมดอายุจะถูกคืนกลับ pending
+        backend: backend ของคิว ("file" หรือ "sqlite")
+        watch: วิธีรองานใหม่ของ backend file ("auto" = inotify ถ้าใช้ได้, "poll")
+        hold_until_scheduled: รันงานเมื่อถึง scheduled_for เท่านั้น (ค่าเริ่มต้นรันทันที)
+        isolation: ถ้าระบุ จะรันแต่ละงานใน child process แยกพร้อมข้อจำกัดนี้
+            (pool เริ่มต้นเป็น thread เพราะ child ทำหน้าที่แยก process อยู่แล้ว)
+        class_limits: จำนวนงานที่รันพร้อมกันสูงสุดต่อ concurrency_class ของงาน
+            (นับรวมทุก worker ที่ใช้คิวเดียวกัน) งานที่ class เต็มจะถูกข้ามไปก่อน
+
+    Returns:
+        รายการ worker summary ของงานที่ประมวลผล หรือ None ถ้า pipeline/worker ถูกปิด
+    """
+    pipeline_enabled = parse_pipeline_enabled(os.environ.get("PIPELINE_ENABLED"))
+    if not pipeline_enabled:
+        print("Pipeline disabled by PIPELINE_ENABLED=false")
+        return None
+    if not _parse_enabled_flag(os.environ.get("WORKER_ENABLED")):
+        print("Worker disabled by WORKER_ENABLED=false")
+        return None
+
+    concurrency = max(1, concurrency)
+    queue = _open_queue(
+        _resolve_path(base_dir, queue_dir),
+        backend,
+        lease_ttl_seconds=lease_ttl,
+        max_attempts=max_attempts,
+    )
+    stop = stop_event or threading.Event()
+    watcher = None
+    if isinstance(queue, FileQueue):
+        watcher = open_watcher(
+            queue.pending_dir, poll_interval=poll_interval, use_inotify=watch == "auto"
+        )
+    # heartbeat/reap อย่างน้อย 3 ครั้งต่อ TTL ถ้าไม่มี watcher ต้องตรวจคิวทุก poll_interval
+    tick = lease_ttl / 3 if watcher is not None else min(poll_interval, lease_ttl / 3)
+    if isolation is not None:
+        runner = job_runner or functools.partial(_execute_isolated, isolation)
+        factory = executor_factory or _thread_executor
+    else:
+        runner = job_runner or _execute_job
+        factory = executor_factory or _default_executor
+    summaries: list[dict[str, Any]] = []
+    in_flight: dict[Future, QueueItem] = {}
+
+    def _submit(pool: Executor, item: QueueItem) -> None:
+        if item.job is None:
+            summaries.append(
+                _finish_job(queue, item, _INVALID_JOB_ERROR, False, base_dir)
+            )
+            return
+        try:
+            pipeline_path = _resolve_job_pipeline_path(item, base_dir)
+            if item.job.params:
+                serialize_pipeline_params(item.job.params)
+        except ParamsSerializationError:
+            summaries.append(_finish_job(queue, item, _PARAMS_ERROR, False, base_dir))
+            return
+        except ValueError as exc:
+            error = JobError(code="orchestrator_failed", message=str(exc))
+            summaries.append(_finish_job(queue, item, error, False, base_dir))
+            return
+        future = pool.submit(
+            runner, str(pipeline_path), item.job.run_id, item.job.params
+        )
+        in_flight[future] = item
+        future.add_done_callback(lambda _future: waker.notify())
+
+    def _heartbeat() -> None:
+        for item in in_flight.values():
+            try:
+                queue.heartbeat(item)
+            except LeaseLostError as exc:
+                print(f"WARNING: {exc}")
+            except (sqlite3.OperationalError, OSError) as exc:
+                # เช่น "database is locked" หรือดิสก์สะดุดชั่วคราว ลองใหม่ใน beat ถัดไป
+                print(f"WARNING: heartbeat failed for {item.job_id}: {exc}")
+
+    def _collect(future: Future) -> None:
+        item = in_flight.pop(future)
+        error = None
+        resources = None
+        exc = future.exception()
+        if exc is not None:
+            error = JobError(code="orchestrator_failed", message=str(exc))
+        elif isinstance(result := future.result(), IsolatedResult):
+            error = result.error
+            resources = result.resources()
+        summaries.append(_finish_job(queue, item, error, False, base_dir, resources))
+
+    def _wait_timeout() -> float:
+        if not hold_until_scheduled or len(in_flight) >= concurrency:
+            return tick
+        # ปลุกตอนงานที่เร็วที่สุดใน pending ถึงกำหนด (จากชื่อไฟล์ ไม่ต้องเปิดไฟล์)
+        next_at = queue.next_scheduled_at()
+        if next_at is None:
+            return tick
+        # งานที่ถึงกำหนดแล้วแต่ยัง claim ไม่ได้ (class เต็ม/lease ค้าง) ต้องรอ tick
+        # ไม่ใช่ 0 มิฉะนั้นจะวนถามคิวไม่หยุด งานใน pool เสร็จจะปลุก waker เองอยู่แล้ว
+        remaining = (next_at - _utc_now()).total_seconds()
+        return min(tick, remaining) if remaining > 0 else tick
+
+    restore_handlers = _install_stop_handlers(stop)
+    waker = QueueWaker(watcher, stop)
+    print(f"Worker daemon started (concurrency={concurrency})")
+    try:
+        with factory(concurrency) as pool:
+            while True:
+                for future in [future for future in in_flight if future.done()]:
+                    _collect(future)
+                _heartbeat()
+                if not stop.is_set() and len(in_flight) < concurrency:
+                    queue.reap_expired()
+                while not stop.is_set() and len(in_flight) < concurrency:
+                    due_before = _utc_now() if hold_until_scheduled else None
+                    item = queue.dequeue_next(
+                        due_before=due_before, class_limits=class_limits
+                    )
+                    if item is None:
+                        break
+                    _submit(pool, item)
+                if not in_flight and (stop.is_set() or until_empty):
+                    break
+                # ตื่นเมื่อมีไฟล์งานใหม่ งานใน pool เสร็จ ถูกสั่งหยุด หรือครบ timeout
+                waker.wait(_wait_timeout())
+    finally:
+        waker.close()
+        restore_handlers()
+    print(f"Worker daemon stopped ({len(summaries)} jobs processed)")
+    return summaries
+
+
+def run_queue_list(
+    queue_dir: str | Path, base_dir: Path = ROOT, *, backend: str = "file"
+) -> None:
     queue_dir = _resolve_path(base_dir, queue_dir)
-    queue = FileQueue(queue_dir)
+    queue = _open_queue(queue_dir, backend)
     for item in queue.list_pending():
         print(item.filename)
 
 
+def run_queue_reindex(
+    queue_dir: str | Path, base_dir: Path = ROOT, *, backend: str = "file"
+) -> int:
+    queue = _open_queue(_resolve_path(base_dir, queue_dir), backend)
+    count = queue.rebuild_index()
+    print(f"Indexed {count} jobs")
+    return count
+
+
+def run_queue_migrate(queue_dir: str | Path, base_dir: Path = ROOT) -> int:
+    """นำเข้างานจากคิวไฟล์ใน queue_dir เข้า SQLite ในโฟลเดอร์เดียวกัน"""
+    queue_dir = _resolve_path(base_dir, queue_dir)
+    report = migrate_file_queue(queue_dir, SQLiteQueue(queue_dir))
+    print(
+        f"Imported {report.imported} jobs into {queue_dir / 'queue.sqlite3'} "
+        f"({report.skipped} already present, {len(report.invalid)} invalid, "
+        f"{report.archived} archived job ids)"
+    )
+    for name in report.invalid:
+        print(f"WARNING: skipped invalid job file {name}")
+    return 1 if report.invalid else 0
+
+
+def run_queue_compact(
+    queue_dir: str | Path,
+    older_than_days: float = DEFAULT_COMPACT_AFTER_DAYS,
+    retention_days: float | None = None,
+    base_dir: Path = ROOT,
+) -> None:
+    """ย้ายงานเก่าใน done/failed ของคิวไฟล์เข้า archive และลบ archive ที่เกิน retention"""
+    queue = FileQueue(_resolve_path(base_dir, queue_dir))
+    report = compact_queue(
+        queue,
+        older_than=timedelta(days=older_than_days),
+        retention=timedelta(days=retention_days)
+        if retention_days is not None
+        else None,
+    )
+    print(
+        f"Archived {report.archived} jobs into {len(report.partitions)} partitions; "
+        f"purged {len(report.purged_partitions)} partitions"
+    )
+
+
 def _parse_now(now_value: str | None) -> datetime | None:
     if now_value is None:
         return None
@@ -459,6 +821,17 @@ def build_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="run without enqueue",
     )
+    schedule_parser.add_argument(
+        "--queue-backend",
+        choices=QUEUE_BACKENDS,
+        default="file",
+        help="queue storage backend",
+    )
+    schedule_parser.add_argument(
+        "--summarize-not-due",
+        action="store_true",
+        help="report entries outside the window as not_due_count only",
+    )
 
     work_parser = subparsers.add_parser("work", help="work one job")
     work_parser.add_argument(
@@ -471,6 +844,94 @@ def build_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="run without orchestrator execution",
     )
+    work_parser.add_argument(
+        "--queue-backend",
+        choices=QUEUE_BACKENDS,
+        default="file",
+        help="queue storage backend",
+    )
+    work_parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="keep running and pull jobs continuously (SIGTERM drains and exits)",
+    )
+    work_parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="jobs to run at once in --daemon mode",
+    )
+    work_parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=DEFAULT_POLL_INTERVAL_SECONDS,
+        help="seconds between queue checks in --daemon mode when not using inotify",
+    )
+    work_parser.add_argument(
+        "--until-empty",
+        action="store_true",
+        help="in --daemon mode, exit once the queue is drained",
+    )
+    work_parser.add_argument(
+        "--watch",
+        choices=WATCH_MODES,
+        default="auto",
+        help="how --daemon waits for new jobs: inotify when available, or polling",
+    )
+    work_parser.add_argument(
+        "--hold-until-scheduled",
+        action="store_true",
+        help="in --daemon mode, start each job only once its scheduled_for arrives",
+    )
+    work_parser.add_argument(
+        "--concurrency-classes",
+        type=parse_class_limits,
+        default=None,
+        metavar="CLASS=N,...",
+        help="max running jobs per concurrency class, e.g. render=1,upload=2,light=8",
+    )
+    work_parser.add_argument(
+        "--isolate",
+        action="store_true",
+        help="run each job in a separate child process (implied by the limits below)",
+    )
+    work_parser.add_argument(
+        "--max-memory-mb",
+        type=int,
+        help="address-space limit (RLIMIT_AS) for an isolated job, in MiB",
+    )
+    work_parser.add_argument(
+        "--max-cpu-seconds",
+        type=int,
+        help="CPU time limit (RLIMIT_CPU) for an isolated job",
+    )
+    work_parser.add_argument(
+        "--job-timeout",
+        type=float,
+        help="wall-clock seconds before an isolated job is killed",
+    )
+    work_parser.add_argument(
+        "--nice",
+        type=int,
+        help="niceness increment for isolated jobs",
+    )
+    work_parser.add_argument(
+        "--ionice",
+        choices=IONICE_CLASSES,
+        help="I/O scheduling class for isolated jobs (needs the ionice command)",
+    )
+    work_parser.add_argument(
+        "--lease-ttl",
+        type=float,
+        default=DEFAULT_LEASE_TTL_SECONDS,
+        help="seconds a running job's lease lives without a heartbeat",
+    )
+    work_parser.add_argument(
+        "--max-attempts",
+        type=int,
+        default=DEFAULT_MAX_ATTEMPTS,
+        help="attempts before a job with an expired lease is moved to failed",
+    )
 
     queue_parser = subparsers.add_parser("queue", help="queue operations")
     queue_subparsers = queue_parser.add_subparsers(dest="queue_command", required=True)
@@ -480,10 +941,71 @@ def build_parser() -> argparse.ArgumentParser:
         default="data/queue",
         help="queue directory",
     )
+    list_parser.add_argument(
+        "--queue-backend",
+        choices=QUEUE_BACKENDS,
+        default="file",
+        help="queue storage backend",
+    )
+    reindex_parser = queue_subparsers.add_parser(
+        "reindex", help="rebuild the job_id index after editing the queue by hand"
+    )
+    reindex_parser.add_argument(
+        "--queue-dir",
+        default="data/queue",
+        help="queue directory",
+    )
+    reindex_parser.add_argument(
+        "--queue-backend",
+        choices=QUEUE_BACKENDS,
+        default="file",
+        help="queue storage backend",
+    )
+    compact_parser = queue_subparsers.add_parser(
+        "compact", help="archive old done/failed jobs of a file queue"
+    )
+    compact_parser.add_argument(
+        "--queue-dir",
+        default="data/queue",
+        help="queue directory",
+    )
+    compact_parser.add_argument(
+        "--older-than-days",
+        type=float,
+        default=DEFAULT_COMPACT_AFTER_DAYS,
+        help="archive done/failed jobs finished more than this many days ago",
+    )
+    compact_parser.add_argument(
+        "--retention-days",
+        type=float,
+        default=None,
+        help="delete archive partitions scheduled more than this many days ago",
+    )
+    migrate_parser = queue_subparsers.add_parser(
+        "migrate", help="import a file queue into the sqlite backend"
+    )
+    migrate_parser.add_argument(
+        "--queue-dir",
+        default="data/queue",
+        help="queue directory (the database is created inside it)",
+    )
 
     return parser
 
 
+def _isolation_from_args(args: argparse.Namespace) -> ResourceLimits | None:
+    limits = ResourceLimits(
+        memory_mb=args.max_memory_mb,
+        cpu_seconds=args.max_cpu_seconds,
+        timeout_seconds=args.job_timeout,
+        nice=args.nice,
+        ionice=args.ionice,
+    )
+    if not args.isolate and limits == ResourceLimits():
+        return None
+    return limits
+
+
 def main(argv: list[str] | None = None) -> int:
     parser = build_parser()
     args = parser.parse_args(argv)
@@ -496,22 +1018,67 @@ def main(argv: list[str] | None = None) -> int:
             now=now_dt,
             window_minutes=args.window_minutes,
             dry_run=args.dry_run,
+            backend=args.queue_backend,
+            summarize_not_due=args.summarize_not_due,
         )
         return 0
 
+    isolation = _isolation_from_args(args) if args.command == "work" else None
+
+    if args.command == "work" and args.daemon:
+        if args.dry_run:
+            print("ERROR: --daemon cannot be combined with --dry-run")
+            return 1
+        summaries = run_daemon(
+            queue_dir=args.queue_dir,
+            concurrency=args.concurrency,
+            poll_interval=args.poll_interval,
+            until_empty=args.until_empty,
+            lease_ttl=args.lease_ttl,
+            max_attempts=args.max_attempts,
+            backend=args.queue_backend,
+            watch=args.watch,
+            hold_until_scheduled=args.hold_until_scheduled,
+            isolation=isolation,
+            class_limits=args.concurrency_classes,
+        )
+        if summaries and any(s.get("decision") == "failed" for s in summaries):
+            return 1
+        return 0
+
     if args.command == "work":
         summary = run_worker(
             queue_dir=args.queue_dir,
             dry_run=args.dry_run,
+            lease_ttl=args.lease_ttl,
+            max_attempts=args.max_attempts,
+            backend=args.queue_backend,
+            isolation=isolation,
+            class_limits=args.concurrency_classes,
         )
         if summary and summary.get("decision") == "failed":
             return 1
         return 0
 
     if args.command == "queue" and args.queue_command == "list":
-        run_queue_list(queue_dir=args.queue_dir)
+        run_queue_list(queue_dir=args.queue_dir, backend=args.queue_backend)
+        return 0
+
+    if args.command == "queue" and args.queue_command == "reindex":
+        run_queue_reindex(queue_dir=args.queue_dir, backend=args.queue_backend)
+        return 0
+
+    if args.command == "queue" and args.queue_command == "compact":
+        run_queue_compact(
+            queue_dir=args.queue_dir,
+            older_than_days=args.older_than_days,
+            retention_days=args.retention_days,
+        )
         return 0
 
+    if args.command == "queue" and args.queue_command == "migrate":
+        return run_queue_migrate(queue_dir=args.queue_dir)
+
     return 1
 
 
@@ -102,9 +102,10 @@ def check_video_properties(video_path: Path):
             "INFO",
         )
 
-        if width != 1920 or height != 1080:
+        # The e2e pipeline renders with render_profile: draft (854x480)
+        if width != 854 or height != 480:
             log(
-                f"FAIL: Resolution mismatch. Expected 1920x1080, got {width}x{height}",
+                f"FAIL: Resolution mismatch. Expected 854x480, got {width}x{height}",
                 "ERROR",
             )
             return False
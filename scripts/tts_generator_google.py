@@ -10,17 +10,51 @@ import json
 import os
 import re
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from dotenv import load_dotenv
 
+ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = ROOT / "src"
+if str(SRC_ROOT) not in sys.path:
+    sys.path.insert(0, str(SRC_ROOT))
+
+from automation_core.tts_cache import (  # noqa: E402
+    DEFAULT_TTS_CACHE_DIR,
+    TTS_CACHE_ENV,
+    TTSCache,
+    compute_tts_cache_key,
+    parse_tts_cache_enabled,
+)
+
 try:
     from google.cloud import texttospeech
     from google.oauth2 import service_account
 except ImportError:
-    print("❌ ไม่พบ google-cloud-texttospeech library")
-    print("💡 ติดตั้งด้วย: pip install google-cloud-texttospeech")
-    sys.exit(1)
+    # ตรวจอีกครั้งตอนสร้างเสียง เพื่อให้ import ฟังก์ชันอื่น (เช่น แบ่ง chunk) ได้
+    texttospeech = None
+    service_account = None
+
+try:
+    from google.api_core import exceptions as google_exceptions
+except ImportError:
+    google_exceptions = None
+
+# Google Cloud TTS limit: 5,000 bytes (ไม่ใช่ characters!)
+# ภาษาไทย 1 ตัวอักษร ≈ 3 bytes (UTF-8)
+MAX_BYTES = 4800  # เหลือที่ว่างสำหรับความปลอดภัย
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_MAX_RETRIES = 3
+RETRY_BACKOFF_SECONDS = 1.0
+# HTTP status ของ google.api_core ที่ลองใหม่ได้ (timeout, quota, server error)
+# นอกจากนี้ลองใหม่เฉพาะ connection/timeout error ของเครือข่าย
+_RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+_LIBRARY_MISSING_MESSAGE = (
+    "❌ ไม่พบ google-cloud-texttospeech library\n"
+    "💡 ติดตั้งด้วย: pip install google-cloud-texttospeech"
+)
 
 
 def load_config():
@@ -134,6 +168,119 @@ def convert_pause_to_ssml(text: str) -> tuple[str, bool]:
     return ssml_text, True
 
 
+def _build_client(credentials_path: str | None, credentials_dict: dict | None):
+    """สร้าง TextToSpeechClient จาก credentials file/dict หรือ default credentials"""
+    if credentials_path:
+        credentials = service_account.Credentials.from_service_account_file(
+            credentials_path
+        )
+        return texttospeech.TextToSpeechClient(credentials=credentials)
+    if credentials_dict:
+        credentials = service_account.Credentials.from_service_account_info(
+            credentials_dict
+        )
+        return texttospeech.TextToSpeechClient(credentials=credentials)
+    # ใช้ default credentials
+    return texttospeech.TextToSpeechClient()
+
+
+def split_text_chunks(
+    text: str, use_ssml: bool = False, max_bytes: int = MAX_BYTES
+) -> list[str]:
+    """
+    แบ่งข้อความเป็นส่วนที่ส่ง API ได้ครั้งละไม่เกิน max_bytes
+
+    ข้อความสั้นคืนตามเดิม 1 ส่วน ข้อความยาวแบ่งตามบรรทัด (เติมจุดท้ายบรรทัดที่ไม่มี
+    เครื่องหมายจบประโยค) และถ้าเป็น SSML แต่ละส่วนจะถูกห่อ <speak> ใหม่
+
+    Returns:
+        รายการข้อความ/SSML ตามลำดับที่ต้องนำเสียงมารวมกัน
+    """
+    if len(text.encode("utf-8")) <= max_bytes:
+        return [text]
+
+    # แยกที่ . ! ? และ \n (newline) เพื่อให้แต่ละบรรทัดเป็น sentence
+    chunks = []
+    # ถ้ามี SSML ให้แกะ <speak> ออกก่อนค่อยตัดชิ้น เพื่อไม่ให้แท็กคาบเกี่ยวข้ามชิ้น
+    working_text = text
+    if use_ssml:
+        working_text = working_text.replace("<speak>", "").replace("</speak>", "")
+    current_chunk = ""
+
+    for line in working_text.split("\n"):
+        line = line.strip()
+        if not line:
+            continue
+
+        # ถ้าบรรทัดไม่มีเครื่องหมายจบประโยค ให้เพิ่มจุด (ยกเว้น [PAUSE] และบรรทัดที่เป็น SSML tag ล้วนๆ)
+        if line[-1] not in ".!?" and not line.startswith("[PAUSE"):
+            tag_like = line.startswith("<") and line.endswith(">")
+            if not tag_like:
+                line += "."
+
+        test_chunk = current_chunk + "\n" + line if current_chunk else line
+        if len(test_chunk.encode("utf-8")) > max_bytes:
+            if current_chunk:
+                chunks.append(current_chunk.strip())
+            current_chunk = line
+        else:
+            current_chunk = test_chunk
+
+    if current_chunk:
+        chunks.append(current_chunk.strip())
+
+    if use_ssml:
+        # wrap ใหม่สำหรับแต่ละ chunk (chunk ณ ตอนนี้ไม่มี <speak> คงค้างแล้ว)
+        chunks = [f"<speak>{chunk}</speak>" for chunk in chunks]
+    return chunks
+
+
+def _is_retryable(error: Exception) -> bool:
+    """
+    error ชั่วคราวที่ควรลองใหม่
+
+    ได้แก่ GoogleAPICallError ที่มี HTTP status ใน _RETRYABLE_STATUS และ
+    connection/timeout error เท่านั้น error อื่น (เช่น TypeError/ValueError จาก input
+    ที่ผิด) ถูกส่งต่อทันทีโดยไม่ backoff
+    """
+    if isinstance(error, ConnectionError | TimeoutError):
+        return True
+    if google_exceptions is not None and isinstance(
+        error, google_exceptions.GoogleAPICallError
+    ):
+        return error.code in _RETRYABLE_STATUS
+    return False
+
+
+def _synthesize_chunk(
+    client,
+    chunk: str,
+    use_ssml: bool,
+    voice,
+    audio_config,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    backoff_seconds: float = RETRY_BACKOFF_SECONDS,
+) -> bytes:
+    """เรียก API สร้างเสียง 1 ส่วน ลองใหม่แบบ exponential backoff เมื่อล้มเหลวชั่วคราว"""
+    if use_ssml:
+        synthesis_input = texttospeech.SynthesisInput(ssml=chunk)
+    else:
+        synthesis_input = texttospeech.SynthesisInput(text=chunk)
+
+    attempt = 0
+    while True:
+        try:
+            response = client.synthesize_speech(
+                input=synthesis_input, voice=voice, audio_config=audio_config
+            )
+            return response.audio_content
+        except Exception as e:
+            if attempt >= max_retries or not _is_retryable(e):
+                raise
+            time.sleep(backoff_seconds * (2**attempt))
+            attempt += 1
+
+
 def generate_tts_google(
     text: str,
     output_path: Path,
@@ -143,10 +290,17 @@ def generate_tts_google(
     credentials_path: str = None,
     credentials_dict: dict = None,
     use_ssml: bool = False,
+    client=None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    cache: TTSCache | None = None,
 ):
     """
     สร้างเสียงจากข้อความด้วย Google Cloud TTS
 
+    ข้อความที่ยาวเกิน MAX_BYTES ถูกแบ่งเป็นหลายส่วนแล้วสร้างเสียงพร้อมกันใน thread pool
+    แต่ละส่วนลองใหม่แบบ backoff เมื่อ API ล้มเหลวชั่วคราว แล้วรวมตามลำดับเดิม
+
     Args:
         text: ข้อความที่ต้องการแปลงเป็นเสียง
         output_path: ไฟล์เสียงที่ต้องการบันทึก
@@ -155,181 +309,117 @@ def generate_tts_google(
         pitch: ระดับเสียง (-20.0 - 20.0, ค่าปกติ 0.0)
         credentials_path: path ไปยัง service account JSON file
         credentials_dict: dictionary ของ service account credentials
+        use_ssml: text เป็น SSML (ห่อด้วย <speak>) หรือไม่
+        client: TextToSpeechClient ที่สร้างไว้แล้ว (ค่าเริ่มต้นสร้างจาก credentials)
+        max_workers: จำนวนส่วนที่เรียก API พร้อมกันสูงสุด
+        max_retries: จำนวนครั้งที่ลองใหม่ต่อส่วนเมื่อ API ล้มเหลวชั่วคราว
+        cache: แคชเสียงระดับ chunk (ค่าเริ่มต้นไม่ใช้แคช)
     """
-    print("🎙️ กำลังสร้างเสียงด้วย Google Cloud TTS...")
-
-    try:
-        # สร้าง client
-        if credentials_path:
-            credentials = service_account.Credentials.from_service_account_file(
-                credentials_path
-            )
-            client = texttospeech.TextToSpeechClient(credentials=credentials)
-        elif credentials_dict:
-            credentials = service_account.Credentials.from_service_account_info(
-                credentials_dict
-            )
-            client = texttospeech.TextToSpeechClient(credentials=credentials)
-        else:
-            # ใช้ default credentials
-            client = texttospeech.TextToSpeechClient()
-
-        print("✅ เชื่อมต่อ Google Cloud TTS สำเร็จ")
-
-    except Exception as e:
-        print(f"❌ ไม่สามารถเชื่อมต่อ Google Cloud TTS: {e}")
+    if texttospeech is None:
+        print(_LIBRARY_MISSING_MESSAGE)
         return False
 
+    print("🎙️ กำลังสร้างเสียงด้วย Google Cloud TTS...")
+
     # ตรวจสอบความยาวข้อความ (Google นับเป็น bytes ไม่ใช่ characters)
     text_bytes = len(text.encode("utf-8"))
     text_length = len(text)
     print(f"📝 ความยาวสคริปต์: {text_length:,} ตัวอักษร ({text_bytes:,} bytes)")
 
-    # Google Cloud TTS limit: 5,000 bytes (ไม่ใช่ characters!)
-    # ภาษาไทย 1 ตัวอักษร ≈ 3 bytes (UTF-8)
-    MAX_BYTES = 4800  # เหลือที่ว่างสำหรับความปลอดภัย
-
-    if text_bytes > MAX_BYTES:
+    chunks = split_text_chunks(text, use_ssml)
+    if len(chunks) > 1:
         print(
             f"⚠️ ข้อความยาวเกิน {MAX_BYTES} bytes ({text_bytes:,} bytes) จะแบ่งเป็นหลายส่วน..."
         )
-
-        # แบ่งข้อความเป็นส่วนๆ ตาม byte limit
-        # แยกที่ . ! ? และ \n (newline) เพื่อให้แต่ละบรรทัดเป็น sentence
-        chunks = []
-        # ถ้ามี SSML ให้แกะ <speak> ออกก่อนค่อยตัดชิ้น เพื่อไม่ให้แท็กคาบเกี่ยวข้ามชิ้น
-        working_text = text
-        if use_ssml:
-            working_text = working_text.replace("<speak>", "").replace("</speak>", "")
-        lines = working_text.split("\n")
-        current_chunk = ""
-
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-
-            # ถ้าบรรทัดไม่มีเครื่องหมายจบประโยค ให้เพิ่มจุด (ยกเว้น [PAUSE] และบรรทัดที่เป็น SSML tag ล้วนๆ)
-            if line[-1] not in ".!?" and not line.startswith("[PAUSE"):
-                tag_like = line.startswith("<") and line.endswith(">")
-                if not tag_like:
-                    line += "."
-
-            test_chunk = current_chunk + "\n" + line if current_chunk else line
-            test_bytes = len(test_chunk.encode("utf-8"))
-
-            if test_bytes > MAX_BYTES:
-                if current_chunk:
-                    chunks.append(current_chunk.strip())
-                current_chunk = line
-            else:
-                current_chunk = test_chunk
-
-        if current_chunk:
-            chunks.append(current_chunk.strip())
-
-        print(f"📦 แบ่งเป็น {len(chunks)} ส่วน")
-
-        # สร้างเสียงแต่ละส่วน
-        audio_files = []
-        for i, chunk in enumerate(chunks, 1):
-            chunk_bytes = len(chunk.encode("utf-8"))
-            print(
-                f"\n🎙️ ส่วนที่ {i}/{len(chunks)} ({len(chunk):,} ตัวอักษร, {chunk_bytes:,} bytes)"
-            )
-
-            chunk_output = output_path.parent / f"temp_chunk_{i:03d}.mp3"
-
-            # สร้างเสียง (ถ้า text มี SSML อยู่แล้วจาก parent, ใช้ตรงๆ)
-            # ถ้ายังไม่มี SSML, แปลง chunk นี้ใหม่
-            if use_ssml:
-                # wrap ใหม่สำหรับแต่ละ chunk (chunk ณ ตอนนี้ไม่มี <speak> คงค้างแล้ว)
-                chunk_ssml_text = f"<speak>{chunk.strip()}</speak>"
-                synthesis_input = texttospeech.SynthesisInput(ssml=chunk_ssml_text)
-            else:
-                # ไม่มี SSML เลย ใช้ text ธรรมดา
-                synthesis_input = texttospeech.SynthesisInput(text=chunk)
-
-            voice = texttospeech.VoiceSelectionParams(
-                language_code="th-TH", name=voice_name
-            )
-
-            audio_config = texttospeech.AudioConfig(
-                audio_encoding=texttospeech.AudioEncoding.MP3,
-                speaking_rate=speaking_rate,
-                pitch=pitch,
-            )
-
-            # เรียก API พร้อมแสดงตัวอย่างข้อความสั้นๆ สำหรับดีบักเมื่อมีปัญหา
-            try:
-                response = client.synthesize_speech(
-                    input=synthesis_input, voice=voice, audio_config=audio_config
-                )
-            except Exception as e:
-                preview = chunk.replace("\n", " ")[:160]
-                print(f"   ⚠️ Chunk {i} failed: {e}\n   ↳ Preview: {preview}...")
-                return False
-
-            # บันทึกไฟล์
-            with open(chunk_output, "wb") as out:
-                out.write(response.audio_content)
-
-            audio_files.append(chunk_output)
-            print(f"   ✓ บันทึก {chunk_output.name}")
-
-        # รวมไฟล์เสียง
-        print("\n🔄 กำลังรวมไฟล์เสียง...")
+        print(f"📦 แบ่งเป็น {len(chunks)} ส่วน (สร้างพร้อมกันสูงสุด {max_workers} ส่วน)")
+    print(f"🔊 Voice: {voice_name}")
+    print(f"⚡ Speaking Rate: {speaking_rate}x")
+    print(f"🎵 Pitch: {pitch:+.1f}")
+
+    # chunk ที่ข้อความและพารามิเตอร์เสียงไม่เปลี่ยนใช้เสียงจากแคช ไม่ต้องเรียก API
+    cache_keys = [
+        compute_tts_cache_key(
+            chunk,
+            voice=voice_name,
+            speaking_rate=speaking_rate,
+            pitch=pitch,
+            ssml=use_ssml,
+            extra={"engine": "google"},
+        )
+        for chunk in chunks
+    ]
+    audio_parts: list[bytes | None] = [
+        cache.get(key) if cache is not None else None for key in cache_keys
+    ]
+    missing = [i for i, audio in enumerate(audio_parts) if audio is None]
+    if cache is not None:
+        print(f"♻️ ใช้เสียงจากแคช {len(chunks) - len(missing)}/{len(chunks)} ส่วน")
+    # ค่าใช้จ่ายคิดเฉพาะ chunk ที่ต้องเรียก API จริง
+    billed_length = sum(len(chunks[i]) for i in missing)
+
+    voice = audio_config = None
+    if missing:
         try:
-            with open(output_path, "wb") as outfile:
-                for audio_file in audio_files:
-                    with open(audio_file, "rb") as infile:
-                        outfile.write(infile.read())
+            if client is None:
+                client = _build_client(credentials_path, credentials_dict)
 
-            # ลบไฟล์ชั่วคราว
-            for audio_file in audio_files:
-                audio_file.unlink()
+            print("✅ เชื่อมต่อ Google Cloud TTS สำเร็จ")
 
-            print("   ✓ รวมไฟล์สำเร็จ")
         except Exception as e:
-            print(f"   ⚠️ ไม่สามารถรวมไฟล์ได้: {e}")
+            print(f"❌ ไม่สามารถเชื่อมต่อ Google Cloud TTS: {e}")
             return False
 
-    else:
-        # ข้อความสั้นกว่า 5,000 ตัวอักษร สร้างเลย
-        print(f"🔊 Voice: {voice_name}")
-        print(f"⚡ Speaking Rate: {speaking_rate}x")
-        print(f"🎵 Pitch: {pitch:+.1f}")
+        voice = texttospeech.VoiceSelectionParams(
+            language_code="th-TH", name=voice_name
+        )
+        audio_config = texttospeech.AudioConfig(
+            audio_encoding=texttospeech.AudioEncoding.MP3,
+            speaking_rate=speaking_rate,
+            pitch=pitch,
+        )
 
+    def _synthesize(index: int) -> bytes:
+        chunk = chunks[index]
         try:
-            # ใช้ SSML หรือ text ธรรมดา
-            if use_ssml:
-                synthesis_input = texttospeech.SynthesisInput(ssml=text)
-            else:
-                synthesis_input = texttospeech.SynthesisInput(text=text)
-
-            voice = texttospeech.VoiceSelectionParams(
-                language_code="th-TH", name=voice_name
-            )
-
-            audio_config = texttospeech.AudioConfig(
-                audio_encoding=texttospeech.AudioEncoding.MP3,
-                speaking_rate=speaking_rate,
-                pitch=pitch,
+            audio = _synthesize_chunk(
+                client, chunk, use_ssml, voice, audio_config, max_retries=max_retries
             )
-
-            response = client.synthesize_speech(
-                input=synthesis_input, voice=voice, audio_config=audio_config
+        except Exception as e:
+            # แสดงตัวอย่างข้อความสั้นๆ สำหรับดีบักเมื่อมีปัญหา
+            preview = chunk.replace("\n", " ")[:160]
+            print(f"   ⚠️ Chunk {index + 1} failed: {e}\n   ↳ Preview: {preview}...")
+            raise
+        if cache is not None:
+            cache.put(cache_keys[index], audio)
+        if len(chunks) > 1:
+            print(
+                f"   ✓ ส่วนที่ {index + 1}/{len(chunks)} "
+                f"({len(chunk):,} ตัวอักษร, {len(chunk.encode('utf-8')):,} bytes)"
             )
+        return audio
 
-            # บันทึกไฟล์
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(output_path, "wb") as out:
-                out.write(response.audio_content)
-
+    # client ของ Google ใช้ข้าม thread ได้ จึงใช้ client เดียวทั้ง pool
+    # map คืนผลตามลำดับ chunk เสมอ แม้แต่ละส่วนจะเสร็จไม่พร้อมกัน
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as pool:
+        try:
+            for index, audio in zip(
+                missing, pool.map(_synthesize, missing), strict=True
+            ):
+                audio_parts[index] = audio
         except Exception as e:
+            pool.shutdown(wait=False, cancel_futures=True)
             print(f"❌ เกิดข้อผิดพลาด: {e}")
             return False
 
+    # รวม MP3 ในหน่วยความจำแล้วเขียนครั้งเดียว (ไม่ต้องมีไฟล์ชั่วคราวต่อ chunk)
+    try:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, "wb") as out:
+            out.write(b"".join(audio_parts))
+    except OSError as e:
+        print(f"   ⚠️ ไม่สามารถบันทึกไฟล์ได้: {e}")
+        return False
+
     # ตรวจสอบไฟล์
     if output_path.exists():
         size_mb = output_path.stat().st_size / (1024 * 1024)
@@ -341,7 +431,7 @@ def generate_tts_google(
         cost_per_million = (
             16 if "Wavenet" in voice_name or "Neural" in voice_name else 4
         )
-        cost_usd = (text_length / 1_000_000) * cost_per_million
+        cost_usd = (billed_length / 1_000_000) * cost_per_million
         cost_thb = cost_usd * 35
 
         print(f"💰 ค่าใช้จ่าย: ${cost_usd:.4f} (~{cost_thb:.2f} บาท)")
@@ -395,6 +485,23 @@ def main():
     parser.add_argument(
         "--pitch", type=float, default=0.0, help="Pitch -20.0 to 20.0 (default: 0.0)"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_MAX_WORKERS,
+        help=f"Chunks synthesized concurrently (default: {DEFAULT_MAX_WORKERS})",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=DEFAULT_TTS_CACHE_DIR,
+        help="Chunk audio cache directory (default: data/tts_cache)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=f"Always call the API (also disabled by {TTS_CACHE_ENV}=false)",
+    )
     parser.add_argument(
         "--list-voices", action="store_true", help="List all available Thai voices"
     )
@@ -403,6 +510,9 @@ def main():
 
     # แสดงรายการเสียง
     if args.list_voices:
+        if texttospeech is None:
+            print(_LIBRARY_MISSING_MESSAGE)
+            sys.exit(1)
         print("\n🎙️ เสียงภาษาไทยที่มี:\n")
         voices = get_available_voices()
         for category, voice_list in voices.items():
@@ -438,6 +548,10 @@ def main():
         print(str(e))
         sys.exit(1)
 
+    cache = None
+    if not args.no_cache and parse_tts_cache_enabled(os.environ.get(TTS_CACHE_ENV)):
+        cache = TTSCache(args.cache_dir)
+
     # สร้างเสียง
     success = generate_tts_google(
         text=script_text,
@@ -448,6 +562,8 @@ def main():
         credentials_path=credentials_path,
         credentials_dict=credentials_dict,
         use_ssml=use_ssml,
+        max_workers=args.workers,
+        cache=cache,
     )
 
     sys.exit(0 if success else 1)
@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""
+สคริปต์ CLI wrapper สำหรับลบ blob ในคลัง voiceover ที่ไม่มี run ใดอ้างถึงแล้ว
+
+blob ถูกนับว่าถูกอ้างถึงเมื่อมีไฟล์ .wav ใต้ data/voiceovers เป็น hardlink
+หรือ symlink ไปที่ blob นั้น การลบโฟลเดอร์ของ run เก่าจึงปล่อยพื้นที่ได้ในรอบ gc ถัดไป
+
+วิธีใช้งาน:
+    python scripts/voiceover_store_gc.py --dry-run
+    python scripts/voiceover_store_gc.py
+"""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from automation_core.voiceover_store import cli_main  # noqa: E402
+
+if __name__ == "__main__":
+    raise SystemExit(cli_main())
@@ -1,79 +1,104 @@
-"""agents - โมดูลรวม AI Agents ทั้งหมด"""
+"""agents - โมดูลรวม AI Agents ทั้งหมด
 
-# ruff: noqa: I001
+คลาสทั้งหมดถูก import แบบ lazy เมื่อถูกเรียกใช้ครั้งแรก เพื่อไม่ให้การ import
+แพ็กเกจนี้ (หรือโมดูลย่อยใด ๆ) ดึง dependency หนักอย่าง pandas, pytrends
+หรือ googleapiclient ของทุกเอเจนต์มาพร้อมกัน
+"""
 
 from __future__ import annotations
 
+from importlib import import_module
 from typing import Any
 
-from .data_sync import (
-    DataSyncAgent,
-    DataSyncLogEntry,
-    DataSyncPayload,
-    DataSyncRequest,
-    DataSyncResponse,
-    SyncData,
-    SyncRule,
-)
-from .error_flag import (
-    AgentError as ErrorFlagAgentError,
-    AgentLog as ErrorFlagAgentLog,
-    CriticalItem as ErrorFlagCriticalItem,
-    ErrorFlagAgent,
-    ErrorFlagInput,
-    ErrorFlagOutput,
-    WarningItem as ErrorFlagWarningItem,
-)
-from .localization_subtitle.agent import LocalizationSubtitleAgent
-from .localization_subtitle.model import (
-    LocalizationSubtitleInput,
-    LocalizationSubtitleMeta,
-    LocalizationSubtitleOutput,
-    SubtitleSegment,
-)
-from .multi_channel_publish import (
-    ChannelPublishPayload as MultiChannelPublishChannelPayload,
-    MultiChannelPublishAgent,
-    MultiChannelPublishInput,
-    MultiChannelPublishLogEntry,
-    MultiChannelPublishOutput,
-    PublishAssets as MultiChannelPublishAssets,
-    PublishRequest as MultiChannelPublishRequest,
-)
-from .personalization import (
-    EngagementMetrics as PersonalizationEngagementMetrics,
-    PersonalizedRecommendation,
-    PersonalizationAgent,
-    PersonalizationConfig,
-    PersonalizationInput,
-    PersonalizationMeta,
-    PersonalizationOutput,
-    PersonalizationRequest,
-    RecommendationItem as PersonalizationRecommendationItem,
-    TrendInterest as PersonalizationTrendInterest,
-    UserProfile as PersonalizationUserProfile,
-    ViewHistoryItem as PersonalizationViewHistoryItem,
-)
-from .research_retrieval.agent import ResearchRetrievalAgent
-from .research_retrieval.model import ResearchRetrievalInput, ResearchRetrievalOutput
-from .scheduling_publishing.agent import SchedulingPublishingAgent
-from .scheduling_publishing.model import (
-    AudienceAnalytics,
-    ContentCalendarEntry,
-    ScheduleConstraints,
-    SchedulingInput,
-    SchedulingOutput,
-)
-from .script_outline.agent import ScriptOutlineAgent
-from .script_outline.model import ScriptOutlineInput, ScriptOutlineOutput
-from .script_writer.agent import ScriptWriterAgent
-from .script_writer.model import ScriptWriterInput, ScriptWriterOutput
-from .seo_metadata.agent import SeoMetadataAgent
-from .seo_metadata.model import SeoMetadataInput, SeoMetadataOutput
-from .topic_prioritizer.agent import TopicPrioritizerAgent
-from .topic_prioritizer.model import PriorityInput, PriorityOutput
-from .trend_scout.agent import TrendScoutAgent
-from .trend_scout.model import TrendScoutInput, TrendScoutOutput
+# ชื่อที่ส่งออก → (โมดูลย่อย, ชื่อในโมดูลนั้น)
+_LAZY_EXPORTS: dict[str, tuple[str, str]] = {
+    "DataSyncAgent": (".data_sync", "DataSyncAgent"),
+    "DataSyncLogEntry": (".data_sync", "DataSyncLogEntry"),
+    "DataSyncPayload": (".data_sync", "DataSyncPayload"),
+    "DataSyncRequest": (".data_sync", "DataSyncRequest"),
+    "DataSyncResponse": (".data_sync", "DataSyncResponse"),
+    "SyncData": (".data_sync", "SyncData"),
+    "SyncRule": (".data_sync", "SyncRule"),
+    "ErrorFlagAgentError": (".error_flag", "AgentError"),
+    "ErrorFlagAgentLog": (".error_flag", "AgentLog"),
+    "ErrorFlagCriticalItem": (".error_flag", "CriticalItem"),
+    "ErrorFlagAgent": (".error_flag", "ErrorFlagAgent"),
+    "ErrorFlagInput": (".error_flag", "ErrorFlagInput"),
+    "ErrorFlagOutput": (".error_flag", "ErrorFlagOutput"),
+    "ErrorFlagWarningItem": (".error_flag", "WarningItem"),
+    "LocalizationSubtitleAgent": (
+        ".localization_subtitle.agent",
+        "LocalizationSubtitleAgent",
+    ),
+    "LocalizationSubtitleInput": (
+        ".localization_subtitle.model",
+        "LocalizationSubtitleInput",
+    ),
+    "LocalizationSubtitleMeta": (
+        ".localization_subtitle.model",
+        "LocalizationSubtitleMeta",
+    ),
+    "LocalizationSubtitleOutput": (
+        ".localization_subtitle.model",
+        "LocalizationSubtitleOutput",
+    ),
+    "SubtitleSegment": (".localization_subtitle.model", "SubtitleSegment"),
+    "MultiChannelPublishChannelPayload": (
+        ".multi_channel_publish",
+        "ChannelPublishPayload",
+    ),
+    "MultiChannelPublishAgent": (".multi_channel_publish", "MultiChannelPublishAgent"),
+    "MultiChannelPublishInput": (".multi_channel_publish", "MultiChannelPublishInput"),
+    "MultiChannelPublishLogEntry": (
+        ".multi_channel_publish",
+        "MultiChannelPublishLogEntry",
+    ),
+    "MultiChannelPublishOutput": (
+        ".multi_channel_publish",
+        "MultiChannelPublishOutput",
+    ),
+    "MultiChannelPublishAssets": (".multi_channel_publish", "PublishAssets"),
+    "MultiChannelPublishRequest": (".multi_channel_publish", "PublishRequest"),
+    "PersonalizationEngagementMetrics": (".personalization", "EngagementMetrics"),
+    "PersonalizedRecommendation": (".personalization", "PersonalizedRecommendation"),
+    "PersonalizationAgent": (".personalization", "PersonalizationAgent"),
+    "PersonalizationConfig": (".personalization", "PersonalizationConfig"),
+    "PersonalizationInput": (".personalization", "PersonalizationInput"),
+    "PersonalizationMeta": (".personalization", "PersonalizationMeta"),
+    "PersonalizationOutput": (".personalization", "PersonalizationOutput"),
+    "PersonalizationRequest": (".personalization", "PersonalizationRequest"),
+    "PersonalizationRecommendationItem": (".personalization", "RecommendationItem"),
+    "PersonalizationTrendInterest": (".personalization", "TrendInterest"),
+    "PersonalizationUserProfile": (".personalization", "UserProfile"),
+    "PersonalizationViewHistoryItem": (".personalization", "ViewHistoryItem"),
+    "ResearchRetrievalAgent": (".research_retrieval.agent", "ResearchRetrievalAgent"),
+    "ResearchRetrievalInput": (".research_retrieval.model", "ResearchRetrievalInput"),
+    "ResearchRetrievalOutput": (".research_retrieval.model", "ResearchRetrievalOutput"),
+    "SchedulingPublishingAgent": (
+        ".scheduling_publishing.agent",
+        "SchedulingPublishingAgent",
+    ),
+    "AudienceAnalytics": (".scheduling_publishing.model", "AudienceAnalytics"),
+    "ContentCalendarEntry": (".scheduling_publishing.model", "ContentCalendarEntry"),
+    "ScheduleConstraints": (".scheduling_publishing.model", "ScheduleConstraints"),
+    "SchedulingInput": (".scheduling_publishing.model", "SchedulingInput"),
+    "SchedulingOutput": (".scheduling_publishing.model", "SchedulingOutput"),
+    "ScriptOutlineAgent": (".script_outline.agent", "ScriptOutlineAgent"),
+    "ScriptOutlineInput": (".script_outline.model", "ScriptOutlineInput"),
+    "ScriptOutlineOutput": (".script_outline.model", "ScriptOutlineOutput"),
+    "ScriptWriterAgent": (".script_writer.agent", "ScriptWriterAgent"),
+    "ScriptWriterInput": (".script_writer.model", "ScriptWriterInput"),
+    "ScriptWriterOutput": (".script_writer.model", "ScriptWriterOutput"),
+    "SeoMetadataAgent": (".seo_metadata.agent", "SeoMetadataAgent"),
+    "SeoMetadataInput": (".seo_metadata.model", "SeoMetadataInput"),
+    "SeoMetadataOutput": (".seo_metadata.model", "SeoMetadataOutput"),
+    "TopicPrioritizerAgent": (".topic_prioritizer.agent", "TopicPrioritizerAgent"),
+    "PriorityInput": (".topic_prioritizer.model", "PriorityInput"),
+    "PriorityOutput": (".topic_prioritizer.model", "PriorityOutput"),
+    "TrendScoutAgent": (".trend_scout.agent", "TrendScoutAgent"),
+    "TrendScoutInput": (".trend_scout.model", "TrendScoutInput"),
+    "TrendScoutOutput": (".trend_scout.model", "TrendScoutOutput"),
+}
 
 __all__ = [
     "TrendScoutAgent",
@@ -141,18 +166,23 @@ __all__ = [
 ]
 
 
-def __getattr__(name: str) -> Any:  # pragma: no cover
-    """Lazy-load optional DoctrineValidator exports.
+_DOCTRINE_VALIDATOR_EXPORTS = frozenset(
+    {"DoctrineValidatorAgent", "DoctrineValidatorInput", "DoctrineValidatorOutput"}
+)
+
+
+def __getattr__(name: str) -> Any:
+    """โหลดคลาสของเอเจนต์เมื่อถูกเรียกใช้ครั้งแรก แล้วเก็บไว้ใน globals()"""
+    if name in _LAZY_EXPORTS:
+        module_name, attr = _LAZY_EXPORTS[name]
+        value = getattr(import_module(module_name, __name__), attr)
+        globals()[name] = value
+        return value
 
-    เหตุผล: ลดภาระการ import dependency หนักใน package-level import.
-    """
-    if name not in {
-        "DoctrineValidatorAgent",
-        "DoctrineValidatorInput",
-        "DoctrineValidatorOutput",
-    }:
-        raise AttributeError(name)
+    if name not in _DOCTRINE_VALIDATOR_EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
+    # DoctrineValidator เป็น optional dependency: คืน None ถ้าติดตั้งไม่ครบ
     try:
         from .doctrine_validator import (  # type: ignore
             DoctrineValidatorAgent,
@@ -170,3 +200,7 @@ def __getattr__(name: str) -> Any:  # pragma: no cover
         }
     )
     return globals()[name]
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *_LAZY_EXPORTS})
@@ -12,11 +12,8 @@ automation_core - โมดูลหลักสำหรับระบบ Flow
 __version__ = "1.0.0"
 __author__ = "FlowBiz Team"
 
-from .base_agent import BaseAgent
-from .base_step import BaseStep
-from .config import AppConfig
-from .logging import setup_logging
-from .prompt_loader import PromptLoadError, load_prompt
+from importlib import import_module
+from typing import Any
 
 __all__ = [
     "BaseAgent",
@@ -26,3 +23,22 @@ __all__ = [
     "load_prompt",
     "PromptLoadError",
 ]
+
+# import แบบ lazy: โมดูลย่อยอย่าง automation_core.queue หรือ dispatch_v0
+# ไม่ต้องโหลด pydantic-settings/logging setup ทุกครั้งที่ถูก import
+_LAZY_EXPORTS = {
+    "BaseAgent": ".base_agent",
+    "BaseStep": ".base_step",
+    "AppConfig": ".config",
+    "setup_logging": ".logging",
+    "load_prompt": ".prompt_loader",
+    "PromptLoadError": ".prompt_loader",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _LAZY_EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_LAZY_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
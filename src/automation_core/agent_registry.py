@@ -0,0 +1,71 @@
+"""
+registry ของเอเจนต์แบบ lazy สำหรับ orchestrator
+
+เอเจนต์ลงทะเบียนได้ทั้งแบบฟังก์ชัน (โหลดแล้ว) หรือสตริง "module:attr" ซึ่งจะถูก
+import เมื่อถูกเรียกใช้ครั้งแรกเท่านั้น ทำให้ process ที่รันไม่กี่ step (เช่น worker
+ของ scheduler ที่เริ่ม interpreter ใหม่ทุกนาที) ไม่ต้องจ่ายค่า import ของทุกเอเจนต์
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator, Mapping, MutableMapping
+from importlib import import_module
+from typing import Any
+
+AgentFunc = Callable[..., Any]
+AgentEntry = AgentFunc | str
+
+
+def resolve_agent_spec(spec: str) -> AgentFunc:
+    """
+    import เอเจนต์จากสตริง "package.module:attr" (attr มีจุดได้ เช่น "step.run")
+
+    Raises:
+        ValueError: ถ้าสตริงไม่อยู่ในรูปแบบ "module:attr"
+        ImportError/AttributeError: ถ้าโมดูลหรือชื่อที่อ้างถึงไม่มีอยู่
+    """
+    module_name, sep, attr_path = spec.partition(":")
+    if not sep or not module_name or not attr_path:
+        raise ValueError(f"Invalid agent spec (expected 'module:attr'): {spec}")
+    obj: Any = import_module(module_name)
+    for attr in attr_path.split("."):
+        obj = getattr(obj, attr)
+    if not callable(obj):
+        raise TypeError(f"Agent spec does not point to a callable: {spec}")
+    return obj
+
+
+class LazyAgentRegistry(MutableMapping[str, AgentFunc]):
+    """mapping ของ uses → ฟังก์ชันเอเจนต์ ที่ import เอเจนต์เมื่ออ่านค่าครั้งแรก"""
+
+    def __init__(self, entries: Mapping[str, AgentEntry] | None = None) -> None:
+        self._entries: dict[str, AgentEntry] = dict(entries or {})
+
+    def __getitem__(self, uses: str) -> AgentFunc:
+        entry = self._entries[uses]
+        if isinstance(entry, str):
+            entry = resolve_agent_spec(entry)
+            self._entries[uses] = entry
+        return entry
+
+    def __setitem__(self, uses: str, entry: AgentEntry) -> None:
+        self._entries[uses] = entry
+
+    def __delitem__(self, uses: str) -> None:
+        del self._entries[uses]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, uses: object) -> bool:
+        return uses in self._entries
+
+    def is_loaded(self, uses: str) -> bool:
+        """True ถ้าเอเจนต์ถูก import แล้ว (ไม่ trigger การ import)"""
+        return not isinstance(self._entries[uses], str)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({sorted(self._entries)!r})"
@@ -0,0 +1,212 @@
+"""
+รัน pipeline หลาย run ใน process เดียว (batch mode ของ orchestrator)
+
+รายการ run อ่านได้จากไฟล์หัวข้อ (JSON/ข้อความ) หรือ JSONL ของ run spec
+แต่ละ run รันใน thread ของตัวเองโดยจำกัดจำนวนพร้อมกันด้วย concurrency
+และ run ที่ล้มเหลวจะไม่หยุด run อื่น
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from automation_core.contracts.common import _validate_run_id
+
+DEFAULT_BATCH_CONCURRENCY = 2
+_SPEC_KEYS = frozenset({"run_id", "topic", "pipeline"})
+
+
+class BatchSpecError(ValueError):
+    """ข้อผิดพลาดเมื่อไฟล์รายการ run ของ batch ไม่ถูกต้อง"""
+
+
+@dataclass(frozen=True)
+class BatchRunSpec:
+    """run หนึ่งรายการใน batch (pipeline=None คือใช้ pipeline หลักของ batch)"""
+
+    run_id: str
+    topic: str | None = None
+    pipeline: Path | None = None
+
+
+@dataclass(frozen=True)
+class BatchRunResult:
+    """ผลของ run หนึ่งรายการใน batch"""
+
+    run_id: str
+    topic: str | None
+    status: str
+    duration_s: float
+    successful_steps: int = 0
+    total_steps: int = 0
+    error: str | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "run_id": self.run_id,
+            "topic": self.topic,
+            "status": self.status,
+            "duration_s": round(self.duration_s, 3),
+            "successful_steps": self.successful_steps,
+            "total_steps": self.total_steps,
+            "error": self.error,
+        }
+
+
+def _topic_title(item: object, index: int) -> str:
+    if isinstance(item, dict):
+        item = item.get("title")
+    if not isinstance(item, str) or not item.strip():
+        raise BatchSpecError(f"topic #{index} must be a non-empty string or title")
+    return item.strip()
+
+
+def load_batch_topics(path: Path) -> list[str]:
+    """
+    อ่านรายการหัวข้อสำหรับ batch
+
+    รองรับ:
+        - JSON list ของสตริงหรือ object ที่มี title
+        - JSON object ที่มีคีย์ topics (รูปแบบเดียวกับ data/mock_topics.json)
+        - ไฟล์ข้อความ บรรทัดละหนึ่งหัวข้อ (ข้ามบรรทัดว่างและบรรทัดที่ขึ้นต้นด้วย #)
+    """
+    text = Path(path).read_text(encoding="utf-8")
+    if Path(path).suffix.lower() != ".json":
+        return [
+            line.strip()
+            for line in text.splitlines()
+            if line.strip() and not line.lstrip().startswith("#")
+        ]
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError as exc:
+        raise BatchSpecError(f"invalid topics JSON: {exc}") from exc
+    if isinstance(data, dict):
+        data = data.get("topics")
+    if not isinstance(data, list):
+        raise BatchSpecError("topics JSON must be a list or an object with 'topics'")
+    return [_topic_title(item, i) for i, item in enumerate(data, 1)]
+
+
+def load_batch_specs(path: Path) -> list[dict[str, Any]]:
+    """
+    อ่าน JSONL ของ run spec (หนึ่ง object ต่อบรรทัด: run_id, topic, pipeline)
+
+    ทุกคีย์เป็น optional; run_id ที่ไม่ระบุจะถูกสร้างโดย build_batch_runs
+    """
+    specs: list[dict[str, Any]] = []
+    lines = Path(path).read_text(encoding="utf-8").splitlines()
+    for line_no, line in enumerate(lines, 1):
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        try:
+            spec = json.loads(line)
+        except json.JSONDecodeError as exc:
+            raise BatchSpecError(f"line {line_no}: invalid JSON: {exc}") from exc
+        if not isinstance(spec, dict):
+            raise BatchSpecError(f"line {line_no}: run spec must be a JSON object")
+        unknown = sorted(set(spec) - _SPEC_KEYS)
+        if unknown:
+            raise BatchSpecError(f"line {line_no}: unknown keys: {', '.join(unknown)}")
+        specs.append(spec)
+    return specs
+
+
+def build_batch_runs(
+    entries: Sequence[dict[str, Any]], batch_id: str
+) -> list[BatchRunSpec]:
+    """
+    แปลงรายการ spec เป็น BatchRunSpec พร้อมตรวจ run_id
+
+    run ที่ไม่ระบุ run_id จะได้ "<batch_id>_<ลำดับ 3 หลัก>"
+
+    Raises:
+        BatchSpecError: ถ้า run_id ไม่ถูกต้องหรือซ้ำกัน
+    """
+    runs: list[BatchRunSpec] = []
+    seen: set[str] = set()
+    for i, entry in enumerate(entries, 1):
+        run_id = entry.get("run_id") or f"{batch_id}_{i:03d}"
+        try:
+            _validate_run_id(str(run_id))
+        except ValueError as exc:
+            raise BatchSpecError(f"run #{i}: {exc}") from exc
+        if run_id in seen:
+            raise BatchSpecError(f"duplicate run_id: {run_id}")
+        seen.add(run_id)
+        topic = entry.get("topic")
+        if topic is not None and not isinstance(topic, str):
+            raise BatchSpecError(f"run #{i}: topic must be a string")
+        pipeline = entry.get("pipeline")
+        runs.append(
+            BatchRunSpec(
+                run_id=str(run_id),
+                topic=topic,
+                pipeline=Path(pipeline) if pipeline else None,
+            )
+        )
+    if not runs:
+        raise BatchSpecError("batch has no runs")
+    return runs
+
+
+def run_batch(
+    runs: Sequence[BatchRunSpec],
+    runner: Callable[[BatchRunSpec], dict[str, Any]],
+    *,
+    concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+) -> list[BatchRunResult]:
+    """
+    รัน runner กับทุก run โดยรันพร้อมกันไม่เกิน concurrency
+
+    Args:
+        runs: รายการ run
+        runner: ฟังก์ชันที่รัน pipeline หนึ่ง run และคืน summary ของ run_pipeline
+        concurrency: จำนวน run ที่รันพร้อมกันสูงสุด (อย่างน้อย 1)
+
+    Returns:
+        ผลของทุก run เรียงตามลำดับเดิม
+    """
+
+    def _run_one(spec: BatchRunSpec) -> BatchRunResult:
+        started = time.perf_counter()
+        try:
+            summary = runner(spec)
+        except Exception as exc:
+            return BatchRunResult(
+                run_id=spec.run_id,
+                topic=spec.topic,
+                status="failed",
+                duration_s=time.perf_counter() - started,
+                error=str(exc),
+            )
+        successful = summary.get("successful", 0)
+        total = summary.get("total_steps", 0)
+        if "status" in summary:
+            status = summary["status"]
+        elif summary.get("failed", 0) > 0:
+            status = "failed"
+        elif successful < total:
+            # เช่น approval.gate สั่ง hold/reject ระหว่างทาง
+            status = "incomplete"
+        else:
+            status = "success"
+        return BatchRunResult(
+            run_id=spec.run_id,
+            topic=spec.topic,
+            status=status,
+            duration_s=time.perf_counter() - started,
+            successful_steps=successful,
+            total_steps=total,
+        )
+
+    with ThreadPoolExecutor(
+        max_workers=max(1, concurrency), thread_name_prefix="pipeline-batch"
+    ) as pool:
+        return list(pool.map(_run_one, runs))
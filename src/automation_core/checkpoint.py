@@ -0,0 +1,172 @@
+"""
+บันทึก checkpoint ราย step ของ pipeline เพื่อรันต่อจากจุดที่ค้างไว้ (resume)
+
+journal ถูกเขียนแบบ atomic (ไฟล์ชั่วคราว + os.replace) หลังทุก step ที่สำเร็จ
+และเก็บ SHA-256 ของไฟล์ผลลัพธ์ เพื่อให้ตอน resume ตรวจได้ว่าไฟล์ยังอยู่ครบและไม่ถูกแก้
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from collections.abc import Iterable, Mapping, Sequence
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from automation_core.step_cache import hash_file
+
+CHECKPOINT_FILENAME = "pipeline_checkpoint.json"
+CHECKPOINT_SCHEMA_VERSION = "v1"
+RESUMABLE_STATUSES = frozenset({"success", "cached", "resumed"})
+
+
+def step_fingerprint(step: Mapping[str, Any]) -> str:
+    """SHA-256 ของนิยาม step (ถ้า config เปลี่ยน checkpoint ของ step นั้นจะใช้ไม่ได้)"""
+    encoded = json.dumps(
+        step, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class CheckpointJournal:
+    """journal ของ run หนึ่งครั้ง เก็บที่ output/<run_id>/pipeline_checkpoint.json"""
+
+    def __init__(self, path: Path, run_id: str, pipeline: str) -> None:
+        self.path = Path(path)
+        self.run_id = run_id
+        self.pipeline = pipeline
+        self.steps: dict[str, dict[str, Any]] = {}
+        self.flags: dict[str, bool] = {}
+
+    @classmethod
+    def load(cls, path: Path, run_id: str, pipeline: str) -> CheckpointJournal:
+        """
+        โหลด journal เดิม (คืน journal ว่างถ้าไม่มีไฟล์, ไฟล์เสีย หรือเป็นของ run อื่น)
+        """
+        journal = cls(path, run_id, pipeline)
+        try:
+            data = json.loads(Path(path).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return journal
+        if (
+            not isinstance(data, dict)
+            or data.get("schema_version") != CHECKPOINT_SCHEMA_VERSION
+            or data.get("run_id") != run_id
+        ):
+            return journal
+        steps = data.get("steps")
+        if isinstance(steps, dict):
+            journal.steps = {str(k): v for k, v in steps.items() if isinstance(v, dict)}
+        flags = data.get("flags")
+        if isinstance(flags, dict):
+            journal.flags = {str(k): bool(v) for k, v in flags.items()}
+        return journal
+
+    def record_step(
+        self,
+        step_id: str,
+        *,
+        step: Mapping[str, Any],
+        status: str,
+        output: str,
+        artifacts: Iterable[tuple[str, Path]],
+    ) -> None:
+        """
+        บันทึก step ที่สำเร็จพร้อมแฮชของไฟล์ผลลัพธ์ แล้วเขียน journal ทันที
+
+        Args:
+            step_id: รหัส step
+            step: นิยาม step จาก YAML (ใช้คำนวณ fingerprint)
+            status: สถานะของ step (success/cached/resumed)
+            output: ค่า output ที่บันทึกใน pipeline_summary.json
+            artifacts: รายการ (path แบบ relative จาก root, path จริง) ของไฟล์ผลลัพธ์
+        """
+        self.steps[step_id] = {
+            "uses": step.get("uses"),
+            "fingerprint": step_fingerprint(step),
+            "status": status,
+            "output": output,
+            "artifacts": [
+                {"path": rel, "sha256": hash_file(path)} for rel, path in artifacts
+            ],
+            "completed_at": datetime.now(UTC).isoformat().replace("+00:00", "Z"),
+        }
+        self.write()
+
+    def set_flag(self, name: str) -> None:
+        """บันทึกว่าขั้นตอนอัตโนมัติ (เช่น post_templates) รันแล้ว"""
+        if self.flags.get(name):
+            return
+        self.flags[name] = True
+        self.write()
+
+    def write(self) -> None:
+        """เขียน journal แบบ atomic"""
+        payload = {
+            "schema_version": CHECKPOINT_SCHEMA_VERSION,
+            "run_id": self.run_id,
+            "pipeline": self.pipeline,
+            "updated_at": datetime.now(UTC).isoformat().replace("+00:00", "Z"),
+            "steps": self.steps,
+            "flags": self.flags,
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_name(f"{self.path.name}.tmp.{os.getpid()}")
+        temp_path.write_text(
+            json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+        os.replace(temp_path, self.path)
+
+    def _entry_is_valid(
+        self, step: Mapping[str, Any], entry: Mapping[str, Any], root_dir: Path
+    ) -> bool:
+        if entry.get("status") not in RESUMABLE_STATUSES:
+            return False
+        if entry.get("fingerprint") != step_fingerprint(step):
+            return False
+        artifacts = entry.get("artifacts")
+        if not isinstance(artifacts, list):
+            return False
+        for artifact in artifacts:
+            if not isinstance(artifact, dict):
+                return False
+            rel = artifact.get("path")
+            if not isinstance(rel, str) or Path(rel).is_absolute():
+                return False
+            path = root_dir / rel
+            if not path.is_file() or hash_file(path) != artifact.get("sha256"):
+                return False
+        return True
+
+    def resumable_steps(
+        self,
+        steps: Sequence[Mapping[str, Any]],
+        dependencies: Mapping[str, Sequence[str]],
+        order: Sequence[str],
+        root_dir: Path,
+    ) -> dict[str, dict[str, Any]]:
+        """
+        คืน step ที่ข้ามได้ตอน resume (step_id → รายการใน journal)
+
+        step จะข้ามได้เมื่อสำเร็จใน run ก่อน, นิยาม step ไม่เปลี่ยน, ไฟล์ผลลัพธ์
+        ยังอยู่และแฮชตรงกัน และ step ที่มันขึ้นอยู่ทั้งหมดก็ข้ามได้ด้วย
+
+        Args:
+            steps: รายการ step จาก YAML
+            dependencies: ผลจาก build_step_dependencies
+            order: ลำดับ topological ของ step
+            root_dir: โฟลเดอร์รากของโปรเจกต์
+        """
+        by_id = {str(step["id"]): step for step in steps}
+        resumable: dict[str, dict[str, Any]] = {}
+        for step_id in order:
+            entry = self.steps.get(step_id)
+            if entry is None:
+                continue
+            if not all(need in resumable for need in dependencies[step_id]):
+                continue
+            if self._entry_is_valid(by_id[step_id], entry, root_dir):
+                resumable[step_id] = entry
+        return resumable
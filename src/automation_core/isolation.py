@@ -0,0 +1,291 @@
+"""
+รันงานของ worker ใน child process แยก พร้อมจำกัดทรัพยากร
+
+parent (worker) เขียนคำขอเป็น JSON แล้วรัน ``python -m automation_core.isolation``
+child ตั้ง RLIMIT_AS/RLIMIT_CPU และ nice ของตัวเองก่อน import pipeline จากนั้นเขียน
+ผลลัพธ์กลับเป็น JSON ส่วน parent วัด peak RSS และเวลา CPU ของ child (รวม subprocess
+ที่ child รอ เช่น ffmpeg) ผ่าน wait4 และ kill ทั้ง process group เมื่อเกิน timeout
+
+หมายเหตุ:
+    - การจำกัดทรัพยากรใช้ได้บน POSIX เท่านั้น บน Windows จะรันแบบไม่จำกัด
+    - ionice ใช้คำสั่ง ``ionice`` ของระบบ ถ้าไม่มีจะข้าม
+"""
+
+from __future__ import annotations
+
+import importlib
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Literal
+
+from automation_core.queue import JobError
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None  # type: ignore[assignment]
+
+_SRC_ROOT = Path(__file__).resolve().parents[1]
+# เผื่อเวลาระหว่าง soft limit (SIGXCPU) กับ hard limit (SIGKILL) ของ RLIMIT_CPU
+_CPU_HARD_GRACE_SECONDS = 5
+_IONICE_CLASSES = {"best-effort": "2", "idle": "3"}
+
+
+@dataclass(frozen=True)
+class ResourceLimits:
+    """ข้อจำกัดของ child process (None = ไม่จำกัด)"""
+
+    memory_mb: int | None = None
+    cpu_seconds: int | None = None
+    timeout_seconds: float | None = None
+    nice: int | None = None
+    ionice: Literal["best-effort", "idle"] | None = None
+
+
+@dataclass(frozen=True)
+class IsolatedJob:
+    """คำขอรันงานใน child: target คือ "module:function" ที่รับ (path, run_id, params)"""
+
+    target: str
+    pipeline_path: str
+    run_id: str
+    params: dict[str, Any] | None = None
+
+
+@dataclass(frozen=True)
+class IsolatedResult:
+    """ผลการรันงานใน child"""
+
+    error: JobError | None
+    exit_code: int | None
+    wall_time_s: float
+    cpu_time_s: float | None
+    peak_rss_kb: int | None
+    timed_out: bool = False
+
+    def resources(self) -> dict[str, Any]:
+        """แปลงเป็น dict สำหรับเขียนลง worker_summary"""
+        return {
+            "exit_code": self.exit_code,
+            "wall_time_s": round(self.wall_time_s, 6),
+            "cpu_time_s": (
+                round(self.cpu_time_s, 6) if self.cpu_time_s is not None else None
+            ),
+            "peak_rss_kb": self.peak_rss_kb,
+            "timed_out": self.timed_out,
+        }
+
+
+def _apply_limits(limits: ResourceLimits) -> None:
+    """ตั้งข้อจำกัดให้ process ปัจจุบัน (เรียกใน child ก่อน import pipeline)"""
+    if resource is not None:
+        if limits.memory_mb is not None:
+            memory_bytes = limits.memory_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, memory_bytes))
+        if limits.cpu_seconds is not None:
+            hard = limits.cpu_seconds + _CPU_HARD_GRACE_SECONDS
+            resource.setrlimit(resource.RLIMIT_CPU, (limits.cpu_seconds, hard))
+    if limits.nice and hasattr(os, "nice"):
+        os.nice(limits.nice)
+
+
+def _resolve_target(target: str) -> Callable[..., Any]:
+    module_name, _, attr = target.partition(":")
+    if not module_name or not attr:
+        raise ValueError(f"target must be 'module:function': {target}")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def _write_result(path: Path, error: JobError | None) -> None:
+    payload = {"error": error.model_dump() if error is not None else None}
+    temp_path = path.with_suffix(f".tmp.{os.getpid()}")
+    temp_path.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+    os.replace(temp_path, path)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """จุดเริ่มของ child: argv = [request.json, result.json]"""
+
+    request_path, result_path = argv if argv is not None else sys.argv[1:3]
+    request = json.loads(Path(request_path).read_text(encoding="utf-8"))
+    _apply_limits(ResourceLimits(**request["limits"]))
+    job = IsolatedJob(**request["job"])
+    error: JobError | None = None
+    try:
+        runner = _resolve_target(job.target)
+        runner(Path(job.pipeline_path), job.run_id, params=job.params)
+    except MemoryError:
+        error = JobError(code="resource_limit", message="memory limit exceeded")
+    except Exception as exc:  # noqa: BLE001
+        error = JobError(code="orchestrator_failed", message=str(exc))
+    _write_result(Path(result_path), error)
+    return 0 if error is None else 1
+
+
+def _read_result(path: Path) -> JobError | None | Literal[False]:
+    """คืน error จากไฟล์ผลลัพธ์ หรือ False ถ้า child ไม่ได้เขียนผล"""
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return False
+    error = payload.get("error")
+    return JobError.model_validate(error) if error is not None else None
+
+
+def _error_from_exit(
+    exit_code: int, limits: ResourceLimits, timed_out: bool
+) -> JobError:
+    if timed_out:
+        return JobError(
+            code="job_timeout",
+            message=f"job exceeded {limits.timeout_seconds:g}s wall-clock timeout",
+        )
+    if exit_code < 0:
+        signum = -exit_code
+        if signum == signal.SIGXCPU or (
+            signum == signal.SIGKILL and limits.cpu_seconds is not None
+        ):
+            return JobError(
+                code="resource_limit",
+                message=f"cpu limit of {limits.cpu_seconds}s exceeded",
+            )
+        return JobError(
+            code="orchestrator_failed",
+            message=f"job process killed by signal {signal.Signals(signum).name}",
+        )
+    return JobError(
+        code="orchestrator_failed",
+        message=f"job process exited with code {exit_code} without a result",
+    )
+
+
+def _build_command(
+    request_path: Path, result_path: Path, limits: ResourceLimits, python: str
+) -> list[str]:
+    command = [python, "-m", "automation_core.isolation"]
+    command += [str(request_path), str(result_path)]
+    if limits.ionice is not None and shutil.which("ionice"):
+        command = ["ionice", "-c", _IONICE_CLASSES[limits.ionice], *command]
+    return command
+
+
+def _child_env(extra_paths: Sequence[str]) -> dict[str, str]:
+    env = os.environ.copy()
+    paths = [str(_SRC_ROOT), *extra_paths]
+    if env.get("PYTHONPATH"):
+        paths.append(env["PYTHONPATH"])
+    env["PYTHONPATH"] = os.pathsep.join(paths)
+    return env
+
+
+def _wait_child(
+    proc: subprocess.Popen[bytes], timeout: float | None
+) -> tuple[int, Any, bool]:
+    """รอ child คืน (exit_code, rusage, timed_out) และ kill ทั้งกลุ่มเมื่อเกิน timeout"""
+
+    lock = threading.Lock()
+    exited = False
+    timed_out = False
+
+    def _kill() -> None:
+        nonlocal timed_out
+        with lock:
+            # child ที่ออกแล้วแต่ยังไม่ถูก reap ยังถือ pid ไว้ จึงไม่ kill ผิดกลุ่ม
+            if exited:
+                return
+            timed_out = True
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+    timer = threading.Timer(timeout, _kill) if timeout is not None else None
+    if timer is not None:
+        timer.daemon = True
+        timer.start()
+    try:
+        if not hasattr(os, "wait4"):  # pragma: no cover - Windows
+            proc.wait()
+            return proc.returncode, None, timed_out
+        os.waitid(os.P_PID, proc.pid, os.WEXITED | os.WNOWAIT)
+        with lock:
+            exited = True
+        _, status, usage = os.wait4(proc.pid, 0)
+    finally:
+        if timer is not None:
+            timer.cancel()
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    return proc.returncode, usage, timed_out
+
+
+def run_isolated(
+    job: IsolatedJob,
+    limits: ResourceLimits | None = None,
+    *,
+    extra_paths: Sequence[str] = (),
+    python: str = sys.executable,
+) -> IsolatedResult:
+    """
+    รันงานใน child process แยกพร้อมข้อจำกัดทรัพยากร
+
+    Args:
+        job: งานที่จะรัน (params ต้อง serialize เป็น JSON ได้)
+        limits: ข้อจำกัดของ child
+        extra_paths: path ที่เพิ่มใน PYTHONPATH ของ child (เช่น โฟลเดอร์ที่มี target)
+        python: interpreter ที่ใช้รัน child
+
+    Returns:
+        IsolatedResult (error เป็น None เมื่องานสำเร็จ)
+    """
+
+    limits = limits or ResourceLimits()
+    with tempfile.TemporaryDirectory(prefix="isolated-job-") as temp_dir:
+        request_path = Path(temp_dir) / "request.json"
+        result_path = Path(temp_dir) / "result.json"
+        request = {"job": asdict(job), "limits": asdict(limits)}
+        request_path.write_text(
+            json.dumps(request, ensure_ascii=False), encoding="utf-8"
+        )
+        started = time.monotonic()
+        proc = subprocess.Popen(
+            _build_command(request_path, result_path, limits, python),
+            env=_child_env(extra_paths),
+            # แยก process group เพื่อ kill subprocess ของงาน (เช่น ffmpeg) ไปพร้อมกัน
+            # และไม่ให้ SIGINT จาก terminal ไปถึง child ก่อน worker จะ drain งาน
+            start_new_session=True,
+        )
+        exit_code, usage, timed_out = _wait_child(proc, limits.timeout_seconds)
+        wall_time_s = time.monotonic() - started
+        error = _read_result(result_path)
+
+    if error is False or timed_out:
+        error = _error_from_exit(exit_code, limits, timed_out)
+    cpu_time_s = peak_rss_kb = None
+    if usage is not None:
+        cpu_time_s = usage.ru_utime + usage.ru_stime
+        # macOS รายงานเป็น bytes ส่วน Linux เป็น kilobytes
+        peak_rss_kb = (
+            usage.ru_maxrss // 1024 if sys.platform == "darwin" else usage.ru_maxrss
+        )
+    return IsolatedResult(
+        error=error,
+        exit_code=exit_code,
+        wall_time_s=wall_time_s,
+        cpu_time_s=cpu_time_s,
+        peak_rss_kb=peak_rss_kb,
+        timed_out=timed_out,
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""
+ตัวช่วยสร้างกราฟการพึ่งพา (DAG) ของ step ใน pipeline จากคีย์ needs
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping, Sequence
+from typing import Any
+
+DEFAULT_MAX_WORKERS = 4
+
+
+class PipelineGraphError(ValueError):
+    """ข้อผิดพลาดเมื่อโครงสร้าง needs ของ pipeline ไม่ถูกต้อง"""
+
+
+def build_step_dependencies(
+    steps: Sequence[Mapping[str, Any]],
+) -> dict[str, tuple[str, ...]]:
+    """
+    สร้าง mapping ของ step_id ไปยังรายการ step ที่ต้องรันเสร็จก่อน
+
+    กติกา:
+        - step ที่ระบุ needs จะขึ้นกับ step เหล่านั้นเท่านั้น (needs: [] คือ root)
+        - step ที่ไม่มีคีย์ needs จะขึ้นกับ step ก่อนหน้าในลิสต์
+          เพื่อคงพฤติกรรมแบบเรียงลำดับของ pipeline เดิม
+
+    Args:
+        steps: รายการ step จากไฟล์ YAML
+
+    Returns:
+        dict ที่เรียงตามลำดับ step ในไฟล์ โดย value เป็น tuple ของ step_id
+
+    Raises:
+        PipelineGraphError: ถ้า step_id ซ้ำ, needs อ้างถึง step ที่ไม่มีอยู่
+            หรือกราฟมีวงจร
+    """
+    step_ids: list[str] = []
+    for step in steps:
+        step_id = step.get("id")
+        if not isinstance(step_id, str) or not step_id:
+            raise PipelineGraphError("every step must have a non-empty string id")
+        if step_id in step_ids:
+            raise PipelineGraphError(f"duplicate step id: {step_id}")
+        step_ids.append(step_id)
+
+    known = set(step_ids)
+    dependencies: dict[str, tuple[str, ...]] = {}
+    previous: str | None = None
+    for step, step_id in zip(steps, step_ids, strict=True):
+        if "needs" in step:
+            needs = step.get("needs") or []
+            if isinstance(needs, str):
+                needs = [needs]
+            if not isinstance(needs, list) or not all(
+                isinstance(item, str) for item in needs
+            ):
+                raise PipelineGraphError(
+                    f"needs of step {step_id} must be a list of step ids"
+                )
+            for need in needs:
+                if need not in known:
+                    raise PipelineGraphError(
+                        f"step {step_id} needs unknown step: {need}"
+                    )
+                if need == step_id:
+                    raise PipelineGraphError(f"step {step_id} cannot need itself")
+            dependencies[step_id] = tuple(dict.fromkeys(needs))
+        elif previous is not None:
+            dependencies[step_id] = (previous,)
+        else:
+            dependencies[step_id] = ()
+        previous = step_id
+
+    topological_order(dependencies)
+    return dependencies
+
+
+def topological_order(dependencies: Mapping[str, Sequence[str]]) -> list[str]:
+    """
+    คืนลำดับ step แบบ topological โดยคงลำดับในไฟล์เมื่อมีหลายทางเลือก
+
+    Raises:
+        PipelineGraphError: ถ้ากราฟมีวงจร
+    """
+    remaining = {step_id: set(needs) for step_id, needs in dependencies.items()}
+    order: list[str] = []
+    while remaining:
+        ready = [step_id for step_id, needs in remaining.items() if not needs]
+        if not ready:
+            cycle = ", ".join(remaining)
+            raise PipelineGraphError(f"pipeline needs contain a cycle: {cycle}")
+        for step_id in ready:
+            order.append(step_id)
+            del remaining[step_id]
+        for needs in remaining.values():
+            needs.difference_update(ready)
+    return order
+
+
+def resolve_max_workers(value: object, default: int = DEFAULT_MAX_WORKERS) -> int:
+    """
+    ตรวจสอบค่า max_workers ของ pipeline (ต้องเป็นจำนวนเต็มบวก)
+
+    Args:
+        value: ค่าจาก CLI หรือคีย์ max_workers ในไฟล์ pipeline (None = ค่าเริ่มต้น)
+        default: ค่าเริ่มต้นเมื่อไม่ได้ระบุ
+
+    Returns:
+        จำนวน worker สูงสุดที่ใช้รัน step พร้อมกัน
+    """
+    if value is None:
+        return default
+    if isinstance(value, bool) or not isinstance(value, int) or value <= 0:
+        raise PipelineGraphError("max_workers must be a positive integer")
+    return value
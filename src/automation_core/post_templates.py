@@ -697,13 +697,21 @@ def generate_post_content_summary(
     return summary, output_path
 
 
-def cli_main(argv: list[str] | None = None, base_dir: Path | None = None) -> int:
+def cli_main(
+    argv: list[str] | None = None,
+    base_dir: Path | None = None,
+    *,
+    pipeline_params_json: str | None = None,
+    checked_at: datetime | None = None,
+) -> int:
     """
     CLI interface สำหรับเรนเดอร์เทมเพลตโพสต์
 
     Args:
         argv: command-line arguments (ถ้าไม่ระบุจะใช้ sys.argv)
         base_dir: โฟลเดอร์ฐานของ repository (ค่าเริ่มต้นคือ REPO_ROOT)
+        pipeline_params_json: params ของ run (ถ้าไม่ระบุจะอ่าน PIPELINE_PARAMS_JSON)
+        checked_at: timestamp สำหรับบันทึกเวลาที่ตรวจสอบ
 
     Returns:
         int: exit code (0 = success, 1 = error)
@@ -731,7 +739,12 @@ def cli_main(argv: list[str] | None = None, base_dir: Path | None = None) -> int
         if not parse_pipeline_enabled(os.environ.get("PIPELINE_ENABLED")):
             print(PIPELINE_DISABLED_MESSAGE)
             return 0
-        _, output_path = generate_post_content_summary(args.run_id, base_dir=base_dir)
+        _, output_path = generate_post_content_summary(
+            args.run_id,
+            base_dir=base_dir,
+            pipeline_params_json=pipeline_params_json,
+            checked_at=checked_at,
+        )
     except Exception as exc:
         print(f"Error: {exc}", file=sys.stderr)
         return 1
@@ -1,20 +1,45 @@
 """
 คิวแบบไฟล์สำหรับจัดการงานที่ต้องรันแบบ deterministic
+
+งานใน running/ ถือ lease (ไฟล์ <filename>.lease ข้างไฟล์งาน) ที่ worker ต้องต่ออายุ
+ด้วย heartbeat ถ้า worker ตายและ lease หมดอายุ reap_expired() จะย้ายงานกลับ pending
+(หรือไป failed เมื่อพยายามครบ max_attempts แล้ว)
+
+ชื่อไฟล์ <scheduledUTC>_<job_id>.json เรียงตามเวลาได้อยู่แล้ว การหางานถัดไปจึงอ่าน
+เฉพาะไฟล์ที่เลือก และ index/<job_id> (ไฟล์ว่าง) ทำให้ exists() ไม่ต้อง glob ทุกสถานะ
+งานที่มี priority หรือ concurrency_class จะต่อท้ายชื่อเป็น <job_id>@<priority>@<class>
+เพื่อให้ dequeue_next เลือกงานตามลำดับความสำคัญและนับงานที่รันต่อ class ได้จากชื่อไฟล์
 """
 
 from __future__ import annotations
 
 import json
 import os
+import re
+import socket
+import threading
+import uuid
+from collections.abc import Callable, Iterator, Mapping, Sequence
+from contextlib import AbstractContextManager, contextmanager
 from dataclasses import dataclass
-from datetime import UTC, datetime
+from datetime import UTC, datetime, timedelta
 from pathlib import Path
-from typing import Any, Literal
+from typing import Any, Literal, Protocol
 
 from pydantic import BaseModel, Field, ValidationError
 
+from automation_core.queue_archive import ARCHIVE_DIRNAME, ArchivedJobIds
+
 QueueState = Literal["pending", "running", "done", "failed"]
 
+DEFAULT_LEASE_TTL_SECONDS = 15 * 60
+DEFAULT_MAX_ATTEMPTS = 3
+_LEASE_SUFFIX = ".lease"
+_INDEX_READY_MARKER = ".ready"
+_FILENAME_TIME_FORMAT = "%Y%m%dT%H%M%SZ"
+_FILENAME_TAG_SEPARATOR = "@"
+CONCURRENCY_CLASS_PATTERN = r"^[A-Za-z0-9_-]+$"
+
 
 class JobError(BaseModel):
     """ข้อมูลข้อผิดพลาดของงานในคิว"""
@@ -36,6 +61,29 @@ class JobSpec(BaseModel):
     status: QueueState
     attempts: int = 0
     last_error: JobError | None = None
+    priority: int = 0
+    concurrency_class: str | None = Field(
+        default=None, pattern=CONCURRENCY_CLASS_PATTERN
+    )
+
+
+class JobLease(BaseModel):
+    """lease ของงานใน running (เจ้าของและเวลา heartbeat ล่าสุด)"""
+
+    job_id: str
+    owner: str
+    acquired_at: str
+    heartbeat_at: str
+    ttl_seconds: float
+
+    def expires_at(self) -> datetime:
+        return _parse_iso_datetime(self.heartbeat_at) + timedelta(
+            seconds=self.ttl_seconds
+        )
+
+
+class LeaseLostError(RuntimeError):
+    """worker ไม่ได้ถือ lease ของงานแล้ว (หมดอายุและถูก reap หรือมีเจ้าของใหม่)"""
 
 
 @dataclass(frozen=True)
@@ -48,6 +96,46 @@ class QueueItem:
     job_id: str
 
 
+class JobQueue(Protocol):
+    """interface ร่วมของ backend คิว (FileQueue และ SQLiteQueue)"""
+
+    def exists(self, job_id: str) -> bool: ...
+
+    def enqueue(self, job: JobSpec, dry_run: bool = False) -> bool: ...
+
+    def enqueue_many(
+        self, jobs: Sequence[JobSpec], dry_run: bool = False
+    ) -> list[bool]: ...
+
+    def list_pending(self) -> list[QueueItem]: ...
+
+    def peek_next(self) -> QueueItem | None: ...
+
+    def next_scheduled_at(self) -> datetime | None: ...
+
+    def dequeue_next(
+        self,
+        due_before: datetime | None = None,
+        class_limits: Mapping[str, int] | None = None,
+    ) -> QueueItem | None: ...
+
+    def heartbeat(self, item: QueueItem) -> None: ...
+
+    def hold_lease(
+        self, item: QueueItem, interval: float | None = None
+    ) -> AbstractContextManager[None]: ...
+
+    def reap_expired(self, now: datetime | None = None) -> list[QueueItem]: ...
+
+    def mark_done(self, item: QueueItem) -> QueueItem: ...
+
+    def mark_failed(
+        self, item: QueueItem, error: JobError | None = None
+    ) -> QueueItem: ...
+
+    def rebuild_index(self) -> int: ...
+
+
 def _parse_iso_datetime(value: str) -> datetime:
     if value.endswith("Z"):
         value = value[:-1] + "+00:00"
@@ -57,28 +145,148 @@ def _parse_iso_datetime(value: str) -> datetime:
     return dt
 
 
+def _utc_now() -> datetime:
+    return datetime.now(UTC)
+
+
+def _utc_iso(value: datetime) -> str:
+    return value.astimezone(UTC).isoformat().replace("+00:00", "Z")
+
+
+def parse_class_limits(value: str) -> dict[str, int]:
+    """
+    แปลงข้อความ limit ของ concurrency class เช่น "render=1,upload=2,light:8"
+
+    Raises:
+        ValueError: ถ้ารูปแบบไม่ถูกต้อง ชื่อ class ไม่ถูกต้อง หรือ limit ติดลบ
+    """
+
+    limits: dict[str, int] = {}
+    for part in value.split(","):
+        if not part.strip():
+            continue
+        name, sep, raw_limit = part.replace(":", "=").partition("=")
+        name = name.strip()
+        if not sep or not re.match(CONCURRENCY_CLASS_PATTERN, name):
+            raise ValueError(f"invalid concurrency class entry: {part.strip()!r}")
+        try:
+            limit = int(raw_limit.strip())
+        except ValueError:
+            raise ValueError(f"invalid limit for concurrency class {name!r}") from None
+        if limit < 0:
+            raise ValueError(f"limit for concurrency class {name!r} must be >= 0")
+        limits[name] = limit
+    return limits
+
+
+def _default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+@contextmanager
+def _keep_lease_alive(
+    heartbeat: Callable[[], None],
+    every: float,
+    job_id: str,
+    retry_on: tuple[type[Exception], ...] = (OSError,),
+) -> Iterator[None]:
+    """เรียก heartbeat ทุก every วินาทีใน background thread จนกว่าจะออกจาก block"""
+    stop = threading.Event()
+
+    def _beat() -> None:
+        while not stop.wait(every):
+            try:
+                heartbeat()
+            except LeaseLostError:
+                return
+            except retry_on:
+                # heartbeat ครั้งถัดไปจะลองใหม่
+                continue
+
+    thread = threading.Thread(target=_beat, name=f"lease-{job_id}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
 def _format_compact_utc(value: str) -> str:
     dt = _parse_iso_datetime(value).astimezone(UTC)
-    return dt.strftime("%Y%m%dT%H%M%SZ")
+    return dt.strftime(_FILENAME_TIME_FORMAT)
 
 
-def _job_id_from_filename(filename: str) -> str:
+def _scheduled_from_filename(filename: str) -> datetime | None:
+    try:
+        return datetime.strptime(filename[:16], _FILENAME_TIME_FORMAT).replace(
+            tzinfo=UTC
+        )
+    except ValueError:
+        return None
+
+
+def _job_filename(job: JobSpec) -> str:
+    """ชื่อไฟล์/คีย์เรียงลำดับของงาน (ใช้ร่วมกันทั้ง FileQueue และ SQLiteQueue)"""
+    name = f"{_format_compact_utc(job.scheduled_for)}_{job.job_id}"
+    if job.priority or job.concurrency_class:
+        sep = _FILENAME_TAG_SEPARATOR
+        name += f"{sep}{job.priority}{sep}{job.concurrency_class or ''}"
+    return f"{name}.json"
+
+
+def _parse_job_filename(filename: str) -> tuple[str, int, str | None]:
+    """แยก (job_id, priority, concurrency_class) จากชื่อไฟล์งาน"""
     stem = Path(filename).stem
     parts = stem.split("_", 1)
-    if len(parts) == 2:
-        return parts[1]
-    return stem
+    job_id = parts[1] if len(parts) == 2 else stem
+    tagged = job_id.rsplit(_FILENAME_TAG_SEPARATOR, 2)
+    if len(tagged) == 3:
+        base_id, priority, concurrency_class = tagged
+        try:
+            return base_id, int(priority), concurrency_class or None
+        except ValueError:
+            pass
+    return job_id, 0, None
+
+
+def _job_id_from_filename(filename: str) -> str:
+    return _parse_job_filename(filename)[0]
 
 
 class FileQueue:
     """คิวไฟล์แบบ deterministic"""
 
-    def __init__(self, queue_dir: Path | str) -> None:
+    def __init__(
+        self,
+        queue_dir: Path | str,
+        *,
+        lease_ttl_seconds: float = DEFAULT_LEASE_TTL_SECONDS,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        worker_id: str | None = None,
+    ) -> None:
+        """
+        Args:
+            queue_dir: โฟลเดอร์คิว
+            lease_ttl_seconds: อายุ lease (วินาที) นับจาก heartbeat ล่าสุด
+            max_attempts: จำนวนครั้งสูงสุดที่งานที่ lease หมดอายุจะถูกคืนกลับ pending
+            worker_id: ชื่อเจ้าของ lease (ค่าเริ่มต้น host:pid:สุ่ม)
+        """
+        if lease_ttl_seconds <= 0:
+            raise ValueError("lease_ttl_seconds must be positive")
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
         self.queue_dir = Path(queue_dir)
         self.pending_dir = self.queue_dir / "pending"
         self.running_dir = self.queue_dir / "running"
         self.done_dir = self.queue_dir / "done"
         self.failed_dir = self.queue_dir / "failed"
+        self.index_dir = self.queue_dir / "index"
+        self.archived_job_ids = ArchivedJobIds(self.queue_dir / ARCHIVE_DIRNAME)
+        self._index_ready = False
+        self.lease_ttl_seconds = lease_ttl_seconds
+        self.max_attempts = max_attempts
+        self.worker_id = worker_id or _default_worker_id()
 
     def _ensure_dirs(self) -> None:
         for path in [
@@ -90,9 +298,12 @@ class FileQueue:
             path.mkdir(parents=True, exist_ok=True)
 
     def _write_job(self, path: Path, job: JobSpec) -> None:
+        payload = json.dumps(job.model_dump(), ensure_ascii=False, indent=2)
+        self._write_atomic(path, payload)
+
+    def _write_atomic(self, path: Path, payload: str) -> None:
         path.parent.mkdir(parents=True, exist_ok=True)
         temp_path = path.with_suffix(f"{path.suffix}.tmp.{os.getpid()}")
-        payload = json.dumps(job.model_dump(), ensure_ascii=False, indent=2)
         temp_path.write_text(payload, encoding="utf-8")
         try:
             os.replace(temp_path, path)
@@ -117,31 +328,67 @@ class FileQueue:
             return None
 
     def _build_filename(self, job: JobSpec) -> str:
-        scheduled_compact = _format_compact_utc(job.scheduled_for)
-        return f"{scheduled_compact}_{job.job_id}.json"
+        return _job_filename(job)
 
     def _list_dir(self, path: Path) -> list[Path]:
         if not path.exists():
             return []
         return sorted(path.glob("*.json"))
 
-    def _find_by_job_id(self, job_id: str) -> list[Path]:
-        pattern = f"*_{job_id}.json"
-        matches: list[Path] = []
+    def _item_from_path(self, path: Path, job: JobSpec | None) -> QueueItem:
+        return QueueItem(
+            filename=path.name,
+            path=path,
+            job=job,
+            job_id=_job_id_from_filename(path.name),
+        )
+
+    def _ensure_index(self) -> None:
+        if self._index_ready:
+            return
+        if not (self.index_dir / _INDEX_READY_MARKER).exists():
+            # คิวที่สร้างก่อนมี index: สร้างจากไฟล์งานที่มีอยู่หนึ่งครั้ง
+            self.rebuild_index()
+        self._index_ready = True
+
+    def rebuild_index(self) -> int:
+        """
+        สร้าง index/<job_id> ใหม่จากไฟล์งานในทุกสถานะ
+
+        ใช้หลังแก้ไขโฟลเดอร์คิวด้วยมือ (เช่นลบงานใน failed เพื่อให้ enqueue ใหม่ได้)
+        ไม่ควรรันพร้อมกับ scheduler ที่กำลัง enqueue
+
+        Returns:
+            จำนวนงานใน index
+        """
+
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        job_ids: set[str] = set()
         for path in [
             self.pending_dir,
             self.running_dir,
             self.done_dir,
             self.failed_dir,
         ]:
-            if path.exists():
-                matches.extend(path.glob(pattern))
-        return matches
+            job_ids.update(_job_id_from_filename(p.name) for p in self._list_dir(path))
+        for marker in self.index_dir.iterdir():
+            if marker.name != _INDEX_READY_MARKER and marker.name not in job_ids:
+                marker.unlink(missing_ok=True)
+        for job_id in job_ids:
+            (self.index_dir / job_id).touch()
+        (self.index_dir / _INDEX_READY_MARKER).touch()
+        self._index_ready = True
+        return len(job_ids)
 
     def exists(self, job_id: str) -> bool:
-        """ตรวจว่ามีงานอยู่ในคิวทุกสถานะหรือไม่"""
+        """
+        ตรวจว่ามีงานอยู่ในคิวทุกสถานะหรือไม่
+
+        ดูจาก index/<job_id> และ job_id ที่ถูก compact เข้า archive แล้ว
+        """
 
-        return bool(self._find_by_job_id(job_id))
+        self._ensure_index()
+        return (self.index_dir / job_id).exists() or job_id in self.archived_job_ids
 
     def enqueue(self, job: JobSpec, dry_run: bool = False) -> bool:
         """
@@ -165,10 +412,19 @@ class FileQueue:
             # แต่ไม่เขียนไฟล์จริง
             return True
 
+        return self._write_pending(job)
+
+    def _write_pending(self, job: JobSpec) -> bool:
         pending_job = job.model_copy(update={"status": "pending", "last_error": None})
         target_path = self.pending_dir / self._build_filename(pending_job)
         payload = json.dumps(pending_job.model_dump(), ensure_ascii=False, indent=2)
+        marker_path = self.index_dir / job.job_id
 
+        try:
+            # จอง job_id ใน index ก่อน เพื่อให้ enqueue พร้อมกันสำเร็จเพียงครั้งเดียว
+            marker_path.open("x").close()
+        except FileExistsError:
+            return False
         try:
             # ใช้โหมด "x" เพื่อสร้างไฟล์แบบ exclusive และเขียนข้อมูลในขั้นตอนเดียว
             with open(target_path, "x", encoding="utf-8") as f:
@@ -176,71 +432,342 @@ class FileQueue:
         except FileExistsError:
             # มีงานที่ job_id เดียวกันถูก enqueue ไปแล้ว
             return False
+        except OSError:
+            marker_path.unlink(missing_ok=True)
+            raise
         else:
             return True
 
+    def enqueue_many(
+        self, jobs: Sequence[JobSpec], dry_run: bool = False
+    ) -> list[bool]:
+        """
+        เพิ่มหลายงานลงคิวในรอบเดียว (ผลลัพธ์เหมือนเรียก enqueue ทีละงานตามลำดับ)
+
+        อ่านรายชื่อ index/ ครั้งเดียวเป็น snapshot แทนการตรวจทีละงาน
+        การเขียนยังใช้ไฟล์แบบ exclusive จึงปลอดภัยเมื่อ enqueue พร้อมกันหลาย process
+
+        Returns:
+            ผลของแต่ละงานตามลำดับเดิม (True = ถูกเพิ่ม/จะถูกเพิ่มถ้าไม่ใช่ dry_run)
+        """
+
+        self._ensure_dirs()
+        self._ensure_index()
+        known = set(os.listdir(self.index_dir))
+        results: list[bool] = []
+        for job in jobs:
+            if job.job_id in known or job.job_id in self.archived_job_ids:
+                results.append(False)
+            elif dry_run:
+                results.append(True)
+            else:
+                added = self._write_pending(job)
+                known.add(job.job_id)
+                results.append(added)
+        return results
+
     def list_pending(self) -> list[QueueItem]:
         """คืนรายการงานในสถานะ pending ตามลำดับ FIFO"""
 
-        items: list[QueueItem] = []
-        for path in self._list_dir(self.pending_dir):
-            job = self._load_job(path)
-            items.append(
-                QueueItem(
-                    filename=path.name,
-                    path=path,
-                    job=job,
-                    job_id=_job_id_from_filename(path.name),
-                )
-            )
-        return items
+        return [
+            self._item_from_path(path, self._load_job(path))
+            for path in self._list_dir(self.pending_dir)
+        ]
 
     def peek_next(self) -> QueueItem | None:
-        """ดูงานถัดไปแบบไม่ย้ายสถานะ"""
+        """ดูงานถัดไปแบบไม่ย้ายสถานะ (priority มากก่อน อ่านเฉพาะไฟล์ที่เลือก)"""
 
-        pending = self.list_pending()
-        if not pending:
+        paths = self._list_dir(self.pending_dir)
+        if not paths:
             return None
-        return pending[0]
+        # max คืนตัวแรกเมื่อ priority เท่ากัน จึงคงลำดับตามชื่อไฟล์
+        path = max(paths, key=lambda p: _parse_job_filename(p.name)[1])
+        return self._item_from_path(path, self._load_job(path))
+
+    def next_scheduled_at(self) -> datetime | None:
+        """เวลา scheduled_for ที่เร็วที่สุดใน pending (อ่านจากชื่อไฟล์แรก ไม่เปิดไฟล์)"""
 
-    def dequeue_next(self) -> QueueItem | None:
-        """ย้ายงานถัดไปจาก pending ไป running"""
+        for path in self._list_dir(self.pending_dir):
+            return _scheduled_from_filename(path.name)
+        return None
 
-        pending = self.list_pending()
-        if not pending:
+    def _lease_path(self, filename: str) -> Path:
+        return self.running_dir / f"{filename}{_LEASE_SUFFIX}"
+
+    def _load_lease(self, path: Path) -> JobLease | None:
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return None
+        try:
+            return JobLease.model_validate(data)
+        except ValidationError:
             return None
-        item = pending[0]
+
+    def _new_lease(self, job_id: str) -> JobLease:
+        now = _utc_iso(_utc_now())
+        return JobLease(
+            job_id=job_id,
+            owner=self.worker_id,
+            acquired_at=now,
+            heartbeat_at=now,
+            ttl_seconds=self.lease_ttl_seconds,
+        )
+
+    def _running_by_class(self) -> dict[str, int]:
+        """นับงานที่รันหรือกำลังถูก claim (มีไฟล์งานหรือ lease ใน running/) ต่อ class"""
+        if not self.running_dir.exists():
+            return {}
+        filenames = {
+            name
+            for path in self.running_dir.iterdir()
+            if (name := path.name.removesuffix(_LEASE_SUFFIX)).endswith(".json")
+        }
+        counts: dict[str, int] = {}
+        for filename in filenames:
+            concurrency_class = _parse_job_filename(filename)[2]
+            if concurrency_class is not None:
+                counts[concurrency_class] = counts.get(concurrency_class, 0) + 1
+        return counts
+
+    def _claim_lease(self, item: QueueItem) -> bool:
+        """สร้างไฟล์ lease แบบ exclusive; คืน False ถ้า worker อื่นกำลัง claim งานนี้"""
+        lease = self._new_lease(item.job_id)
+        payload = json.dumps(lease.model_dump(), ensure_ascii=False, indent=2)
+        try:
+            with open(self._lease_path(item.filename), "x", encoding="utf-8") as f:
+                f.write(payload)
+        except FileExistsError:
+            return False
+        return True
+
+    def _check_lease(self, item: QueueItem) -> None:
+        lease = self._load_lease(self._lease_path(item.filename))
+        if lease is not None and lease.owner != self.worker_id:
+            raise LeaseLostError(
+                f"job {item.job_id} is leased by {lease.owner}, not {self.worker_id}"
+            )
+
+    def dequeue_next(
+        self,
+        due_before: datetime | None = None,
+        class_limits: Mapping[str, int] | None = None,
+    ) -> QueueItem | None:
+        """
+        ย้ายงานถัดไปจาก pending ไป running พร้อมถือ lease ของงาน
+
+        lease ถูกสร้างก่อนย้ายไฟล์ด้วยโหมด exclusive จึงมี worker เพียงตัวเดียว
+        ที่ claim งานหนึ่งได้ งานที่ worker อื่นกำลัง claim จะถูกข้ามไปงานถัดไป
+        ลำดับงานมาจากชื่อไฟล์ (priority มากก่อน แล้วตามเวลา) จึงอ่าน JSON
+        เฉพาะงานที่ claim ได้เท่านั้น
+
+        Args:
+            due_before: ถ้าระบุ จะ claim เฉพาะงานที่ scheduled_for ไม่เกินเวลานี้
+            class_limits: จำนวนงานที่รันพร้อมกันได้สูงสุดต่อ concurrency_class
+                (นับจาก running/ ของทุก worker; 0 = หยุด class ชั่วคราว,
+                class ที่ไม่ระบุหรืองานที่ไม่มี class ไม่จำกัด)
+        """
+
         self._ensure_dirs()
-        dest_path = self.running_dir / item.filename
+        cutoff = (
+            due_before.astimezone(UTC).strftime(_FILENAME_TIME_FORMAT)
+            if due_before is not None
+            else None
+        )
+        candidates: list[tuple[Path, int, str | None]] = []
+        for path in self._list_dir(self.pending_dir):
+            if cutoff is not None and path.name[:16] > cutoff:
+                # ชื่อไฟล์เรียงตามเวลา งานที่เหลือจึงยังไม่ถึงกำหนดทั้งหมด
+                break
+            _, priority, concurrency_class = _parse_job_filename(path.name)
+            candidates.append((path, priority, concurrency_class))
+        # sort แบบ stable: priority เท่ากันยังคงลำดับตามชื่อไฟล์ (FIFO)
+        candidates.sort(key=lambda candidate: -candidate[1])
+        running = self._running_by_class() if class_limits else {}
+        for path, _, concurrency_class in candidates:
+            limit = (
+                class_limits.get(concurrency_class)
+                if class_limits and concurrency_class is not None
+                else None
+            )
+            if limit is not None and running.get(concurrency_class, 0) >= limit:
+                continue
+            item = self._item_from_path(path, None)
+            if not self._claim_lease(item):
+                continue
+            if (
+                limit is not None
+                and self._running_by_class().get(concurrency_class, 0) > limit
+            ):
+                # worker อื่น claim งาน class เดียวกันไปพร้อมกัน: นับรวม lease ที่กำลัง
+                # claim แล้วเกิน limit จึงคืน lease และปล่อยให้รอบถัดไปตัดสินใหม่
+                self._lease_path(item.filename).unlink(missing_ok=True)
+                continue
+            dest_path = self.running_dir / item.filename
+            try:
+                os.replace(path, dest_path)
+            except FileNotFoundError:
+                # งานถูก dequeue โดย worker ตัวอื่นไปแล้ว
+                self._lease_path(item.filename).unlink(missing_ok=True)
+                continue
+            job = self._load_job(dest_path)
+            if job is not None:
+                job = job.model_copy(
+                    update={
+                        "status": "running",
+                        "attempts": job.attempts + 1,
+                        "last_error": None,
+                    }
+                )
+                self._write_job(dest_path, job)
+            return self._item_from_path(dest_path, job)
+        return None
+
+    def heartbeat(self, item: QueueItem) -> None:
+        """
+        ต่ออายุ lease ของงานที่กำลังรัน
+
+        Raises:
+            LeaseLostError: ถ้างานไม่อยู่ใน running แล้วหรือ lease เป็นของ worker อื่น
+        """
+
+        if not (self.running_dir / item.filename).exists():
+            raise LeaseLostError(f"job {item.job_id} is no longer running")
+        lease_path = self._lease_path(item.filename)
+        lease = self._load_lease(lease_path)
+        if lease is None:
+            lease = self._new_lease(item.job_id)
+        elif lease.owner != self.worker_id:
+            raise LeaseLostError(
+                f"job {item.job_id} is leased by {lease.owner}, not {self.worker_id}"
+            )
+        else:
+            lease = lease.model_copy(
+                update={
+                    "heartbeat_at": _utc_iso(_utc_now()),
+                    "ttl_seconds": self.lease_ttl_seconds,
+                }
+            )
+        payload = json.dumps(lease.model_dump(), ensure_ascii=False, indent=2)
+        self._write_atomic(lease_path, payload)
+
+    @contextmanager
+    def hold_lease(
+        self, item: QueueItem, interval: float | None = None
+    ) -> Iterator[None]:
+        """
+        ต่ออายุ lease ใน background thread ระหว่างที่ block ทำงาน
+
+        Args:
+            item: งานที่ได้จาก dequeue_next
+            interval: ระยะห่างระหว่าง heartbeat (ค่าเริ่มต้น 1/3 ของ lease TTL)
+        """
+
+        every = interval if interval is not None else self.lease_ttl_seconds / 3
+        with _keep_lease_alive(lambda: self.heartbeat(item), every, item.job_id):
+            yield
+
+    def reap_expired(self, now: datetime | None = None) -> list[QueueItem]:
+        """
+        คืนงานใน running ที่ lease หมดอายุ (worker ตายหรือค้าง)
+
+        งานที่ attempts ยังไม่ถึง max_attempts จะกลับไป pending เพื่อให้ worker อื่นรันต่อ
+        งานที่ครบแล้วหรือ payload เสียจะถูกย้ายไป failed พร้อม last_error=lease_expired
+        งานที่ไม่มีไฟล์ lease (เช่นจากเวอร์ชันก่อน) ใช้เวลาแก้ไขไฟล์งานแทน heartbeat
+
+        Args:
+            now: เวลาอ้างอิง (ค่าเริ่มต้นเวลาปัจจุบัน)
+
+        Returns:
+            รายการงานที่ถูกย้ายออกจาก running (path คือตำแหน่งใหม่)
+        """
+
+        now = now or _utc_now()
+        fallback_ttl = timedelta(seconds=self.lease_ttl_seconds)
+        reaped: list[QueueItem] = []
+        for path in self._list_dir(self.running_dir):
+            lease_path = self._lease_path(path.name)
+            lease = self._load_lease(lease_path)
+            if lease is not None:
+                expires_at = lease.expires_at()
+            else:
+                try:
+                    mtime = path.stat().st_mtime
+                except FileNotFoundError:
+                    continue
+                expires_at = datetime.fromtimestamp(mtime, UTC) + fallback_ttl
+            if expires_at > now:
+                continue
+            item = self._reap(path, lease)
+            if item is not None:
+                reaped.append(item)
+        self._remove_orphan_leases(now)
+        return reaped
+
+    def _reap(self, path: Path, lease: JobLease | None) -> QueueItem | None:
+        # ย้ายไฟล์ออกจาก running ไปชื่อชั่วคราว (ไม่ตรง *.json) ก่อน เพื่อให้ reaper
+        # เพียงตัวเดียวเป็นผู้ย้าย และ worker อื่นไม่ dequeue ไฟล์ที่ยังเขียนไม่เสร็จ
+        staging_path = self.pending_dir / f"{path.name}.reap.{os.getpid()}"
         try:
-            os.replace(item.path, dest_path)
+            os.replace(path, staging_path)
         except FileNotFoundError:
-            # งานถูก dequeue โดย worker ตัวอื่นไปแล้ว
             return None
-        job = item.job
+        self._lease_path(path.name).unlink(missing_ok=True)
+
+        job = self._load_job(staging_path)
+        owner = lease.owner if lease is not None else "unknown"
+        if job is not None and job.attempts < self.max_attempts:
+            dest_dir = self.pending_dir
+            status: QueueState = "pending"
+            message = f"lease of {owner} expired after attempt {job.attempts}"
+        else:
+            dest_dir = self.failed_dir
+            status = "failed"
+            attempts = job.attempts if job is not None else 0
+            message = f"lease of {owner} expired after {attempts} attempts"
         if job is not None:
             job = job.model_copy(
                 update={
-                    "status": "running",
-                    "attempts": job.attempts + 1,
-                    "last_error": None,
+                    "status": status,
+                    "last_error": JobError(code="lease_expired", message=message),
                 }
             )
-            self._write_job(dest_path, job)
-        return QueueItem(
-            filename=item.filename,
-            path=dest_path,
-            job=job,
-            job_id=item.job_id,
-        )
+            self._write_job(staging_path, job)
+        dest_path = dest_dir / path.name
+        os.replace(staging_path, dest_path)
+        return self._item_from_path(dest_path, job)
+
+    def _remove_orphan_leases(self, now: datetime) -> None:
+        """ลบ lease ที่หมดอายุและไม่มีไฟล์งานคู่กัน (worker ตายระหว่าง claim)"""
+        if not self.running_dir.exists():
+            return
+        for lease_path in self.running_dir.glob(f"*{_LEASE_SUFFIX}"):
+            job_path = lease_path.with_suffix("")
+            if job_path.exists():
+                continue
+            lease = self._load_lease(lease_path)
+            if lease is None or lease.expires_at() <= now:
+                lease_path.unlink(missing_ok=True)
+
+    def _move_from_running(self, item: QueueItem, dest_path: Path) -> None:
+        self._check_lease(item)
+        try:
+            os.replace(self.running_dir / item.filename, dest_path)
+        except FileNotFoundError as exc:
+            raise LeaseLostError(f"job {item.job_id} is no longer running") from exc
+        self._lease_path(item.filename).unlink(missing_ok=True)
 
     def mark_done(self, item: QueueItem) -> QueueItem:
-        """ย้ายงานจาก running ไป done"""
+        """
+        ย้ายงานจาก running ไป done
+
+        Raises:
+            LeaseLostError: ถ้างานถูก reap ไปแล้วหรือ lease เป็นของ worker อื่น
+        """
 
         self._ensure_dirs()
-        src_path = self.running_dir / item.filename
         dest_path = self.done_dir / item.filename
-        os.replace(src_path, dest_path)
+        self._move_from_running(item, dest_path)
         job = item.job
         if job is not None:
             job = job.model_copy(update={"status": "done", "last_error": None})
@@ -253,12 +780,16 @@ class FileQueue:
         )
 
     def mark_failed(self, item: QueueItem, error: JobError | None = None) -> QueueItem:
-        """ย้ายงานจาก running ไป failed"""
+        """
+        ย้ายงานจาก running ไป failed
+
+        Raises:
+            LeaseLostError: ถ้างานถูก reap ไปแล้วหรือ lease เป็นของ worker อื่น
+        """
 
         self._ensure_dirs()
-        src_path = self.running_dir / item.filename
         dest_path = self.failed_dir / item.filename
-        os.replace(src_path, dest_path)
+        self._move_from_running(item, dest_path)
         job = item.job
         if job is not None:
             update: dict[str, Any] = {"status": "failed"}
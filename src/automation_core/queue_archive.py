@@ -0,0 +1,174 @@
+"""
+compaction และ retention ของงานใน done/ และ failed/ ของ FileQueue
+
+งานที่เสร็จนานแล้วถูกรวมเป็น archive/<YYYYMMDD>.jsonl.gz (แบ่งตามวันที่ scheduled_for)
+และ job_id ถูกเก็บใน archive/job_ids.txt (เรียงลำดับ) เพื่อให้ exists() ยังกันการ
+enqueue ซ้ำได้หลังลบไฟล์งานและ index/<job_id> ออกแล้ว
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import os
+from bisect import bisect_left
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from automation_core.queue import FileQueue
+
+ARCHIVE_DIRNAME = "archive"
+JOB_IDS_FILENAME = "job_ids.txt"
+DEFAULT_COMPACT_AFTER_DAYS = 7
+_UNDATED_PARTITION = "undated"
+
+
+class ArchivedJobIds:
+    """ชุด job_id ที่ถูก archive แล้ว อ่านจาก job_ids.txt และโหลดใหม่เมื่อไฟล์เปลี่ยน"""
+
+    def __init__(self, archive_dir: Path) -> None:
+        self.path = archive_dir / JOB_IDS_FILENAME
+        self._ids: list[str] = []
+        self._stamp: tuple[int, int] | None = None
+
+    def _load(self) -> list[str]:
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            self._ids, self._stamp = [], None
+            return self._ids
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp != self._stamp:
+            text = self.path.read_text(encoding="utf-8")
+            self._ids = [line for line in text.splitlines() if line]
+            self._stamp = stamp
+        return self._ids
+
+    def __contains__(self, job_id: object) -> bool:
+        ids = self._load()
+        index = bisect_left(ids, job_id)
+        return index < len(ids) and ids[index] == job_id
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._load())
+
+    def add(self, job_ids: Iterable[str]) -> None:
+        """รวม job_id ใหม่เข้ากับไฟล์เดิมแล้วเขียนแบบ atomic (ยังเรียงลำดับ)"""
+        merged = sorted(set(self._load()).union(job_ids))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_suffix(f".tmp.{os.getpid()}")
+        temp_path.write_text(
+            "".join(f"{job_id}\n" for job_id in merged), encoding="utf-8"
+        )
+        os.replace(temp_path, self.path)
+        self._ids, self._stamp = merged, None
+
+
+@dataclass
+class CompactionReport:
+    """ผลการ compact คิว"""
+
+    archived: int = 0
+    partitions: list[str] = field(default_factory=list)
+    purged_partitions: list[str] = field(default_factory=list)
+
+
+def _partition_of(filename: str) -> str:
+    prefix = filename[:8]
+    return prefix if prefix.isdigit() else _UNDATED_PARTITION
+
+
+def _archive_record(path: Path, state: str) -> str:
+    text = path.read_text(encoding="utf-8")
+    record: dict[str, object] = {"state": state, "filename": path.name}
+    try:
+        record["job"] = json.loads(text)
+    except json.JSONDecodeError:
+        # เก็บ payload ที่เสียไว้ตามเดิมเพื่อการตรวจสอบย้อนหลัง
+        record["raw"] = text
+    return json.dumps(record, ensure_ascii=False)
+
+
+def compact_queue(
+    queue: FileQueue,
+    *,
+    older_than: timedelta = timedelta(days=DEFAULT_COMPACT_AFTER_DAYS),
+    retention: timedelta | None = None,
+    now: datetime | None = None,
+) -> CompactionReport:
+    """
+    ย้ายงานใน done/ และ failed/ ที่เสร็จก่อน now - older_than เข้า archive
+
+    ลำดับการทำงาน: เขียน archive -> เพิ่ม job_id ใน job_ids.txt -> ลบไฟล์งานและ
+    index/<job_id> ถ้าหยุดกลางทาง รอบถัดไปจะ archive ซ้ำได้โดยไม่ทำให้งานหาย
+    ไม่ควรรันหลาย instance พร้อมกัน
+
+    Args:
+        queue: คิวไฟล์
+        older_than: อายุขั้นต่ำของงาน (นับจากเวลาแก้ไขไฟล์ล่าสุด) ที่จะถูก archive
+        retention: ถ้าระบุ จะลบ partition ของ archive ที่เก่ากว่า now - retention
+            (job_id ยังอยู่ใน job_ids.txt เพื่อกันการ enqueue ซ้ำ)
+        now: เวลาอ้างอิง (ค่าเริ่มต้นเวลาปัจจุบัน)
+
+    Returns:
+        CompactionReport
+    """
+
+    now = now or datetime.now(UTC)
+    cutoff = (now - older_than).timestamp()
+    archive_dir = queue.queue_dir / ARCHIVE_DIRNAME
+    report = CompactionReport()
+
+    batches: dict[str, list[tuple[Path, str]]] = {}
+    for state, directory in (("done", queue.done_dir), ("failed", queue.failed_dir)):
+        for path in queue._list_dir(directory):
+            try:
+                if path.stat().st_mtime > cutoff:
+                    continue
+            except FileNotFoundError:
+                continue
+            batches.setdefault(_partition_of(path.name), []).append((path, state))
+
+    archived: list[tuple[Path, str]] = []
+    if batches:
+        archive_dir.mkdir(parents=True, exist_ok=True)
+    for partition in sorted(batches):
+        lines: list[str] = []
+        for path, state in batches[partition]:
+            try:
+                lines.append(_archive_record(path, state))
+            except FileNotFoundError:
+                continue
+            archived.append((path, state))
+        if not lines:
+            continue
+        # gzip แบบ append เพิ่ม member ใหม่ต่อท้าย ซึ่ง gzip.open อ่านต่อเนื่องได้
+        with gzip.open(
+            archive_dir / f"{partition}.jsonl.gz", "at", encoding="utf-8"
+        ) as f:
+            f.write("".join(f"{line}\n" for line in lines))
+        report.partitions.append(partition)
+
+    if archived:
+        job_ids = [queue._item_from_path(path, None).job_id for path, _ in archived]
+        queue.archived_job_ids.add(job_ids)
+        for (path, _state), job_id in zip(archived, job_ids, strict=True):
+            path.unlink(missing_ok=True)
+            (queue.index_dir / job_id).unlink(missing_ok=True)
+        report.archived = len(archived)
+
+    if retention is not None and archive_dir.exists():
+        oldest_kept = (now - retention).strftime("%Y%m%d")
+        for archive_path in sorted(archive_dir.glob("*.jsonl.gz")):
+            partition = archive_path.name.removesuffix(".jsonl.gz")
+            if partition.isdigit() and partition < oldest_kept:
+                archive_path.unlink()
+                report.purged_partitions.append(partition)
+    return report
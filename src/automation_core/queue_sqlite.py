@@ -0,0 +1,598 @@
+"""
+backend คิวบน SQLite (stdlib sqlite3, WAL mode) ที่มี API เดียวกับ FileQueue
+
+แต่ละการเปลี่ยนสถานะเป็น UPDATE แถวเดียวแทนการ rename + เขียน JSON ใหม่ทั้งไฟล์
+การ claim งานใช้ UPDATE ... RETURNING ใน statement เดียว จึงมี worker เพียงตัวเดียว
+ที่ได้งานหนึ่ง (รวมถึงการตรวจ limit ของ concurrency_class) และมี index บน
+status/scheduled_for/pipeline_path สำหรับ query สถิติ
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+from collections.abc import Iterator, Mapping, Sequence
+from contextlib import closing, contextmanager
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from automation_core.queue import (
+    DEFAULT_LEASE_TTL_SECONDS,
+    DEFAULT_MAX_ATTEMPTS,
+    FileQueue,
+    JobError,
+    JobSpec,
+    LeaseLostError,
+    QueueItem,
+    QueueState,
+    _default_worker_id,
+    _format_compact_utc,
+    _job_filename,
+    _keep_lease_alive,
+    _utc_iso,
+    _utc_now,
+)
+
+DEFAULT_DB_FILENAME = "queue.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    filename TEXT NOT NULL,
+    schema_version TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    scheduled_for TEXT NOT NULL,
+    scheduled_for_utc TEXT NOT NULL,
+    pipeline_path TEXT NOT NULL,
+    run_id TEXT NOT NULL,
+    params TEXT,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error_code TEXT,
+    last_error_message TEXT,
+    lease_owner TEXT,
+    lease_expires_at REAL,
+    updated_at REAL NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    concurrency_class TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status_filename ON jobs (status, filename);
+CREATE INDEX IF NOT EXISTS idx_jobs_scheduled_for ON jobs (scheduled_for_utc);
+CREATE INDEX IF NOT EXISTS idx_jobs_pipeline_status ON jobs (pipeline_path, status);
+CREATE INDEX IF NOT EXISTS idx_jobs_lease ON jobs (status, lease_expires_at);
+-- job_id ที่ถูก compact เข้า archive ของคิวไฟล์ก่อนนำเข้า (กันการ enqueue ซ้ำ)
+CREATE TABLE IF NOT EXISTS archived_jobs (job_id TEXT PRIMARY KEY);
+"""
+
+# คอลัมน์ที่เพิ่มหลังสคีมาแรก: ฐานข้อมูลเดิมจะถูก ALTER TABLE ตอนเปิดครั้งแรก
+_ADDED_COLUMNS = {
+    "priority": "INTEGER NOT NULL DEFAULT 0",
+    "concurrency_class": "TEXT",
+}
+_ADDED_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_jobs_claim
+    ON jobs (status, priority DESC, filename);
+CREATE INDEX IF NOT EXISTS idx_jobs_class_status ON jobs (concurrency_class, status);
+"""
+
+# claim งาน pending ที่ priority สูงสุด (เท่ากันเรียงตาม filename) โดยข้าม class
+# ที่มีงาน running ครบ limit แล้ว ทั้งหมดอยู่ใน UPDATE เดียวจึง atomic ข้าม worker
+_CLAIM_SQL = """
+UPDATE jobs SET
+    status = 'running',
+    attempts = attempts + 1,
+    last_error_code = NULL,
+    last_error_message = NULL,
+    lease_owner = :owner,
+    lease_expires_at = :expires_at,
+    updated_at = :now
+WHERE job_id = (
+    SELECT candidate.job_id FROM jobs AS candidate
+    WHERE candidate.status = 'pending'
+        AND (:cutoff IS NULL OR candidate.scheduled_for_utc <= :cutoff)
+        AND NOT EXISTS (
+            SELECT 1 FROM json_each(:limits) AS limits
+            WHERE limits.key = candidate.concurrency_class
+                AND limits.value <= (
+                    SELECT COUNT(*) FROM jobs AS running
+                    WHERE running.status = 'running'
+                        AND running.concurrency_class = limits.key
+                )
+        )
+    ORDER BY candidate.priority DESC, candidate.filename
+    LIMIT 1
+)
+RETURNING *
+"""
+
+_REAP_SQL = """
+UPDATE jobs SET
+    status = CASE WHEN attempts < :max_attempts THEN 'pending' ELSE 'failed' END,
+    last_error_code = 'lease_expired',
+    last_error_message = 'lease of ' || COALESCE(lease_owner, 'unknown')
+        || CASE WHEN attempts < :max_attempts
+            THEN ' expired after attempt ' || attempts
+            ELSE ' expired after ' || attempts || ' attempts' END,
+    lease_owner = NULL,
+    lease_expires_at = NULL,
+    updated_at = :now
+WHERE status = 'running' AND lease_expires_at <= :now
+RETURNING *
+"""
+
+
+@dataclass
+class MigrationReport:
+    """ผลการนำเข้าคิวไฟล์เข้า SQLite"""
+
+    imported: int = 0
+    skipped: int = 0
+    archived: int = 0
+    invalid: list[str] = field(default_factory=list)
+
+
+class SQLiteQueue:
+    """คิวงานบน SQLite ที่ใช้แทน FileQueue ได้ (เก็บที่ <queue_dir>/queue.sqlite3)"""
+
+    def __init__(
+        self,
+        queue_dir: Path | str,
+        *,
+        lease_ttl_seconds: float = DEFAULT_LEASE_TTL_SECONDS,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        worker_id: str | None = None,
+        db_filename: str = DEFAULT_DB_FILENAME,
+    ) -> None:
+        """
+        Args:
+            queue_dir: โฟลเดอร์คิว (ไฟล์ฐานข้อมูลอยู่ในโฟลเดอร์นี้)
+            lease_ttl_seconds: อายุ lease (วินาที) นับจาก heartbeat ล่าสุด
+            max_attempts: จำนวนครั้งสูงสุดที่งานที่ lease หมดอายุจะถูกคืนกลับ pending
+            worker_id: ชื่อเจ้าของ lease (ค่าเริ่มต้น host:pid:สุ่ม)
+            db_filename: ชื่อไฟล์ฐานข้อมูล
+        """
+        if lease_ttl_seconds <= 0:
+            raise ValueError("lease_ttl_seconds must be positive")
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        self.queue_dir = Path(queue_dir)
+        self.db_path = self.queue_dir / db_filename
+        self.lease_ttl_seconds = lease_ttl_seconds
+        self.max_attempts = max_attempts
+        self.worker_id = worker_id or _default_worker_id()
+        self._schema_ready = False
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # เปิด connection ต่อการเรียกหนึ่งครั้ง เพื่อใช้ข้าม thread/process ได้
+        self.queue_dir.mkdir(parents=True, exist_ok=True)
+        with closing(
+            sqlite3.connect(self.db_path, timeout=30.0, isolation_level=None)
+        ) as conn:
+            conn.row_factory = sqlite3.Row
+            if not self._schema_ready:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(_SCHEMA)
+                columns = {
+                    row["name"] for row in conn.execute("PRAGMA table_info(jobs)")
+                }
+                for name, definition in _ADDED_COLUMNS.items():
+                    if name not in columns:
+                        conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {definition}")
+                conn.executescript(_ADDED_INDEXES)
+                self._schema_ready = True
+            yield conn
+
+    def _item_from_row(self, row: sqlite3.Row) -> QueueItem:
+        last_error = None
+        if row["last_error_code"] is not None:
+            last_error = JobError(
+                code=row["last_error_code"], message=row["last_error_message"] or ""
+            )
+        job = JobSpec(
+            schema_version=row["schema_version"],
+            job_id=row["job_id"],
+            created_at=row["created_at"],
+            scheduled_for=row["scheduled_for"],
+            pipeline_path=row["pipeline_path"],
+            run_id=row["run_id"],
+            params=json.loads(row["params"]) if row["params"] is not None else None,
+            status=row["status"],
+            attempts=row["attempts"],
+            last_error=last_error,
+            priority=row["priority"],
+            concurrency_class=row["concurrency_class"],
+        )
+        return QueueItem(
+            filename=row["filename"],
+            path=self.db_path,
+            job=job,
+            job_id=row["job_id"],
+        )
+
+    def _insert(
+        self,
+        conn: sqlite3.Connection,
+        job: JobSpec,
+        status: QueueState,
+        lease_owner: str | None = None,
+        lease_expires_at: float | None = None,
+    ) -> bool:
+        scheduled_compact = _format_compact_utc(job.scheduled_for)
+        last_error = job.last_error
+        cursor = conn.execute(
+            """
+            INSERT INTO jobs (
+                job_id, filename, schema_version, created_at, scheduled_for,
+                scheduled_for_utc, pipeline_path, run_id, params, status, attempts,
+                last_error_code, last_error_message, lease_owner, lease_expires_at,
+                updated_at, priority, concurrency_class
+            )
+            SELECT ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?
+            WHERE NOT EXISTS (SELECT 1 FROM archived_jobs WHERE job_id = ?)
+            ON CONFLICT (job_id) DO NOTHING
+            """,
+            (
+                job.job_id,
+                _job_filename(job),
+                job.schema_version,
+                job.created_at,
+                job.scheduled_for,
+                scheduled_compact,
+                job.pipeline_path,
+                job.run_id,
+                json.dumps(job.params, ensure_ascii=False)
+                if job.params is not None
+                else None,
+                status,
+                job.attempts,
+                last_error.code if last_error is not None else None,
+                last_error.message if last_error is not None else None,
+                lease_owner,
+                lease_expires_at,
+                time.time(),
+                job.priority,
+                job.concurrency_class,
+                job.job_id,
+            ),
+        )
+        return cursor.rowcount == 1
+
+    def exists(self, job_id: str) -> bool:
+        """ตรวจว่ามีงานอยู่ในคิวทุกสถานะหรือไม่ (รวม job_id ที่ archive จากคิวไฟล์)"""
+
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT 1 FROM jobs WHERE job_id = ?"
+                " UNION ALL SELECT 1 FROM archived_jobs WHERE job_id = ?",
+                (job_id, job_id),
+            ).fetchone()
+        return row is not None
+
+    def enqueue(self, job: JobSpec, dry_run: bool = False) -> bool:
+        """
+        เพิ่มงานลงคิวแบบ idempotent (ความหมายเดียวกับ FileQueue.enqueue)
+
+        Returns:
+            True ถ้างานถูกเพิ่มลงคิว (หรือจะถูกเพิ่มถ้าไม่ใช่ dry_run)
+            False ถ้างานมีอยู่แล้วในคิว
+        """
+
+        if dry_run:
+            return not self.exists(job.job_id)
+        pending_job = job.model_copy(update={"status": "pending", "last_error": None})
+        with self._connect() as conn:
+            return self._insert(conn, pending_job, "pending")
+
+    def enqueue_many(
+        self, jobs: Sequence[JobSpec], dry_run: bool = False
+    ) -> list[bool]:
+        """เพิ่มหลายงานใน transaction เดียว (ผลลัพธ์เหมือนเรียก enqueue ทีละงาน)"""
+
+        if dry_run:
+            job_ids = json.dumps([job.job_id for job in jobs])
+            with self._connect() as conn:
+                rows = conn.execute(
+                    "SELECT job_id FROM jobs"
+                    " WHERE job_id IN (SELECT value FROM json_each(:ids))"
+                    " UNION SELECT job_id FROM archived_jobs"
+                    " WHERE job_id IN (SELECT value FROM json_each(:ids))",
+                    {"ids": job_ids},
+                ).fetchall()
+            known = {row["job_id"] for row in rows}
+            return [job.job_id not in known for job in jobs]
+        results: list[bool] = []
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for job in jobs:
+                    pending_job = job.model_copy(
+                        update={"status": "pending", "last_error": None}
+                    )
+                    results.append(self._insert(conn, pending_job, "pending"))
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        return results
+
+    def list_pending(self) -> list[QueueItem]:
+        """คืนรายการงานในสถานะ pending ตามลำดับ FIFO"""
+
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT * FROM jobs WHERE status = 'pending' ORDER BY filename"
+            ).fetchall()
+        return [self._item_from_row(row) for row in rows]
+
+    def peek_next(self) -> QueueItem | None:
+        """ดูงานถัดไปแบบไม่ย้ายสถานะ"""
+
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = 'pending'"
+                " ORDER BY priority DESC, filename LIMIT 1"
+            ).fetchone()
+        return self._item_from_row(row) if row is not None else None
+
+    def next_scheduled_at(self) -> datetime | None:
+        """เวลา scheduled_for ที่เร็วที่สุดของงาน pending"""
+
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT MIN(scheduled_for_utc) FROM jobs WHERE status = 'pending'"
+            ).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return datetime.strptime(row[0], "%Y%m%dT%H%M%SZ").replace(tzinfo=UTC)
+
+    def dequeue_next(
+        self,
+        due_before: datetime | None = None,
+        class_limits: Mapping[str, int] | None = None,
+    ) -> QueueItem | None:
+        """
+        claim งานถัดไปพร้อม lease ด้วย UPDATE ... RETURNING ใน statement เดียว
+
+        Args:
+            due_before: ถ้าระบุ จะ claim เฉพาะงานที่ scheduled_for ไม่เกินเวลานี้
+            class_limits: จำนวนงาน running สูงสุดต่อ concurrency_class
+                (ความหมายเดียวกับ FileQueue.dequeue_next)
+        """
+
+        cutoff = (
+            due_before.astimezone(UTC).strftime("%Y%m%dT%H%M%SZ")
+            if due_before is not None
+            else None
+        )
+        now = time.time()
+        with self._connect() as conn:
+            rows = conn.execute(
+                _CLAIM_SQL,
+                {
+                    "owner": self.worker_id,
+                    "expires_at": now + self.lease_ttl_seconds,
+                    "now": now,
+                    "cutoff": cutoff,
+                    "limits": json.dumps(dict(class_limits or {})),
+                },
+            ).fetchall()
+        # ใช้ fetchall เพื่อให้ statement จบและ commit ก่อนปิด connection
+        return self._item_from_row(rows[0]) if rows else None
+
+    def heartbeat(self, item: QueueItem) -> None:
+        """
+        ต่ออายุ lease ของงานที่กำลังรัน
+
+        Raises:
+            LeaseLostError: ถ้างานไม่อยู่ใน running แล้วหรือ lease เป็นของ worker อื่น
+        """
+
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE jobs SET lease_expires_at = ?, updated_at = ?
+                WHERE job_id = ? AND status = 'running' AND lease_owner = ?
+                """,
+                (now + self.lease_ttl_seconds, now, item.job_id, self.worker_id),
+            )
+            updated = cursor.rowcount
+        if updated == 0:
+            raise LeaseLostError(
+                f"job {item.job_id} is no longer leased by this worker"
+            )
+
+    @contextmanager
+    def hold_lease(
+        self, item: QueueItem, interval: float | None = None
+    ) -> Iterator[None]:
+        """ต่ออายุ lease ใน background thread ระหว่างที่ block ทำงาน"""
+
+        every = interval if interval is not None else self.lease_ttl_seconds / 3
+        with _keep_lease_alive(
+            lambda: self.heartbeat(item),
+            every,
+            item.job_id,
+            retry_on=(sqlite3.OperationalError,),
+        ):
+            yield
+
+    def reap_expired(self, now: datetime | None = None) -> list[QueueItem]:
+        """
+        คืนงานใน running ที่ lease หมดอายุ (กติกาเดียวกับ FileQueue.reap_expired)
+
+        Returns:
+            รายการงานที่ถูกย้ายออกจาก running
+        """
+
+        now_ts = (now or _utc_now()).timestamp()
+        with self._connect() as conn:
+            rows = conn.execute(
+                _REAP_SQL, {"max_attempts": self.max_attempts, "now": now_ts}
+            ).fetchall()
+        items = [self._item_from_row(row) for row in rows]
+        return sorted(items, key=lambda item: item.filename)
+
+    def _finish(
+        self, item: QueueItem, status: QueueState, error: JobError | None
+    ) -> QueueItem:
+        with self._connect() as conn:
+            rows = conn.execute(
+                """
+                UPDATE jobs SET
+                    status = ?,
+                    last_error_code = CASE WHEN ? THEN NULL
+                        ELSE COALESCE(?, last_error_code) END,
+                    last_error_message = CASE WHEN ? THEN NULL
+                        ELSE COALESCE(?, last_error_message) END,
+                    lease_owner = NULL,
+                    lease_expires_at = NULL,
+                    updated_at = ?
+                WHERE job_id = ? AND status = 'running'
+                    AND (lease_owner IS NULL OR lease_owner = ?)
+                RETURNING *
+                """,
+                (
+                    status,
+                    status == "done",
+                    error.code if error is not None else None,
+                    status == "done",
+                    error.message if error is not None else None,
+                    time.time(),
+                    item.job_id,
+                    self.worker_id,
+                ),
+            ).fetchall()
+        if not rows:
+            raise LeaseLostError(
+                f"job {item.job_id} is no longer leased by this worker"
+            )
+        return self._item_from_row(rows[0])
+
+    def mark_done(self, item: QueueItem) -> QueueItem:
+        """
+        เปลี่ยนสถานะงานจาก running เป็น done
+
+        Raises:
+            LeaseLostError: ถ้างานถูก reap ไปแล้วหรือ lease เป็นของ worker อื่น
+        """
+
+        return self._finish(item, "done", None)
+
+    def mark_failed(self, item: QueueItem, error: JobError | None = None) -> QueueItem:
+        """
+        เปลี่ยนสถานะงานจาก running เป็น failed
+
+        Raises:
+            LeaseLostError: ถ้างานถูก reap ไปแล้วหรือ lease เป็นของ worker อื่น
+        """
+
+        return self._finish(item, "failed", error)
+
+    def rebuild_index(self) -> int:
+        """สร้าง index ของตารางใหม่ (REINDEX) และคืนจำนวนงานทั้งหมด"""
+
+        with self._connect() as conn:
+            conn.execute("REINDEX jobs")
+            return conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    def count_jobs(
+        self,
+        status: QueueState | None = None,
+        pipeline_path: str | None = None,
+        scheduled_since: datetime | None = None,
+    ) -> int:
+        """
+        นับงานตามเงื่อนไข เช่นงาน failed ของ pipeline หนึ่งตั้งแต่ต้นสัปดาห์
+
+        Args:
+            status: สถานะงาน
+            pipeline_path: pipeline_path ตามที่อยู่ใน JobSpec
+            scheduled_since: นับเฉพาะงานที่ scheduled_for ตั้งแต่เวลานี้
+        """
+
+        clauses: list[str] = []
+        args: list[Any] = []
+        if status is not None:
+            clauses.append("status = ?")
+            args.append(status)
+        if pipeline_path is not None:
+            clauses.append("pipeline_path = ?")
+            args.append(pipeline_path)
+        if scheduled_since is not None:
+            clauses.append("scheduled_for_utc >= ?")
+            args.append(_format_compact_utc(_utc_iso(scheduled_since)))
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._connect() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM jobs{where}", args).fetchone()[0]
+
+
+def migrate_file_queue(source_dir: Path | str, target: SQLiteQueue) -> MigrationReport:
+    """
+    นำเข้างานทุกสถานะจากคิวไฟล์เข้า SQLiteQueue (รันซ้ำได้ งานที่มีอยู่แล้วจะถูกข้าม)
+
+    สถานะของงานอิงจากโฟลเดอร์ที่ไฟล์อยู่ งานใน running จะใช้ lease เดิม
+    (หรือเวลาแก้ไขไฟล์ + TTL ถ้าไม่มี lease) เพื่อให้ reap_expired จัดการต่อได้
+    job_id ใน archive/job_ids.txt (งานที่ถูก compact แล้ว) ถูกนำเข้าตาราง
+    archived_jobs เพื่อให้ exists() ยังกันการ enqueue ซ้ำ
+    ไฟล์ต้นทางไม่ถูกแก้ไขหรือลบ
+
+    Args:
+        source_dir: โฟลเดอร์คิวไฟล์ต้นทาง
+        target: คิว SQLite ปลายทาง
+
+    Returns:
+        MigrationReport ที่บอกจำนวนงานที่นำเข้า/ข้าม จำนวน job_id ที่ archive แล้ว
+        และไฟล์ที่อ่านไม่ได้
+    """
+
+    source = FileQueue(source_dir)
+    report = MigrationReport()
+    states: list[tuple[QueueState, Path]] = [
+        ("pending", source.pending_dir),
+        ("running", source.running_dir),
+        ("done", source.done_dir),
+        ("failed", source.failed_dir),
+    ]
+    with target._connect() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for status, directory in states:
+                for path in source._list_dir(directory):
+                    job = source._load_job(path)
+                    if job is None:
+                        report.invalid.append(f"{status}/{path.name}")
+                        continue
+                    lease_owner = None
+                    lease_expires_at = None
+                    if status == "running":
+                        lease = source._load_lease(source._lease_path(path.name))
+                        if lease is not None:
+                            lease_owner = lease.owner
+                            lease_expires_at = lease.expires_at().timestamp()
+                        else:
+                            lease_expires_at = (
+                                path.stat().st_mtime + target.lease_ttl_seconds
+                            )
+                    job = job.model_copy(update={"status": status})
+                    if target._insert(conn, job, status, lease_owner, lease_expires_at):
+                        report.imported += 1
+                    else:
+                        report.skipped += 1
+            # นำเข้าหลังไฟล์งาน: งานที่ยังมีไฟล์อยู่ (compact ค้างกลางทาง) จึงถูกนำเข้าครบ
+            archived_ids = list(source.archived_job_ids)
+            conn.executemany(
+                "INSERT INTO archived_jobs (job_id) VALUES (?)"
+                " ON CONFLICT (job_id) DO NOTHING",
+                ((job_id,) for job_id in archived_ids),
+            )
+            report.archived = len(archived_ids)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+    return report
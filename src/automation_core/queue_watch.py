@@ -0,0 +1,198 @@
+"""
+ปลุก worker แบบ event-driven เมื่อมีไฟล์งานใหม่ใน pending/ ของ FileQueue
+
+บน Linux ใช้ inotify (ผ่าน ctypes ไม่ต้องติดตั้งแพ็กเกจเพิ่ม) ระบบอื่นหรือเมื่อ inotify
+ใช้ไม่ได้ (เช่น เกิน max_user_watches) จะ fallback เป็นการตรวจ mtime ของโฟลเดอร์
+ซึ่งใช้ stat ครั้งเดียวต่อรอบแทนการ list ไฟล์ทั้งโฟลเดอร์
+"""
+
+from __future__ import annotations
+
+import ctypes
+import os
+import select
+import sys
+import threading
+import time
+from pathlib import Path
+from types import TracebackType
+from typing import Protocol
+
+# ค่าจาก <sys/inotify.h>: รอ close_write เพื่อไม่ปลุก worker ก่อนเขียนไฟล์งานเสร็จ
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_WATCH_MASK = _IN_CLOSE_WRITE | _IN_MOVED_TO
+# ช่วงเวลาที่ QueueWaker ตรวจ stop_event ระหว่างรอ watcher
+_STOP_CHECK_SECONDS = 0.5
+
+
+class QueueWatcher(Protocol):
+    """ตัวเฝ้าโฟลเดอร์ pending/"""
+
+    def wait(self, timeout: float) -> bool:
+        """รอไม่เกิน timeout วินาที คืน True ถ้าโฟลเดอร์มีการเปลี่ยนแปลง"""
+        ...
+
+    def close(self) -> None: ...
+
+
+class InotifyWatcher:
+    """เฝ้าโฟลเดอร์ด้วย inotify (Linux เท่านั้น)"""
+
+    def __init__(self, path: Path) -> None:
+        """
+        Raises:
+            OSError: ถ้าระบบไม่รองรับ inotify หรือเพิ่ม watch ไม่สำเร็จ
+        """
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is not available on this platform")
+        # CDLL(None) คือสัญลักษณ์ของ process ซึ่งรวม libc อยู่แล้ว
+        libc = ctypes.CDLL(None, use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("libc does not provide inotify")
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        if libc.inotify_add_watch(fd, os.fsencode(path), _WATCH_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(fd)
+            raise OSError(errno, os.strerror(errno), str(path))
+        self.path = path
+        self._fd: int | None = fd
+
+    def wait(self, timeout: float) -> bool:
+        """รอ event ไม่เกิน timeout วินาที และอ่าน event ที่ค้างทิ้งทั้งหมด"""
+
+        if self._fd is None:
+            raise ValueError("watcher is closed")
+        readable, _, _ = select.select([self._fd], [], [], max(timeout, 0.0))
+        if not readable:
+            return False
+        while True:
+            try:
+                if not os.read(self._fd, 64 * 1024):
+                    break
+            except BlockingIOError:
+                break
+        return True
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+class PollingWatcher:
+    """fallback แบบ portable: ตรวจ mtime ของโฟลเดอร์ทุก interval วินาที"""
+
+    def __init__(self, path: Path, interval: float) -> None:
+        self.path = path
+        self.interval = max(interval, 0.01)
+        self._stamp = self._read_stamp()
+        self._next_check = time.monotonic() + self.interval
+
+    def _read_stamp(self) -> int | None:
+        try:
+            return self.path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def wait(self, timeout: float) -> bool:
+        """ตรวจ mtime เมื่อครบ interval คืน True ถ้าเปลี่ยนภายใน timeout วินาที"""
+
+        deadline = time.monotonic() + max(timeout, 0.0)
+        while True:
+            now = time.monotonic()
+            if now >= self._next_check:
+                self._next_check = now + self.interval
+                stamp = self._read_stamp()
+                if stamp != self._stamp:
+                    self._stamp = stamp
+                    return True
+            if now >= deadline:
+                return False
+            time.sleep(min(deadline, self._next_check) - now)
+
+    def close(self) -> None:
+        return None
+
+
+def open_watcher(
+    path: Path, *, poll_interval: float, use_inotify: bool = True
+) -> QueueWatcher:
+    """
+    เปิด watcher ของโฟลเดอร์ (สร้างโฟลเดอร์ถ้ายังไม่มี)
+
+    Args:
+        path: โฟลเดอร์ที่ต้องการเฝ้า (ปกติคือ FileQueue.pending_dir)
+        poll_interval: ช่วงตรวจ mtime ของ PollingWatcher
+        use_inotify: ลองใช้ inotify ก่อน (False = ใช้ polling เสมอ)
+
+    Returns:
+        InotifyWatcher ถ้าใช้ได้ มิฉะนั้น PollingWatcher
+    """
+
+    path.mkdir(parents=True, exist_ok=True)
+    if use_inotify:
+        try:
+            return InotifyWatcher(path)
+        except OSError:
+            pass
+    return PollingWatcher(path, poll_interval)
+
+
+class QueueWaker:
+    """
+    รวมสัญญาณปลุก daemon: ไฟล์งานใหม่ (จาก watcher), notify() และ stop_event
+
+    watcher ถูกรอใน thread พื้นหลัง ส่วน daemon รอที่ wait() เพียงจุดเดียว
+    """
+
+    def __init__(self, watcher: QueueWatcher | None, stop: threading.Event) -> None:
+        self.watcher = watcher
+        self._stop = stop
+        self._wake = threading.Event()
+        self._closed = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="queue-waker", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._closed.is_set():
+            if self._stop.is_set():
+                self._wake.set()
+                return
+            if self.watcher is None:
+                self._stop.wait(_STOP_CHECK_SECONDS)
+            elif self.watcher.wait(_STOP_CHECK_SECONDS):
+                self._wake.set()
+
+    def notify(self) -> None:
+        """ปลุก wait() ทันที (เช่น เมื่องานใน pool รันเสร็จ)"""
+        self._wake.set()
+
+    def wait(self, timeout: float) -> bool:
+        """รอสัญญาณปลุกไม่เกิน timeout วินาที คืน True ถ้าถูกปลุก"""
+        woke = self._wake.wait(max(timeout, 0.0))
+        # clear ก่อนผู้เรียกตรวจคิว สัญญาณที่มาหลังจากนี้จึงไม่หาย
+        self._wake.clear()
+        return woke
+
+    def close(self) -> None:
+        self._closed.set()
+        self._thread.join()
+        if self.watcher is not None:
+            self.watcher.close()
+
+    def __enter__(self) -> QueueWaker:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
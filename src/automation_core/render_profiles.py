@@ -0,0 +1,102 @@
+"""
+โปรไฟล์การเข้ารหัสของขั้นตอน video.render
+
+แต่ละโปรไฟล์กำหนด preset/CRF/maxrate/threads ของ libx264 และ bitrate ของ AAC
+รวมถึงขนาดภาพและ frame rate ค่าเริ่มต้น (ค่า resolution/fps ใน step config ยังมีผลเหนือกว่า)
+
+- draft: เร็วที่สุด ความละเอียดต่ำ สำหรับ pipeline ทดสอบ/QA ที่ไม่ได้เผยแพร่จริง
+- publish: คุณภาพสำหรับเผยแพร่แนวนอน 1920x1080
+- shorts: วิดีโอแนวตั้ง 1080x1920 สำหรับ YouTube Shorts
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class RenderProfile:
+    """ค่าการเข้ารหัสของโปรไฟล์ (threads=0 ให้ libx264 เลือกตามจำนวนคอร์)"""
+
+    name: str
+    preset: str
+    crf: int
+    maxrate: str
+    bufsize: str
+    threads: int
+    audio_bitrate: str
+    resolution: str | None = None
+    fps: int | None = None
+
+    def video_args(self) -> list[str]:
+        """อาร์กิวเมนต์ ffmpeg ของ libx264 (ต่อท้าย -c:v libx264)"""
+        return [
+            "-preset",
+            self.preset,
+            "-crf",
+            str(self.crf),
+            "-maxrate",
+            self.maxrate,
+            "-bufsize",
+            self.bufsize,
+            "-threads",
+            str(self.threads),
+        ]
+
+    def audio_args(self) -> list[str]:
+        """อาร์กิวเมนต์ ffmpeg ของ AAC (ต่อท้าย -c:a aac)"""
+        return ["-b:a", self.audio_bitrate]
+
+
+RENDER_PROFILES: dict[str, RenderProfile] = {
+    profile.name: profile
+    for profile in (
+        RenderProfile(
+            name="draft",
+            preset="ultrafast",
+            crf=35,
+            maxrate="1M",
+            bufsize="2M",
+            threads=0,
+            audio_bitrate="64k",
+            resolution="854x480",
+            fps=15,
+        ),
+        RenderProfile(
+            name="publish",
+            preset="slow",
+            crf=20,
+            maxrate="8M",
+            bufsize="16M",
+            threads=0,
+            audio_bitrate="192k",
+            resolution="1920x1080",
+            fps=30,
+        ),
+        RenderProfile(
+            name="shorts",
+            preset="medium",
+            crf=23,
+            maxrate="6M",
+            bufsize="12M",
+            threads=0,
+            audio_bitrate="128k",
+            resolution="1080x1920",
+            fps=30,
+        ),
+    )
+}
+
+
+def get_render_profile(name: str) -> RenderProfile:
+    """
+    คืนโปรไฟล์ตามชื่อ
+
+    Raises:
+        ValueError: ถ้าไม่มีโปรไฟล์ชื่อนี้
+    """
+    try:
+        return RENDER_PROFILES[name]
+    except KeyError:
+        names = ", ".join(sorted(RENDER_PROFILES))
+        raise ValueError(f"render_profile must be one of: {names}") from None
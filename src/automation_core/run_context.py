@@ -0,0 +1,103 @@
+"""
+บริบทของ pipeline run หนึ่งครั้ง (run_id, params, topic, นาฬิกา, root_dir)
+
+run_pipeline สร้าง RunContext แล้วตั้งเป็น context ปัจจุบันผ่าน ContextVar ทำให้
+หลาย pipeline รันพร้อมกันใน process เดียวได้โดยไม่แย่ง os.environ กัน
+ส่วนการส่งค่าผ่าน PIPELINE_PARAMS_JSON/DHAMMA_TOPIC ยังใช้ได้ผ่าน from_env()
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from collections.abc import Callable, Iterator, Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from automation_core.params import PIPELINE_PARAMS_ENV, serialize_pipeline_params
+
+TOPIC_ENV = "DHAMMA_TOPIC"
+
+_CURRENT_RUN_CONTEXT: ContextVar[RunContext | None] = ContextVar(
+    "current_run_context", default=None
+)
+
+
+def _utc_now() -> datetime:
+    return datetime.now(UTC)
+
+
+@dataclass(frozen=True)
+class RunContext:
+    """ค่าประจำ run ที่ orchestrator และเอเจนต์ใช้ร่วมกัน"""
+
+    run_id: str
+    root_dir: Path
+    params: Mapping[str, Any] | None = None
+    topic: str | None = None
+    clock: Callable[[], datetime] = field(default=_utc_now, compare=False)
+
+    @property
+    def run_dir(self) -> Path:
+        """โฟลเดอร์ผลลัพธ์ของ run (output/<run_id>)"""
+        return self.root_dir / "output" / self.run_id
+
+    def now(self) -> datetime:
+        """เวลาปัจจุบันตามนาฬิกาของ run (แทนที่ได้ในเทสต์)"""
+        return self.clock()
+
+    def params_json(self) -> str | None:
+        """params ในรูป JSON แบบเดียวกับ PIPELINE_PARAMS_JSON (None ถ้าไม่มี)"""
+        if self.params is None:
+            return None
+        return serialize_pipeline_params(dict(self.params))
+
+    @classmethod
+    def from_env(
+        cls,
+        run_id: str,
+        root_dir: Path,
+        *,
+        environ: Mapping[str, str] | None = None,
+    ) -> RunContext:
+        """
+        สร้าง context จากตัวแปรสภาพแวดล้อมแบบเดิม (compatibility shim)
+
+        PIPELINE_PARAMS_JSON ที่ไม่ใช่ JSON object จะไม่ถูกนำมาใช้ที่นี่
+        เพื่อให้ผู้อ่านเดิม (เช่น post_templates) รายงานข้อผิดพลาดเหมือนก่อน
+        """
+        env = os.environ if environ is None else environ
+        params: dict[str, Any] | None = None
+        payload = env.get(PIPELINE_PARAMS_ENV)
+        if payload and payload.strip():
+            try:
+                decoded = json.loads(payload)
+            except json.JSONDecodeError:
+                decoded = None
+            if isinstance(decoded, dict):
+                params = decoded
+        return cls(
+            run_id=run_id,
+            root_dir=Path(root_dir),
+            params=params,
+            topic=env.get(TOPIC_ENV) or None,
+        )
+
+
+def current_run_context() -> RunContext | None:
+    """คืน RunContext ของ run ที่กำลังทำงานอยู่ใน context นี้ (หรือ None)"""
+    return _CURRENT_RUN_CONTEXT.get()
+
+
+@contextmanager
+def activate_run_context(context: RunContext) -> Iterator[RunContext]:
+    """ตั้ง context เป็นของ run ปัจจุบันภายใน block แล้วคืนค่าเดิมเมื่อออก"""
+    token = _CURRENT_RUN_CONTEXT.set(context)
+    try:
+        yield context
+    finally:
+        _CURRENT_RUN_CONTEXT.reset(token)
@@ -4,25 +4,50 @@
 
 from __future__ import annotations
 
+import contextlib
 import hashlib
-from dataclasses import dataclass
-from datetime import UTC, datetime, timedelta
+import json
+import os
+import time
+from bisect import bisect_left, bisect_right
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, date, datetime, timedelta
+from datetime import time as time_of_day
 from pathlib import Path
-from typing import Any
+from typing import Any, Literal
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 import yaml
-from pydantic import BaseModel, Field, ValidationError, field_validator
+from pydantic import (
+    BaseModel,
+    Field,
+    ValidationError,
+    field_validator,
+    model_validator,
+)
 
-from automation_core.queue import FileQueue, JobSpec
+from automation_core.queue import CONCURRENCY_CLASS_PATTERN, JobQueue, JobSpec
 
 DEFAULT_TIMEZONE = "Asia/Bangkok"
+COMPILED_PLAN_VERSION = 3
+WEEKDAY_NAMES = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+_RACY_STAMP_NS = 2_000_000_000
 
 
 class SchedulePlanError(RuntimeError):
     """ข้อผิดพลาดในการอ่านแผนเวลา"""
 
 
+def _validate_relative_pipeline_path(value: str) -> str:
+    path = Path(value)
+    if path.is_absolute() or path.drive or path.root:
+        raise ValueError("pipeline_path must be relative")
+    if any(part == ".." for part in path.parts):
+        raise ValueError("pipeline_path must not contain '..'")
+    return value
+
+
 class ScheduleEntry(BaseModel):
     """รายการแผนเวลา 1 รายการ"""
 
@@ -30,19 +55,116 @@ class ScheduleEntry(BaseModel):
     pipeline_path: str = Field(..., min_length=1)
     run_id_prefix: str | None = None
     params: dict[str, Any] | None = None
+    priority: int = 0
+    concurrency_class: str | None = Field(
+        default=None, pattern=CONCURRENCY_CLASS_PATTERN
+    )
+
+    @field_validator("pipeline_path")
+    @classmethod
+    def _validate_pipeline_path(cls, value: str) -> str:
+        """ตรวจสอบ pipeline_path ต้องเป็น relative path และห้ามมี path traversal"""
+
+        return _validate_relative_pipeline_path(value)
+
+
+class RecurrenceRule(BaseModel):
+    """
+    กฎเวลาซ้ำ 1 รายการ (แบบ RRULE อย่างง่าย)
+
+    - freq: daily (ทุกวัน หรือเฉพาะวันใน by_weekday) หรือ weekly (วันใน by_weekday
+      ค่าเริ่มต้นคือวันเดียวกับ start)
+    - times: เวลาท้องถิ่น "HH:MM" ในแต่ละวันที่ตรงกฎ
+    - until (วันที่สุดท้าย รวมวันนั้น) หรือ count (จำนวนครั้งนับจาก start) อย่างใดอย่างหนึ่ง
+    - exclude: วันที่ "YYYY-MM-DD" หรือเวลา "YYYY-MM-DDTHH:MM" ที่ต้องข้าม
+      (ยังนับรวมใน count เหมือน EXDATE)
+    - timezone: timezone ของกฎ (ค่าเริ่มต้นใช้ timezone ของแผน)
+    """
+
+    freq: Literal["daily", "weekly"]
+    times: list[str] = Field(..., min_length=1)
+    by_weekday: list[str] | None = None
+    start: date | None = None
+    until: date | None = None
+    count: int | None = Field(default=None, ge=1)
+    exclude: list[str] = Field(default_factory=list)
+    timezone: str | None = None
+    pipeline_path: str = Field(..., min_length=1)
+    run_id_prefix: str | None = None
+    params: dict[str, Any] | None = None
+    priority: int = 0
+    concurrency_class: str | None = Field(
+        default=None, pattern=CONCURRENCY_CLASS_PATTERN
+    )
 
     @field_validator("pipeline_path")
     @classmethod
     def _validate_pipeline_path(cls, value: str) -> str:
         """ตรวจสอบ pipeline_path ต้องเป็น relative path และห้ามมี path traversal"""
 
-        path = Path(value)
-        if path.is_absolute() or path.drive or path.root:
-            raise ValueError("pipeline_path must be relative")
-        if any(part == ".." for part in path.parts):
-            raise ValueError("pipeline_path must not contain '..'")
+        return _validate_relative_pipeline_path(value)
+
+    @field_validator("times")
+    @classmethod
+    def _validate_times(cls, value: list[str]) -> list[str]:
+        """ตรวจรูปแบบ HH:MM แล้วเรียงและตัดค่าซ้ำ"""
+
+        return sorted(
+            {time_of_day.fromisoformat(item).strftime("%H:%M") for item in value}
+        )
+
+    @field_validator("by_weekday")
+    @classmethod
+    def _validate_by_weekday(cls, value: list[str] | None) -> list[str] | None:
+        """ตรวจชื่อวัน (mon..sun)"""
+
+        if value is None:
+            return None
+        names = [item.strip().lower()[:3] for item in value]
+        unknown = [item for item in names if item not in WEEKDAY_NAMES]
+        if unknown or not names:
+            raise ValueError(f"by_weekday ต้องเป็นชื่อวัน {WEEKDAY_NAMES}")
+        return names
+
+    @field_validator("exclude")
+    @classmethod
+    def _validate_exclude(cls, value: list[str]) -> list[str]:
+        """ตรวจรูปแบบวันที่หรือเวลาที่ต้องข้าม"""
+
+        result = []
+        for item in value:
+            if "T" in item:
+                result.append(datetime.fromisoformat(item).strftime("%Y-%m-%dT%H:%M"))
+            else:
+                result.append(date.fromisoformat(item).isoformat())
+        return result
+
+    @field_validator("timezone")
+    @classmethod
+    def _validate_timezone(cls, value: str | None) -> str | None:
+        """ตรวจว่า timezone มีอยู่จริง"""
+
+        if value is not None:
+            try:
+                ZoneInfo(value)
+            except (ZoneInfoNotFoundError, ValueError) as exc:
+                raise ValueError(f"timezone ไม่ถูกต้อง: {value}") from exc
         return value
 
+    @model_validator(mode="after")
+    def _validate_bounds(self) -> RecurrenceRule:
+        """ตรวจ until/count และ start"""
+
+        if self.until is not None and self.count is not None:
+            raise ValueError("ระบุ until หรือ count ได้อย่างใดอย่างหนึ่ง")
+        if self.count is not None and self.start is None:
+            raise ValueError("count ต้องระบุ start")
+        if self.freq == "weekly" and self.by_weekday is None and self.start is None:
+            raise ValueError("weekly ต้องระบุ by_weekday หรือ start")
+        if self.start and self.until and self.until < self.start:
+            raise ValueError("until ต้องไม่ก่อน start")
+        return self
+
 
 class RawSchedulePlan(BaseModel):
     """ข้อมูลแผนเวลาแบบดิบ"""
@@ -50,6 +172,7 @@ class RawSchedulePlan(BaseModel):
     schema_version: str
     timezone: str | None = None
     entries: list[dict[str, Any]] = Field(default_factory=list)
+    recurrences: list[dict[str, Any]] = Field(default_factory=list)
 
 
 @dataclass(frozen=True)
@@ -70,6 +193,7 @@ class ScheduleResult:
     timezone: str
     enqueued_job_ids: list[str]
     skipped_entries: list[ScheduleSkip]
+    not_due_count: int = 0
 
 
 def parse_iso_datetime(value: str) -> datetime:
@@ -115,6 +239,19 @@ def build_job_id(
     return hashlib.sha256(seed.encode("utf-8")).hexdigest()[:12]
 
 
+def build_job_identity(
+    entry: ScheduleEntry,
+    scheduled_for_utc: datetime,
+    local_tz: ZoneInfo,
+) -> tuple[str, str]:
+    """สร้าง (job_id, run_id) ของ entry ตามเวลาที่กำหนด"""
+
+    local_dt = scheduled_for_utc.astimezone(local_tz)
+    run_id_base = build_run_id_base(local_dt, entry.run_id_prefix)
+    job_id = build_job_id(scheduled_for_utc, entry.pipeline_path, run_id_base)
+    return job_id, f"{run_id_base}_{job_id}"
+
+
 def build_job_spec(
     entry: ScheduleEntry,
     scheduled_for_utc: datetime,
@@ -123,10 +260,7 @@ def build_job_spec(
 ) -> JobSpec:
     """สร้าง JobSpec จาก ScheduleEntry"""
 
-    local_dt = scheduled_for_utc.astimezone(local_tz)
-    run_id_base = build_run_id_base(local_dt, entry.run_id_prefix)
-    job_id = build_job_id(scheduled_for_utc, entry.pipeline_path, run_id_base)
-    run_id = f"{run_id_base}_{job_id}"
+    job_id, run_id = build_job_identity(entry, scheduled_for_utc, local_tz)
     return JobSpec(
         schema_version="v1",
         job_id=job_id,
@@ -138,16 +272,16 @@ def build_job_spec(
         status="pending",
         attempts=0,
         last_error=None,
+        priority=entry.priority,
+        concurrency_class=entry.concurrency_class,
     )
 
 
-def load_schedule_plan(plan_path: Path) -> RawSchedulePlan:
-    """อ่านและตรวจโครงสร้างแผนเวลาเบื้องต้น"""
+def parse_schedule_plan(text: str) -> RawSchedulePlan:
+    """ตรวจโครงสร้างแผนเวลาจากข้อความ YAML"""
 
     try:
-        raw = yaml.safe_load(plan_path.read_text(encoding="utf-8"))
-    except FileNotFoundError as exc:
-        raise SchedulePlanError(f"ไม่พบไฟล์แผน: {plan_path}") from exc
+        raw = yaml.safe_load(text)
     except Exception as exc:  # noqa: BLE001
         raise SchedulePlanError(f"อ่านแผนไม่สำเร็จ: {exc}") from exc
 
@@ -165,35 +299,242 @@ def load_schedule_plan(plan_path: Path) -> RawSchedulePlan:
     return plan
 
 
-def schedule_due_jobs(
-    plan_path: Path,
-    queue: FileQueue,
-    now_utc: datetime,
-    window_minutes: int,
-    dry_run: bool,
-    scheduler_enabled: bool,
-    created_at_utc: datetime | None = None,
-) -> ScheduleResult:
-    """เลือกงานที่ถึงกำหนดและ enqueue ตามเงื่อนไข"""
+def _read_plan_bytes(plan_path: Path) -> bytes:
+    try:
+        return plan_path.read_bytes()
+    except FileNotFoundError as exc:
+        raise SchedulePlanError(f"ไม่พบไฟล์แผน: {plan_path}") from exc
+    except OSError as exc:
+        raise SchedulePlanError(f"อ่านแผนไม่สำเร็จ: {exc}") from exc
 
-    plan = load_schedule_plan(plan_path)
-    tz_name = plan.timezone or DEFAULT_TIMEZONE
+
+def _decode_plan(data: bytes) -> str:
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError as exc:
+        raise SchedulePlanError(f"อ่านแผนไม่สำเร็จ: {exc}") from exc
+
+
+def load_schedule_plan(plan_path: Path) -> RawSchedulePlan:
+    """อ่านและตรวจโครงสร้างแผนเวลาเบื้องต้น"""
+
+    return parse_schedule_plan(_decode_plan(_read_plan_bytes(plan_path)))
+
+
+def _load_timezone(tz_name: str) -> ZoneInfo:
     try:
-        local_tz = ZoneInfo(tz_name)
-    except ZoneInfoNotFoundError as exc:
+        return ZoneInfo(tz_name)
+    except (ZoneInfoNotFoundError, ValueError) as exc:
         raise SchedulePlanError(f"timezone ไม่ถูกต้อง: {tz_name}") from exc
 
-    if now_utc.tzinfo is None:
-        now_utc = now_utc.replace(tzinfo=UTC)
+
+def _utc_micros(value: datetime) -> int:
+    return (value - _EPOCH) // timedelta(microseconds=1)
+
+
+@dataclass(frozen=True)
+class CompiledEntry:
+    """entry ที่ผ่านการตรวจแล้ว พร้อม job_id/run_id ที่คำนวณไว้ล่วงหน้า"""
+
+    scheduled_us: int
+    scheduled_for: str
+    publish_at: str
+    pipeline_path: str
+    job_id: str
+    run_id: str
+    params: dict[str, Any] | None = None
+    priority: int = 0
+    concurrency_class: str | None = None
+
+    def skip(self, code: str, message: str) -> ScheduleSkip:
+        """สร้าง ScheduleSkip ของ entry นี้"""
+        return ScheduleSkip(
+            publish_at=self.publish_at,
+            pipeline_path=self.pipeline_path,
+            run_id=self.run_id,
+            code=code,
+            message=message,
+        )
+
+    def to_job_spec(self, created_at_utc: datetime) -> JobSpec:
+        """สร้าง JobSpec (ค่าเดียวกับ build_job_spec)"""
+        return JobSpec(
+            schema_version="v1",
+            job_id=self.job_id,
+            created_at=format_utc(created_at_utc),
+            scheduled_for=self.scheduled_for,
+            pipeline_path=self.pipeline_path,
+            run_id=self.run_id,
+            params=self.params,
+            status="pending",
+            attempts=0,
+            last_error=None,
+            priority=self.priority,
+            concurrency_class=self.concurrency_class,
+        )
+
+
+@dataclass(frozen=True)
+class CompiledRecurrence:
+    """
+    กฎเวลาซ้ำที่ตรวจแล้ว ขยายเป็น CompiledEntry เฉพาะช่วงเวลาที่ถามเท่านั้น
+
+    until คือเวลาท้องถิ่นล่าสุดที่อนุญาต (แปลงจาก until หรือ count ตอน compile)
+    """
+
+    timezone: str
+    weekdays: list[int]
+    times: list[str]
+    pipeline_path: str
+    start: str | None = None
+    until: str | None = None
+    exclude: list[str] = field(default_factory=list)
+    run_id_prefix: str | None = None
+    params: dict[str, Any] | None = None
+    priority: int = 0
+    concurrency_class: str | None = None
+
+    def expand(
+        self, start_utc: datetime, end_utc: datetime, plan_tz: ZoneInfo
+    ) -> list[CompiledEntry]:
+        """
+        คืน occurrence ที่ start_utc <= เวลา <= end_utc เรียงตามเวลา
+
+        job_id/run_id คำนวณด้วย timezone ของแผน จึงตรงกับ entry ปกติที่ระบุเวลาเดียวกัน
+        งานต่อรอบขึ้นกับความยาวของช่วงเวลาเท่านั้น ไม่ขึ้นกับระยะเวลาของกฎ
+        """
+
+        rule_tz = ZoneInfo(self.timezone)
+        # เผื่อ 1 วันทั้งสองข้างสำหรับ offset และ DST
+        day = start_utc.astimezone(rule_tz).date() - timedelta(days=1)
+        last_day = end_utc.astimezone(rule_tz).date() + timedelta(days=1)
+        if self.start is not None:
+            day = max(day, date.fromisoformat(self.start))
+        until = datetime.fromisoformat(self.until) if self.until else None
+        if until is not None:
+            last_day = min(last_day, until.date())
+        weekdays = set(self.weekdays)
+        exclude = set(self.exclude)
+        times = [time_of_day.fromisoformat(value) for value in self.times]
+
+        occurrences: list[CompiledEntry] = []
+        while day <= last_day:
+            if day.weekday() in weekdays and day.isoformat() not in exclude:
+                for at in times:
+                    local_dt = datetime.combine(day, at)
+                    if until is not None and local_dt > until:
+                        break
+                    if local_dt.strftime("%Y-%m-%dT%H:%M") in exclude:
+                        continue
+                    scheduled_utc = local_dt.replace(tzinfo=rule_tz).astimezone(UTC)
+                    if start_utc <= scheduled_utc <= end_utc:
+                        occurrences.append(
+                            self._occurrence(scheduled_utc, rule_tz, plan_tz)
+                        )
+            day += timedelta(days=1)
+        occurrences.sort(key=lambda item: item.scheduled_us)
+        return occurrences
+
+    def _occurrence(
+        self, scheduled_utc: datetime, rule_tz: ZoneInfo, plan_tz: ZoneInfo
+    ) -> CompiledEntry:
+        local_dt = scheduled_utc.astimezone(plan_tz)
+        run_id_base = build_run_id_base(local_dt, self.run_id_prefix)
+        job_id = build_job_id(scheduled_utc, self.pipeline_path, run_id_base)
+        return CompiledEntry(
+            scheduled_us=_utc_micros(scheduled_utc),
+            scheduled_for=format_utc(scheduled_utc),
+            publish_at=scheduled_utc.astimezone(rule_tz).isoformat(timespec="minutes"),
+            pipeline_path=self.pipeline_path,
+            job_id=job_id,
+            run_id=f"{run_id_base}_{job_id}",
+            params=self.params,
+            priority=self.priority,
+            concurrency_class=self.concurrency_class,
+        )
+
+
+def _nth_matching_day(start: date, weekdays: list[int], index: int) -> date:
+    # ทุกช่วง 7 วันนับจาก start มีวันที่ตรงกฎ len(weekdays) วันเสมอ
+    weeks, remaining = divmod(index, len(weekdays))
+    day = start + timedelta(weeks=weeks)
+    while True:
+        if day.weekday() in weekdays:
+            if remaining == 0:
+                return day
+            remaining -= 1
+        day += timedelta(days=1)
+
+
+def compile_recurrence(rule: RecurrenceRule, plan_timezone: str) -> CompiledRecurrence:
+    """แปลง RecurrenceRule เป็น CompiledRecurrence (count ถูกแปลงเป็น until)"""
+
+    if rule.by_weekday is not None:
+        weekdays = sorted({WEEKDAY_NAMES.index(name) for name in rule.by_weekday})
+    elif rule.freq == "weekly" and rule.start is not None:
+        weekdays = [rule.start.weekday()]
     else:
-        now_utc = now_utc.astimezone(UTC)
+        weekdays = list(range(7))
+
+    until: datetime | None = None
+    if rule.until is not None:
+        until = datetime.combine(rule.until, time_of_day.max)
+    elif rule.count is not None and rule.start is not None:
+        day_index, time_index = divmod(rule.count - 1, len(rule.times))
+        until = datetime.combine(
+            _nth_matching_day(rule.start, weekdays, day_index),
+            time_of_day.fromisoformat(rule.times[time_index]),
+        )
+
+    return CompiledRecurrence(
+        timezone=rule.timezone or plan_timezone,
+        weekdays=weekdays,
+        times=rule.times,
+        pipeline_path=rule.pipeline_path,
+        start=rule.start.isoformat() if rule.start else None,
+        until=until.isoformat() if until else None,
+        exclude=rule.exclude,
+        run_id_prefix=rule.run_id_prefix,
+        params=rule.params,
+        priority=rule.priority,
+        concurrency_class=rule.concurrency_class,
+    )
 
-    if created_at_utc is None:
-        created_at_utc = now_utc
 
-    window_end = now_utc + timedelta(minutes=max(window_minutes, 0))
-    enqueued_job_ids: list[str] = []
-    skipped_entries: list[ScheduleSkip] = []
+@dataclass(frozen=True)
+class CompiledSchedulePlan:
+    """
+    แผนเวลาที่ compile แล้ว
+
+    entries เรียงตามเวลา UTC (เวลาเท่ากันคงลำดับเดิมในแผน) recurrences เก็บกฎเวลาซ้ำ
+    ที่ยังไม่ขยาย ส่วน entry/กฎที่ไม่ผ่านการตรวจเก็บไว้ใน invalid เป็น ScheduleSkip
+    รหัส job_invalid ตามลำดับในแผน
+    """
+
+    timezone: str
+    entries: list[CompiledEntry]
+    recurrences: list[CompiledRecurrence]
+    invalid: list[ScheduleSkip]
+    _keys: list[int] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        keys = [entry.scheduled_us for entry in self.entries]
+        object.__setattr__(self, "_keys", keys)
+
+    def due_range(self, start_utc: datetime, end_utc: datetime) -> tuple[int, int]:
+        """คืนช่วง index [lo, hi) ของ entry ที่ start_utc <= เวลา <= end_utc"""
+        lo = bisect_left(self._keys, _utc_micros(start_utc))
+        hi = bisect_right(self._keys, _utc_micros(end_utc), lo=lo)
+        return lo, hi
+
+
+def compile_schedule_plan(plan: RawSchedulePlan) -> CompiledSchedulePlan:
+    """ตรวจทุก entry คำนวณ job_id/run_id เรียงตามเวลา UTC และตรวจกฎเวลาซ้ำ"""
+
+    tz_name = plan.timezone or DEFAULT_TIMEZONE
+    local_tz = _load_timezone(tz_name)
+    entries: list[CompiledEntry] = []
+    invalid: list[ScheduleSkip] = []
 
     for raw_entry in plan.entries:
         publish_at = ""
@@ -204,9 +545,9 @@ def schedule_due_jobs(
             pipeline_path = entry.pipeline_path
             scheduled_local = parse_publish_at(entry.publish_at, local_tz)
             scheduled_utc = scheduled_local.astimezone(UTC)
-            job = build_job_spec(entry, scheduled_utc, local_tz, created_at_utc)
+            job_id, run_id = build_job_identity(entry, scheduled_utc, local_tz)
         except (ValidationError, ValueError, TypeError) as exc:
-            skipped_entries.append(
+            invalid.append(
                 ScheduleSkip(
                     publish_at=publish_at,
                     pipeline_path=pipeline_path,
@@ -216,48 +557,239 @@ def schedule_due_jobs(
                 )
             )
             continue
-
-        if not scheduler_enabled:
-            skipped_entries.append(
-                ScheduleSkip(
-                    publish_at=entry.publish_at,
-                    pipeline_path=entry.pipeline_path,
-                    run_id=job.run_id,
-                    code="scheduler_disabled",
-                    message="SCHEDULER_ENABLED=false",
-                )
+        entries.append(
+            CompiledEntry(
+                scheduled_us=_utc_micros(scheduled_utc),
+                scheduled_for=format_utc(scheduled_utc),
+                publish_at=entry.publish_at,
+                pipeline_path=entry.pipeline_path,
+                job_id=job_id,
+                run_id=run_id,
+                params=entry.params,
+                priority=entry.priority,
+                concurrency_class=entry.concurrency_class,
             )
-            continue
+        )
 
-        if not (now_utc <= scheduled_utc <= window_end):
-            skipped_entries.append(
+    recurrences: list[CompiledRecurrence] = []
+    for raw_rule in plan.recurrences:
+        try:
+            rule = RecurrenceRule.model_validate(raw_rule)
+            recurrences.append(compile_recurrence(rule, tz_name))
+        except (ValidationError, ValueError, TypeError) as exc:
+            invalid.append(
                 ScheduleSkip(
-                    publish_at=entry.publish_at,
-                    pipeline_path=entry.pipeline_path,
-                    run_id=job.run_id,
-                    code="entry_not_due",
-                    message="not within window",
+                    publish_at="",
+                    pipeline_path="",
+                    run_id="",
+                    code="job_invalid",
+                    message=str(exc),
                 )
             )
-            continue
 
-        # ใช้ enqueue() แบบเดียวกันทั้ง dry_run และ actual run
-        # เพื่อให้ dry_run ให้ผลลัพธ์ที่ตรงกับ actual run
-        if queue.enqueue(job, dry_run=dry_run):
-            enqueued_job_ids.append(job.job_id)
+    entries.sort(key=lambda item: item.scheduled_us)
+    return CompiledSchedulePlan(
+        timezone=tz_name, entries=entries, recurrences=recurrences, invalid=invalid
+    )
+
+
+# (mtime_ns, ctime_ns, size) ของไฟล์แผน, sha256 ของเนื้อหา, แผนที่ compile แล้ว
+_CachedPlan = tuple[tuple[int, int, int], str, CompiledSchedulePlan]
+_COMPILED_PLANS: dict[Path, _CachedPlan] = {}
+
+
+def _compiled_cache_path(cache_dir: Path, plan_key: Path) -> Path:
+    name = hashlib.sha256(str(plan_key).encode("utf-8")).hexdigest()[:16]
+    return cache_dir / f"plan_{name}.json"
+
+
+def _read_compiled_cache(path: Path, plan_key: Path) -> _CachedPlan | None:
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+        if payload.get("version") != COMPILED_PLAN_VERSION or payload.get(
+            "plan_path"
+        ) != str(plan_key):
+            return None
+        plan = CompiledSchedulePlan(
+            timezone=payload["timezone"],
+            entries=[CompiledEntry(**item) for item in payload["entries"]],
+            recurrences=[CompiledRecurrence(**item) for item in payload["recurrences"]],
+            invalid=[ScheduleSkip(**item) for item in payload["invalid"]],
+        )
+        return tuple(payload["stamp"]), payload["sha256"], plan
+    except (OSError, ValueError, TypeError, KeyError, AttributeError):
+        # cache เสียหรือคนละรุ่น ให้ compile ใหม่
+        return None
+
+
+def _write_compiled_cache(path: Path, plan_key: Path, cached: _CachedPlan) -> None:
+    stamp, digest, plan = cached
+    payload = {
+        "version": COMPILED_PLAN_VERSION,
+        "plan_path": str(plan_key),
+        "stamp": list(stamp),
+        "sha256": digest,
+        "timezone": plan.timezone,
+        "entries": [asdict(entry) for entry in plan.entries],
+        "recurrences": [asdict(rule) for rule in plan.recurrences],
+        "invalid": [asdict(skip) for skip in plan.invalid],
+    }
+    # cache เป็นเพียงตัวเร่ง ถ้าเขียนไม่ได้ (เช่น params ไม่ใช่ JSON) ก็ข้ามไป
+    with contextlib.suppress(OSError, TypeError, ValueError):
+        text = json.dumps(payload, ensure_ascii=False)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_suffix(f".tmp.{os.getpid()}")
+        temp_path.write_text(text, encoding="utf-8")
+        os.replace(temp_path, path)
+
+
+def load_compiled_plan(
+    plan_path: Path, cache_dir: Path | None = None
+) -> CompiledSchedulePlan:
+    """
+    คืนแผนเวลาที่ compile แล้ว โดยใช้ cache แทนการอ่าน YAML ใหม่ทุกรอบ
+
+    cache ผูกกับ (mtime_ns, ctime_ns, size) ของไฟล์แผน ถ้าค่าเหล่านี้ไม่เปลี่ยนจะใช้
+    cache ทันทีโดยไม่อ่านไฟล์ ถ้าเปลี่ยนจะเทียบ sha256 ของเนื้อหาก่อน compile ใหม่
+    cache อยู่ในหน่วยความจำของ process และถ้าระบุ cache_dir จะเขียนลงดิสก์ด้วย
+    เพื่อให้ใช้ข้ามรอบ cron ได้ (process หนึ่งอ่าน cache บนดิสก์เฉพาะตอนยังไม่มีแผน
+    ในหน่วยความจำหรือเมื่อเนื้อหาแผนเปลี่ยน และเขียนเฉพาะเมื่อ stamp/sha256 เปลี่ยน)
+
+    Args:
+        plan_path: พาธไฟล์แผน
+        cache_dir: โฟลเดอร์เก็บแผนที่ compile แล้ว (None = ใช้เฉพาะในหน่วยความจำ)
+
+    Returns:
+        CompiledSchedulePlan
+    """
+
+    try:
+        stat = plan_path.stat()
+    except FileNotFoundError as exc:
+        raise SchedulePlanError(f"ไม่พบไฟล์แผน: {plan_path}") from exc
+    except OSError as exc:
+        raise SchedulePlanError(f"อ่านแผนไม่สำเร็จ: {exc}") from exc
+    # อ่าน stat ก่อนเนื้อหา ถ้าไฟล์ถูกแก้ระหว่างนี้ รอบถัดไปจะเห็น stamp ไม่ตรงและตรวจใหม่
+    stamp = (stat.st_mtime_ns, stat.st_ctime_ns, stat.st_size)
+    # ไฟล์ที่เพิ่งถูกแก้อาจถูกแก้ซ้ำภายในช่วงความละเอียดของ mtime โดยขนาดเท่าเดิม
+    # จึงยังไม่เชื่อ stamp และเทียบ sha256 ทุกครั้งจนกว่าไฟล์จะนิ่ง
+    racy = time.time_ns() - stat.st_mtime_ns < _RACY_STAMP_NS
+    plan_key = plan_path.resolve()
+    cache_path = (
+        _compiled_cache_path(cache_dir, plan_key) if cache_dir is not None else None
+    )
+
+    cached = _COMPILED_PLANS.get(plan_key)
+    if cached is None and cache_path is not None:
+        cached = _read_compiled_cache(cache_path, plan_key)
+    if cached is not None and cached[0] == stamp:
+        _COMPILED_PLANS[plan_key] = cached
+        return cached[2]
+
+    data = _read_plan_bytes(plan_path)
+    digest = hashlib.sha256(data).hexdigest()
+    if cached is not None and cached[1] != digest and cache_path is not None:
+        # process อื่นอาจ compile เนื้อหาใหม่นี้ลงดิสก์ไว้แล้ว
+        on_disk = _read_compiled_cache(cache_path, plan_key)
+        if on_disk is not None and on_disk[1] == digest:
+            cached = on_disk
+    if cached is not None and cached[1] == digest:
+        compiled = cached[2]
+    else:
+        compiled = compile_schedule_plan(parse_schedule_plan(_decode_plan(data)))
+    updated = ((-1, -1, -1) if racy else stamp, digest, compiled)
+    _COMPILED_PLANS[plan_key] = updated
+    # ช่วงที่ไฟล์ยังไม่นิ่ง stamp จะเป็น (-1, -1, -1) ทุกรอบ ไม่ต้องเขียนซ้ำ
+    if cache_path is not None and (cached is None or cached[:2] != updated[:2]):
+        _write_compiled_cache(cache_path, plan_key, updated)
+    return compiled
+
+
+def schedule_due_jobs(
+    plan_path: Path,
+    queue: JobQueue,
+    now_utc: datetime,
+    window_minutes: int,
+    dry_run: bool,
+    scheduler_enabled: bool,
+    created_at_utc: datetime | None = None,
+    cache_dir: Path | None = None,
+    report_not_due: bool = True,
+) -> ScheduleResult:
+    """
+    เลือกงานที่ถึงกำหนดและ enqueue ตามเงื่อนไข
+
+    ใช้แผนที่ compile แล้ว (ดู load_compiled_plan) หา entry ในช่วง
+    [now_utc, now_utc + window] ด้วย binary search ขยายกฎเวลาซ้ำเฉพาะช่วงเดียวกัน
+    และสร้าง JobSpec เฉพาะงานที่ถึงกำหนด ลำดับของ skipped_entries คือ job_invalid
+    ตามลำดับในแผน แล้วตามด้วย entry ที่เหลือเรียงตามเวลา (occurrence ของกฎเวลาซ้ำ
+    ที่ยังไม่ถึงกำหนดไม่ถูกรายงาน)
+
+    entry ที่อยู่นอก window นับไว้ใน not_due_count เสมอ ถ้า report_not_due=False
+    จะไม่สร้าง skip "entry_not_due" รายตัว ทำให้แต่ละรอบแตะเฉพาะ entry ในช่วงที่ถึงกำหนด
+    """
+
+    compiled = load_compiled_plan(plan_path, cache_dir)
+
+    if now_utc.tzinfo is None:
+        now_utc = now_utc.replace(tzinfo=UTC)
+    else:
+        now_utc = now_utc.astimezone(UTC)
+
+    if created_at_utc is None:
+        created_at_utc = now_utc
+
+    window_end = now_utc + timedelta(minutes=max(window_minutes, 0))
+    plan_tz = _load_timezone(compiled.timezone)
+    # กฎเวลาซ้ำถูกขยายเฉพาะช่วง window ของรอบนี้
+    occurrences = [
+        occurrence
+        for rule in compiled.recurrences
+        for occurrence in rule.expand(now_utc, window_end, plan_tz)
+    ]
+
+    skipped_entries = list(compiled.invalid)
+    enqueued_job_ids: list[str] = []
+    if not scheduler_enabled:
+        skipped_entries.extend(
+            entry.skip("scheduler_disabled", "SCHEDULER_ENABLED=false")
+            for entry in [*compiled.entries, *occurrences]
+        )
+        return ScheduleResult(
+            timezone=compiled.timezone,
+            enqueued_job_ids=enqueued_job_ids,
+            skipped_entries=skipped_entries,
+        )
+
+    lo, hi = compiled.due_range(now_utc, window_end)
+    due_entries = sorted(
+        [*compiled.entries[lo:hi], *occurrences], key=lambda item: item.scheduled_us
+    )
+
+    # ใช้ enqueue_many() แบบเดียวกันทั้ง dry_run และ actual run
+    # เพื่อให้ dry_run ให้ผลลัพธ์ที่ตรงกับ actual run
+    due_jobs = [entry.to_job_spec(created_at_utc) for entry in due_entries]
+    accepted = queue.enqueue_many(due_jobs, dry_run=dry_run) if due_jobs else []
+
+    if report_not_due:
+        skipped_entries.extend(
+            entry.skip("entry_not_due", "not within window")
+            for entry in compiled.entries[:lo]
+        )
+    for entry, is_new in zip(due_entries, accepted, strict=True):
+        if is_new:
+            enqueued_job_ids.append(entry.job_id)
         else:
-            skipped_entries.append(
-                ScheduleSkip(
-                    publish_at=entry.publish_at,
-                    pipeline_path=entry.pipeline_path,
-                    run_id=job.run_id,
-                    code="already_enqueued",
-                    message="job already exists",
-                )
-            )
+            skipped_entries.append(entry.skip("already_enqueued", "job already exists"))
+    if report_not_due:
+        skipped_entries.extend(
+            entry.skip("entry_not_due", "not within window")
+            for entry in compiled.entries[hi:]
+        )
 
     return ScheduleResult(
-        timezone=tz_name,
+        timezone=compiled.timezone,
         enqueued_job_ids=enqueued_job_ids,
         skipped_entries=skipped_entries,
+        not_due_count=lo + len(compiled.entries) - hi,
     )
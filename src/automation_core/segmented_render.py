@@ -0,0 +1,235 @@
+"""
+วางแผนและเข้ารหัสวิดีโอแบบแบ่งช่วงเวลา (segment) พร้อมกันหลาย process
+
+ใช้กับขั้นตอน video.render ในโหมด segmented: แบ่ง timeline ที่ขอบ segment ของ
+voiceover หรือช่วงเงียบในไฟล์ WAV เข้ารหัสวิดีโอแต่ละช่วงด้วย ffmpeg แยก process
+แล้วต่อด้วย concat demuxer แบบ stream copy เสียงถูกเข้ารหัสครั้งเดียวตอนต่อ
+เพื่อไม่ให้เกิดช่องว่างของ AAC priming ที่รอยต่อ
+
+ขอบทุกช่วงถูกปัดให้ตรง frame (จำนวน frame ต่อช่วงกำหนดด้วย -frames:v) ความยาวรวม
+ของวิดีโอจึงไม่คลาดจากเสียงตามจำนวนช่วง
+
+libx264 ค่าเริ่มต้นเปิด thread ราว 1.5 เท่าของจำนวนคอร์ต่อ process การรันหลายช่วง
+พร้อมกันจึงต้องจำกัดจำนวน process และ -threads ของแต่ละช่วงให้รวมกันไม่เกินจำนวนคอร์
+(ดู plan_encoder_threads)
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+import wave
+from array import array
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+# ช่วงที่สั้นกว่านี้ไม่คุ้มค่า overhead ของการเปิด ffmpeg เพิ่ม
+MIN_RENDER_SEGMENT_SECONDS = 10.0
+# ช่วงเงียบ: ค่า amplitude สูงสุดของ PCM 16-bit ต่ำกว่า threshold ต่อเนื่องอย่างน้อย
+# min_silence_seconds (ประมาณ -36 dBFS)
+SILENCE_THRESHOLD = 500
+SILENCE_MIN_SECONDS = 0.3
+_SILENCE_WINDOW_SECONDS = 0.05
+
+
+@dataclass(frozen=True)
+class RenderSegment:
+    """ช่วงของวิดีโอ [start_frame, end_frame) ที่ fps กำหนด"""
+
+    index: int
+    start_frame: int
+    end_frame: int
+    fps: int
+
+    @property
+    def frames(self) -> int:
+        return self.end_frame - self.start_frame
+
+    @property
+    def start_seconds(self) -> float:
+        return round(self.start_frame / self.fps, 6)
+
+    @property
+    def end_seconds(self) -> float:
+        return round(self.end_frame / self.fps, 6)
+
+
+def find_silence_boundaries(
+    wav_path: Path,
+    *,
+    threshold: int = SILENCE_THRESHOLD,
+    min_silence_seconds: float = SILENCE_MIN_SECONDS,
+) -> list[float]:
+    """
+    หาจุดกึ่งกลางของช่วงเงียบในไฟล์ WAV (อ่านทีละ window จึงใช้หน่วยความจำคงที่)
+
+    Args:
+        wav_path: ไฟล์ WAV PCM 16-bit
+        threshold: amplitude สูงสุดที่ยังถือว่าเงียบ
+        min_silence_seconds: ความยาวขั้นต่ำของช่วงเงียบ
+
+    Returns:
+        เวลา (วินาที) ของจุดกึ่งกลางช่วงเงียบ เรียงจากน้อยไปมาก
+        คืนรายการว่างถ้าไฟล์ไม่ใช่ PCM 16-bit
+    """
+    with wave.open(str(wav_path), "rb") as wav_file:
+        if wav_file.getsampwidth() != 2:
+            return []
+        rate = wav_file.getframerate()
+        channels = wav_file.getnchannels()
+        window = max(1, int(rate * _SILENCE_WINDOW_SECONDS))
+        boundaries: list[float] = []
+        position = 0
+        silence_start: int | None = None
+        while True:
+            data = wav_file.readframes(window)
+            if not data:
+                break
+            samples = array("h", data)
+            if sys.byteorder == "big":
+                samples.byteswap()
+            frames = len(samples) // channels
+            quiet = max(map(abs, samples), default=0) <= threshold
+            if quiet and silence_start is None:
+                silence_start = position
+            elif not quiet and silence_start is not None:
+                if (position - silence_start) / rate >= min_silence_seconds:
+                    boundaries.append(round((silence_start + position) / 2 / rate, 6))
+                silence_start = None
+            position += frames
+    # ช่วงเงียบท้ายไฟล์ไม่ใช่จุดตัดที่มีประโยชน์ จึงไม่นับ
+    return boundaries
+
+
+def plan_render_segments(
+    duration_seconds: float,
+    fps: int,
+    count: int,
+    boundaries: Sequence[float] = (),
+    *,
+    min_segment_seconds: float = MIN_RENDER_SEGMENT_SECONDS,
+) -> list[RenderSegment]:
+    """
+    แบ่ง timeline เป็นช่วงใกล้เคียงกัน โดยเลื่อนจุดตัดไปที่ boundary ที่ใกล้ที่สุด
+
+    Args:
+        duration_seconds: ความยาวเสียง
+        fps: frame rate ของวิดีโอ
+        count: จำนวนช่วงที่ต้องการ (ลดลงอัตโนมัติให้แต่ละช่วงยาวไม่ต่ำกว่า
+            min_segment_seconds)
+        boundaries: เวลาที่ควรตัด เช่น ขอบ segment ของ voiceover หรือช่วงเงียบ
+        min_segment_seconds: ความยาวขั้นต่ำของแต่ละช่วง
+
+    Returns:
+        รายการ RenderSegment ที่ต่อกันครอบคลุมทั้ง timeline
+
+    Raises:
+        ValueError: ถ้า duration_seconds, fps หรือ count ไม่เป็นค่าบวก
+    """
+    if duration_seconds <= 0:
+        raise ValueError("duration_seconds must be > 0")
+    if fps <= 0 or count <= 0:
+        raise ValueError("fps and count must be positive")
+    total_frames = max(1, round(duration_seconds * fps))
+    count = max(1, min(count, int(duration_seconds // min_segment_seconds)))
+    candidates = sorted({round(b * fps) for b in boundaries})
+    snap_window = total_frames / count / 2
+
+    edges = [0]
+    for i in range(1, count):
+        target = round(total_frames * i / count)
+        nearby = [
+            frame
+            for frame in candidates
+            if edges[-1] < frame < total_frames and abs(frame - target) <= snap_window
+        ]
+        cut = min(nearby, key=lambda frame: abs(frame - target), default=target)
+        if edges[-1] < cut < total_frames:
+            edges.append(cut)
+    edges.append(total_frames)
+    return [
+        RenderSegment(index=i, start_frame=start, end_frame=end, fps=fps)
+        for i, (start, end) in enumerate(zip(edges, edges[1:], strict=False))
+    ]
+
+
+def plan_encoder_threads(
+    segment_count: int, cpu_count: int | None = None
+) -> tuple[int, int]:
+    """
+    แบ่งคอร์ให้การเข้ารหัสช่วง
+
+    Args:
+        segment_count: จำนวนช่วงที่ต้องเข้ารหัส
+        cpu_count: จำนวนคอร์ (ค่าเริ่มต้น os.cpu_count())
+
+    Returns:
+        (จำนวน process ที่รันพร้อมกัน, ค่า -threads ของแต่ละ process)
+        ผลคูณไม่เกินจำนวนคอร์ (ยกเว้นเครื่องที่มีคอร์เดียว)
+    """
+    cores = max(1, cpu_count or os.cpu_count() or 1)
+    workers = max(1, min(segment_count, cores))
+    return workers, max(1, cores // workers)
+
+
+def with_encoder_threads(codec_args: Sequence[str], threads: int) -> list[str]:
+    """แทนที่ (หรือเพิ่ม) -threads ในอาร์กิวเมนต์ encoder เช่น -threads 0 ของโปรไฟล์"""
+    args: list[str] = []
+    skip = False
+    for arg in codec_args:
+        if skip:
+            skip = False
+            continue
+        if arg == "-threads":
+            skip = True
+            continue
+        args.append(arg)
+    return [*args, "-threads", str(threads)]
+
+
+def encode_segments(
+    commands: Sequence[Sequence[str]],
+    run: Callable[[Sequence[str]], object],
+    *,
+    max_workers: int,
+) -> list[float]:
+    """
+    รันคำสั่งเข้ารหัสของแต่ละช่วงพร้อมกัน (แต่ละคำสั่งเป็น process ของตัวเอง)
+
+    Args:
+        commands: คำสั่ง ffmpeg ของแต่ละช่วง
+        run: ฟังก์ชันที่รันคำสั่งหนึ่งคำสั่งและ raise เมื่อล้มเหลว
+        max_workers: จำนวน process สูงสุดที่รันพร้อมกัน
+
+    Returns:
+        เวลาที่ใช้ (วินาที) ของแต่ละช่วงตามลำดับ
+
+    Raises:
+        Exception: error แรกจาก run (ช่วงที่ยังไม่เริ่มจะถูกยกเลิก)
+    """
+
+    def _timed(command: Sequence[str]) -> float:
+        started = time.perf_counter()
+        run(command)
+        return round(time.perf_counter() - started, 6)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = [executor.submit(_timed, command) for command in commands]
+        try:
+            return [future.result() for future in futures]
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+
+def write_concat_list(paths: Sequence[Path], list_path: Path) -> None:
+    """เขียนไฟล์รายการของ concat demuxer (ชื่อไฟล์ relative กับโฟลเดอร์ของ list_path)"""
+    lines = []
+    for path in paths:
+        name = path.relative_to(list_path.parent).as_posix().replace("'", "'\\''")
+        lines.append(f"file '{name}'\n")
+    list_path.write_text("".join(lines), encoding="utf-8")
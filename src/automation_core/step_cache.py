@@ -0,0 +1,489 @@
+"""
+แคชผลลัพธ์ของ step แบบ content-addressed สำหรับ orchestrator
+
+คีย์แคชคำนวณจาก uses, config ของ step, ไบต์ของไฟล์ input และเวอร์ชันโค้ดของเอเจนต์
+ไฟล์ผลลัพธ์ถูกเก็บเป็น blob ตาม SHA-256 และนำกลับมาใช้ด้วย hardlink (หรือคัดลอก
+เมื่อ hardlink ไม่ได้) โดยตรวจสอบแฮชของ blob ทุกครั้งก่อนนำไปใช้
+
+ไฟล์ที่ materialize แล้วใช้ inode เดียวกับ blob จึงถูกบันทึกไว้ที่
+<run_dir>/.step_cache_links/<step_id>.json ก่อนรัน step นั้นซ้ำต้องเรียก
+detach_materialized เพื่อ unlink ไฟล์เหล่านั้น มิฉะนั้นการเขียนทับจะแก้ blob
+และทุก run ที่ link อยู่ไปด้วย
+"""
+
+from __future__ import annotations
+
+import ast
+import dis
+import functools
+import hashlib
+import importlib.util
+import inspect
+import json
+import os
+import shutil
+import sys
+import threading
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from types import CodeType, FunctionType, ModuleType
+from typing import Any, Literal
+
+from automation_core.voiceover_store import detach_output
+
+STEP_CACHE_ENV = "STEP_CACHE_ENABLED"
+CACHE_SCHEMA_VERSION = "v1"
+LINKS_DIR_NAME = ".step_cache_links"
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+ArtifactScope = Literal["run", "root"]
+
+
+def parse_step_cache_enabled(env_value: str | None) -> bool:
+    """
+    แปลงค่า STEP_CACHE_ENABLED เป็น boolean (ค่าเริ่มต้นเปิดใช้งาน)
+
+    Args:
+        env_value: ค่าจากตัวแปรสภาพแวดล้อมหรือ None
+
+    Returns:
+        False ถ้าค่าเป็น "false", "0", "no", "off", "disabled" และ True ในกรณีอื่น
+    """
+    if env_value is None:
+        return True
+    return env_value.strip().lower() not in ("false", "0", "no", "off", "disabled")
+
+
+def hash_file(path: Path) -> str:
+    """คำนวณ SHA-256 ของไฟล์แบบอ่านทีละ chunk"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def compute_step_cache_key(
+    *,
+    uses: str,
+    step_config: Mapping[str, Any],
+    input_files: Iterable[Path],
+    code_version: str,
+    extra: Mapping[str, Any] | None = None,
+) -> str:
+    """
+    คำนวณคีย์แคชของ step แบบ deterministic
+
+    Args:
+        uses: ชื่อเอเจนต์ของ step
+        step_config: ข้อมูล step (config/input/output) ที่มีผลต่อผลลัพธ์
+        input_files: ไฟล์ input ที่ step อ่าน (ลำดับไม่มีผล)
+        code_version: เวอร์ชันโค้ดของเอเจนต์
+        extra: ค่าอื่นที่มีผลต่อผลลัพธ์ เช่น run_id หรือ topic
+
+    Returns:
+        SHA-256 hex digest ความยาว 64 ตัวอักษร
+    """
+    inputs = sorted(
+        (path.as_posix(), hash_file(path)) for path in {Path(p) for p in input_files}
+    )
+    payload = {
+        "schema_version": CACHE_SCHEMA_VERSION,
+        "uses": uses,
+        "step": step_config,
+        "inputs": [sha for _, sha in inputs],
+        "code_version": code_version,
+        "extra": dict(extra or {}),
+    }
+    encoded = json.dumps(
+        payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _code_objects(code: CodeType) -> Iterable[CodeType]:
+    yield code
+    for const in code.co_consts:
+        if isinstance(const, CodeType):
+            yield from _code_objects(const)
+
+
+def _imported_module_names(code: CodeType) -> set[str]:
+    """ชื่อ module ที่ code import ภายในฟังก์ชัน (รวม "pkg.name" ของ from pkg import name)"""
+    names: set[str] = set()
+    for sub_code in _code_objects(code):
+        module_name = None
+        for instruction in dis.get_instructions(sub_code):
+            if instruction.opname == "IMPORT_NAME":
+                module_name = instruction.argval
+                names.add(module_name)
+            elif instruction.opname == "IMPORT_FROM" and module_name:
+                names.add(f"{module_name}.{instruction.argval}")
+    return names
+
+
+def _static_imports(path: Path, module_name: str) -> frozenset[str]:
+    """ชื่อ module ที่ไฟล์ import (อ่านด้วย ast ไม่ต้อง import จริง)"""
+    try:
+        stat = path.stat()
+    except OSError:
+        return frozenset()
+    return _parse_imports(path, module_name, stat.st_mtime_ns, stat.st_size)
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_imports(
+    path: Path, module_name: str, _mtime_ns: int, _size: int
+) -> frozenset[str]:
+    # mtime/ขนาดไฟล์เป็นส่วนหนึ่งของคีย์ lru_cache: ไฟล์ที่ถูกแก้จะถูก parse ใหม่
+    try:
+        tree = ast.parse(path.read_bytes())
+    except (OSError, SyntaxError, ValueError):
+        return frozenset()
+    package = (
+        module_name if path.name == "__init__.py" else module_name.rpartition(".")[0]
+    )
+    names: set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            base = node.module or ""
+            if node.level:
+                parts = package.split(".")
+                parent = ".".join(parts[: len(parts) - node.level + 1])
+                base = f"{parent}.{base}" if base else parent
+            names.add(base)
+            names.update(f"{base}.{alias.name}" for alias in node.names)
+    return frozenset(names)
+
+
+def compute_code_version(func: Callable, roots: Iterable[Path]) -> str:
+    """
+    คำนวณเวอร์ชันโค้ดของเอเจนต์จากโค้ดทั้งหมดที่เอเจนต์เรียกใช้ภายใน repo
+
+    รวม source ของฟังก์ชันและฟังก์ชันในไฟล์เดียวกันที่ถูกเรียกต่อ กับไบต์ของไฟล์
+    module first-party ทุกไฟล์ที่เข้าถึงได้ (ทั้ง import ในฟังก์ชันและ import ต่อกัน
+    เป็นทอดๆ) การแก้โค้ดใน steps/, agents/ หรือ automation_core/ จึงเปลี่ยนคีย์แคช
+
+    Args:
+        func: ฟังก์ชันเอเจนต์
+        roots: โฟลเดอร์ของโค้ด first-party (ไม่นับ site-packages ที่อยู่ข้างใน)
+
+    Returns:
+        SHA-256 hex digest ความยาว 64 ตัวอักษร
+    """
+    resolved_roots = [Path(root).resolve() for root in roots]
+
+    def _first_party_file(filename: str | None) -> Path | None:
+        if not filename or not filename.endswith(".py"):
+            return None
+        path = Path(filename).resolve()
+        if "site-packages" in path.parts or not path.is_file():
+            return None
+        if any(path.is_relative_to(root) for root in resolved_roots):
+            return path
+        return None
+
+    def _module_file(module_name: str) -> Path | None:
+        module = sys.modules.get(module_name)
+        if module is not None:
+            return _first_party_file(getattr(module, "__file__", None))
+        try:
+            spec = importlib.util.find_spec(module_name)
+        except (ImportError, ValueError):
+            return None
+        return _first_party_file(spec.origin if spec else None)
+
+    home_module = getattr(func, "__module__", None)
+    sources: dict[str, str] = {}
+    files: dict[Path, str] = {}
+    pending_funcs: list[FunctionType] = [func] if isinstance(func, FunctionType) else []
+    pending_modules: list[str] = []
+
+    while pending_funcs:
+        current = pending_funcs.pop()
+        name = f"{current.__module__}.{current.__qualname__}"
+        if name in sources:
+            continue
+        try:
+            sources[name] = inspect.getsource(current)
+        except (OSError, TypeError):
+            sources[name] = name
+        pending_modules.extend(_imported_module_names(current.__code__))
+        for sub_code in _code_objects(current.__code__):
+            for global_name in sub_code.co_names:
+                obj = current.__globals__.get(global_name)
+                if isinstance(obj, FunctionType) and obj.__module__ == home_module:
+                    pending_funcs.append(obj)
+                elif isinstance(obj, ModuleType):
+                    pending_modules.append(obj.__name__)
+                elif obj is not None and getattr(obj, "__module__", None):
+                    if obj.__module__ == home_module and inspect.isclass(obj):
+                        try:
+                            sources[f"{home_module}.{global_name}"] = inspect.getsource(
+                                obj
+                            )
+                        except (OSError, TypeError):
+                            pass
+                    elif obj.__module__ != home_module:
+                        pending_modules.append(obj.__module__)
+
+    seen_modules: set[str] = set()
+    while pending_modules:
+        module_name = pending_modules.pop()
+        if module_name in seen_modules or module_name == home_module:
+            continue
+        seen_modules.add(module_name)
+        path = _module_file(module_name)
+        if path is None or path in files:
+            continue
+        files[path] = hash_file(path)
+        pending_modules.extend(_static_imports(path, module_name))
+
+    digest = hashlib.sha256()
+    for name in sorted(sources):
+        digest.update(f"{name}\0{sources[name]}\0".encode())
+    for sha256 in sorted(files.values()):
+        digest.update(sha256.encode("ascii"))
+    if not sources:
+        module = getattr(func, "__module__", "")
+        digest.update(f"{module}.{getattr(func, '__qualname__', repr(func))}".encode())
+    return digest.hexdigest()
+
+
+@dataclass(frozen=True)
+class CachedArtifact:
+    """ไฟล์ผลลัพธ์ 1 ไฟล์ในแคช (rel_path อ้างอิงจาก run_dir หรือ root_dir ตาม scope)"""
+
+    scope: ArtifactScope
+    rel_path: str
+    sha256: str
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    """รายการแคชของ step หนึ่งครั้ง"""
+
+    key: str
+    uses: str
+    output_scope: ArtifactScope
+    output_rel: str
+    output_kind: Literal["path", "str"]
+    artifacts: tuple[CachedArtifact, ...]
+    created_at: str
+
+
+def _scope_base(scope: ArtifactScope, run_dir: Path, root_dir: Path) -> Path:
+    return run_dir if scope == "run" else root_dir
+
+
+def split_artifact_path(
+    path: Path, run_dir: Path, root_dir: Path
+) -> tuple[ArtifactScope, str] | None:
+    """
+    แปลง path ของไฟล์ผลลัพธ์เป็น (scope, rel_path)
+
+    Returns:
+        ("run", rel) ถ้าอยู่ใต้ run_dir, ("root", rel) ถ้าอยู่ใต้ root_dir
+        หรือ None ถ้าอยู่นอก root_dir
+    """
+    resolved = path.resolve()
+    for scope, base in (("run", run_dir), ("root", root_dir)):
+        try:
+            rel = resolved.relative_to(base.resolve())
+        except ValueError:
+            continue
+        return scope, rel.as_posix()  # type: ignore[return-value]
+    return None
+
+
+class StepCache:
+    """ที่เก็บแคชผลลัพธ์ step บนดิสก์ (entries/<key>.json + objects/<sha256>)"""
+
+    def __init__(self, cache_dir: Path | str) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.entries_dir = self.cache_dir / "entries"
+        self.objects_dir = self.cache_dir / "objects"
+
+    def _entry_path(self, key: str) -> Path:
+        return self.entries_dir / f"{key}.json"
+
+    def _object_path(self, sha256: str) -> Path:
+        return self.objects_dir / sha256[:2] / sha256
+
+    @staticmethod
+    def _temp_path(path: Path) -> Path:
+        return path.with_name(f"{path.name}.tmp.{os.getpid()}.{threading.get_ident()}")
+
+    def lookup(self, key: str) -> CacheEntry | None:
+        """อ่านรายการแคช คืน None ถ้าไม่มีหรือข้อมูลเสีย"""
+        try:
+            data = json.loads(self._entry_path(key).read_text(encoding="utf-8"))
+            if data.get("schema_version") != CACHE_SCHEMA_VERSION:
+                return None
+            artifacts = tuple(
+                CachedArtifact(
+                    scope=item["scope"],
+                    rel_path=item["rel_path"],
+                    sha256=item["sha256"],
+                )
+                for item in data["artifacts"]
+            )
+            return CacheEntry(
+                key=key,
+                uses=data["uses"],
+                output_scope=data["output_scope"],
+                output_rel=data["output_rel"],
+                output_kind=data["output_kind"],
+                artifacts=artifacts,
+                created_at=data["created_at"],
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _store_object(self, source: Path) -> str:
+        sha256 = hash_file(source)
+        target = self._object_path(sha256)
+        if target.is_file():
+            return sha256
+        target.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self._temp_path(target)
+        shutil.copyfile(source, temp_path)
+        os.replace(temp_path, target)
+        return sha256
+
+    def store(
+        self,
+        key: str,
+        *,
+        uses: str,
+        output: tuple[ArtifactScope, str],
+        output_kind: Literal["path", "str"],
+        artifacts: Iterable[tuple[ArtifactScope, str, Path]],
+    ) -> CacheEntry:
+        """
+        บันทึกไฟล์ผลลัพธ์ของ step ลงแคช
+
+        Args:
+            key: คีย์จาก compute_step_cache_key
+            uses: ชื่อเอเจนต์
+            output: (scope, rel_path) ของค่าที่ step คืนกลับ
+            output_kind: ชนิดค่าที่ step คืน ("path" = Path, "str" = สตริง relative)
+            artifacts: รายการ (scope, rel_path, path จริง) ของไฟล์ผลลัพธ์
+        """
+        stored = tuple(
+            CachedArtifact(scope=scope, rel_path=rel, sha256=self._store_object(path))
+            for scope, rel, path in artifacts
+        )
+        entry = CacheEntry(
+            key=key,
+            uses=uses,
+            output_scope=output[0],
+            output_rel=output[1],
+            output_kind=output_kind,
+            artifacts=stored,
+            created_at=datetime.now(UTC).isoformat().replace("+00:00", "Z"),
+        )
+        payload = {
+            "schema_version": CACHE_SCHEMA_VERSION,
+            "uses": entry.uses,
+            "output_scope": entry.output_scope,
+            "output_rel": entry.output_rel,
+            "output_kind": entry.output_kind,
+            "artifacts": [
+                {"scope": a.scope, "rel_path": a.rel_path, "sha256": a.sha256}
+                for a in entry.artifacts
+            ],
+            "created_at": entry.created_at,
+        }
+        entry_path = self._entry_path(key)
+        entry_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self._temp_path(entry_path)
+        temp_path.write_text(
+            json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+        os.replace(temp_path, entry_path)
+        return entry
+
+    def materialize(
+        self, entry: CacheEntry, *, run_dir: Path, root_dir: Path
+    ) -> Path | str | None:
+        """
+        วางไฟล์จากแคชลงตำแหน่งเดิมของ run ปัจจุบัน
+
+        Returns:
+            ค่าผลลัพธ์ของ step ในรูปแบบเดียวกับที่ step คืน
+            หรือ None ถ้า blob หายหรือถูกแก้ไข (รายการแคชนั้นจะถูกลบทิ้ง)
+        """
+        objects: list[tuple[Path, Path]] = []
+        for artifact in entry.artifacts:
+            blob = self._object_path(artifact.sha256)
+            if not blob.is_file() or hash_file(blob) != artifact.sha256:
+                self.invalidate(entry.key)
+                return None
+            base = _scope_base(artifact.scope, run_dir, root_dir)
+            objects.append((blob, base / artifact.rel_path))
+
+        for blob, dest in objects:
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            if dest.exists() and os.path.samefile(blob, dest):
+                continue
+            temp_path = self._temp_path(dest)
+            try:
+                os.link(blob, temp_path)
+            except OSError:
+                shutil.copyfile(blob, temp_path)
+            os.replace(temp_path, dest)
+
+        output = _scope_base(entry.output_scope, run_dir, root_dir) / entry.output_rel
+        if entry.output_kind == "str":
+            return output.relative_to(root_dir).as_posix()
+        return output
+
+    def record_links(self, entry: CacheEntry, *, run_dir: Path, step_id: str) -> None:
+        """บันทึกไฟล์ที่ materialize ให้ step_id (ใช้กับ detach_materialized)"""
+        links_path = run_dir / LINKS_DIR_NAME / f"{step_id}.json"
+        links_path.parent.mkdir(parents=True, exist_ok=True)
+        links = [{"scope": a.scope, "rel_path": a.rel_path} for a in entry.artifacts]
+        temp_path = self._temp_path(links_path)
+        temp_path.write_text(json.dumps(links, ensure_ascii=False), encoding="utf-8")
+        os.replace(temp_path, links_path)
+
+    def invalidate(self, key: str) -> None:
+        """ลบรายการแคช (ไม่ลบ blob ที่อาจถูกใช้ร่วมกับรายการอื่น)"""
+        try:
+            self._entry_path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+
+def detach_materialized(*, run_dir: Path, root_dir: Path, step_id: str) -> list[Path]:
+    """
+    unlink ไฟล์ที่เคย materialize จากแคชให้ step_id ก่อน step นั้นเขียนผลลัพธ์ใหม่
+
+    ไฟล์ที่ยังเป็น hardlink/symlink ของ blob จะถูก unlink (ดู detach_output)
+    ส่วนไฟล์ที่ถูกแทนที่ด้วยไฟล์ของตัวเองแล้วจะไม่ถูกแตะ
+
+    Returns:
+        ไฟล์ที่ถูก unlink
+    """
+    links_path = run_dir / LINKS_DIR_NAME / f"{step_id}.json"
+    try:
+        links = json.loads(links_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return []
+    detached: list[Path] = []
+    for link in links if isinstance(links, list) else []:
+        try:
+            base = _scope_base(link["scope"], run_dir, root_dir)
+            path = base / link["rel_path"]
+        except (KeyError, TypeError):
+            continue
+        if path.is_symlink() or (path.is_file() and path.stat().st_nlink > 1):
+            detach_output(path)
+            detached.append(path)
+    links_path.unlink(missing_ok=True)
+    return detached
@@ -0,0 +1,186 @@
+"""
+วัดต้นทุนของแต่ละ step ใน pipeline (เวลา, CPU, หน่วยความจำ, I/O, เวลา subprocess)
+
+ค่าที่วัดได้ถูกเขียนลง pipeline_summary.json ใต้บล็อก metrics และแปลงเป็น
+Chrome trace-event JSON (เปิดดูใน Perfetto หรือ chrome://tracing) ได้
+
+หมายเหตุ:
+    - cpu_time_s และ io_* วัดเฉพาะ thread ที่รัน step (step รันใน worker thread)
+    - peak_rss_delta_kb มาจาก ru_maxrss ของทั้ง process จึงเป็นค่าโดยประมาณ
+      เมื่อมี step รันพร้อมกันหลายตัว
+    - subprocess_time_s นับเฉพาะคำสั่งที่ถูกครอบด้วย track_subprocess()
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None  # type: ignore[assignment]
+
+_THREAD_IO_PATH = Path("/proc/thread-self/io")
+_local = threading.local()
+
+
+@dataclass(frozen=True)
+class StepMetrics:
+    """ผลการวัดของ step หนึ่งครั้ง"""
+
+    started_at: float
+    wall_time_s: float
+    cpu_time_s: float
+    peak_rss_delta_kb: int | None
+    io_read_bytes: int | None
+    io_write_bytes: int | None
+    subprocess_time_s: float
+    thread_id: int
+
+    def to_dict(self) -> dict[str, Any]:
+        """แปลงเป็น dict สำหรับเขียนลง pipeline_summary.json"""
+        return {
+            "wall_time_s": round(self.wall_time_s, 6),
+            "cpu_time_s": round(self.cpu_time_s, 6),
+            "peak_rss_delta_kb": self.peak_rss_delta_kb,
+            "io_read_bytes": self.io_read_bytes,
+            "io_write_bytes": self.io_write_bytes,
+            "subprocess_time_s": round(self.subprocess_time_s, 6),
+        }
+
+
+class _Collector:
+    def __init__(self) -> None:
+        self.subprocess_time_s = 0.0
+        self.metrics: StepMetrics | None = None
+
+
+def _peak_rss_kb() -> int | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS รายงานเป็น bytes ส่วน Linux เป็น kilobytes
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def _thread_io() -> tuple[int, int] | None:
+    """คืน (rchar, wchar) ของ thread ปัจจุบัน หรือ None ถ้าระบบไม่รองรับ"""
+    try:
+        text = _THREAD_IO_PATH.read_text(encoding="ascii")
+    except OSError:
+        return None
+    values: dict[str, int] = {}
+    for line in text.splitlines():
+        name, _, value = line.partition(":")
+        if value.strip().isdigit():
+            values[name.strip()] = int(value)
+    if "rchar" not in values or "wchar" not in values:
+        return None
+    return values["rchar"], values["wchar"]
+
+
+@contextmanager
+def measure_step() -> Iterator[_Collector]:
+    """
+    วัดโค้ดที่อยู่ใน block (ต้องเรียกใน thread เดียวกับที่รัน step)
+
+    ค่า collector.metrics จะถูกกำหนดเมื่อออกจาก block แม้ step จะ raise
+    """
+    collector = _Collector()
+    previous = getattr(_local, "collector", None)
+    _local.collector = collector
+    started_at = time.time()
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+    rss_start = _peak_rss_kb()
+    io_start = _thread_io()
+    try:
+        yield collector
+    finally:
+        io_end = _thread_io()
+        rss_end = _peak_rss_kb()
+        io_delta = (
+            (io_end[0] - io_start[0], io_end[1] - io_start[1])
+            if io_start is not None and io_end is not None
+            else (None, None)
+        )
+        collector.metrics = StepMetrics(
+            started_at=started_at,
+            wall_time_s=time.perf_counter() - wall_start,
+            cpu_time_s=time.thread_time() - cpu_start,
+            peak_rss_delta_kb=(
+                rss_end - rss_start
+                if rss_start is not None and rss_end is not None
+                else None
+            ),
+            io_read_bytes=io_delta[0],
+            io_write_bytes=io_delta[1],
+            subprocess_time_s=collector.subprocess_time_s,
+            thread_id=threading.get_ident(),
+        )
+        _local.collector = previous
+
+
+@contextmanager
+def track_subprocess() -> Iterator[None]:
+    """นับเวลาของ subprocess (เช่น ffmpeg/ffprobe) เข้ากับ step ที่กำลังวัดอยู่"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        collector = getattr(_local, "collector", None)
+        if collector is not None:
+            collector.subprocess_time_s += time.perf_counter() - start
+
+
+def build_trace_events(
+    entries: Sequence[tuple[str, str, StepMetrics]],
+    *,
+    pipeline: str,
+    run_id: str,
+) -> dict[str, Any]:
+    """
+    สร้าง Chrome trace-event JSON จากผลการวัด
+
+    Args:
+        entries: รายการ (step_id, uses, metrics)
+        pipeline: ชื่อ pipeline
+        run_id: รหัส run
+
+    Returns:
+        dict รูปแบบ {"traceEvents": [...]} ที่ Perfetto เปิดได้
+    """
+    origin = min((m.started_at for _, _, m in entries), default=0.0)
+    pid = os.getpid()
+    thread_ids: dict[int, int] = {}
+    events: list[dict[str, Any]] = [
+        {
+            "name": "process_name",
+            "ph": "M",
+            "pid": pid,
+            "args": {"name": f"{pipeline} ({run_id})"},
+        }
+    ]
+    for step_id, uses, metrics in sorted(entries, key=lambda e: e[2].started_at):
+        tid = thread_ids.setdefault(metrics.thread_id, len(thread_ids) + 1)
+        events.append(
+            {
+                "name": step_id,
+                "cat": uses,
+                "ph": "X",
+                "ts": round((metrics.started_at - origin) * 1_000_000),
+                "dur": round(metrics.wall_time_s * 1_000_000),
+                "pid": pid,
+                "tid": tid,
+                "args": metrics.to_dict(),
+            }
+        )
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
@@ -0,0 +1,214 @@
+"""
+แคชเสียง TTS ระดับ chunk แบบ content-addressed
+
+คีย์คำนวณจากข้อความที่ normalize แล้ว เสียง ความเร็ว pitch และชนิด input (SSML/ข้อความ)
+chunk ที่ไม่ถูกแก้ไขจึงนำเสียงเดิมจากดิสก์มาใช้ได้ มีเพียง chunk ที่แก้ไขเท่านั้นที่ต้อง
+เรียก API ใหม่ แคชจำกัดขนาดรวมและลบไฟล์ที่ใช้ล่าสุดนานที่สุดก่อน (LRU ตาม mtime
+ซึ่งถูกแตะทุกครั้งที่อ่าน) โดยนับขนาดรวมสะสมไว้และสแกนโฟลเดอร์ใหม่เฉพาะเมื่อเกินขีดจำกัด
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any
+
+TTS_CACHE_ENV = "TTS_CACHE_ENABLED"
+TTS_CACHE_SCHEMA_VERSION = "v1"
+DEFAULT_TTS_CACHE_DIR = Path(__file__).resolve().parents[2] / "data" / "tts_cache"
+DEFAULT_TTS_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+
+def parse_tts_cache_enabled(env_value: str | None) -> bool:
+    """แปลงค่า TTS_CACHE_ENABLED เป็น boolean (ค่าเริ่มต้นเปิดใช้งาน)"""
+    if env_value is None:
+        return True
+    return env_value.strip().lower() not in ("false", "0", "no", "off", "disabled")
+
+
+def _normalize_chunk_text(text: str) -> str:
+    # ตรงกับ voiceover_tts.normalize_script_text และตัดช่องว่างหัวท้ายเพิ่ม
+    normalized = text.replace("\r\n", "\n").replace("\r", "\n")
+    return "\n".join(line.rstrip() for line in normalized.split("\n")).strip()
+
+
+def compute_tts_cache_key(
+    text: str,
+    *,
+    voice: str | None,
+    speaking_rate: float | None = None,
+    pitch: float | None = None,
+    ssml: bool = False,
+    audio_format: str = "mp3",
+    extra: Mapping[str, Any] | None = None,
+) -> str:
+    """
+    คำนวณคีย์แคชของเสียง 1 chunk
+
+    Args:
+        text: ข้อความ/SSML ของ chunk (normalize บรรทัดและช่องว่างหัวท้ายก่อนคำนวณ)
+        voice: ชื่อเสียง
+        speaking_rate: ความเร็วในการพูด
+        pitch: ระดับเสียง
+        ssml: text เป็น SSML หรือไม่
+        audio_format: นามสกุลไฟล์เสียง (mp3/wav) ใช้แยกผลลัพธ์ต่างรูปแบบกัน
+        extra: ค่าอื่นที่มีผลต่อเสียง เช่น ชื่อเอนจิน
+
+    Returns:
+        SHA-256 hex digest ความยาว 64 ตัวอักษร
+    """
+    payload = {
+        "schema_version": TTS_CACHE_SCHEMA_VERSION,
+        "text": _normalize_chunk_text(text),
+        "voice": voice,
+        "speaking_rate": speaking_rate,
+        "pitch": pitch,
+        "ssml": ssml,
+        "audio_format": audio_format,
+        "extra": dict(extra or {}),
+    }
+    encoded = json.dumps(
+        payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class TTSCache:
+    """ที่เก็บเสียงบนดิสก์ (<cache_dir>/<key[:2]>/<key>.<format>) จำกัดขนาดรวมแบบ LRU"""
+
+    def __init__(
+        self,
+        cache_dir: Path | str = DEFAULT_TTS_CACHE_DIR,
+        max_bytes: int = DEFAULT_TTS_CACHE_MAX_BYTES,
+    ) -> None:
+        """
+        Args:
+            cache_dir: โฟลเดอร์แคช
+            max_bytes: ขนาดรวมสูงสุดของแคช (ไบต์) เกินแล้วลบไฟล์ที่ใช้ล่าสุดนานที่สุดก่อน
+
+        Raises:
+            ValueError: ถ้า max_bytes ไม่เป็นค่าบวก
+        """
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # ขนาดรวมโดยประมาณ (None = ยังไม่เคยสแกน) ใช้เลี่ยงการสแกนทุกครั้งที่ put
+        self._total_bytes: int | None = None
+
+    def path_for(self, key: str, audio_format: str = "mp3") -> Path:
+        return self.cache_dir / key[:2] / f"{key}.{audio_format}"
+
+    @staticmethod
+    def _temp_path(path: Path) -> Path:
+        return path.with_name(f"{path.name}.tmp.{os.getpid()}.{threading.get_ident()}")
+
+    def _touch(self, path: Path) -> bool:
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    @staticmethod
+    def _existing_size(path: Path) -> int:
+        try:
+            return path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def _record_write(self, written: int, replaced: int) -> None:
+        """บวกขนาดที่เขียนเข้ายอดรวมสะสม แล้ว evict เฉพาะเมื่อยอดรวมเกิน max_bytes"""
+        with self._lock:
+            if self._total_bytes is not None:
+                self._total_bytes += written - replaced
+                if self._total_bytes <= self.max_bytes:
+                    return
+        self.evict()
+
+    def get(self, key: str, audio_format: str = "mp3") -> bytes | None:
+        """อ่านเสียงจากแคช คืน None ถ้าไม่มี (หรือถูก evict ไประหว่างอ่าน)"""
+        path = self.path_for(key, audio_format)
+        if not self._touch(path):
+            return None
+        try:
+            return path.read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, data: bytes, audio_format: str = "mp3") -> Path:
+        """บันทึกเสียงลงแคชแบบ atomic แล้ว evict ถ้าขนาดรวมสะสมเกิน max_bytes"""
+        path = self.path_for(key, audio_format)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self._temp_path(path)
+        temp_path.write_bytes(data)
+        replaced = self._existing_size(path)
+        os.replace(temp_path, path)
+        self._record_write(len(data), replaced)
+        return path
+
+    def copy_to(self, key: str, dest: Path, audio_format: str = "wav") -> bool:
+        """
+        คัดลอกไฟล์เสียงจากแคชไปที่ dest คืน False ถ้าไม่มีในแคช
+
+        ใช้การคัดลอกแทน hardlink เพราะเอนจินอาจเขียนทับ dest แบบ in-place ในรอบถัดไป
+        """
+        path = self.path_for(key, audio_format)
+        if not self._touch(path):
+            return False
+        temp_path = self._temp_path(dest)
+        try:
+            shutil.copyfile(path, temp_path)
+        except FileNotFoundError:
+            return False
+        os.replace(temp_path, dest)
+        return True
+
+    def put_file(self, key: str, source: Path, audio_format: str = "wav") -> Path:
+        """คัดลอกไฟล์เสียงที่สร้างแล้วเข้าแคช"""
+        path = self.path_for(key, audio_format)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self._temp_path(path)
+        shutil.copyfile(source, temp_path)
+        written = temp_path.stat().st_size
+        replaced = self._existing_size(path)
+        os.replace(temp_path, path)
+        self._record_write(written, replaced)
+        return path
+
+    def evict(self) -> list[Path]:
+        """
+        สแกนแคชทั้งหมดแล้วลบไฟล์ที่ใช้ล่าสุดนานที่สุดจนขนาดรวมไม่เกิน max_bytes
+
+        ตั้งยอดรวมสะสมใหม่จากผลสแกน (แก้ค่าคลาดเคลื่อนจาก process อื่นที่ใช้แคชเดียวกัน)
+
+        Returns:
+            รายการไฟล์ที่ถูกลบ
+        """
+        with self._lock:
+            entries: list[tuple[int, int, Path]] = []
+            total = 0
+            for path in self.cache_dir.glob("*/*"):
+                if ".tmp." in path.name:
+                    continue
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, path))
+                total += stat.st_size
+            removed: list[Path] = []
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+                removed.append(path)
+            self._total_bytes = total
+            return removed
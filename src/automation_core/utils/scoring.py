@@ -4,8 +4,6 @@
 
 from typing import Any
 
-import numpy as np
-
 __all__ = [
     "calculate_composite_score",
     "normalize_scores",
@@ -67,6 +65,9 @@ def normalize_scores(
     if not scores:
         return []
 
+    # import ตอนใช้งาน: numpy หนักและไม่ควรถูกโหลดเพียงเพราะ import automation_core.utils
+    import numpy as np
+
     scores_array = np.array(scores)
 
     # หาค่าต่ำสุดและสูงสุดในข้อมูล
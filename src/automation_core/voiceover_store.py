@@ -0,0 +1,287 @@
+"""
+คลังเสียง voiceover กลางแบบ content-addressed ใช้ร่วมกันทุก run
+
+ไฟล์ WAV ของ data/voiceovers/<run_id>/ ผูกกับ run เดียว สคริปต์เดิมใน run ใหม่จึงต้อง
+สังเคราะห์ซ้ำ คลังนี้เก็บ WAV หนึ่งชุดต่อ (input_sha256, เอนจิน, voice, style) ที่
+data/voiceover_store/<key[:2]>/<key>.wav พร้อม sidecar JSON แล้วให้แต่ละ run อ้างถึง
+ด้วย hardlink (fallback เป็น symlink และคัดลอกตามลำดับ) ส่วน gc() ลบ blob ที่ไม่มีไฟล์
+ใน run ใดอ้างถึงแล้ว
+
+หมายเหตุ:
+    ไฟล์ใน run ที่เป็น hardlink ใช้ inode เดียวกับ blob ผู้ที่จะเขียนทับไฟล์นั้นต้อง
+    unlink ก่อน (ดู detach_output) มิฉะนั้น blob จะเสียไปด้วย
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Literal
+
+VOICEOVER_STORE_ENV = "VOICEOVER_STORE_ENABLED"
+VOICEOVER_STORE_SCHEMA_VERSION = "v1"
+REPO_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_VOICEOVER_STORE_DIR = REPO_ROOT / "data" / "voiceover_store"
+
+LinkMode = Literal["hardlink", "symlink", "copy"]
+
+
+def parse_voiceover_store_enabled(env_value: str | None) -> bool:
+    """แปลงค่า VOICEOVER_STORE_ENABLED เป็น boolean (ค่าเริ่มต้นเปิดใช้งาน)"""
+    if env_value is None:
+        return True
+    return env_value.strip().lower() not in ("false", "0", "no", "off", "disabled")
+
+
+def compute_voiceover_key(
+    input_sha256: str,
+    *,
+    engine_name: str,
+    voice: str | None = None,
+    style: str | None = None,
+    params: Mapping[str, Any] | None = None,
+) -> str:
+    """
+    คำนวณคีย์ของ voiceover ในคลัง
+
+    Args:
+        input_sha256: SHA-256 ของสคริปต์ที่ normalize แล้ว
+        engine_name: ชื่อเอนจิน
+        voice: เสียงที่ใช้
+        style: สไตล์เสียง
+        params: ค่าอื่นที่มีผลต่อเสียง เช่น cache_params ของเอนจินหรือหน่วย segment
+
+    Returns:
+        SHA-256 hex digest ความยาว 64 ตัวอักษร
+
+    Raises:
+        ValueError: ถ้า input_sha256 ไม่ใช่แฮชความยาว 64 ตัวอักษร
+    """
+    if len(input_sha256) != 64:
+        raise ValueError("input_sha256 must be a full 64-character sha256 hex string")
+    payload = {
+        "schema_version": VOICEOVER_STORE_SCHEMA_VERSION,
+        "input_sha256": input_sha256,
+        "engine_name": engine_name,
+        "voice": voice,
+        "style": style,
+        "params": dict(params or {}),
+    }
+    encoded = json.dumps(
+        payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def detach_output(path: Path) -> None:
+    """ลบ path ถ้าเป็น symlink หรือ hardlink เพื่อให้เขียนไฟล์ใหม่ได้โดยไม่กระทบ blob"""
+    try:
+        stat = path.lstat()
+    except FileNotFoundError:
+        return
+    if path.is_symlink() or stat.st_nlink > 1:
+        path.unlink()
+
+
+def _temp_path(path: Path) -> Path:
+    return path.with_name(f"{path.name}.tmp.{os.getpid()}")
+
+
+@dataclass
+class GCReport:
+    """ผลของ VoiceoverStore.gc"""
+
+    kept: int = 0
+    removed: list[str] = field(default_factory=list)
+    freed_bytes: int = 0
+
+
+class VoiceoverStore:
+    """คลัง WAV (<store_dir>/<key[:2]>/<key>.wav) พร้อม sidecar <key>.json"""
+
+    def __init__(self, store_dir: Path | str = DEFAULT_VOICEOVER_STORE_DIR) -> None:
+        self.store_dir = Path(store_dir)
+
+    def blob_path(self, key: str) -> Path:
+        return self.store_dir / key[:2] / f"{key}.wav"
+
+    def record_path(self, key: str) -> Path:
+        return self.store_dir / key[:2] / f"{key}.json"
+
+    def lookup(self, key: str) -> dict[str, Any] | None:
+        """คืน record ของ blob ถ้ามีทั้ง WAV และ sidecar มิฉะนั้นคืน None"""
+        if not self.blob_path(key).is_file():
+            return None
+        try:
+            return json.loads(self.record_path(key).read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def link_to(self, key: str, dest: Path) -> LinkMode:
+        """
+        ให้ dest ชี้ไปที่ blob แบบ atomic
+
+        ลอง hardlink ก่อน ถ้าข้าม filesystem หรือระบบไม่รองรับจะใช้ symlink
+        และคัดลอกเป็นทางสุดท้าย
+
+        Returns:
+            วิธีที่ใช้ ("hardlink", "symlink" หรือ "copy")
+
+        Raises:
+            FileNotFoundError: ถ้าไม่มี blob ของ key
+        """
+        blob = self.blob_path(key)
+        if not blob.is_file():
+            raise FileNotFoundError(blob)
+        temp_path = _temp_path(dest)
+        temp_path.unlink(missing_ok=True)
+        mode: LinkMode
+        try:
+            os.link(blob, temp_path)
+            mode = "hardlink"
+        except OSError:
+            try:
+                os.symlink(blob.resolve(), temp_path)
+                mode = "symlink"
+            except OSError:
+                shutil.copyfile(blob, temp_path)
+                mode = "copy"
+        os.replace(temp_path, dest)
+        return mode
+
+    def add(self, key: str, source: Path, record: Mapping[str, Any]) -> LinkMode:
+        """
+        นำ WAV ที่สร้างแล้วเข้าคลังและให้ source กลายเป็นไฟล์อ้างถึง blob
+
+        Args:
+            key: คีย์จาก compute_voiceover_key
+            source: ไฟล์ WAV ใน run
+            record: ข้อมูลที่เก็บใน sidecar (เช่น engine_name, segments)
+
+        Returns:
+            วิธีที่ source อ้างถึง blob หลังเพิ่มเข้าคลัง
+        """
+        blob = self.blob_path(key)
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        temp_blob = _temp_path(blob)
+        temp_blob.unlink(missing_ok=True)
+        try:
+            os.link(source, temp_blob)
+            linked = True
+        except OSError:
+            shutil.copyfile(source, temp_blob)
+            linked = False
+        os.replace(temp_blob, blob)
+
+        temp_record = _temp_path(self.record_path(key))
+        temp_record.write_text(
+            json.dumps(
+                {
+                    "schema_version": VOICEOVER_STORE_SCHEMA_VERSION,
+                    "key": key,
+                    **record,
+                },
+                ensure_ascii=False,
+                indent=2,
+                sort_keys=True,
+            ),
+            encoding="utf-8",
+        )
+        os.replace(temp_record, self.record_path(key))
+        return "hardlink" if linked else self.link_to(key, source)
+
+    def gc(self, reference_dirs: Iterable[Path], *, dry_run: bool = False) -> GCReport:
+        """
+        ลบ blob ที่ไม่มีไฟล์ .wav ใต้ reference_dirs อ้างถึง (ทั้ง hardlink และ symlink)
+
+        Args:
+            reference_dirs: โฟลเดอร์ที่เก็บไฟล์ของแต่ละ run (เช่น data/voiceovers)
+            dry_run: รายงานอย่างเดียวโดยไม่ลบ
+
+        Returns:
+            GCReport ที่มีจำนวน blob ที่เหลือ คีย์ที่ลบ และจำนวนไบต์ที่คืน
+        """
+        inodes: set[tuple[int, int]] = set()
+        targets: set[Path] = set()
+        for directory in reference_dirs:
+            for path in Path(directory).rglob("*.wav"):
+                try:
+                    if path.is_symlink():
+                        targets.add(path.resolve())
+                    else:
+                        stat = path.stat()
+                        inodes.add((stat.st_dev, stat.st_ino))
+                except OSError:
+                    continue
+
+        report = GCReport()
+        for blob in sorted(self.store_dir.glob("*/*.wav")):
+            if ".tmp." in blob.name:
+                continue
+            try:
+                stat = blob.stat()
+            except FileNotFoundError:
+                continue
+            if (stat.st_dev, stat.st_ino) in inodes or blob.resolve() in targets:
+                report.kept += 1
+                continue
+            key = blob.stem
+            report.removed.append(key)
+            report.freed_bytes += stat.st_size
+            if not dry_run:
+                blob.unlink(missing_ok=True)
+                self.record_path(key).unlink(missing_ok=True)
+        return report
+
+
+def cli_main(argv: Sequence[str] | None = None) -> int:
+    """
+    CLI สำหรับลบ blob ที่ไม่ถูกอ้างถึงออกจากคลัง voiceover
+
+    Returns:
+        0 เสมอเมื่อทำงานสำเร็จ
+    """
+    parser = argparse.ArgumentParser(
+        description="Remove voiceover store blobs no longer referenced by any run."
+    )
+    parser.add_argument(
+        "--store-dir",
+        type=Path,
+        default=DEFAULT_VOICEOVER_STORE_DIR,
+        help="Voiceover store directory (default: data/voiceover_store)",
+    )
+    parser.add_argument(
+        "--voiceover-dir",
+        type=Path,
+        action="append",
+        default=None,
+        help="Directory holding per-run voiceovers (repeatable, default: data/voiceovers)",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Report unreferenced blobs without deleting them",
+    )
+    args = parser.parse_args(argv)
+
+    reference_dirs = args.voiceover_dir or [REPO_ROOT / "data" / "voiceovers"]
+    report = VoiceoverStore(args.store_dir).gc(reference_dirs, dry_run=args.dry_run)
+    verb = "Would remove" if args.dry_run else "Removed"
+    print(
+        f"{verb} {len(report.removed)} blob(s), {report.freed_bytes} bytes;"
+        f" kept {report.kept}"
+    )
+    for key in report.removed:
+        print(f"  {key}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(cli_main())
@@ -4,6 +4,11 @@
 โมดูลนี้จัดการการแปลงข้อความเป็นเสียง (Text-to-Speech) โดยใช้ระบบ content-addressed naming
 ที่สร้างชื่อไฟล์จาก SHA-256 hash ของข้อความเพื่อให้ผลลัพธ์เหมือนกันทุกครั้งที่ใช้ input เดียวกัน
 รองรับ kill switch (PIPELINE_ENABLED) และสร้าง metadata JSON ที่มี schema คงที่
+
+สคริปต์ยาวสังเคราะห์แบบแบ่ง segment (ย่อหน้า/ประโยค) ได้ผ่าน TTSEnginePool
+ซึ่งรันหลาย segment พร้อมกันแล้วต่อ PCM ลงไฟล์ WAV ทีละส่วนตามลำดับ
+จึงใช้หน่วยความจำคงที่ไม่ขึ้นกับความยาวเสียง และบันทึกเวลาของแต่ละ segment ใน metadata
+เมื่อใช้ TTSCache เสียงถูกแคชทีละ segment การแก้ย่อหน้าเดียวจึงสังเคราะห์ใหม่เฉพาะย่อหน้านั้น
 """
 
 from __future__ import annotations
@@ -12,12 +17,32 @@ import argparse
 import hashlib
 import json
 import os
+import queue
 import re
 import sys
+import tempfile
+import threading
 import wave
-from collections.abc import Callable
+from collections import deque
+from collections.abc import Callable, Iterator, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Protocol
+from typing import IO, Literal, Protocol
+
+from automation_core.tts_cache import (
+    TTS_CACHE_ENV,
+    TTSCache,
+    compute_tts_cache_key,
+    parse_tts_cache_enabled,
+)
+from automation_core.voiceover_store import (
+    VOICEOVER_STORE_ENV,
+    VoiceoverStore,
+    compute_voiceover_key,
+    detach_output,
+    parse_voiceover_store_enabled,
+)
 
 PIPELINE_DISABLED_MESSAGE = "Pipeline disabled by PIPELINE_ENABLED=false"
 REPO_ROOT = Path(__file__).resolve().parents[2]
@@ -29,7 +54,17 @@ WAV_SAMPLE_WIDTH_BYTES = 2
 NULL_TTS_DURATION_SECONDS = 1.0
 MAX_SCRIPT_LENGTH = 4096
 METADATA_SCHEMA_VERSION = "1"
+DEFAULT_ENGINE_POOL_SIZE = 4
+# ขนาดบล็อกที่เขียน/คัดลอก PCM ต่อครั้ง (frames) และขนาดที่ segment พักไว้ใน RAM
+# ก่อน spill ลงไฟล์ชั่วคราว
+_STREAM_BLOCK_FRAMES = 16000
+_SEGMENT_SPOOL_BYTES = 1024 * 1024
+# นามสกุลของ PCM ดิบ (ไม่มี header) ของแต่ละ segment ใน TTSCache
+_SEGMENT_CACHE_FORMAT = "pcm"
 _IDENTIFIER_RE = re.compile(r"^[a-z0-9][a-z0-9_-]{0,63}$")
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+
+SegmentUnit = Literal["paragraph", "sentence"]
 
 
 class TTSEngine(Protocol):
@@ -57,6 +92,32 @@ class TTSEngine(Protocol):
         """
 
 
+class SegmentTTSEngine(Protocol):
+    """
+    Protocol สำหรับเอนจินที่สังเคราะห์เสียงทีละ segment แบบ streaming
+
+    เอนจินเขียน PCM 16-bit mono little-endian (ไม่มี header WAV) ลง sink
+    ทีละส่วนได้ตามต้องการ เพื่อไม่ต้องถือเสียงทั้ง segment ไว้ในหน่วยความจำ
+    instance หนึ่งถูกใช้โดย thread เดียวในแต่ละช่วงเวลา (ดู TTSEnginePool)
+
+    เอนจินควรมี attribute cache_params (dict ของค่าที่มีผลต่อเสียง เช่น speaking rate)
+    เพื่อให้คีย์แคชของ segment เปลี่ยนตามการตั้งค่า ถ้าไม่มี คีย์จะใช้เพียงชื่อเอนจิน
+    sample_rate, voice และ style
+    """
+
+    name: str
+    sample_rate: int
+
+    def synthesize_segment(self, text: str, sink: IO[bytes]) -> None:
+        """
+        สังเคราะห์เสียงของ segment และเขียน PCM ลง sink
+
+        Args:
+            text: ข้อความของ segment
+            sink: ไฟล์ไบนารีปลายทางของ PCM 16-bit mono
+        """
+
+
 def parse_pipeline_enabled(env_value: str | None) -> bool:
     """
     แปลงค่าจากตัวแปรสภาพแวดล้อมเพื่อเช็คว่า PIPELINE_ENABLED เปิดอยู่หรือไม่
@@ -202,6 +263,36 @@ def build_voiceover_paths(
     return wav_path, metadata_path
 
 
+def split_script_segments(
+    script_text: str, unit: SegmentUnit = "paragraph"
+) -> list[str]:
+    """
+    แบ่งสคริปต์ที่ normalize แล้วเป็น segment สำหรับสังเคราะห์แบบขนาน
+
+    Args:
+        script_text: ข้อความสคริปต์
+        unit: "paragraph" แบ่งที่บรรทัดว่าง ส่วน "sentence" แบ่งทุกบรรทัดและหลัง . ! ?
+
+    Returns:
+        รายการ segment ตามลำดับ (ตัดช่องว่างหัวท้ายและข้าม segment ว่าง)
+
+    Raises:
+        ValueError: ถ้า unit ไม่รองรับ
+    """
+    normalized = normalize_script_text(script_text)
+    if unit == "paragraph":
+        parts = re.split(r"\n\s*\n", normalized)
+    elif unit == "sentence":
+        parts = [
+            sentence
+            for line in normalized.split("\n")
+            for sentence in _SENTENCE_END_RE.split(line)
+        ]
+    else:
+        raise ValueError("segment unit must be 'paragraph' or 'sentence'")
+    return [part.strip() for part in parts if part.strip()]
+
+
 def get_wav_duration_seconds(path: Path) -> float:
     """
     คำนวณความยาวของไฟล์ WAV เป็นวินาที
@@ -254,6 +345,27 @@ class NullTTSEngine:
         self.duration_seconds = duration_seconds
         self.sample_rate = sample_rate
 
+    @property
+    def cache_params(self) -> dict[str, object]:
+        """ค่าที่มีผลต่อเสียงที่สร้าง (ใช้เป็นส่วนหนึ่งของคีย์ TTSCache)"""
+        return {
+            "duration_seconds": self.duration_seconds,
+            "sample_rate": self.sample_rate,
+        }
+
+    def _write_silence(self, write: Callable[[bytes], object]) -> None:
+        # เขียนทีละบล็อกแทนการสร้าง buffer ทั้งไฟล์
+        remaining = int(round(self.duration_seconds * self.sample_rate))
+        block = b"\x00" * (_STREAM_BLOCK_FRAMES * WAV_SAMPLE_WIDTH_BYTES)
+        while remaining > 0:
+            frames = min(remaining, _STREAM_BLOCK_FRAMES)
+            write(block[: frames * WAV_SAMPLE_WIDTH_BYTES])
+            remaining -= frames
+
+    def synthesize_segment(self, text: str, sink: IO[bytes]) -> None:
+        """เขียนเสียงเงียบยาว duration_seconds ลง sink (ต่อ 1 segment)"""
+        self._write_silence(sink.write)
+
     def synthesize(self, text: str, output_path: Path) -> None:
         """
         สังเคราะห์เสียงเงียบและบันทึกเป็นไฟล์ WAV
@@ -268,13 +380,232 @@ class NullTTSEngine:
         if not is_pipeline_enabled():
             return
 
-        num_frames = int(round(self.duration_seconds * self.sample_rate))
-        silence = b"\x00\x00" * num_frames
-        with wave.open(str(output_path), "wb") as wav_file:
-            wav_file.setnchannels(WAV_CHANNELS)
-            wav_file.setsampwidth(WAV_SAMPLE_WIDTH_BYTES)
-            wav_file.setframerate(self.sample_rate)
-            wav_file.writeframes(silence)
+        with _open_wav_writer(output_path, self.sample_rate) as wav_file:
+            # writeframesraw ไม่แก้ header ทุกครั้ง wave จะ patch จำนวน frames ตอนปิด
+            self._write_silence(wav_file.writeframesraw)
+
+
+def _open_wav_writer(path: Path, sample_rate: int) -> wave.Wave_write:
+    wav_file = wave.open(str(path), "wb")
+    wav_file.setnchannels(WAV_CHANNELS)
+    wav_file.setsampwidth(WAV_SAMPLE_WIDTH_BYTES)
+    wav_file.setframerate(sample_rate)
+    return wav_file
+
+
+class TTSEnginePool:
+    """
+    pool ของเอนจิน SegmentTTSEngine สำหรับสังเคราะห์หลาย segment พร้อมกัน
+
+    เอนจินถูกสร้างจาก factory เมื่อจำเป็น (ไม่เกิน size ตัว) และ thread ที่ยืม
+    เอนจินไปจะใช้มันเพียงผู้เดียวจนคืน จึงใช้กับ client ที่ไม่ thread-safe ได้
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], SegmentTTSEngine],
+        size: int = DEFAULT_ENGINE_POOL_SIZE,
+    ) -> None:
+        """
+        Args:
+            factory: ฟังก์ชันสร้างเอนจินใหม่ (ทุกตัวต้องมี name/sample_rate เดียวกัน)
+            size: จำนวนเอนจินสูงสุด (= จำนวน segment ที่สังเคราะห์พร้อมกัน)
+
+        Raises:
+            ValueError: ถ้า size น้อยกว่า 1
+        """
+        if size < 1:
+            raise ValueError("size must be >= 1")
+        self.size = size
+        self._factory = factory
+        self._idle: queue.LifoQueue[SegmentTTSEngine] = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._prototype: SegmentTTSEngine | None = None
+
+    def _create(self) -> SegmentTTSEngine:
+        engine = self._factory()
+        with self._lock:
+            if self._prototype is None:
+                self._prototype = engine
+        return engine
+
+    @property
+    def prototype(self) -> SegmentTTSEngine:
+        """เอนจินตัวแรกของ pool (สร้างถ้ายังไม่มี) ใช้อ่านคุณสมบัติร่วม"""
+        if self._prototype is None:
+            with self._lock:
+                self._created += 1
+            self._idle.put(self._create())
+        assert self._prototype is not None
+        return self._prototype
+
+    @property
+    def name(self) -> str:
+        return getattr(self.prototype, "name", type(self.prototype).__name__)
+
+    @property
+    def sample_rate(self) -> int:
+        return self.prototype.sample_rate
+
+    @property
+    def cache_params(self) -> dict[str, object] | None:
+        return getattr(self.prototype, "cache_params", None)
+
+    @contextmanager
+    def acquire(self) -> Iterator[SegmentTTSEngine]:
+        """ยืมเอนจินจาก pool (รอถ้าสร้างครบ size ตัวและทุกตัวถูกใช้อยู่)"""
+        try:
+            engine = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_create = self._created < self.size
+                if can_create:
+                    self._created += 1
+            engine = self._create() if can_create else self._idle.get()
+        try:
+            yield engine
+        finally:
+            self._idle.put(engine)
+
+
+def _render_segment(
+    pool: TTSEnginePool,
+    text: str,
+    cache: TTSCache | None = None,
+    cache_key: str | None = None,
+) -> IO[bytes]:
+    spool = tempfile.SpooledTemporaryFile(max_size=_SEGMENT_SPOOL_BYTES)
+    try:
+        cached = None
+        if cache is not None and cache_key is not None:
+            cached = cache.get(cache_key, _SEGMENT_CACHE_FORMAT)
+        if cached is not None:
+            spool.write(cached)
+        else:
+            with pool.acquire() as engine:
+                engine.synthesize_segment(text, spool)
+            if cache is not None and cache_key is not None:
+                spool.seek(0)
+                cache.put(cache_key, spool.read(), _SEGMENT_CACHE_FORMAT)
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool
+
+
+def compute_segment_cache_keys(
+    segments: Sequence[str],
+    pool: TTSEnginePool,
+    *,
+    voice: str | None = None,
+    style: str | None = None,
+) -> list[str]:
+    """
+    คำนวณคีย์ TTSCache ของแต่ละ segment
+
+    คีย์ขึ้นกับข้อความของ segment เท่านั้น (ไม่ขึ้นกับตำแหน่งหรือ segment อื่น)
+    segment ที่ไม่ถูกแก้ไขจึงใช้เสียงเดิมได้แม้สคริปต์ส่วนอื่นเปลี่ยน
+    """
+    extra = {
+        "engine": pool.name,
+        "style": style,
+        "sample_rate": pool.sample_rate,
+        **(pool.cache_params or {}),
+    }
+    return [
+        compute_tts_cache_key(
+            text, voice=voice, audio_format=_SEGMENT_CACHE_FORMAT, extra=extra
+        )
+        for text in segments
+    ]
+
+
+def synthesize_segments_to_wav(
+    segments: Sequence[str],
+    pool: TTSEnginePool,
+    wav_path: Path,
+    *,
+    cache: TTSCache | None = None,
+    cache_keys: Sequence[str] | None = None,
+) -> list[dict[str, object]]:
+    """
+    สังเคราะห์ segment พร้อมกันผ่าน pool แล้วต่อเสียงลง wav_path ตามลำดับ
+
+    segment ที่เสร็จแล้วพักใน SpooledTemporaryFile (spill ลงดิสก์เมื่อใหญ่เกิน
+    _SEGMENT_SPOOL_BYTES) และรอคิวค้างไม่เกิน 2 เท่าของขนาด pool
+    หน่วยความจำที่ใช้จึงไม่ขึ้นกับความยาวของสคริปต์ ไฟล์ WAV ถูกเขียนแบบ atomic
+
+    Args:
+        segments: ข้อความแต่ละ segment ตามลำดับ
+        pool: pool ของเอนจิน
+        wav_path: ไฟล์ WAV ปลายทาง
+        cache: แคช PCM ของแต่ละ segment (optional)
+        cache_keys: คีย์แคชของแต่ละ segment (ดู compute_segment_cache_keys)
+
+    Returns:
+        รายการเวลาของแต่ละ segment: index, text_sha256, start_seconds, end_seconds
+
+    Raises:
+        ValueError: ถ้าไม่มี segment หรือจำนวน cache_keys ไม่เท่ากับจำนวน segment
+        RuntimeError: ถ้าเอนจินเขียน PCM ไม่ครบ frame (จำนวนไบต์เป็นเลขคี่)
+    """
+    if not segments:
+        raise ValueError("segments must not be empty")
+    if cache_keys is not None and len(cache_keys) != len(segments):
+        raise ValueError("cache_keys must match segments")
+    sample_rate = pool.sample_rate
+    frame_bytes = WAV_SAMPLE_WIDTH_BYTES * WAV_CHANNELS
+    temp_path = wav_path.with_name(f"{wav_path.name}.tmp.{os.getpid()}")
+    timings: list[dict[str, object]] = []
+    pending: deque[Future[IO[bytes]]] = deque()
+    next_index = 0
+    frames_written = 0
+
+    with ThreadPoolExecutor(max_workers=pool.size) as executor:
+        try:
+            with _open_wav_writer(temp_path, sample_rate) as wav_file:
+                while next_index < len(segments) or pending:
+                    while next_index < len(segments) and len(pending) < pool.size * 2:
+                        pending.append(
+                            executor.submit(
+                                _render_segment,
+                                pool,
+                                segments[next_index],
+                                cache,
+                                cache_keys[next_index] if cache_keys else None,
+                            )
+                        )
+                        next_index += 1
+                    index = len(timings)
+                    with pending.popleft().result() as spool:
+                        start_frame = frames_written
+                        while block := spool.read(_STREAM_BLOCK_FRAMES * frame_bytes):
+                            if len(block) % frame_bytes:
+                                raise RuntimeError(
+                                    f"segment {index} produced a partial PCM frame"
+                                )
+                            wav_file.writeframesraw(block)
+                            frames_written += len(block) // frame_bytes
+                    timings.append(
+                        {
+                            "index": index,
+                            "text_sha256": _hash_text(segments[index]),
+                            "start_seconds": round(start_frame / sample_rate, 6),
+                            "end_seconds": round(frames_written / sample_rate, 6),
+                        }
+                    )
+        except BaseException:
+            for future in pending:
+                future.cancel()
+            for future in pending:
+                if not future.cancelled() and future.exception() is None:
+                    future.result().close()
+            temp_path.unlink(missing_ok=True)
+            raise
+    os.replace(temp_path, wav_path)
+    return timings
 
 
 def _resolve_root_dir(root_dir: Path | None) -> Path:
@@ -331,6 +662,10 @@ def generate_voiceover(
     log: Callable[[str], None] | None = None,
     root_dir: Path | None = None,
     base_dir: Path | None = None,
+    cache: TTSCache | None = None,
+    store: VoiceoverStore | None = None,
+    engine_pool: TTSEnginePool | None = None,
+    segment_unit: SegmentUnit = "paragraph",
 ) -> dict | None:
     """
     สร้างไฟล์เสียง voiceover และ metadata จากข้อความสคริปต์
@@ -352,6 +687,15 @@ def generate_voiceover(
         log: ฟังก์ชัน callback สำหรับ logging (optional)
         root_dir: ไดเรกทอรีรากของโปรเจกต์ (ค่าเริ่มต้น: REPO_ROOT)
         base_dir: ไดเรกทอรีฐานสำหรับเก็บไฟล์ (ค่าเริ่มต้น: root_dir/data/voiceovers)
+        cache: แคชเสียง TTS (optional) เมื่อใช้ engine_pool จะแคชทีละ segment
+            ส่วน engine เดี่ยวจะแคชทั้งไฟล์และใช้ได้กับเอนจินที่มี attribute
+            cache_params (ค่าที่มีผลต่อเสียง) เท่านั้น
+        store: คลัง voiceover กลาง (optional) ถ้ามีเสียงของสคริปต์/เอนจิน/voice/style
+            เดียวกันอยู่แล้วจะ link ไฟล์ของ run ไปที่ blob โดยไม่สังเคราะห์ใหม่
+            และเสียงที่สังเคราะห์ใหม่จะถูกเพิ่มเข้าคลัง
+        engine_pool: pool ของ SegmentTTSEngine (optional) ถ้ากำหนดจะแบ่งสคริปต์เป็น
+            segment สังเคราะห์พร้อมกัน และบันทึกเวลาแต่ละ segment ใน metadata["segments"]
+        segment_unit: หน่วยการแบ่ง segment เมื่อใช้ engine_pool ("paragraph"/"sentence")
 
     Returns:
         dict ของ metadata ที่มีข้อมูล run_id, slug, input_sha256, output_wav_path,
@@ -360,9 +704,11 @@ def generate_voiceover(
 
     Raises:
         ValueError: ถ้า script_text ว่างเปล่า, base_dir ไม่อยู่ใน root_dir,
-            หรือ run_id/slug ไม่ถูกต้อง
+            run_id/slug ไม่ถูกต้อง หรือกำหนดทั้ง engine และ engine_pool
         RuntimeError: ถ้าเอนจินไม่สร้างไฟล์ WAV ที่คาดหวัง
     """
+    if engine is not None and engine_pool is not None:
+        raise ValueError("engine and engine_pool are mutually exclusive")
     if not is_pipeline_enabled():
         if log:
             log(PIPELINE_DISABLED_MESSAGE)
@@ -379,14 +725,84 @@ def generate_voiceover(
     )
     wav_path.parent.mkdir(parents=True, exist_ok=True)
 
-    engine = engine or NullTTSEngine()
-    engine.synthesize(normalized_text, wav_path)
+    extra: dict[str, object] = {}
+    if engine_pool is not None:
+        engine_name = engine_pool.name
+        cache_params = engine_pool.cache_params
+        extra["segment_unit"] = segment_unit
+    else:
+        engine = engine or NullTTSEngine()
+        engine_name = getattr(engine, "name", type(engine).__name__)
+        cache_params = getattr(engine, "cache_params", None)
+    cache_key = None
+    if cache is not None and engine_pool is None and cache_params is not None:
+        cache_key = compute_tts_cache_key(
+            normalized_text,
+            voice=voice,
+            audio_format="wav",
+            extra={"engine": engine_name, "style": style, **cache_params},
+        )
 
-    if not wav_path.exists():
-        raise RuntimeError(f"Expected WAV output was not created: {wav_path}")
+    store_key = None
+    stored = None
+    if store is not None:
+        store_key = compute_voiceover_key(
+            input_sha256,
+            engine_name=engine_name,
+            voice=voice,
+            style=style,
+            params={**extra, **(cache_params or {})},
+        )
+        stored = store.lookup(store_key)
+
+    segments: list[dict[str, object]] | None = None
+    cache_hit = False
+    if stored is None:
+        # ไฟล์จาก run ก่อนอาจเป็น link ของ blob ห้ามให้เอนจินเขียนทับ in-place
+        detach_output(wav_path)
+    if stored is None and cache_key is not None:
+        cache_hit = cache.copy_to(cache_key, wav_path)
+
+    if stored is not None:
+        store.link_to(store_key, wav_path)
+        segments = stored.get("segments")
+        if log:
+            log(f"Voiceover store hit: {store_key[:SHA_PREFIX_LENGTH]}")
+    elif cache_hit:
+        if log:
+            log(f"TTS cache hit: {cache_key[:SHA_PREFIX_LENGTH]}")
+    elif engine_pool is not None:
+        texts = split_script_segments(normalized_text, segment_unit)
+        segments = synthesize_segments_to_wav(
+            texts,
+            engine_pool,
+            wav_path,
+            cache=cache,
+            cache_keys=(
+                compute_segment_cache_keys(texts, engine_pool, voice=voice, style=style)
+                if cache is not None
+                else None
+            ),
+        )
+    else:
+        engine.synthesize(normalized_text, wav_path)
+        if not wav_path.exists():
+            raise RuntimeError(f"Expected WAV output was not created: {wav_path}")
+        if cache_key is not None:
+            cache.put_file(cache_key, wav_path)
+
+    if store_key is not None and stored is None:
+        record: dict[str, object] = {
+            "input_sha256": input_sha256,
+            "engine_name": engine_name,
+            "voice": voice,
+            "style": style,
+        }
+        if segments is not None:
+            record["segments"] = segments
+        store.add(store_key, wav_path, record)
 
     duration_seconds = round(get_wav_duration_seconds(wav_path), 6)
-    engine_name = getattr(engine, "name", type(engine).__name__)
 
     metadata: dict[str, object] = {
         "schema_version": METADATA_SCHEMA_VERSION,
@@ -404,6 +820,8 @@ def generate_voiceover(
         metadata["style"] = style
     if created_utc is not None:
         metadata["created_utc"] = created_utc
+    if segments is not None:
+        metadata["segments"] = segments
 
     metadata_path.write_text(
         json.dumps(metadata, ensure_ascii=False, indent=2, sort_keys=True),
@@ -464,6 +882,28 @@ def cli_main(argv: list[str] | None = None) -> int:
         action="store_true",
         help="Validate inputs and show outputs without writing files",
     )
+    parser.add_argument(
+        "--no-tts-cache",
+        action="store_true",
+        help="Always synthesize instead of reusing audio from data/tts_cache",
+    )
+    parser.add_argument(
+        "--no-voiceover-store",
+        action="store_true",
+        help="Do not reuse or publish voiceovers in data/voiceover_store",
+    )
+    parser.add_argument(
+        "--segment-unit",
+        choices=["paragraph", "sentence"],
+        default=None,
+        help="Synthesize per paragraph/sentence concurrently and record segment timings",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_ENGINE_POOL_SIZE,
+        help="Engine pool size for --segment-unit (default: 4)",
+    )
 
     args = parser.parse_args(argv)
 
@@ -488,6 +928,19 @@ def cli_main(argv: list[str] | None = None) -> int:
             print(f"  Metadata: {_relative_to_root(metadata_path, root_dir)}")
             return 0
 
+        cache = None
+        if not args.no_tts_cache and parse_tts_cache_enabled(
+            os.environ.get(TTS_CACHE_ENV)
+        ):
+            cache = TTSCache(REPO_ROOT / "data" / "tts_cache")
+        store = None
+        if not args.no_voiceover_store and parse_voiceover_store_enabled(
+            os.environ.get(VOICEOVER_STORE_ENV)
+        ):
+            store = VoiceoverStore(REPO_ROOT / "data" / "voiceover_store")
+        engine_pool = None
+        if args.segment_unit is not None:
+            engine_pool = TTSEnginePool(NullTTSEngine, size=args.workers)
         metadata = generate_voiceover(
             script_text,
             args.run_id,
@@ -495,6 +948,10 @@ def cli_main(argv: list[str] | None = None) -> int:
             voice=args.voice,
             style=args.style,
             log=print,
+            cache=cache,
+            store=store,
+            engine_pool=engine_pool,
+            segment_unit=args.segment_unit or "paragraph",
         )
     except Exception as exc:
         print(f"Error: {exc}", file=sys.stderr)
@@ -510,4 +967,6 @@ def cli_main(argv: list[str] | None = None) -> int:
     print(f"  Metadata: {_relative_to_root(metadata_path, REPO_ROOT)}")
     print(f"  Engine: {metadata['engine_name']}")
     print(f"  Duration: {metadata['duration_seconds']}")
+    if "segments" in metadata:
+        print(f"  Segments: {len(metadata['segments'])}")
     return 0
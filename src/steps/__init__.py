@@ -1,12 +1,42 @@
-from .trend_scout import TrendScoutStep
-from .topic_prioritizer import TopicPrioritizerStep
-from .research_retrieval import ResearchRetrievalStep
-from .data_enrichment import DataEnrichmentStep
-
-# Register step for orchestrator
-STEP_REGISTRY = {
-    "TrendScout": TrendScoutStep,
-    "TopicPrioritizer": TopicPrioritizerStep,
-    "ResearchRetrieval": ResearchRetrievalStep,
-    "DataEnrichment": DataEnrichmentStep,
+"""
+steps - step ของ pipeline
+
+คลาส step และ STEP_REGISTRY ถูก import แบบ lazy เพื่อให้การ import step ย่อย
+(เช่น steps.approval_gate) ไม่ต้องโหลดเอเจนต์ทั้งหมดพร้อมกัน
+"""
+
+from importlib import import_module
+from typing import Any
+
+__all__ = [
+    "TrendScoutStep",
+    "TopicPrioritizerStep",
+    "ResearchRetrievalStep",
+    "DataEnrichmentStep",
+    "STEP_REGISTRY",
+]
+
+# ชื่อใน uses → (โมดูลย่อย, ชื่อคลาส)
+_STEP_CLASSES: dict[str, tuple[str, str]] = {
+    "TrendScout": (".trend_scout", "TrendScoutStep"),
+    "TopicPrioritizer": (".topic_prioritizer", "TopicPrioritizerStep"),
+    "ResearchRetrieval": (".research_retrieval", "ResearchRetrievalStep"),
+    "DataEnrichment": (".data_enrichment", "DataEnrichmentStep"),
 }
+_CLASS_MODULES = {cls: module for module, cls in _STEP_CLASSES.values()}
+
+
+def __getattr__(name: str) -> Any:
+    """โหลดคลาส step (หรือ STEP_REGISTRY) เมื่อถูกเรียกใช้ครั้งแรก"""
+    if name == "STEP_REGISTRY":
+        # Register step for orchestrator
+        value: Any = {
+            uses: getattr(import_module(module, __name__), cls)
+            for uses, (module, cls) in _STEP_CLASSES.items()
+        }
+    elif name in _CLASS_MODULES:
+        value = getattr(import_module(_CLASS_MODULES[name], __name__), name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
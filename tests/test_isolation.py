@@ -0,0 +1,142 @@
+"""ทดสอบการรันงานใน child process แยกพร้อมข้อจำกัดทรัพยากร"""
+
+import importlib.util
+import json
+import sys
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+from types import ModuleType
+
+import pytest
+
+from automation_core.isolation import IsolatedJob, ResourceLimits, run_isolated
+from automation_core.queue import FileQueue, JobSpec
+
+_FAKE_PIPELINE = """
+import json
+import time
+from pathlib import Path
+
+
+def ok(pipeline_path, run_id, params=None):
+    Path(params["out"]).write_text(json.dumps([pipeline_path.name, run_id, params]))
+
+
+def fail(pipeline_path, run_id, params=None):
+    raise RuntimeError("render failed")
+
+
+def hog(pipeline_path, run_id, params=None):
+    blocks = [bytearray(64 * 1024 * 1024) for _ in range(64)]
+    return len(blocks)
+
+
+def hang(pipeline_path, run_id, params=None):
+    time.sleep(60)
+"""
+
+
+@pytest.fixture
+def fake_module(tmp_path: Path) -> str:
+    module_dir = tmp_path / "fake_modules"
+    module_dir.mkdir()
+    (module_dir / "isolated_fake_pipeline.py").write_text(
+        _FAKE_PIPELINE, encoding="utf-8"
+    )
+    return str(module_dir)
+
+
+def _run(target: str, fake_module: str, limits: ResourceLimits | None = None, **kw):
+    job = IsolatedJob(
+        target=f"isolated_fake_pipeline:{target}",
+        pipeline_path="pipeline.web.yml",
+        run_id="run-001",
+        **kw,
+    )
+    return run_isolated(job, limits, extra_paths=[fake_module])
+
+
+def test_run_isolated_reports_result_and_usage(tmp_path: Path, fake_module: str):
+    out = tmp_path / "out.json"
+
+    result = _run("ok", fake_module, params={"out": str(out)})
+
+    assert result.error is None
+    assert result.exit_code == 0
+    assert json.loads(out.read_text()) == [
+        "pipeline.web.yml",
+        "run-001",
+        {"out": str(out)},
+    ]
+    assert result.peak_rss_kb is not None and result.peak_rss_kb > 0
+    assert result.cpu_time_s is not None and result.cpu_time_s > 0
+    assert result.resources()["timed_out"] is False
+
+    failed = _run("fail", fake_module)
+    assert failed.error is not None
+    assert failed.error.code == "orchestrator_failed"
+    assert failed.error.message == "render failed"
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="rlimit ใช้ได้เฉพาะ POSIX")
+def test_run_isolated_enforces_limits(fake_module: str):
+    hog = _run("hog", fake_module, ResourceLimits(memory_mb=1024, nice=5))
+    assert hog.error is not None
+    assert hog.error.code == "resource_limit"
+
+    started = time.monotonic()
+    hang = _run("hang", fake_module, ResourceLimits(timeout_seconds=0.5))
+    assert time.monotonic() - started < 30
+    assert hang.timed_out is True
+    assert hang.error is not None
+    assert hang.error.code == "job_timeout"
+
+
+def _load_runner() -> ModuleType:
+    runner_path = Path(__file__).parent.parent / "scripts" / "scheduler_runner.py"
+    spec = importlib.util.spec_from_file_location("scheduler_runner", runner_path)
+    module = importlib.util.module_from_spec(spec)
+    assert spec.loader is not None
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_worker_records_resources_for_isolated_job(
+    tmp_path: Path, fake_module: str, monkeypatch: pytest.MonkeyPatch
+):
+    runner = _load_runner()
+    monkeypatch.setenv("PIPELINE_ENABLED", "true")
+    monkeypatch.setenv("WORKER_ENABLED", "true")
+    monkeypatch.setenv("PYTHONPATH", fake_module)
+    monkeypatch.setattr(runner, "_PIPELINE_TARGET", "isolated_fake_pipeline:fail")
+    FileQueue(tmp_path / "queue").enqueue(
+        JobSpec(
+            schema_version="v1",
+            job_id="job-001",
+            created_at=datetime.now(UTC).isoformat().replace("+00:00", "Z"),
+            scheduled_for="2026-01-01T00:00:00Z",
+            pipeline_path="pipeline.web.yml",
+            run_id="run-001",
+            params={"topic_seed": "เมตตา"},
+            status="pending",
+            attempts=0,
+            last_error=None,
+        )
+    )
+
+    summary = runner.run_worker(
+        queue_dir="queue",
+        dry_run=False,
+        base_dir=tmp_path,
+        isolation=ResourceLimits(timeout_seconds=60),
+    )
+
+    assert summary is not None
+    assert summary["decision"] == "failed"
+    assert summary["error"] == {
+        "code": "orchestrator_failed",
+        "message": "render failed",
+    }
+    assert summary["resources"]["exit_code"] == 1
+    assert summary["resources"]["peak_rss_kb"] > 0
@@ -0,0 +1,145 @@
+"""ทดสอบ batch mode ของ orchestrator (หลาย run ใน process เดียว)"""
+
+from __future__ import annotations
+
+import json
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from automation_core.batch import (
+    BatchSpecError,
+    build_batch_runs,
+    load_batch_specs,
+    load_batch_topics,
+)
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+import orchestrator
+
+PIPELINE = """pipeline: batch_test
+steps:
+  - id: pick
+    uses: FakePick
+    output: pick.json
+"""
+
+
+@pytest.fixture
+def pipeline_path(tmp_path, monkeypatch) -> Path:
+    monkeypatch.setattr(orchestrator, "ROOT", tmp_path)
+    monkeypatch.setenv("PIPELINE_ENABLED", "true")
+    monkeypatch.delenv("DHAMMA_TOPIC", raising=False)
+    path = tmp_path / "pipeline.yml"
+    path.write_text(PIPELINE, encoding="utf-8")
+    return path
+
+
+def test_concurrent_runs_see_their_own_topic(tmp_path, pipeline_path, monkeypatch):
+    barrier = threading.Barrier(2, timeout=5)
+
+    def _pick(step, run_dir):
+        # ทั้งสอง run ต้องรันพร้อมกันจึงจะผ่าน barrier ได้
+        barrier.wait()
+        out = run_dir / step["output"]
+        orchestrator.write_json(out, {"topic": orchestrator.current_topic()})
+        return out
+
+    monkeypatch.setitem(orchestrator.AGENTS, "FakePick", _pick)
+    topics_path = tmp_path / "topics.json"
+    topics_path.write_text(
+        json.dumps({"topics": [{"title": "เมตตา"}, {"title": "อานาปานสติ"}]}),
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(
+        "sys.argv",
+        [
+            "orchestrator.py",
+            "--pipeline",
+            str(pipeline_path),
+            "--run-id",
+            "daily",
+            "--batch-topics",
+            str(topics_path),
+            "--batch-concurrency",
+            "2",
+        ],
+    )
+
+    assert orchestrator.main() == 0
+
+    for run_id, topic in (("daily_001", "เมตตา"), ("daily_002", "อานาปานสติ")):
+        pick = tmp_path / "output" / run_id / "pick.json"
+        assert json.loads(pick.read_text(encoding="utf-8")) == {"topic": topic}
+    summary = json.loads(
+        (tmp_path / "output" / "daily" / "batch_summary.json").read_text(
+            encoding="utf-8"
+        )
+    )
+    assert summary["successful"] == 2
+    assert [r["run_id"] for r in summary["runs"]] == ["daily_001", "daily_002"]
+    assert "DHAMMA_TOPIC" not in orchestrator.os.environ
+
+
+def test_failed_run_does_not_stop_batch(tmp_path, pipeline_path, monkeypatch):
+    def _pick(step, run_dir):
+        topic = orchestrator.current_topic()
+        if topic == "bad":
+            raise RuntimeError("render exploded")
+        out = run_dir / step["output"]
+        orchestrator.write_json(out, {"topic": topic})
+        return out
+
+    monkeypatch.setitem(orchestrator.AGENTS, "FakePick", _pick)
+    specs_path = tmp_path / "runs.jsonl"
+    specs_path.write_text(
+        '{"run_id": "r_bad", "topic": "bad"}\n'
+        "# comment\n"
+        '{"run_id": "r_good", "topic": "good"}\n',
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(
+        "sys.argv",
+        [
+            "orchestrator.py",
+            "--pipeline",
+            str(pipeline_path),
+            "--run-id",
+            "b1",
+            "--batch",
+            str(specs_path),
+        ],
+    )
+
+    assert orchestrator.main() == 1
+
+    summary = json.loads(
+        (tmp_path / "output" / "b1" / "batch_summary.json").read_text(encoding="utf-8")
+    )
+    runs = {r["run_id"]: r for r in summary["runs"]}
+    assert runs["r_bad"]["status"] == "failed"
+    assert runs["r_bad"]["error"] == "render exploded"
+    assert runs["r_good"]["status"] == "success"
+    assert (tmp_path / "output" / "r_good" / "pick.json").is_file()
+
+
+def test_batch_topics_accepts_text_file(tmp_path):
+    path = tmp_path / "topics.txt"
+    path.write_text("# today\nเมตตา\n\nกรุณา\n", encoding="utf-8")
+
+    assert load_batch_topics(path) == ["เมตตา", "กรุณา"]
+
+
+def test_batch_specs_reject_unknown_keys_and_duplicate_run_ids(tmp_path):
+    path = tmp_path / "runs.jsonl"
+    path.write_text('{"run_id": "a", "topci": "typo"}\n', encoding="utf-8")
+    with pytest.raises(BatchSpecError, match="unknown keys: topci"):
+        load_batch_specs(path)
+
+    with pytest.raises(BatchSpecError, match="duplicate run_id: a"):
+        build_batch_runs([{"run_id": "a"}, {"run_id": "a"}], "batch")
+
+    with pytest.raises(BatchSpecError, match="path separators"):
+        build_batch_runs([{"run_id": "a/b"}], "batch")
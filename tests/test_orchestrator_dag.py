@@ -0,0 +1,189 @@
+"""ทดสอบการรัน pipeline แบบ DAG ตามคีย์ needs"""
+
+from __future__ import annotations
+
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from automation_core.pipeline_graph import (
+    PipelineGraphError,
+    build_step_dependencies,
+    topological_order,
+)
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+import orchestrator
+
+
+def _write_pipeline(tmp_path: Path, body: str) -> Path:
+    pipeline_path = tmp_path / "pipeline.yml"
+    pipeline_path.write_text(body, encoding="utf-8")
+    return pipeline_path
+
+
+def test_steps_without_needs_depend_on_previous_step():
+    steps = [
+        {"id": "a", "uses": "X"},
+        {"id": "b", "uses": "X"},
+        {"id": "c", "uses": "X", "needs": ["a"]},
+        {"id": "d", "uses": "X", "needs": []},
+    ]
+
+    dependencies = build_step_dependencies(steps)
+
+    assert dependencies == {"a": (), "b": ("a",), "c": ("a",), "d": ()}
+    assert topological_order(dependencies) == ["a", "d", "b", "c"]
+
+
+def test_unknown_need_is_rejected():
+    steps = [{"id": "a", "uses": "X", "needs": ["missing"]}]
+
+    with pytest.raises(PipelineGraphError, match="unknown step: missing"):
+        build_step_dependencies(steps)
+
+
+def test_cycle_is_rejected():
+    steps = [
+        {"id": "a", "uses": "X", "needs": ["b"]},
+        {"id": "b", "uses": "X", "needs": ["a"]},
+    ]
+
+    with pytest.raises(PipelineGraphError, match="cycle"):
+        build_step_dependencies(steps)
+
+
+def test_independent_branches_run_concurrently(tmp_path, monkeypatch):
+    barrier = threading.Barrier(3, timeout=5)
+    order: list[str] = []
+    lock = threading.Lock()
+
+    def _root(step, run_dir):
+        with lock:
+            order.append(step["id"])
+        return "root"
+
+    def _branch(step, run_dir):
+        # ถ้า branch ไม่ได้รันพร้อมกัน barrier จะ timeout และ step จะ fail
+        barrier.wait()
+        with lock:
+            order.append(step["id"])
+        return step["id"]
+
+    def _join(step, run_dir):
+        with lock:
+            order.append(step["id"])
+        return "join"
+
+    monkeypatch.setitem(orchestrator.AGENTS, "FakeRoot", _root)
+    monkeypatch.setitem(orchestrator.AGENTS, "FakeBranch", _branch)
+    monkeypatch.setitem(orchestrator.AGENTS, "FakeJoin", _join)
+    monkeypatch.setattr(orchestrator, "ROOT", tmp_path)
+    monkeypatch.setenv("PIPELINE_ENABLED", "true")
+
+    pipeline_path = _write_pipeline(
+        tmp_path,
+        """pipeline: dag_parallel
+steps:
+  - id: root
+    uses: FakeRoot
+  - id: visual
+    uses: FakeBranch
+    needs: [root]
+  - id: voice
+    uses: FakeBranch
+    needs: [root]
+  - id: localization
+    uses: FakeBranch
+    needs: [root]
+  - id: join
+    uses: FakeJoin
+    needs: [visual, voice, localization]
+""",
+    )
+
+    summary = orchestrator.run_pipeline(pipeline_path, "run_dag", max_workers=3)
+
+    assert order[0] == "root"
+    assert order[-1] == "join"
+    assert set(order[1:4]) == {"visual", "voice", "localization"}
+    assert list(summary["results"]) == [
+        "root",
+        "visual",
+        "voice",
+        "localization",
+        "join",
+    ]
+    assert summary["successful"] == 5
+
+
+def test_max_workers_one_keeps_file_order(tmp_path, monkeypatch):
+    order: list[str] = []
+
+    def _record(step, run_dir):
+        order.append(step["id"])
+        return step["id"]
+
+    monkeypatch.setitem(orchestrator.AGENTS, "FakeRecord", _record)
+    monkeypatch.setattr(orchestrator, "ROOT", tmp_path)
+    monkeypatch.setenv("PIPELINE_ENABLED", "true")
+
+    pipeline_path = _write_pipeline(
+        tmp_path,
+        """pipeline: dag_serial
+steps:
+  - id: a
+    uses: FakeRecord
+  - id: b
+    uses: FakeRecord
+    needs: [a]
+  - id: c
+    uses: FakeRecord
+    needs: [a]
+  - id: d
+    uses: FakeRecord
+    needs: [b]
+""",
+    )
+
+    orchestrator.run_pipeline(pipeline_path, "run_serial", max_workers=1)
+
+    assert order == ["a", "b", "c", "d"]
+
+
+def test_branch_failure_propagates_and_blocks_dependents(tmp_path, monkeypatch):
+    ran: list[str] = []
+
+    def _ok(step, run_dir):
+        ran.append(step["id"])
+        return step["id"]
+
+    def _boom(step, run_dir):
+        raise ValueError("branch exploded")
+
+    monkeypatch.setitem(orchestrator.AGENTS, "FakeOk", _ok)
+    monkeypatch.setitem(orchestrator.AGENTS, "FakeBoom", _boom)
+    monkeypatch.setattr(orchestrator, "ROOT", tmp_path)
+    monkeypatch.setenv("PIPELINE_ENABLED", "true")
+
+    pipeline_path = _write_pipeline(
+        tmp_path,
+        """pipeline: dag_failure
+steps:
+  - id: root
+    uses: FakeOk
+  - id: broken
+    uses: FakeBoom
+    needs: [root]
+  - id: after_broken
+    uses: FakeOk
+    needs: [broken]
+""",
+    )
+
+    with pytest.raises(ValueError, match="branch exploded"):
+        orchestrator.run_pipeline(pipeline_path, "run_fail", max_workers=2)
+
+    assert "after_broken" not in ran
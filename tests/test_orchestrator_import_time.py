@@ -0,0 +1,85 @@
+"""ทดสอบว่า import orchestrator ไม่โหลดเอเจนต์/dependency หนักล่วงหน้า"""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from automation_core.agent_registry import LazyAgentRegistry
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# งบเวลา import แบบ cumulative ของ orchestrator (ไมโครวินาที)
+# ก่อนทำ lazy registry อยู่ที่ประมาณ 1.2 วินาที หลังทำเหลือราว 0.1 วินาที
+IMPORT_BUDGET_US = 600_000
+
+HEAVY_MODULES = (
+    "pandas",
+    "numpy",
+    "pytrends",
+    "googleapiclient",
+    "sentence_transformers",
+    "agents",
+    "steps.trend_scout",
+)
+
+
+def _importtime(statement: str) -> dict[str, int]:
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative: dict[str, int] = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cum, name = (part.strip() for part in line.split("|"))
+        if cum.isdigit():
+            cumulative[name] = int(cum)
+    return cumulative
+
+
+def test_import_orchestrator_skips_heavy_dependencies():
+    cumulative = _importtime("import orchestrator")
+
+    loaded = sorted(name for name in HEAVY_MODULES if name in cumulative)
+    assert loaded == []
+    assert cumulative["orchestrator"] < IMPORT_BUDGET_US
+
+
+def test_scheduler_runner_does_not_import_orchestrator():
+    cumulative = _importtime(
+        "import sys; sys.path.insert(0, 'scripts'); import scheduler_runner"
+    )
+
+    assert "orchestrator" not in cumulative
+    assert "pandas" not in cumulative
+
+
+def test_lazy_registry_imports_agent_on_first_use(monkeypatch):
+    monkeypatch.delitem(sys.modules, "json.tool", raising=False)
+    registry = LazyAgentRegistry({"pretty": "json.tool:main", "inline": len})
+
+    assert not registry.is_loaded("pretty")
+    assert "json.tool" not in sys.modules
+    assert registry.get("missing") is None
+
+    func = registry["pretty"]
+
+    assert "json.tool" in sys.modules
+    assert func is sys.modules["json.tool"].main
+    assert registry.is_loaded("pretty")
+    assert registry["inline"] is len
+
+
+def test_lazy_registry_rejects_malformed_spec():
+    registry = LazyAgentRegistry({"broken": "steps.decision_support"})
+
+    with pytest.raises(ValueError, match="module:attr"):
+        registry["broken"]
@@ -0,0 +1,96 @@
+"""ทดสอบการวัดต้นทุนราย step ใน pipeline_summary.json และ trace.json"""
+
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from automation_core.step_metrics import measure_step, track_subprocess
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+import orchestrator
+
+PIPELINE = """pipeline: metrics_test
+steps:
+  - id: render
+    uses: FakeRender
+    output: render.bin
+  - id: gate
+    uses: FakeGate
+    input_from: render.bin
+    output: gate.json
+"""
+
+
+@pytest.fixture
+def pipeline_path(tmp_path, monkeypatch) -> Path:
+    def _render(step, run_dir):
+        out = run_dir / step["output"]
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_bytes(b"\0" * 4096)
+        return out
+
+    def _gate(step, run_dir):
+        with track_subprocess():
+            subprocess.run([sys.executable, "-c", "pass"], check=True)
+        out = run_dir / step["output"]
+        orchestrator.write_json(out, {"ok": True})
+        return out
+
+    monkeypatch.setitem(orchestrator.AGENTS, "FakeRender", _render)
+    monkeypatch.setitem(orchestrator.AGENTS, "FakeGate", _gate)
+    monkeypatch.setattr(orchestrator, "ROOT", tmp_path)
+    monkeypatch.setenv("PIPELINE_ENABLED", "true")
+    path = tmp_path / "pipeline.yml"
+    path.write_text(PIPELINE, encoding="utf-8")
+    return path
+
+
+def test_summary_contains_per_step_metrics(tmp_path, pipeline_path):
+    summary = orchestrator.run_pipeline(pipeline_path, "run_metrics")
+
+    metrics = summary["metrics"]
+    assert list(metrics["steps"]) == ["render", "gate"]
+    gate = metrics["steps"]["gate"]
+    assert gate["uses"] == "FakeGate"
+    assert gate["subprocess_time_s"] > 0
+    assert gate["wall_time_s"] >= gate["subprocess_time_s"]
+    assert metrics["steps"]["render"]["subprocess_time_s"] == 0
+    assert metrics["by_uses"]["FakeRender"]["count"] == 1
+    assert metrics["wall_time_s"] >= gate["wall_time_s"]
+    assert not (tmp_path / "output" / "run_metrics" / "trace.json").exists()
+
+    written = json.loads(
+        (tmp_path / "output" / "run_metrics" / "pipeline_summary.json").read_text(
+            encoding="utf-8"
+        )
+    )
+    assert written["metrics"]["steps"]["gate"] == gate
+
+
+def test_trace_written_as_chrome_trace_events(tmp_path, pipeline_path):
+    orchestrator.run_pipeline(pipeline_path, "run_trace", trace=True)
+
+    trace = json.loads(
+        (tmp_path / "output" / "run_trace" / "trace.json").read_text(encoding="utf-8")
+    )
+    spans = [e for e in trace["traceEvents"] if e["ph"] == "X"]
+    assert [e["name"] for e in spans] == ["render", "gate"]
+    assert spans[0]["ts"] == 0
+    assert spans[1]["ts"] >= spans[0]["ts"] + spans[0]["dur"] - 1
+    assert spans[1]["cat"] == "FakeGate"
+
+
+def test_measure_step_records_thread_io():
+    with measure_step() as collector:
+        Path("/dev/null").write_bytes(b"x" * 10_000)
+
+    metrics = collector.metrics
+    assert metrics is not None
+    assert metrics.wall_time_s >= 0
+    if metrics.io_write_bytes is not None:
+        assert metrics.io_write_bytes >= 10_000
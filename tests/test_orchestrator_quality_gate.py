@@ -563,3 +563,50 @@ steps:
     post_summary = json.loads(post_content_path.read_text(encoding="utf-8"))
     assert post_summary["schema_version"] == "v1"
     assert post_summary["run_id"] == run_id
+
+
+def test_orchestrator_quality_gate_duration_mismatch_fails(tmp_path, monkeypatch):
+    run_id = "run_mismatch"
+    output_mp4_rel = f"output/{run_id}/artifacts/demo_mismatch.mp4"
+    mp4_path = tmp_path / output_mp4_rel
+    mp4_path.parent.mkdir(parents=True, exist_ok=True)
+    mp4_path.write_bytes(b"fake mp4")
+    summary_path = _write_video_render_summary(tmp_path, run_id, output_mp4_rel)
+    render_summary = json.loads(summary_path.read_text(encoding="utf-8"))
+    render_summary["expected_duration_seconds"] = 30.0
+    summary_path.write_text(json.dumps(render_summary), encoding="utf-8")
+
+    pipeline_path = tmp_path / "pipeline.yml"
+    pipeline_path.write_text(
+        """pipeline: quality_gate_duration_mismatch
+steps:
+  - id: quality_gate
+    uses: quality.gate
+""",
+        encoding="utf-8",
+    )
+
+    monkeypatch.setattr(orchestrator, "ROOT", tmp_path)
+    monkeypatch.setenv("PIPELINE_ENABLED", "true")
+
+    ffprobe_payload = json.dumps(
+        {"format": {"duration": "12.0"}, "streams": [{"codec_type": "audio"}]}
+    )
+
+    def fake_run(cmd, check=False, capture_output=True, text=True):
+        return subprocess.CompletedProcess(cmd, 0, stdout=ffprobe_payload, stderr="")
+
+    monkeypatch.setattr(orchestrator.subprocess, "run", fake_run)
+
+    try:
+        orchestrator.run_pipeline(pipeline_path, run_id)
+    except RuntimeError as exc:
+        assert "Quality gate failed" in str(exc)
+    else:
+        raise AssertionError("Expected RuntimeError for duration mismatch")
+
+    gate_path = tmp_path / "output" / run_id / "artifacts" / "quality_gate_summary.json"
+    summary = json.loads(gate_path.read_text(encoding="utf-8"))
+    assert summary["decision"] == "fail"
+    assert [reason["code"] for reason in summary["reasons"]] == ["duration_mismatch"]
+    _assert_reason_contract(summary["reasons"][0], summary["checked_at"])
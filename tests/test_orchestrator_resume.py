@@ -0,0 +1,128 @@
+"""ทดสอบการ resume pipeline จาก checkpoint journal"""
+
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+import orchestrator
+
+PIPELINE_TEMPLATE = """pipeline: resume_test
+steps:
+  - id: render
+    uses: FakeRender
+    output: render.json
+  - id: gate
+    uses: FakeGate
+    input_from: render.json
+    output: gate.json
+    config:
+      min_duration: {min_duration}
+  - id: upload
+    uses: FakeUpload
+    input_from: gate.json
+    output: upload.json
+"""
+
+
+@pytest.fixture
+def agents(tmp_path, monkeypatch) -> dict:
+    state = {"calls": [], "upload_fails": True}
+
+    def _make(name: str):
+        def _agent(step, run_dir):
+            state["calls"].append(step["id"])
+            if name == "FakeUpload" and state["upload_fails"]:
+                raise RuntimeError("quota exceeded")
+            out = run_dir / step["output"]
+            orchestrator.write_json(out, {"step": step["id"]})
+            return out
+
+        return _agent
+
+    for name in ("FakeRender", "FakeGate", "FakeUpload"):
+        monkeypatch.setitem(orchestrator.AGENTS, name, _make(name))
+    monkeypatch.setattr(orchestrator, "ROOT", tmp_path)
+    monkeypatch.setenv("PIPELINE_ENABLED", "true")
+    return state
+
+
+def _pipeline(tmp_path: Path, min_duration: int = 1) -> Path:
+    pipeline_path = tmp_path / "pipeline.yml"
+    pipeline_path.write_text(
+        PIPELINE_TEMPLATE.format(min_duration=min_duration), encoding="utf-8"
+    )
+    return pipeline_path
+
+
+def _fail_first_run(tmp_path: Path, agents: dict) -> None:
+    with pytest.raises(RuntimeError, match="quota exceeded"):
+        orchestrator.run_pipeline(_pipeline(tmp_path), "run_resume")
+    agents["calls"].clear()
+    agents["upload_fails"] = False
+
+
+def test_resume_continues_from_first_incomplete_step(tmp_path, agents):
+    _fail_first_run(tmp_path, agents)
+
+    journal_path = tmp_path / "output" / "run_resume" / "pipeline_checkpoint.json"
+    journal = json.loads(journal_path.read_text(encoding="utf-8"))
+    assert set(journal["steps"]) == {"render", "gate"}
+    assert journal["steps"]["render"]["artifacts"][0]["path"] == (
+        "output/run_resume/render.json"
+    )
+
+    summary = orchestrator.run_pipeline(_pipeline(tmp_path), "run_resume", resume=True)
+
+    assert agents["calls"] == ["upload"]
+    assert summary["results"]["render"]["status"] == "resumed"
+    assert summary["results"]["gate"]["status"] == "resumed"
+    assert summary["results"]["upload"]["status"] == "success"
+    assert summary["resumed"] == 2
+    assert summary["successful"] == 3
+
+
+def test_resume_reruns_step_with_modified_artifact_and_dependents(tmp_path, agents):
+    _fail_first_run(tmp_path, agents)
+    (tmp_path / "output" / "run_resume" / "gate.json").write_text(
+        "tampered", encoding="utf-8"
+    )
+
+    orchestrator.run_pipeline(_pipeline(tmp_path), "run_resume", resume=True)
+
+    assert agents["calls"] == ["gate", "upload"]
+
+
+def test_resume_reruns_step_with_changed_config(tmp_path, agents):
+    _fail_first_run(tmp_path, agents)
+
+    summary = orchestrator.run_pipeline(
+        _pipeline(tmp_path, min_duration=5), "run_resume", resume=True
+    )
+
+    assert agents["calls"] == ["gate", "upload"]
+    assert summary["resumed"] == 1
+
+
+def test_run_without_resume_starts_over(tmp_path, agents):
+    _fail_first_run(tmp_path, agents)
+
+    summary = orchestrator.run_pipeline(_pipeline(tmp_path), "run_resume")
+
+    assert agents["calls"] == ["render", "gate", "upload"]
+    assert summary["resumed"] == 0
+
+
+def test_cli_resume_requires_run_id(tmp_path, monkeypatch, capsys):
+    monkeypatch.setenv("PIPELINE_ENABLED", "true")
+    monkeypatch.setattr(
+        "sys.argv",
+        ["orchestrator.py", "--pipeline", str(_pipeline(tmp_path)), "--resume"],
+    )
+
+    assert orchestrator.main() == 1
+    assert "--resume requires --run-id" in capsys.readouterr().out
@@ -0,0 +1,219 @@
+"""ทดสอบแคชผลลัพธ์ของ step ใน orchestrator"""
+
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+import orchestrator
+
+PIPELINE_TEMPLATE = """pipeline: step_cache
+steps:
+  - id: trend_scout
+    uses: TrendScout
+    output: trend.json
+  - id: script_outline
+    uses: ScriptOutline
+    needs: [trend_scout]
+    input_from: trend.json
+    output: outline.md
+    config:
+      tone: {tone}
+"""
+
+
+@pytest.fixture
+def calls(tmp_path, monkeypatch) -> dict[str, int]:
+    counts = {"TrendScout": 0, "ScriptOutline": 0}
+
+    def _fake_trend(step, run_dir):
+        counts["TrendScout"] += 1
+        out = run_dir / step["output"]
+        orchestrator.write_json(out, {"topics": ["mindfulness"]})
+        return out
+
+    def _fake_outline(step, run_dir):
+        counts["ScriptOutline"] += 1
+        topics = orchestrator.read_json(run_dir / step["input_from"])["topics"]
+        out = run_dir / step["output"]
+        orchestrator.write_text(out, f"# {topics[0]} ({step['config']['tone']})")
+        return out
+
+    monkeypatch.setitem(orchestrator.AGENTS, "TrendScout", _fake_trend)
+    monkeypatch.setitem(orchestrator.AGENTS, "ScriptOutline", _fake_outline)
+    monkeypatch.setattr(orchestrator, "ROOT", tmp_path)
+    monkeypatch.setenv("PIPELINE_ENABLED", "true")
+    monkeypatch.delenv("STEP_CACHE_ENABLED", raising=False)
+    monkeypatch.delenv("DHAMMA_TOPIC", raising=False)
+    return counts
+
+
+def _run(tmp_path: Path, run_id: str, tone: str = "calm") -> dict:
+    pipeline_path = tmp_path / "pipeline.yml"
+    pipeline_path.write_text(PIPELINE_TEMPLATE.format(tone=tone), encoding="utf-8")
+    return orchestrator.run_pipeline(pipeline_path, run_id)
+
+
+def test_rerun_materializes_cached_artifacts_into_new_run(tmp_path, calls):
+    first = _run(tmp_path, "run_a")
+    second = _run(tmp_path, "run_b")
+
+    assert calls == {"TrendScout": 1, "ScriptOutline": 1}
+    assert first["results"]["script_outline"]["status"] == "success"
+    assert second["results"]["trend_scout"]["status"] == "cached"
+    assert second["results"]["script_outline"]["status"] == "cached"
+    assert second["cached"] == 2
+    assert second["successful"] == 2
+
+    outline_b = tmp_path / "output" / "run_b" / "outline.md"
+    assert outline_b.read_text(encoding="utf-8") == "# mindfulness (calm)"
+    assert second["results"]["script_outline"]["output"] == str(outline_b)
+
+    summary = json.loads(
+        (tmp_path / "output" / "run_b" / "pipeline_summary.json").read_text(
+            encoding="utf-8"
+        )
+    )
+    assert summary["results"]["trend_scout"]["status"] == "cached"
+
+
+def test_config_change_only_reruns_changed_step(tmp_path, calls):
+    _run(tmp_path, "run_a", tone="calm")
+    summary = _run(tmp_path, "run_b", tone="warm")
+
+    assert calls == {"TrendScout": 1, "ScriptOutline": 2}
+    assert summary["results"]["trend_scout"]["status"] == "cached"
+    assert summary["results"]["script_outline"]["status"] == "success"
+
+
+def test_cache_disabled_by_env(tmp_path, calls, monkeypatch):
+    monkeypatch.setenv("STEP_CACHE_ENABLED", "false")
+
+    _run(tmp_path, "run_a")
+    summary = _run(tmp_path, "run_b")
+
+    assert calls == {"TrendScout": 2, "ScriptOutline": 2}
+    assert summary["cached"] == 0
+    assert not (tmp_path / "data" / "step_cache").exists()
+
+
+def test_corrupted_blob_falls_back_to_running_step(tmp_path, calls):
+    _run(tmp_path, "run_a")
+    for blob in (tmp_path / "data" / "step_cache" / "objects").rglob("*"):
+        if blob.is_file():
+            blob.write_bytes(b"corrupted")
+
+    summary = _run(tmp_path, "run_b")
+
+    assert calls == {"TrendScout": 2, "ScriptOutline": 2}
+    assert summary["results"]["trend_scout"]["status"] == "success"
+    outline_b = tmp_path / "output" / "run_b" / "outline.md"
+    assert outline_b.read_text(encoding="utf-8") == "# mindfulness (calm)"
+
+
+def test_rerun_after_hit_does_not_rewrite_shared_blob(tmp_path, calls):
+    _run(tmp_path, "run_a")
+    _run(tmp_path, "run_b")
+    _run(tmp_path, "run_c")
+    outline_c = tmp_path / "output" / "run_c" / "outline.md"
+    assert outline_c.stat().st_nlink > 1
+
+    # run_b รันซ้ำด้วย config ใหม่ (cache miss) ต้องไม่เขียนทับไฟล์ที่ link กับ blob
+    _run(tmp_path, "run_b", tone="warm")
+    summary = _run(tmp_path, "run_d")
+
+    outline_b = tmp_path / "output" / "run_b" / "outline.md"
+    assert outline_b.read_text(encoding="utf-8") == "# mindfulness (warm)"
+    assert outline_c.read_text(encoding="utf-8") == "# mindfulness (calm)"
+    assert summary["results"]["script_outline"]["status"] == "cached"
+    assert calls == {"TrendScout": 1, "ScriptOutline": 2}
+
+
+def test_uncached_rerun_after_hit_does_not_rewrite_shared_blob(
+    tmp_path, calls, monkeypatch
+):
+    _run(tmp_path, "run_a")
+    _run(tmp_path, "run_b")
+    _run(tmp_path, "run_c")
+    trend_c = tmp_path / "output" / "run_c" / "trend.json"
+    assert trend_c.stat().st_nlink > 1
+    original = trend_c.read_bytes()
+
+    def _changed_trend(step, run_dir):
+        out = run_dir / step["output"]
+        orchestrator.write_json(out, {"topics": ["changed"]})
+        return out
+
+    # run_b รันซ้ำโดยปิดแคช (ไม่มีคีย์แคช) ต้องไม่เขียนทับไฟล์ที่ link กับ blob
+    monkeypatch.setitem(orchestrator.AGENTS, "TrendScout", _changed_trend)
+    monkeypatch.setenv("STEP_CACHE_ENABLED", "false")
+    _run(tmp_path, "run_b")
+
+    trend_b = tmp_path / "output" / "run_b" / "trend.json"
+    assert orchestrator.read_json(trend_b) == {"topics": ["changed"]}
+    assert trend_c.read_bytes() == original
+    blobs = [
+        blob
+        for blob in (tmp_path / "data" / "step_cache" / "objects").rglob("*")
+        if blob.is_file()
+    ]
+    assert any(blob.read_bytes() == original for blob in blobs)
+    assert all(b"changed" not in blob.read_bytes() for blob in blobs)
+
+
+def test_code_version_tracks_imported_modules(tmp_path, monkeypatch):
+    package = tmp_path / "fake_steps"
+    package.mkdir()
+    (package / "__init__.py").write_text("", encoding="utf-8")
+    (package / "helper.py").write_text("VALUE = 1\n", encoding="utf-8")
+    (package / "impl.py").write_text(
+        "from .helper import VALUE\n\n\ndef work():\n    return VALUE\n",
+        encoding="utf-8",
+    )
+    (tmp_path / "fake_agents.py").write_text(
+        "def agent(step, run_dir):\n"
+        "    from fake_steps.impl import work\n\n"
+        "    return work()\n",
+        encoding="utf-8",
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    import fake_agents
+
+    before = orchestrator.compute_code_version(fake_agents.agent, [tmp_path])
+    assert before == orchestrator.compute_code_version(fake_agents.agent, [tmp_path])
+
+    (package / "helper.py").write_text("VALUE = 2\n", encoding="utf-8")
+    after = orchestrator.compute_code_version(fake_agents.agent, [tmp_path])
+
+    assert after != before
+
+
+def test_cache_hit_restores_side_outputs_into_new_run(tmp_path, calls):
+    pipeline = PIPELINE_TEMPLATE.format(tone="calm") + (
+        "  - id: doctrine_validator\n"
+        "    uses: DoctrineValidator\n"
+        "    needs: [script_outline]\n"
+        "    input_from: outline.md\n"
+        "    output: validated.md\n"
+        "  - id: localization\n"
+        "    uses: Localization\n"
+        "    needs: [doctrine_validator]\n"
+        "    input_from: validated.md\n"
+        "    output: localization.json\n"
+    )
+    pipeline_path = tmp_path / "pipeline.yml"
+    pipeline_path.write_text(pipeline, encoding="utf-8")
+
+    orchestrator.run_pipeline(pipeline_path, "run_a")
+    second = orchestrator.run_pipeline(pipeline_path, "run_b")
+
+    assert second["results"]["doctrine_validator"]["status"] == "cached"
+    assert second["results"]["localization"]["status"] == "cached"
+    run_a = tmp_path / "output" / "run_a"
+    run_b = tmp_path / "output" / "run_b"
+    for name in ("validation_report.json", "subtitles_th.srt"):
+        assert (run_b / name).read_bytes() == (run_a / name).read_bytes()
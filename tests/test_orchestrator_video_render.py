@@ -217,6 +217,87 @@ steps:
     assert post_summary["run_id"] == run_id
 
 
+def test_orchestrator_video_render_profile_sets_encoder_args(tmp_path, monkeypatch):
+    run_id = "run_profile"
+    slug = "draftrender"
+    sha12 = compute_input_sha256("Hello draft")[:12]
+    _write_voiceover_summary(tmp_path, run_id, slug, sha12)
+    write_post_templates(tmp_path)
+    write_metadata(
+        tmp_path,
+        run_id,
+        title="Test Video Title",
+        description="Test video description",
+        tags=["#test", "#video"],
+    )
+
+    pipeline_path = tmp_path / "pipeline.yml"
+    pipeline_path.write_text(
+        f"""pipeline: video_render_profile
+steps:
+  - id: video_render
+    uses: video.render
+    config:
+      slug: {slug}
+      dry_run: false
+      render_profile: draft
+""",
+        encoding="utf-8",
+    )
+
+    monkeypatch.setattr(orchestrator, "ROOT", tmp_path)
+    monkeypatch.setenv("PIPELINE_ENABLED", "true")
+
+    def fake_run(cmd, check, capture_output, text):
+        return subprocess.CompletedProcess(cmd, 0, stdout="ok", stderr="")
+
+    monkeypatch.setattr(orchestrator.subprocess, "run", fake_run)
+
+    orchestrator.run_pipeline(pipeline_path, run_id)
+
+    summary = json.loads(
+        (
+            tmp_path / "output" / run_id / "artifacts" / "video_render_summary.json"
+        ).read_text(encoding="utf-8")
+    )
+    cmd = summary["ffmpeg_cmd"]
+    assert summary["render_profile"] == "draft"
+    assert "color=c=black:s=854x480:r=15" in cmd
+    for flag, value in (
+        ("-preset", "ultrafast"),
+        ("-crf", "35"),
+        ("-maxrate", "1M"),
+        ("-threads", "0"),
+        ("-b:a", "64k"),
+    ):
+        assert cmd[cmd.index(flag) + 1] == value
+
+
+def test_orchestrator_video_render_unknown_profile_fails(tmp_path, monkeypatch):
+    pipeline_path = tmp_path / "pipeline.yml"
+    pipeline_path.write_text(
+        """pipeline: video_render_bad_profile
+steps:
+  - id: video_render
+    uses: video.render
+    config:
+      slug: demo
+      render_profile: ultra
+""",
+        encoding="utf-8",
+    )
+
+    monkeypatch.setattr(orchestrator, "ROOT", tmp_path)
+    monkeypatch.setenv("PIPELINE_ENABLED", "true")
+
+    try:
+        orchestrator.run_pipeline(pipeline_path, "run_bad_profile")
+    except ValueError as exc:
+        assert "render_profile must be one of" in str(exc)
+    else:
+        raise AssertionError("Expected ValueError for unknown render_profile")
+
+
 def test_orchestrator_video_render_voiceover_summary_traversal_blocked(
     tmp_path, monkeypatch
 ):
@@ -327,3 +408,191 @@ steps:
         assert "thumbnails/does_not_exist.png" in str(exc)
     else:
         raise AssertionError("Expected FileNotFoundError for missing image")
+
+
+def test_orchestrator_video_render_segmented_mode_encodes_in_parallel(
+    tmp_path, monkeypatch
+):
+    import threading
+    import time
+    import wave
+
+    run_id = "run_segmented"
+    slug = "segmented"
+    sha12 = compute_input_sha256("Hello segmented")[:12]
+    _, wav_rel = _write_voiceover_summary(tmp_path, run_id, slug, sha12)
+    write_post_templates(tmp_path)
+    write_metadata(tmp_path, run_id, title="Segmented", description="d", tags=["#t"])
+    wav_path = tmp_path / wav_rel
+    with wave.open(str(wav_path), "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(1000)
+        wav_file.writeframes(b"\x00\x00" * 36000)
+    segments = [{"end_seconds": end} for end in (11.0, 25.5, 36.0)]
+    wav_path.with_suffix(".json").write_text(
+        json.dumps({"segments": segments}), encoding="utf-8"
+    )
+
+    pipeline_path = tmp_path / "pipeline.yml"
+    pipeline_path.write_text(
+        f"""pipeline: video_render_segmented
+steps:
+  - id: video_render
+    uses: video.render
+    config:
+      slug: {slug}
+      fps: 10
+      render_mode: segmented
+      render_segments: 3
+""",
+        encoding="utf-8",
+    )
+
+    monkeypatch.setattr(orchestrator, "ROOT", tmp_path)
+    monkeypatch.setenv("PIPELINE_ENABLED", "true")
+    monkeypatch.setattr(orchestrator.os, "cpu_count", lambda: 7)
+    lock = threading.Lock()
+    state = {"active": 0, "max_active": 0}
+    concat_entries: list[str] = []
+    segment_cmds: list[list[str]] = []
+
+    def fake_run(cmd, check, capture_output, text):
+        if "concat" in cmd:
+            list_path = Path(cmd[cmd.index("-i") + 1])
+            concat_entries.extend(list_path.read_text(encoding="utf-8").splitlines())
+            for line in concat_entries:
+                assert (list_path.parent / line[len("file '") : -1]).exists()
+        else:
+            with lock:
+                segment_cmds.append(cmd)
+                state["active"] += 1
+                state["max_active"] = max(state["max_active"], state["active"])
+            time.sleep(0.05)
+            with lock:
+                state["active"] -= 1
+        Path(cmd[-1]).write_bytes(b"mp4")
+        return subprocess.CompletedProcess(cmd, 0, stdout="", stderr="")
+
+    monkeypatch.setattr(orchestrator.subprocess, "run", fake_run)
+
+    orchestrator.run_pipeline(pipeline_path, run_id)
+
+    artifacts_dir = tmp_path / "output" / run_id / "artifacts"
+    summary = json.loads(
+        (artifacts_dir / "video_render_summary.json").read_text(encoding="utf-8")
+    )
+    assert summary["render_mode"] == "segmented"
+    assert [
+        (s["start_seconds"], s["end_seconds"], s["frames"]) for s in summary["segments"]
+    ] == [(0.0, 11.0, 110), (11.0, 25.5, 145), (25.5, 36.0, 105)]
+    assert all(s["encode_seconds"] >= 0 for s in summary["segments"])
+    assert state["max_active"] == 3
+    # 7 คอร์ / 3 ช่วงพร้อมกัน = libx264 ช่วงละ 2 thread
+    assert (summary["segment_workers"], summary["segment_threads"]) == (3, 2)
+    assert len(segment_cmds) == 3
+    for cmd in segment_cmds:
+        assert cmd.count("-threads") == 1
+        assert cmd[cmd.index("-threads") + 1] == "2"
+    assert concat_entries == [f"file 'segment_{i:03d}.mp4'" for i in range(3)]
+    concat_prefix = ["ffmpeg", "-y", "-f", "concat", "-i", "segments.txt"]
+    assert summary["ffmpeg_cmd"][:6] == concat_prefix
+    assert wav_rel in summary["ffmpeg_cmd"]
+    assert summary["ffmpeg_cmd"][-1] == summary["output_mp4_path"]
+    for arg in summary["ffmpeg_cmd"]:
+        assert not Path(arg).is_absolute()
+    assert not list(artifacts_dir.glob(".render_segments-*"))
+
+
+def test_orchestrator_video_render_still_loop_encodes_clip_once(tmp_path, monkeypatch):
+    import wave
+
+    run_id = "run_still"
+    slug = "still"
+    sha12 = compute_input_sha256("Hello still")[:12]
+    _, wav_rel = _write_voiceover_summary(tmp_path, run_id, slug, sha12)
+    write_post_templates(tmp_path)
+    write_metadata(tmp_path, run_id, title="Still", description="d", tags=["#t"])
+    with wave.open(str(tmp_path / wav_rel), "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(1000)
+        wav_file.writeframes(b"\x00\x00" * 90500)
+    image_path = tmp_path / "assets" / "background.png"
+    image_path.parent.mkdir(parents=True)
+    image_path.write_bytes(b"png")
+
+    pipeline_path = tmp_path / "pipeline.yml"
+    pipeline_path.write_text(
+        f"""pipeline: video_render_still
+steps:
+  - id: video_render
+    uses: video.render
+    config:
+      slug: {slug}
+      image_path: assets/background.png
+      render_mode: still_loop
+      still_fps: 2
+""",
+        encoding="utf-8",
+    )
+
+    monkeypatch.setattr(orchestrator, "ROOT", tmp_path)
+    monkeypatch.setenv("PIPELINE_ENABLED", "true")
+    calls: list[list[str]] = []
+
+    def fake_run(cmd, check, capture_output, text):
+        calls.append(cmd)
+        if "-stream_loop" in cmd:
+            assert Path(cmd[cmd.index("-stream_loop") + 3]).exists()
+        Path(cmd[-1]).write_bytes(b"mp4")
+        return subprocess.CompletedProcess(cmd, 0, stdout="", stderr="")
+
+    monkeypatch.setattr(orchestrator.subprocess, "run", fake_run)
+
+    orchestrator.run_pipeline(pipeline_path, run_id)
+
+    clip_cmd, mux_cmd = calls
+    assert clip_cmd[clip_cmd.index("-frames:v") + 1] == "20"
+    assert clip_cmd[clip_cmd.index("-g") + 1] == "20"
+    assert "-an" in clip_cmd
+    assert mux_cmd[mux_cmd.index("-c:v") + 1] == "copy"
+    assert mux_cmd[mux_cmd.index("-c:a") + 1] == "aac"
+    assert mux_cmd[mux_cmd.index("-t") + 1] == "90.5"
+
+    artifacts_dir = tmp_path / "output" / run_id / "artifacts"
+    summary = json.loads(
+        (artifacts_dir / "video_render_summary.json").read_text(encoding="utf-8")
+    )
+    assert summary["render_mode"] == "still_loop"
+    assert summary["expected_duration_seconds"] == 90.5
+    assert set(summary["render_timings"]) == {"clip_seconds", "mux_seconds"}
+    assert "assets/background.png" in summary["still_clip_cmd"]
+    assert summary["ffmpeg_cmd"][-1] == summary["output_mp4_path"]
+    for arg in summary["ffmpeg_cmd"] + summary["still_clip_cmd"]:
+        assert not Path(arg).is_absolute()
+    assert not list(artifacts_dir.glob(".render_still-*"))
+
+
+def test_orchestrator_video_render_still_loop_requires_image(tmp_path, monkeypatch):
+    pipeline_path = tmp_path / "pipeline.yml"
+    pipeline_path.write_text(
+        """pipeline: video_render_still_no_image
+steps:
+  - id: video_render
+    uses: video.render
+    config:
+      slug: still
+      render_mode: still_loop
+""",
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(orchestrator, "ROOT", tmp_path)
+    monkeypatch.setenv("PIPELINE_ENABLED", "true")
+
+    try:
+        orchestrator.run_pipeline(pipeline_path, "run_still_no_image")
+    except ValueError as exc:
+        assert "image_path" in str(exc)
+    else:
+        raise AssertionError("Expected ValueError for still_loop without image_path")
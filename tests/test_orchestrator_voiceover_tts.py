@@ -184,3 +184,51 @@ steps:
         assert "script_path" in str(exc)
     else:
         raise AssertionError("Expected ValueError for script_path traversal")
+
+
+def test_orchestrator_voiceover_tts_segment_unit_records_timings(tmp_path, monkeypatch):
+    script_path = tmp_path / "scripts" / "voiceover.txt"
+    script_path.parent.mkdir(parents=True, exist_ok=True)
+    script_path.write_text("First paragraph.\n\nSecond paragraph.\n", encoding="utf-8")
+
+    pipeline_path = tmp_path / "pipeline.yml"
+    pipeline_path.write_text(
+        """pipeline: voiceover_tts_segments
+steps:
+  - id: voiceover_step
+    uses: voiceover.tts
+    config:
+      slug: segments
+      script_path: scripts/voiceover.txt
+      segment_unit: paragraph
+      tts_workers: 2
+""",
+        encoding="utf-8",
+    )
+
+    monkeypatch.setattr(orchestrator, "ROOT", tmp_path)
+    monkeypatch.setenv("PIPELINE_ENABLED", "true")
+
+    orchestrator.run_pipeline(pipeline_path, "run_segments")
+
+    summary = json.loads(
+        (
+            tmp_path
+            / "output"
+            / "run_segments"
+            / "artifacts"
+            / "voiceover_summary.json"
+        ).read_text(encoding="utf-8")
+    )
+    metadata = json.loads(
+        (tmp_path / summary["metadata_path"]).read_text(encoding="utf-8")
+    )
+    assert [s["end_seconds"] for s in metadata["segments"]] == [1.0, 2.0]
+    assert metadata["duration_seconds"] == 2.0
+
+    # เสียงถูกแคชทีละย่อหน้า: แก้ย่อหน้าเดียวแล้วรันใหม่ เพิ่มแคชเพียง 1 segment
+    cache_dir = tmp_path / "data" / "tts_cache"
+    assert len(list(cache_dir.glob("*/*.pcm"))) == 2
+    script_path.write_text("First paragraph.\n\nEdited paragraph.\n", encoding="utf-8")
+    orchestrator.run_pipeline(pipeline_path, "run_segments_edit")
+    assert len(list(cache_dir.glob("*/*.pcm"))) == 3
@@ -2,16 +2,22 @@
 
 หมายเหตุ: การทดสอบ concurrency
 - คิวใช้ os.O_CREAT | os.O_EXCL สำหรับ enqueue (ป้องกัน race condition)
-- dequeue_next มีการจัดการ FileNotFoundError (สำหรับ race condition)
-- ออกแบบสำหรับ single-worker execution
-- การรัน worker หลายตัวพร้อมกันไม่แนะนำ แต่จะไม่ทำให้เกิด data corruption
-- ถ้าต้องการ parallel processing ให้ใช้ external locking (เช่น flock)
+- dequeue_next claim งานด้วยไฟล์ lease แบบ exclusive ก่อนย้ายไป running
+- งานที่ lease หมดอายุถูกคืนด้วย reap_expired (ทดสอบด้วยการส่ง now ล่วงหน้า)
 """
 
 from datetime import UTC, datetime, timedelta
 from pathlib import Path
 
-from automation_core.queue import FileQueue, JobError, JobSpec
+import pytest
+
+from automation_core.queue import (
+    FileQueue,
+    JobError,
+    JobSpec,
+    LeaseLostError,
+    parse_class_limits,
+)
 
 
 def _utc_iso(value: datetime) -> str:
@@ -148,3 +154,185 @@ def test_enqueue_dry_run_mode(tmp_path: Path):
 
     # enqueue จริงอีกครั้ง ก็ควรคืน False
     assert queue.enqueue(job, dry_run=False) is False
+
+
+def test_dequeue_writes_lease_owned_by_worker(tmp_path: Path):
+    queue = FileQueue(tmp_path / "queue", worker_id="worker-a")
+    now = datetime(2026, 1, 1, 0, 0, tzinfo=UTC)
+    queue.enqueue(_build_job("job-001", now, "run_001"))
+
+    item = queue.dequeue_next()
+    assert item is not None
+    lease_path = queue.running_dir / f"{item.filename}.lease"
+    assert lease_path.exists()
+    queue.heartbeat(item)
+
+    # worker อื่นไม่สามารถปิดงานที่ตนไม่ได้ถือ lease
+    other = FileQueue(tmp_path / "queue", worker_id="worker-b")
+    with pytest.raises(LeaseLostError):
+        other.mark_done(item)
+
+    queue.mark_done(item)
+    assert not lease_path.exists()
+    assert (queue.done_dir / item.filename).exists()
+
+
+def test_reap_expired_returns_job_to_pending_then_fails(tmp_path: Path):
+    queue = FileQueue(tmp_path / "queue", lease_ttl_seconds=60, max_attempts=2)
+    now = datetime(2026, 1, 1, 0, 0, tzinfo=UTC)
+    queue.enqueue(_build_job("job-001", now, "run_001"))
+    later = datetime.now(UTC) + timedelta(minutes=5)
+
+    first = queue.dequeue_next()
+    assert first is not None
+    # lease ยังไม่หมดอายุ จึงไม่ถูก reap
+    assert queue.reap_expired() == []
+
+    reaped = queue.reap_expired(now=later)
+    assert [item.job_id for item in reaped] == ["job-001"]
+    pending = queue.list_pending()
+    assert len(pending) == 1
+    assert pending[0].job is not None
+    assert pending[0].job.status == "pending"
+    assert pending[0].job.attempts == 1
+    assert pending[0].job.last_error is not None
+    assert pending[0].job.last_error.code == "lease_expired"
+    assert list(queue.running_dir.iterdir()) == []
+
+    # worker เดิมที่ถูก reap ไปแล้วปิดงานไม่ได้
+    with pytest.raises(LeaseLostError):
+        queue.mark_done(first)
+
+    second = queue.dequeue_next()
+    assert second is not None
+    assert second.job is not None
+    assert second.job.attempts == 2
+    reaped = queue.reap_expired(now=later)
+    assert [item.path.parent for item in reaped] == [queue.failed_dir]
+    assert reaped[0].job is not None
+    assert reaped[0].job.status == "failed"
+    assert queue.list_pending() == []
+
+
+def test_dequeue_skips_job_claimed_by_other_worker(tmp_path: Path):
+    queue = FileQueue(tmp_path / "queue", worker_id="worker-a")
+    now = datetime(2026, 1, 1, 0, 0, tzinfo=UTC)
+    queue.enqueue(_build_job("job-early", now, "run_early"))
+    queue.enqueue(_build_job("job-late", now + timedelta(minutes=1), "run_late"))
+    early = queue.list_pending()[0]
+    # จำลอง worker อื่นที่สร้าง lease แล้วแต่ยังย้ายไฟล์ไม่เสร็จ
+    queue.running_dir.mkdir(parents=True, exist_ok=True)
+    (queue.running_dir / f"{early.filename}.lease").write_text("{}", encoding="utf-8")
+
+    item = queue.dequeue_next()
+
+    assert item is not None
+    assert item.job_id == "job-late"
+    # lease ที่ไม่มีไฟล์งานคู่กันและอ่านไม่ได้จะถูกล้างเมื่อ reap
+    queue.reap_expired()
+    assert [i.job_id for i in queue.list_pending()] == ["job-early"]
+    assert queue.dequeue_next() is not None
+
+
+def test_dequeue_parses_only_selected_job(tmp_path: Path, monkeypatch):
+    queue = FileQueue(tmp_path / "queue")
+    now = datetime(2026, 1, 1, 0, 0, tzinfo=UTC)
+    for i in range(5):
+        queue.enqueue(_build_job(f"job-{i}", now + timedelta(minutes=i), f"run_{i}"))
+    loaded: list[str] = []
+    original = FileQueue._load_job
+
+    def _counting_load(self: FileQueue, path: Path) -> JobSpec | None:
+        loaded.append(path.name)
+        return original(self, path)
+
+    monkeypatch.setattr(FileQueue, "_load_job", _counting_load)
+
+    peeked = queue.peek_next()
+    item = queue.dequeue_next()
+
+    assert peeked is not None and peeked.job_id == "job-0"
+    assert item is not None and item.job_id == "job-0"
+    assert item.job is not None and item.job.attempts == 1
+    assert loaded == [peeked.filename, item.filename]
+
+
+def test_exists_uses_index_and_rebuilds_for_legacy_queue(tmp_path: Path):
+    queue_dir = tmp_path / "queue"
+    now = datetime(2026, 1, 1, 0, 0, tzinfo=UTC)
+    queue = FileQueue(queue_dir)
+    queue.enqueue(_build_job("job-done", now, "run_done"))
+    item = queue.dequeue_next()
+    assert item is not None
+    queue.mark_done(item)
+    assert (queue.index_dir / "job-done").exists()
+
+    # คิวจากเวอร์ชันก่อนไม่มี index: สร้างจากไฟล์งานเมื่อเรียก exists ครั้งแรก
+    for marker in queue.index_dir.iterdir():
+        marker.unlink()
+    legacy = FileQueue(queue_dir)
+    assert legacy.exists("job-done") is True
+    assert legacy.exists("job-missing") is False
+    assert legacy.enqueue(_build_job("job-done", now, "run_done")) is False
+
+    # ลบงานใน done ด้วยมือแล้ว rebuild_index เพื่อให้ enqueue ใหม่ได้
+    (legacy.done_dir / item.filename).unlink()
+    assert legacy.rebuild_index() == 0
+    assert legacy.enqueue(_build_job("job-done", now, "run_done")) is True
+
+
+def test_enqueue_many_matches_sequential_enqueue(tmp_path: Path):
+    queue = FileQueue(tmp_path / "queue")
+    now = datetime(2026, 1, 1, 0, 0, tzinfo=UTC)
+    existing = _build_job("job-existing", now, "run_existing")
+    queue.enqueue(existing)
+    jobs = [
+        _build_job("job-a", now, "run_a"),
+        existing,
+        _build_job("job-b", now + timedelta(minutes=1), "run_b"),
+        _build_job("job-a", now, "run_a"),
+    ]
+
+    assert queue.enqueue_many(jobs, dry_run=True) == [True, False, True, True]
+    assert len(queue.list_pending()) == 1
+    assert queue.enqueue_many(jobs) == [True, False, True, False]
+    assert [item.job_id for item in queue.list_pending()] == [
+        "job-a",
+        "job-existing",
+        "job-b",
+    ]
+
+
+def test_tagged_filename_and_class_limit_counts_pending_claims(tmp_path: Path):
+    queue = FileQueue(tmp_path / "queue")
+    now = datetime(2026, 1, 1, 0, 0, tzinfo=UTC)
+    job = _build_job("job-render", now, "run_render")
+    queue.enqueue(job.model_copy(update={"priority": 2, "concurrency_class": "render"}))
+    queue.enqueue(_build_job("job-other", now, "run_other"))
+
+    tagged = queue.list_pending()[1]
+    assert tagged.filename == "20260101T000000Z_job-render@2@render.json"
+    assert tagged.job_id == "job-render"
+    assert queue.exists("job-render") is True
+    # lease ของงาน render ที่ worker อื่นกำลัง claim นับรวมใน limit ด้วย
+    queue.running_dir.mkdir(parents=True, exist_ok=True)
+    claiming = queue.running_dir / "20251231T235900Z_job-x@0@render.json.lease"
+    claiming.write_text("{}", encoding="utf-8")
+
+    assert queue.dequeue_next(class_limits={"render": 1}).job_id == "job-other"
+    claiming.unlink()
+    item = queue.dequeue_next(class_limits={"render": 1})
+    assert item is not None and item.job_id == "job-render"
+    assert item.job is not None and item.job.priority == 2
+
+
+def test_parse_class_limits():
+    assert parse_class_limits("render: 1, upload=2,light:8") == {
+        "render": 1,
+        "upload": 2,
+        "light": 8,
+    }
+    assert parse_class_limits("") == {}
+    for bad in ("render", "render=x", "render=-1", "bad name=1"):
+        with pytest.raises(ValueError):
+            parse_class_limits(bad)
@@ -0,0 +1,98 @@
+"""ทดสอบ compaction/retention ของ done/ และ failed/ ในคิวไฟล์"""
+
+import gzip
+import json
+import os
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+from automation_core.queue import FileQueue, JobError, JobSpec
+from automation_core.queue_archive import compact_queue
+
+
+def _utc_iso(value: datetime) -> str:
+    return value.astimezone(UTC).isoformat().replace("+00:00", "Z")
+
+
+def _build_job(job_id: str, scheduled_for: datetime) -> JobSpec:
+    return JobSpec(
+        schema_version="v1",
+        job_id=job_id,
+        created_at=_utc_iso(scheduled_for),
+        scheduled_for=_utc_iso(scheduled_for),
+        pipeline_path="pipeline.web.yml",
+        run_id=f"run_{job_id}",
+        params=None,
+        status="pending",
+        attempts=0,
+        last_error=None,
+    )
+
+
+def _finish(queue: FileQueue, failed: bool = False) -> Path:
+    item = queue.dequeue_next()
+    assert item is not None
+    if failed:
+        return queue.mark_failed(item, JobError(code="test_error", message="fail")).path
+    return queue.mark_done(item).path
+
+
+def _age(path: Path, days: int) -> None:
+    stamp = (datetime.now(UTC) - timedelta(days=days)).timestamp()
+    os.utime(path, (stamp, stamp))
+
+
+def test_compact_archives_old_jobs_and_keeps_idempotency(tmp_path: Path):
+    queue = FileQueue(tmp_path / "queue")
+    day1 = datetime(2026, 1, 1, 9, 0, tzinfo=UTC)
+    day2 = datetime(2026, 1, 2, 9, 0, tzinfo=UTC)
+    queue.enqueue(_build_job("job-old-done", day1))
+    queue.enqueue(_build_job("job-old-failed", day2))
+    queue.enqueue(_build_job("job-recent", day2 + timedelta(hours=1)))
+    _age(_finish(queue), days=10)
+    _age(_finish(queue, failed=True), days=10)
+    recent = _finish(queue)
+
+    report = compact_queue(queue, older_than=timedelta(days=7))
+
+    assert report.archived == 2
+    assert report.partitions == ["20260101", "20260102"]
+    assert list(queue.failed_dir.iterdir()) == []
+    assert [p.name for p in queue.done_dir.iterdir()] == [recent.name]
+    assert not (queue.index_dir / "job-old-done").exists()
+    with gzip.open(queue.queue_dir / "archive" / "20260102.jsonl.gz", "rt") as f:
+        records = [json.loads(line) for line in f]
+    assert records[0]["state"] == "failed"
+    assert records[0]["job"]["last_error"]["code"] == "test_error"
+
+    # งานที่ถูก archive แล้วยัง enqueue ซ้ำไม่ได้ รวมถึงจาก instance ใหม่
+    fresh = FileQueue(tmp_path / "queue")
+    assert fresh.exists("job-old-done") is True
+    assert fresh.enqueue(_build_job("job-old-failed", day2)) is False
+    assert fresh.exists("job-unknown") is False
+
+    # รอบที่สองต่อท้าย partition เดิมเป็น gzip member ใหม่
+    _age(recent, days=10)
+    assert compact_queue(fresh, older_than=timedelta(days=7)).archived == 1
+    with gzip.open(queue.queue_dir / "archive" / "20260102.jsonl.gz", "rt") as f:
+        assert len(f.readlines()) == 2
+
+
+def test_retention_purges_old_partitions_only(tmp_path: Path):
+    queue = FileQueue(tmp_path / "queue")
+    today = datetime.now(UTC).replace(hour=0, minute=0, second=0, microsecond=0)
+    old_day = today - timedelta(days=100)
+    new_day = today - timedelta(days=10)
+    queue.enqueue(_build_job("job-old", old_day))
+    queue.enqueue(_build_job("job-new", new_day))
+    _finish(queue)
+    _finish(queue)
+
+    report = compact_queue(queue, older_than=timedelta(0), retention=timedelta(days=60))
+
+    assert report.archived == 2
+    assert report.purged_partitions == [old_day.strftime("%Y%m%d")]
+    archives = sorted(p.name for p in (queue.queue_dir / "archive").glob("*.gz"))
+    assert archives == [f"{new_day.strftime('%Y%m%d')}.jsonl.gz"]
+    # job_id ของ partition ที่ถูกลบยังกันการ enqueue ซ้ำ
+    assert queue.exists("job-old") is True
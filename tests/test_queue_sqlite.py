@@ -0,0 +1,281 @@
+"""ทดสอบ backend คิวบน SQLite และการนำเข้าจากคิวไฟล์"""
+
+import importlib.util
+import sqlite3
+import threading
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from types import ModuleType
+
+import pytest
+
+from automation_core.queue import FileQueue, JobError, JobSpec, LeaseLostError
+from automation_core.queue_archive import compact_queue
+from automation_core.queue_sqlite import SQLiteQueue, migrate_file_queue
+
+
+def _utc_iso(value: datetime) -> str:
+    return value.astimezone(UTC).isoformat().replace("+00:00", "Z")
+
+
+def _build_job(
+    job_id: str, scheduled_for: datetime, pipeline_path: str = "pipeline.web.yml"
+) -> JobSpec:
+    return JobSpec(
+        schema_version="v1",
+        job_id=job_id,
+        created_at=_utc_iso(datetime.now(UTC)),
+        scheduled_for=_utc_iso(scheduled_for),
+        pipeline_path=pipeline_path,
+        run_id=f"run_{job_id}",
+        params={"topic_seed": "เมตตา"},
+        status="pending",
+        attempts=0,
+        last_error=None,
+    )
+
+
+def _load_runner() -> ModuleType:
+    runner_path = Path(__file__).parent.parent / "scripts" / "scheduler_runner.py"
+    spec = importlib.util.spec_from_file_location("scheduler_runner", runner_path)
+    module = importlib.util.module_from_spec(spec)
+    assert spec.loader is not None
+    spec.loader.exec_module(module)
+    return module
+
+
+NOW = datetime(2026, 1, 1, 0, 0, tzinfo=UTC)
+
+
+def test_sqlite_queue_matches_file_queue_semantics(tmp_path: Path):
+    queue = SQLiteQueue(tmp_path / "queue", worker_id="worker-a")
+    assert queue.enqueue(_build_job("job-late", NOW + timedelta(minutes=5))) is True
+    assert queue.enqueue(_build_job("job-early", NOW)) is True
+    assert queue.enqueue(_build_job("job-early", NOW)) is False
+    assert queue.enqueue(_build_job("job-new", NOW), dry_run=True) is True
+    assert queue.exists("job-new") is False
+
+    assert [item.job_id for item in queue.list_pending()] == ["job-early", "job-late"]
+    first = queue.dequeue_next()
+    assert first is not None and first.job is not None
+    assert first.filename == "20260101T000000Z_job-early.json"
+    assert first.job.status == "running"
+    assert first.job.attempts == 1
+    assert first.job.params == {"topic_seed": "เมตตา"}
+
+    other = SQLiteQueue(tmp_path / "queue", worker_id="worker-b")
+    with pytest.raises(LeaseLostError):
+        other.mark_done(first)
+    done = queue.mark_done(first)
+    assert done.job is not None and done.job.status == "done"
+
+    second = queue.dequeue_next()
+    assert second is not None
+    failed = queue.mark_failed(second, JobError(code="test_error", message="fail"))
+    assert failed.job is not None
+    assert failed.job.last_error == JobError(code="test_error", message="fail")
+    assert queue.dequeue_next() is None
+    # ห้าม enqueue ซ้ำ แม้งานจะอยู่ใน done/failed แล้ว
+    assert queue.enqueue(_build_job("job-late", NOW + timedelta(minutes=5))) is False
+
+
+def test_concurrent_dequeue_claims_each_job_once(tmp_path: Path):
+    queue_dir = tmp_path / "queue"
+    seed = SQLiteQueue(queue_dir)
+    for i in range(20):
+        seed.enqueue(_build_job(f"job-{i:02d}", NOW + timedelta(minutes=i)))
+    claimed: list[str] = []
+    lock = threading.Lock()
+
+    def _worker(name: str) -> None:
+        queue = SQLiteQueue(queue_dir, worker_id=name)
+        while (item := queue.dequeue_next()) is not None:
+            with lock:
+                claimed.append(item.job_id)
+            queue.mark_done(item)
+
+    threads = [threading.Thread(target=_worker, args=(f"w{i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(claimed) == [f"job-{i:02d}" for i in range(20)]
+    assert seed.count_jobs(status="done") == 20
+
+
+def test_reap_expired_and_count_jobs(tmp_path: Path):
+    queue = SQLiteQueue(tmp_path / "queue", lease_ttl_seconds=60, max_attempts=2)
+    queue.enqueue(_build_job("job-001", NOW))
+    queue.enqueue(_build_job("job-002", NOW, pipeline_path="pipeline.other.yml"))
+    later = datetime.now(UTC) + timedelta(minutes=5)
+
+    first = queue.dequeue_next()
+    assert first is not None
+    queue.heartbeat(first)
+    assert queue.reap_expired() == []
+    reaped = queue.reap_expired(now=later)
+    assert [item.job_id for item in reaped] == ["job-001"]
+    assert reaped[0].job is not None
+    assert reaped[0].job.status == "pending"
+    assert reaped[0].job.last_error is not None
+    assert reaped[0].job.last_error.code == "lease_expired"
+    with pytest.raises(LeaseLostError):
+        queue.heartbeat(first)
+
+    assert queue.dequeue_next() is not None
+    reaped = queue.reap_expired(now=later)
+    assert reaped[0].job is not None
+    assert reaped[0].job.status == "failed"
+
+    assert queue.count_jobs(status="failed", pipeline_path="pipeline.web.yml") == 1
+    assert queue.count_jobs(status="pending") == 1
+    assert queue.count_jobs(scheduled_since=NOW + timedelta(days=1)) == 0
+
+
+def test_migrate_file_queue_imports_all_states(tmp_path: Path):
+    queue_dir = tmp_path / "queue"
+    files = FileQueue(queue_dir)
+    files.enqueue(_build_job("job-done", NOW))
+    files.enqueue(_build_job("job-running", NOW + timedelta(minutes=1)))
+    files.enqueue(_build_job("job-pending", NOW + timedelta(minutes=2)))
+    files.mark_done(files.dequeue_next())
+    running = files.dequeue_next()
+    assert running is not None
+    (files.pending_dir / "20260101T000300Z_job-broken.json").write_text(
+        "{", encoding="utf-8"
+    )
+
+    target = SQLiteQueue(queue_dir, worker_id=files.worker_id)
+    report = migrate_file_queue(queue_dir, target)
+
+    assert report.imported == 3
+    assert report.invalid == ["pending/20260101T000300Z_job-broken.json"]
+    assert [item.job_id for item in target.list_pending()] == ["job-pending"]
+    assert target.count_jobs(status="done") == 1
+    # งานใน running ย้ายมาพร้อม lease เดิม จึงปิดงานต่อได้ด้วย worker เดิม
+    assert target.mark_done(running).job is not None
+    assert migrate_file_queue(queue_dir, target).skipped == 3
+
+
+def test_migrate_file_queue_keeps_archived_job_ids(tmp_path: Path):
+    queue_dir = tmp_path / "queue"
+    files = FileQueue(queue_dir)
+    files.enqueue(_build_job("job-archived", NOW))
+    files.mark_done(files.dequeue_next())
+    compact_queue(files, older_than=timedelta(0), now=datetime.now(UTC) + timedelta(1))
+    assert list(files.done_dir.iterdir()) == []
+
+    target = SQLiteQueue(queue_dir)
+    report = migrate_file_queue(queue_dir, target)
+
+    assert (report.imported, report.archived) == (0, 1)
+    assert target.exists("job-archived") is True
+    assert target.enqueue(_build_job("job-archived", NOW)) is False
+    assert target.enqueue_many(
+        [_build_job("job-archived", NOW), _build_job("job-new", NOW)], dry_run=True
+    ) == [False, True]
+    assert target.count_jobs() == 0
+    assert migrate_file_queue(queue_dir, target).archived == 1
+
+
+def test_worker_runs_job_from_sqlite_backend(tmp_path: Path, monkeypatch):
+    runner = _load_runner()
+    monkeypatch.setenv("PIPELINE_ENABLED", "true")
+    monkeypatch.setenv("WORKER_ENABLED", "true")
+    monkeypatch.setenv("YOUTUBE_UPLOAD_ENABLED", "false")
+    SQLiteQueue(tmp_path / "queue").enqueue(_build_job("job-001", NOW))
+    calls: list[str] = []
+
+    summary = runner.run_worker(
+        queue_dir="queue",
+        dry_run=False,
+        base_dir=tmp_path,
+        pipeline_runner=lambda _path, run_id: calls.append(run_id),
+        backend="sqlite",
+    )
+
+    assert summary is not None
+    assert summary["decision"] == "done"
+    assert calls == ["run_job-001"]
+    assert SQLiteQueue(tmp_path / "queue").count_jobs(status="done") == 1
+
+
+def test_sqlite_enqueue_many_reports_per_job_outcomes(tmp_path: Path):
+    queue = SQLiteQueue(tmp_path / "queue")
+    queue.enqueue(_build_job("job-existing", NOW))
+    jobs = [
+        _build_job("job-a", NOW),
+        _build_job("job-existing", NOW),
+        _build_job("job-a", NOW),
+    ]
+
+    assert queue.enqueue_many(jobs, dry_run=True) == [True, False, True]
+    assert queue.enqueue_many(jobs) == [True, False, False]
+    assert queue.count_jobs(status="pending") == 2
+
+
+def test_dequeue_due_before_skips_future_jobs(tmp_path: Path):
+    for queue in (FileQueue(tmp_path / "files"), SQLiteQueue(tmp_path / "sqlite")):
+        assert queue.next_scheduled_at() is None
+        queue.enqueue(_build_job("job-later", NOW + timedelta(minutes=5)))
+        queue.enqueue(_build_job("job-now", NOW))
+
+        assert queue.next_scheduled_at() == NOW
+        first = queue.dequeue_next(due_before=NOW + timedelta(seconds=59))
+        assert first is not None and first.job_id == "job-now"
+        assert queue.dequeue_next(due_before=NOW + timedelta(minutes=1)) is None
+        assert queue.next_scheduled_at() == NOW + timedelta(minutes=5)
+        assert queue.dequeue_next() is not None
+
+
+def test_dequeue_prefers_priority_and_respects_class_limits(tmp_path: Path):
+    def _tagged(job_id: str, minutes: int, priority: int, cls: str | None) -> JobSpec:
+        job = _build_job(job_id, NOW + timedelta(minutes=minutes))
+        return job.model_copy(update={"priority": priority, "concurrency_class": cls})
+
+    for queue in (FileQueue(tmp_path / "files"), SQLiteQueue(tmp_path / "sqlite")):
+        queue.enqueue(_tagged("job-render-1", 0, 0, "render"))
+        queue.enqueue(_tagged("job-render-2", 1, 0, "render"))
+        queue.enqueue(_tagged("job-plain", 2, 0, None))
+        queue.enqueue(_tagged("job-upload", 3, 5, "upload"))
+        limits = {"render": 1, "upload": 0}
+
+        assert queue.peek_next().job_id == "job-upload"
+        first = queue.dequeue_next(class_limits=limits)
+        assert first is not None and first.job_id == "job-render-1"
+        assert first.job is not None and first.job.concurrency_class == "render"
+        # render เต็ม และ upload ถูกหยุดไว้ จึงได้งานที่ไม่มี class
+        assert queue.dequeue_next(class_limits=limits).job_id == "job-plain"
+        assert queue.dequeue_next(class_limits=limits) is None
+
+        queue.mark_done(first)
+        assert queue.dequeue_next(class_limits=limits).job_id == "job-render-2"
+        assert queue.dequeue_next().job_id == "job-upload"
+
+
+def test_sqlite_adds_priority_columns_to_existing_database(tmp_path: Path):
+    queue_dir = tmp_path / "queue"
+    queue_dir.mkdir()
+    with sqlite3.connect(queue_dir / "queue.sqlite3") as conn:
+        conn.execute(
+            "CREATE TABLE jobs (job_id TEXT PRIMARY KEY, filename TEXT NOT NULL,"
+            " schema_version TEXT NOT NULL, created_at TEXT NOT NULL,"
+            " scheduled_for TEXT NOT NULL, scheduled_for_utc TEXT NOT NULL,"
+            " pipeline_path TEXT NOT NULL, run_id TEXT NOT NULL, params TEXT,"
+            " status TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0,"
+            " last_error_code TEXT, last_error_message TEXT, lease_owner TEXT,"
+            " lease_expires_at REAL, updated_at REAL NOT NULL)"
+        )
+        conn.execute(
+            "INSERT INTO jobs VALUES ('job-old', '20260101T000000Z_job-old.json',"
+            " 'v1', '2026-01-01T00:00:00Z', '2026-01-01T00:00:00Z',"
+            " '20260101T000000Z', 'pipeline.web.yml', 'run_job-old', NULL,"
+            " 'pending', 0, NULL, NULL, NULL, NULL, 0)"
+        )
+
+    queue = SQLiteQueue(queue_dir)
+    item = queue.dequeue_next(class_limits={"render": 1})
+    assert item is not None and item.job is not None
+    assert item.job.priority == 0
+    assert item.job.concurrency_class is None
@@ -0,0 +1,53 @@
+"""ทดสอบตัวเฝ้าโฟลเดอร์ pending/ ที่ใช้ปลุก worker daemon"""
+
+import threading
+import time
+from pathlib import Path
+
+from automation_core.queue_watch import (
+    InotifyWatcher,
+    PollingWatcher,
+    QueueWaker,
+    open_watcher,
+)
+
+
+def test_open_watcher_reports_new_files(tmp_path: Path):
+    pending = tmp_path / "pending"
+    for use_inotify in (True, False):
+        watcher = open_watcher(pending, poll_interval=0.01, use_inotify=use_inotify)
+        try:
+            if use_inotify and not isinstance(watcher, InotifyWatcher):
+                continue
+            assert watcher.wait(0.05) is False
+            name = "inotify" if use_inotify else "poll"
+            (pending / f"20260101T000000Z_{name}.json").write_text("{}")
+            assert watcher.wait(2) is True
+            assert watcher.wait(0.05) is False
+        finally:
+            watcher.close()
+
+
+def test_polling_watcher_skips_until_interval(tmp_path: Path):
+    watcher = PollingWatcher(tmp_path, interval=0.2)
+    (tmp_path / "job.json").write_text("{}")
+
+    started = time.monotonic()
+    assert watcher.wait(0.05) is False
+    assert watcher.wait(1) is True
+    assert time.monotonic() - started >= 0.15
+
+
+def test_queue_waker_relays_notify_and_stop(tmp_path: Path):
+    stop = threading.Event()
+    with QueueWaker(PollingWatcher(tmp_path, interval=0.01), stop) as waker:
+        assert waker.wait(0.05) is False
+        waker.notify()
+        assert waker.wait(0) is True
+        stop.set()
+        assert waker.wait(5) is True
+
+
+def test_queue_waker_without_watcher_times_out():
+    with QueueWaker(None, threading.Event()) as waker:
+        assert waker.wait(0.05) is False
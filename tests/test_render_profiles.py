@@ -0,0 +1,33 @@
+"""ทดสอบโปรไฟล์การเข้ารหัสของ video.render"""
+
+from __future__ import annotations
+
+import pytest
+
+from automation_core.render_profiles import RENDER_PROFILES, get_render_profile
+
+
+def test_render_profile_args_map_to_ffmpeg_flags():
+    draft = get_render_profile("draft")
+
+    assert draft.video_args() == [
+        "-preset",
+        "ultrafast",
+        "-crf",
+        "35",
+        "-maxrate",
+        "1M",
+        "-bufsize",
+        "2M",
+        "-threads",
+        "0",
+    ]
+    assert draft.audio_args() == ["-b:a", "64k"]
+    assert (draft.resolution, draft.fps) == ("854x480", 15)
+    assert get_render_profile("shorts").resolution == "1080x1920"
+    assert set(RENDER_PROFILES) == {"draft", "publish", "shorts"}
+
+
+def test_unknown_render_profile_lists_choices():
+    with pytest.raises(ValueError, match="draft, publish, shorts"):
+        get_render_profile("ultra")
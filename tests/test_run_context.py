@@ -0,0 +1,134 @@
+"""ทดสอบ RunContext และการส่งค่าประจำ run โดยไม่ผ่าน os.environ"""
+
+from __future__ import annotations
+
+import json
+import sys
+import threading
+from datetime import UTC, datetime
+from pathlib import Path
+
+import pytest
+
+from automation_core.run_context import (
+    RunContext,
+    activate_run_context,
+    current_run_context,
+)
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+import orchestrator
+
+PIPELINE = """pipeline: run_context_test
+steps:
+  - id: capture
+    uses: FakeCapture
+    output: capture.json
+"""
+
+FIXED_NOW = datetime(2026, 1, 2, 3, 4, 5, tzinfo=UTC)
+
+
+@pytest.fixture
+def pipeline_path(tmp_path, monkeypatch) -> Path:
+    monkeypatch.setattr(orchestrator, "ROOT", tmp_path)
+    monkeypatch.setenv("PIPELINE_ENABLED", "true")
+    monkeypatch.delenv("DHAMMA_TOPIC", raising=False)
+    monkeypatch.delenv("PIPELINE_PARAMS_JSON", raising=False)
+    path = tmp_path / "pipeline.yml"
+    path.write_text(PIPELINE, encoding="utf-8")
+    return path
+
+
+def _capture_agent(barrier: threading.Barrier | None = None):
+    def _capture(step, run_dir):
+        if barrier is not None:
+            barrier.wait()
+        context = current_run_context()
+        out = run_dir / step["output"]
+        orchestrator.write_json(
+            out,
+            {
+                "run_id": context.run_id,
+                "params": dict(context.params or {}),
+                "topic": context.topic,
+            },
+        )
+        return out
+
+    return _capture
+
+
+def test_concurrent_pipelines_get_isolated_params(tmp_path, pipeline_path, monkeypatch):
+    barrier = threading.Barrier(2, timeout=5)
+    monkeypatch.setitem(orchestrator.AGENTS, "FakeCapture", _capture_agent(barrier))
+
+    def _run(run_id: str, hook: str) -> None:
+        context = RunContext(
+            run_id=run_id, root_dir=tmp_path, params={"hook": hook}, topic=hook
+        )
+        orchestrator.run_pipeline(pipeline_path, run_id, context=context)
+
+    threads = [
+        threading.Thread(target=_run, args=("run_a", "A")),
+        threading.Thread(target=_run, args=("run_b", "B")),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for run_id, hook in (("run_a", "A"), ("run_b", "B")):
+        captured = json.loads(
+            (tmp_path / "output" / run_id / "capture.json").read_text(encoding="utf-8")
+        )
+        assert captured == {"run_id": run_id, "params": {"hook": hook}, "topic": hook}
+    assert current_run_context() is None
+
+
+def test_env_variables_remain_supported(tmp_path, pipeline_path, monkeypatch):
+    monkeypatch.setitem(orchestrator.AGENTS, "FakeCapture", _capture_agent())
+    monkeypatch.setenv("DHAMMA_TOPIC", "เมตตา")
+    monkeypatch.setenv("PIPELINE_PARAMS_JSON", json.dumps({"cta": "subscribe"}))
+
+    orchestrator.run_pipeline(pipeline_path, "run_env")
+
+    captured = json.loads(
+        (tmp_path / "output" / "run_env" / "capture.json").read_text(encoding="utf-8")
+    )
+    assert captured["topic"] == "เมตตา"
+    assert captured["params"] == {"cta": "subscribe"}
+
+
+def test_context_run_id_must_match(tmp_path, pipeline_path):
+    context = RunContext(run_id="other", root_dir=tmp_path)
+
+    with pytest.raises(ValueError, match="run_id mismatch"):
+        orchestrator.run_pipeline(pipeline_path, "run_x", context=context)
+
+
+def test_from_env_ignores_invalid_params_payload(tmp_path):
+    context = RunContext.from_env(
+        "run_1", tmp_path, environ={"PIPELINE_PARAMS_JSON": "[1, 2]"}
+    )
+
+    assert context.params is None
+    assert context.topic is None
+    assert context.run_dir == tmp_path / "output" / "run_1"
+
+
+def test_generation_steps_use_run_clock(tmp_path):
+    captured = {}
+
+    def _generate(run_id, *, base_dir, checked_at=None):
+        captured["checked_at"] = checked_at
+        return {}, None
+
+    context = RunContext(run_id="run_1", root_dir=tmp_path, clock=lambda: FIXED_NOW)
+    with activate_run_context(context):
+        result = orchestrator._run_artifact_generation_step(
+            "run_1", tmp_path, _generate, "Fake"
+        )
+
+    assert result == "skipped"
+    assert captured["checked_at"] == FIXED_NOW
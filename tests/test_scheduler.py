@@ -1,14 +1,21 @@
 """ทดสอบการคัดเลือกงานตามแผนเวลา"""
 
 import hashlib
+import os
 from datetime import UTC, datetime, timedelta
 from pathlib import Path
 from zoneinfo import ZoneInfo
 
 import pytest
 
+from automation_core import scheduler
 from automation_core.queue import FileQueue
-from automation_core.scheduler import SchedulePlanError, schedule_due_jobs
+from automation_core.scheduler import (
+    SchedulePlanError,
+    load_compiled_plan,
+    load_schedule_plan,
+    schedule_due_jobs,
+)
 
 
 def _utc_iso(value: datetime) -> str:
@@ -321,3 +328,321 @@ def test_scheduler_dry_run_matches_actual_run(tmp_path: Path):
     assert len(result4.enqueued_job_ids) == 0
     assert len(result4.skipped_entries) == 1
     assert result4.skipped_entries[0].code == "already_enqueued"
+
+
+def test_scheduler_enqueues_large_plan_in_one_batch(tmp_path: Path, monkeypatch):
+    plan_path = tmp_path / "schedule_plan.yaml"
+    lines = ['schema_version: "v1"', 'timezone: "UTC"', "entries:"]
+    start = datetime(2026, 1, 1, 0, 0, tzinfo=UTC)
+    for i in range(300):
+        publish_at = (start + timedelta(minutes=i)).strftime("%Y-%m-%dT%H:%M")
+        lines += [f'  - publish_at: "{publish_at}"', '    pipeline_path: "p.yml"']
+    plan_path.write_text("\n".join(lines), encoding="utf-8")
+    queue = FileQueue(tmp_path / "queue")
+    queue.enqueue_many([])  # สร้างโฟลเดอร์และ index ก่อนนับการเรียก
+    calls: list[int] = []
+    original = FileQueue.enqueue_many
+
+    def _counting(self, jobs, dry_run=False):
+        calls.append(len(jobs))
+        return original(self, jobs, dry_run=dry_run)
+
+    monkeypatch.setattr(FileQueue, "enqueue_many", _counting)
+
+    def _schedule():
+        return schedule_due_jobs(
+            plan_path=plan_path,
+            queue=queue,
+            now_utc=start + timedelta(minutes=100),
+            window_minutes=24 * 60,
+            dry_run=False,
+            scheduler_enabled=True,
+        )
+
+    first = _schedule()
+    second = _schedule()
+
+    assert calls == [200, 200]
+    assert len(first.enqueued_job_ids) == 200
+    assert len(queue.list_pending()) == 200
+    assert [skip.code for skip in first.skipped_entries] == ["entry_not_due"] * 100
+    assert second.enqueued_job_ids == []
+    assert [skip.code for skip in second.skipped_entries[100:]] == [
+        "already_enqueued"
+    ] * 200
+
+
+def test_compiled_plan_cache_tracks_plan_changes(tmp_path: Path, monkeypatch):
+    plan_path = tmp_path / "schedule_plan.yaml"
+    cache_dir = tmp_path / "cache"
+    _write_plan(plan_path)
+    past = datetime(2025, 1, 1, tzinfo=UTC).timestamp()
+    os.utime(plan_path, (past, past))
+    compiled_calls: list[int] = []
+    original = scheduler.compile_schedule_plan
+
+    def _counting(plan):
+        compiled_calls.append(len(plan.entries))
+        return original(plan)
+
+    monkeypatch.setattr(scheduler, "compile_schedule_plan", _counting)
+    monkeypatch.setattr(scheduler, "_COMPILED_PLANS", {})
+
+    compiled = load_compiled_plan(plan_path, cache_dir)
+    assert load_compiled_plan(plan_path, cache_dir) is compiled
+    # process ใหม่ (หน่วยความจำว่าง) ใช้ cache บนดิสก์ได้โดยไม่ compile ซ้ำ
+    monkeypatch.setattr(scheduler, "_COMPILED_PLANS", {})
+    assert load_compiled_plan(plan_path, cache_dir) == compiled
+    assert compiled_calls == [3]
+
+    # แก้เนื้อหาโดยขนาดเท่าเดิมและ mtime เดิม ต้องยังเห็นการเปลี่ยนแปลง
+    plan_path.write_text(
+        plan_path.read_text(encoding="utf-8").replace("10:30", "11:30"),
+        encoding="utf-8",
+    )
+    os.utime(plan_path, (past, past))
+    changed = load_compiled_plan(plan_path, cache_dir)
+    assert compiled_calls == [3, 3]
+    assert changed.entries[-1].publish_at == "2026-01-01T11:30"
+
+
+def test_compiled_plan_stays_in_memory_while_plan_is_fresh(tmp_path: Path, monkeypatch):
+    plan_path = tmp_path / "schedule_plan.yaml"
+    cache_dir = tmp_path / "cache"
+    _write_plan(plan_path)  # mtime ใหม่: stamp ยังไม่น่าเชื่อ ต้องเทียบ sha256 ทุกรอบ
+    reads: list[Path] = []
+    writes: list[Path] = []
+    original_read = scheduler._read_compiled_cache
+    original_write = scheduler._write_compiled_cache
+
+    def _counting_read(path, plan_key):
+        reads.append(path)
+        return original_read(path, plan_key)
+
+    def _counting_write(path, plan_key, cached):
+        writes.append(path)
+        original_write(path, plan_key, cached)
+
+    monkeypatch.setattr(scheduler, "_read_compiled_cache", _counting_read)
+    monkeypatch.setattr(scheduler, "_write_compiled_cache", _counting_write)
+    monkeypatch.setattr(scheduler, "_COMPILED_PLANS", {})
+
+    compiled = load_compiled_plan(plan_path, cache_dir)
+    for _ in range(5):
+        assert load_compiled_plan(plan_path, cache_dir) is compiled
+
+    # อ่าน/เขียน cache บนดิสก์ครั้งเดียว รอบถัดไปใช้แผนในหน่วยความจำ
+    assert len(reads) == 1
+    assert len(writes) == 1
+
+
+def test_schedule_due_jobs_can_count_not_due_entries(tmp_path: Path, monkeypatch):
+    plan_path = tmp_path / "schedule_plan.yaml"
+    lines = ['schema_version: "v1"', 'timezone: "UTC"', "entries:"]
+    start = datetime(2026, 1, 1, 0, 0, tzinfo=UTC)
+    for i in range(50):
+        publish_at = (start + timedelta(hours=i)).strftime("%Y-%m-%dT%H:%M")
+        lines += [f'  - publish_at: "{publish_at}"', '    pipeline_path: "p.yml"']
+    plan_path.write_text("\n".join(lines), encoding="utf-8")
+    skips: list[str] = []
+    original_skip = scheduler.CompiledEntry.skip
+
+    def _counting_skip(self, code, message):
+        skips.append(code)
+        return original_skip(self, code, message)
+
+    monkeypatch.setattr(scheduler.CompiledEntry, "skip", _counting_skip)
+
+    result = schedule_due_jobs(
+        plan_path=plan_path,
+        queue=FileQueue(tmp_path / "queue"),
+        now_utc=start + timedelta(hours=10),
+        window_minutes=60,
+        dry_run=True,
+        scheduler_enabled=True,
+        report_not_due=False,
+    )
+
+    assert len(result.enqueued_job_ids) == 2
+    assert result.skipped_entries == []
+    assert result.not_due_count == 48
+    assert skips == []
+
+
+def test_compiled_plan_due_range_matches_linear_scan(tmp_path: Path):
+    plan_path = tmp_path / "schedule_plan.yaml"
+    lines = ['schema_version: "v1"', 'timezone: "Asia/Bangkok"', "entries:"]
+    start = datetime(2026, 1, 1, 0, 0, tzinfo=UTC)
+    # ใส่ entry ไม่เรียงเวลาและมีเวลาซ้ำ เพื่อตรวจการเรียงและขอบของช่วง
+    for i in [7, 3, 3, 9, 0, 5, 12, 1]:
+        publish_at = _utc_iso(start + timedelta(minutes=10 * i))
+        lines += [f'  - publish_at: "{publish_at}"', '    pipeline_path: "p.yml"']
+    lines += ['  - publish_at: "not-a-date"', '    pipeline_path: "p.yml"']
+    plan_path.write_text("\n".join(lines), encoding="utf-8")
+
+    compiled = load_compiled_plan(plan_path)
+    assert len(compiled.invalid) == 1
+    assert compiled.invalid[0].code == "job_invalid"
+    now = start + timedelta(minutes=30)
+    end = now + timedelta(minutes=40)
+    lo, hi = compiled.due_range(now, end)
+    expected = sorted(
+        _utc_iso(start + timedelta(minutes=10 * i))
+        for i in [7, 3, 3, 9, 0, 5, 12, 1]
+        if 30 <= 10 * i <= 70
+    )
+    assert [entry.scheduled_for for entry in compiled.entries[lo:hi]] == expected
+    assert len(load_schedule_plan(plan_path).entries) == 9
+
+
+def test_recurrence_matches_explicit_entries(tmp_path: Path):
+    explicit_path = tmp_path / "explicit.yaml"
+    explicit_path.write_text(
+        "\n".join(
+            [
+                'schema_version: "v1"',
+                'timezone: "Asia/Bangkok"',
+                "entries:",
+                '  - publish_at: "2026-01-01T10:00"',
+                '    pipeline_path: "pipeline.web.yml"',
+                '    run_id_prefix: "daily"',
+                '  - publish_at: "2026-01-02T10:00"',
+                '    pipeline_path: "pipeline.web.yml"',
+                '    run_id_prefix: "daily"',
+            ]
+        ),
+        encoding="utf-8",
+    )
+    recurring_path = tmp_path / "recurring.yaml"
+    recurring_path.write_text(
+        "\n".join(
+            [
+                'schema_version: "v1"',
+                'timezone: "Asia/Bangkok"',
+                "recurrences:",
+                "  - freq: daily",
+                '    times: ["10:00"]',
+                "    start: 2025-06-01",
+                '    pipeline_path: "pipeline.web.yml"',
+                '    run_id_prefix: "daily"',
+                "  - freq: daily",
+                "    times: [10:00]",
+                '    pipeline_path: "pipeline.web.yml"',
+            ]
+        ),
+        encoding="utf-8",
+    )
+    now_utc = datetime(2026, 1, 1, 2, 0, tzinfo=UTC)
+
+    def _schedule(plan_path: Path):
+        return schedule_due_jobs(
+            plan_path=plan_path,
+            queue=FileQueue(tmp_path / "queue"),
+            now_utc=now_utc,
+            window_minutes=36 * 60,
+            dry_run=True,
+            scheduler_enabled=True,
+        )
+
+    explicit = _schedule(explicit_path)
+    recurring = _schedule(recurring_path)
+
+    assert len(explicit.enqueued_job_ids) == 2
+    assert recurring.enqueued_job_ids == explicit.enqueued_job_ids
+    # times แบบไม่ใส่เครื่องหมายคำพูดถูก YAML อ่านเป็นตัวเลข จึงต้องเป็น job_invalid
+    assert [skip.code for skip in recurring.skipped_entries] == ["job_invalid"]
+
+
+def test_recurrence_honours_weekdays_count_and_exclusions(tmp_path: Path):
+    plan_path = tmp_path / "schedule_plan.yaml"
+    plan_path.write_text(
+        "\n".join(
+            [
+                'schema_version: "v1"',
+                'timezone: "UTC"',
+                "recurrences:",
+                "  - freq: weekly",
+                "    by_weekday: [mon, wed]",
+                '    times: ["18:00", "09:00"]',
+                "    start: 2026-01-05",
+                "    count: 7",
+                '    exclude: ["2026-01-07", "2026-01-12T18:00"]',
+                '    timezone: "Asia/Bangkok"',
+                '    pipeline_path: "pipeline.web.yml"',
+            ]
+        ),
+        encoding="utf-8",
+    )
+
+    compiled = load_compiled_plan(plan_path)
+    occurrences = compiled.recurrences[0].expand(
+        datetime(2026, 1, 1, tzinfo=UTC),
+        datetime(2026, 3, 1, tzinfo=UTC),
+        ZoneInfo("UTC"),
+    )
+
+    # count นับรวมรายการที่ถูก exclude (แบบ EXDATE) จึงจบที่ 14 ม.ค. 09:00
+    assert [item.publish_at for item in occurrences] == [
+        "2026-01-05T09:00+07:00",
+        "2026-01-05T18:00+07:00",
+        "2026-01-12T09:00+07:00",
+        "2026-01-14T09:00+07:00",
+    ]
+    assert occurrences[0].scheduled_for == "2026-01-05T02:00:00Z"
+    assert (
+        compiled.recurrences[0].expand(
+            datetime(2026, 1, 20, tzinfo=UTC),
+            datetime(2026, 1, 21, tzinfo=UTC),
+            ZoneInfo("UTC"),
+        )
+        == []
+    )
+
+
+def test_schedule_entries_carry_priority_and_concurrency_class(tmp_path: Path):
+    plan_path = tmp_path / "schedule_plan.yaml"
+    plan_path.write_text(
+        "\n".join(
+            [
+                'schema_version: "v1"',
+                'timezone: "Asia/Bangkok"',
+                "entries:",
+                '  - publish_at: "2026-01-01T10:00"',
+                '    pipeline_path: "pipeline.web.yml"',
+                "    priority: 5",
+                "    concurrency_class: render",
+                '  - publish_at: "2026-01-01T10:00"',
+                '    pipeline_path: "pipeline.web.yml"',
+                '    concurrency_class: "bad class"',
+                "recurrences:",
+                "  - freq: daily",
+                '    times: ["10:05"]',
+                '    pipeline_path: "pipeline.web.yml"',
+                "    concurrency_class: upload",
+            ]
+        ),
+        encoding="utf-8",
+    )
+    queue = FileQueue(tmp_path / "queue")
+    now_utc = datetime(2026, 1, 1, 3, 0, tzinfo=UTC)
+
+    result = schedule_due_jobs(
+        plan_path=plan_path,
+        queue=queue,
+        now_utc=now_utc,
+        window_minutes=10,
+        dry_run=False,
+        scheduler_enabled=True,
+        created_at_utc=now_utc,
+    )
+
+    assert [skip.code for skip in result.skipped_entries] == ["job_invalid"]
+    jobs = {item.job.concurrency_class: item.job for item in queue.list_pending()}
+    assert jobs["render"].priority == 5
+    assert jobs["upload"].priority == 0
+    # priority/class ไม่อยู่ใน seed ของ job_id จึงเปลี่ยนค่าได้โดย id เดิม
+    plain = scheduler.ScheduleEntry(
+        publish_at="2026-01-01T10:00", pipeline_path="pipeline.web.yml"
+    )
+    job_id, _ = scheduler.build_job_identity(plain, now_utc, ZoneInfo("Asia/Bangkok"))
+    assert jobs["render"].job_id == job_id
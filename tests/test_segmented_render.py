@@ -0,0 +1,82 @@
+"""ทดสอบการวางแผนช่วงและการหาช่วงเงียบของ segmented_render"""
+
+from __future__ import annotations
+
+import wave
+from pathlib import Path
+
+import pytest
+
+from automation_core.segmented_render import (
+    encode_segments,
+    find_silence_boundaries,
+    plan_encoder_threads,
+    plan_render_segments,
+    with_encoder_threads,
+)
+
+
+def test_plan_snaps_cuts_to_nearby_boundaries_on_frame_grid():
+    segments = plan_render_segments(60.0, 30, 4, boundaries=[14.2, 31.0, 59.0])
+
+    assert [(s.start_frame, s.end_frame) for s in segments] == [
+        (0, 426),
+        (426, 930),
+        (930, 1350),
+        (1350, 1800),
+    ]
+    assert sum(s.frames for s in segments) == 1800
+    assert segments[1].start_seconds == 14.2
+
+
+def test_plan_limits_count_for_short_audio():
+    assert len(plan_render_segments(25.0, 30, 8)) == 2
+    assert len(plan_render_segments(3.0, 30, 8)) == 1
+    with pytest.raises(ValueError):
+        plan_render_segments(0, 30, 2)
+
+
+def test_find_silence_boundaries_returns_midpoints(tmp_path: Path):
+    loud = b"\xe8\x03" * 1000  # amplitude 1000 นาน 1 วินาที ที่ 1000 Hz
+    wav_path = tmp_path / "voice.wav"
+    with wave.open(str(wav_path), "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(1000)
+        wav_file.writeframes(
+            loud
+            + b"\x00\x00" * 500
+            + loud
+            + b"\x00\x00" * 100
+            + loud
+            + b"\x00\x00" * 800
+        )
+
+    assert find_silence_boundaries(wav_path) == [1.25]
+
+
+def test_encode_segments_propagates_first_failure():
+    def _run(command):
+        if command[0] == "bad":
+            raise RuntimeError("ffmpeg failed")
+
+    assert len(encode_segments([["ok"], ["ok"]], _run, max_workers=2)) == 2
+    with pytest.raises(RuntimeError, match="ffmpeg failed"):
+        encode_segments([["ok"], ["bad"]], _run, max_workers=2)
+
+
+def test_encoder_threads_never_oversubscribe_cores():
+    assert plan_encoder_threads(8, cpu_count=8) == (8, 1)
+    assert plan_encoder_threads(3, cpu_count=8) == (3, 2)
+    assert plan_encoder_threads(16, cpu_count=4) == (4, 1)
+    assert plan_encoder_threads(2, cpu_count=1) == (1, 1)
+
+    profile_args = ["-c:v", "libx264", "-preset", "slow", "-threads", "0"]
+    assert with_encoder_threads(profile_args, 2) == [
+        "-c:v",
+        "libx264",
+        "-preset",
+        "slow",
+        "-threads",
+        "2",
+    ]
@@ -0,0 +1,88 @@
+"""ทดสอบแคชเสียง TTS ระดับ chunk"""
+
+import os
+import wave
+from pathlib import Path
+
+from automation_core.tts_cache import TTSCache, compute_tts_cache_key
+from automation_core.voiceover_tts import NullTTSEngine, generate_voiceover
+
+
+def test_cache_key_covers_voice_prosody_and_ssml():
+    base = compute_tts_cache_key("สวัสดี\r\nครับ  ", voice="th-TH-A", pitch=0.0)
+
+    assert base == compute_tts_cache_key("สวัสดี\nครับ", voice="th-TH-A", pitch=0.0)
+    assert base != compute_tts_cache_key("สวัสดี\nครับ", voice="th-TH-B", pitch=0.0)
+    assert base != compute_tts_cache_key("สวัสดี\nครับ", voice="th-TH-A", pitch=1.0)
+    assert base != compute_tts_cache_key(
+        "สวัสดี\nครับ", voice="th-TH-A", pitch=0.0, speaking_rate=0.8
+    )
+    assert base != compute_tts_cache_key(
+        "สวัสดี\nครับ", voice="th-TH-A", pitch=0.0, ssml=True
+    )
+
+
+def test_cache_evicts_least_recently_used(tmp_path: Path):
+    cache = TTSCache(tmp_path / "cache", max_bytes=350)
+    for i, key in enumerate(["aa01", "bb02", "cc03"]):
+        path = cache.put(key, b"x" * 100)
+        os.utime(path, ns=(i * 10**9, i * 10**9))
+    # อ่าน aa01 ทำให้กลายเป็นรายการที่ใช้ล่าสุด จึงถูกเก็บไว้
+    assert cache.get("aa01") == b"x" * 100
+
+    cache.put("dd04", b"y" * 100)
+
+    assert cache.get("bb02") is None
+    assert cache.get("aa01") is not None
+    assert cache.get("cc03") is not None
+    assert cache.get("dd04") == b"y" * 100
+
+
+def test_cache_rescans_only_when_running_total_exceeds_limit(tmp_path: Path):
+    scans: list[int] = []
+
+    class _CountingCache(TTSCache):
+        def evict(self) -> list[Path]:
+            scans.append(1)
+            return super().evict()
+
+    cache = _CountingCache(tmp_path / "cache", max_bytes=350)
+    cache.put("aa01", b"x" * 100)
+    cache.put("bb02", b"x" * 100)
+    cache.put("bb02", b"x" * 100)
+    cache.put("cc03", b"x" * 100)
+    # สแกนครั้งแรกเพื่อตั้งยอดรวม จากนั้นไม่สแกนจนกว่าจะเกิน max_bytes
+    assert len(scans) == 1
+
+    cache.put("dd04", b"y" * 100)
+
+    assert len(scans) == 2
+    assert cache.get("aa01") is None
+    assert cache.get("dd04") == b"y" * 100
+
+
+def test_generate_voiceover_reuses_cached_wav(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("PIPELINE_ENABLED", "true")
+    cache = TTSCache(tmp_path / "data" / "tts_cache")
+    calls: list[str] = []
+
+    class _CountingEngine(NullTTSEngine):
+        def synthesize(self, text: str, output_path: Path) -> None:
+            calls.append(text)
+            super().synthesize(text, output_path)
+
+    def _generate(run_id: str, engine: NullTTSEngine) -> dict:
+        metadata = generate_voiceover(
+            "สคริปต์เดิม", run_id, "demo", engine, root_dir=tmp_path, cache=cache
+        )
+        assert metadata is not None
+        return metadata
+
+    first = _generate("run_001", _CountingEngine())
+    second = _generate("run_002", _CountingEngine())
+    _generate("run_003", _CountingEngine(duration_seconds=2.0))
+
+    assert len(calls) == 2
+    assert second["duration_seconds"] == first["duration_seconds"]
+    with wave.open(str(tmp_path / second["output_wav_path"]), "rb") as wav_file:
+        assert wav_file.getnframes() > 0
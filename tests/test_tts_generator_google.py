@@ -0,0 +1,177 @@
+"""ทดสอบการสร้างเสียงแบบแบ่ง chunk ของ scripts/tts_generator_google.py ด้วย client จำลอง"""
+
+import importlib.util
+import sys
+import threading
+import time
+from pathlib import Path
+from types import ModuleType, SimpleNamespace
+
+import pytest
+
+
+def _load_generator() -> ModuleType:
+    script_path = Path(__file__).parent.parent / "scripts" / "tts_generator_google.py"
+    spec = importlib.util.spec_from_file_location("tts_generator_google", script_path)
+    module = importlib.util.module_from_spec(spec)
+    assert spec.loader is not None
+    spec.loader.exec_module(module)
+    return module
+
+
+class _FakeTextToSpeech:
+    """แทน google.cloud.texttospeech เฉพาะส่วนที่ generator ใช้"""
+
+    AudioEncoding = SimpleNamespace(MP3="mp3")
+
+    @staticmethod
+    def SynthesisInput(text=None, ssml=None):  # noqa: N802
+        return SimpleNamespace(text=text, ssml=ssml)
+
+    @staticmethod
+    def VoiceSelectionParams(**kwargs):  # noqa: N802
+        return SimpleNamespace(**kwargs)
+
+    @staticmethod
+    def AudioConfig(**kwargs):  # noqa: N802
+        return SimpleNamespace(**kwargs)
+
+
+class _GoogleAPICallError(Exception):
+    """แทน google.api_core.exceptions.GoogleAPICallError"""
+
+
+class _ApiError(_GoogleAPICallError):
+    def __init__(self, code: int) -> None:
+        super().__init__(f"status {code}")
+        self.code = code
+
+
+class _FakeClient:
+    def __init__(self, failures: dict[int, list[Exception]] | None = None) -> None:
+        self.failures = failures or {}
+        self.calls: list[int] = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def synthesize_speech(self, input, voice, audio_config):  # noqa: A002
+        index = int(input.text.split(".", 1)[0].rsplit(" ", 1)[-1])
+        with self._lock:
+            self.calls.append(index)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            pending = self.failures.get(index)
+            error = pending.pop(0) if pending else None
+        try:
+            # chunk แรกๆ ช้ากว่า เพื่อให้เสร็จไม่ตรงลำดับ
+            time.sleep(0.02 * (5 - index % 5))
+            if error is not None:
+                raise error
+            return SimpleNamespace(audio_content=f"<{index}>".encode())
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def _long_script(lines: int) -> str:
+    # แต่ละบรรทัด ~4000 bytes จึงได้ 1 chunk ต่อบรรทัด
+    return "\n".join(f"line {i}." + " ธรรม" * 266 for i in range(lines))
+
+
+@pytest.fixture
+def generator(monkeypatch) -> ModuleType:
+    module = _load_generator()
+    monkeypatch.setattr(module, "texttospeech", _FakeTextToSpeech)
+    monkeypatch.setattr(
+        module,
+        "google_exceptions",
+        SimpleNamespace(GoogleAPICallError=_GoogleAPICallError),
+    )
+    sleeps: list[float] = []
+    monkeypatch.setattr(module, "time", SimpleNamespace(sleep=sleeps.append))
+    module.recorded_sleeps = sleeps
+    return module
+
+
+def test_chunks_synthesized_concurrently_and_reassembled_in_order(
+    generator, tmp_path: Path
+):
+    client = _FakeClient(failures={2: [ConnectionError("reset"), _ApiError(503)]})
+    output_path = tmp_path / "voice.mp3"
+
+    assert generator.generate_tts_google(
+        _long_script(6), output_path, client=client, max_workers=3
+    )
+
+    assert output_path.read_bytes() == b"<0><1><2><3><4><5>"
+    assert client.max_active > 1
+    assert sorted(client.calls) == [0, 1, 2, 2, 2, 3, 4, 5]
+    # backoff แบบ exponential ก่อนลองใหม่ของ chunk 2
+    assert generator.recorded_sleeps == [1.0, 2.0]
+    assert not list(tmp_path.glob("temp_chunk_*"))
+
+
+def test_chunk_failure_is_not_retried_for_client_errors(generator, tmp_path: Path):
+    client = _FakeClient(failures={1: [_ApiError(400)]})
+    output_path = tmp_path / "voice.mp3"
+
+    assert not generator.generate_tts_google(
+        _long_script(3), output_path, client=client
+    )
+
+    assert client.calls.count(1) == 1
+    assert not output_path.exists()
+
+
+def test_programming_errors_are_not_retried(generator, tmp_path: Path):
+    client = _FakeClient(failures={0: [TypeError("bad input")]})
+
+    with pytest.raises(TypeError):
+        generator._synthesize_chunk(
+            client, "line 0.", False, voice=None, audio_config=None
+        )
+
+    assert client.calls == [0]
+    assert generator.recorded_sleeps == []
+    assert generator._is_retryable(TimeoutError()) is True
+    assert generator._is_retryable(ValueError()) is False
+
+
+def test_list_voices_without_library_exits_cleanly(generator, monkeypatch, capsys):
+    monkeypatch.setattr(generator, "texttospeech", None)
+    monkeypatch.setattr(sys, "argv", ["tts_generator_google.py", "--list-voices"])
+
+    with pytest.raises(SystemExit) as exc_info:
+        generator.main()
+
+    assert exc_info.value.code == 1
+    assert "google-cloud-texttospeech" in capsys.readouterr().out
+
+
+def test_split_text_chunks_rewraps_ssml(generator):
+    text = "<speak>" + _long_script(2) + '\n<break time="1s"/></speak>'
+
+    chunks = generator.split_text_chunks(text, use_ssml=True)
+
+    assert len(chunks) == 2
+    assert all(c.startswith("<speak>") and c.endswith("</speak>") for c in chunks)
+    assert all(len(c.encode("utf-8")) <= generator.MAX_BYTES + 15 for c in chunks)
+    assert generator.split_text_chunks("สั้น", use_ssml=False) == ["สั้น"]
+
+
+def test_unchanged_chunks_are_served_from_cache(generator, tmp_path: Path):
+    cache = generator.TTSCache(tmp_path / "cache")
+    output_path = tmp_path / "voice.mp3"
+    assert generator.generate_tts_google(
+        _long_script(3), output_path, client=_FakeClient(), cache=cache
+    )
+
+    edited = _long_script(3).replace("line 1.", "line 1. แก้ไข", 1)
+    client = _FakeClient()
+    assert generator.generate_tts_google(
+        edited, output_path, client=client, cache=cache
+    )
+
+    assert client.calls == [1]
+    assert output_path.read_bytes() == b"<0><1><2>"
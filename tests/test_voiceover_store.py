@@ -0,0 +1,120 @@
+"""ทดสอบคลัง voiceover กลางแบบ content-addressed และ gc ของ blob ที่ไม่ถูกอ้างถึง"""
+
+from __future__ import annotations
+
+import shutil
+from pathlib import Path
+
+from automation_core.voiceover_store import (
+    VoiceoverStore,
+    compute_voiceover_key,
+    parse_voiceover_store_enabled,
+)
+from automation_core.voiceover_tts import (
+    NullTTSEngine,
+    compute_input_sha256,
+    generate_voiceover,
+)
+
+
+class _RecordingEngine(NullTTSEngine):
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls = 0
+
+    def synthesize(self, text: str, output_path: Path) -> None:
+        self.calls += 1
+        super().synthesize(text, output_path)
+
+
+def test_store_reuses_voiceover_across_runs(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("PIPELINE_ENABLED", "true")
+    store = VoiceoverStore(tmp_path / "data" / "voiceover_store")
+    engine = _RecordingEngine()
+    logs: list[str] = []
+
+    first = generate_voiceover(
+        "สคริปต์เดิม", "run_a", "talk", engine, root_dir=tmp_path, store=store
+    )
+    second = generate_voiceover(
+        "สคริปต์เดิม",
+        "run_b",
+        "talk",
+        engine,
+        root_dir=tmp_path,
+        store=store,
+        log=logs.append,
+    )
+    styled = generate_voiceover(
+        "สคริปต์เดิม",
+        "run_c",
+        "talk",
+        engine,
+        style="calm",
+        root_dir=tmp_path,
+        store=store,
+    )
+
+    assert first is not None and second is not None and styled is not None
+    assert engine.calls == 2
+    assert logs and logs[0].startswith("Voiceover store hit")
+    assert second["duration_seconds"] == first["duration_seconds"]
+    wav_a = tmp_path / str(first["output_wav_path"])
+    wav_b = tmp_path / str(second["output_wav_path"])
+    assert wav_a.stat().st_ino == wav_b.stat().st_ino
+    assert len(list(store.store_dir.glob("*/*.wav"))) == 2
+
+    # สังเคราะห์ซ้ำใน run เดิมโดยไม่ใช้คลัง ต้องไม่เขียนทับ blob ที่ link อยู่
+    blob = store.blob_path(
+        compute_voiceover_key(
+            compute_input_sha256("สคริปต์เดิม"),
+            engine_name="null",
+            params=NullTTSEngine().cache_params,
+        )
+    )
+    generate_voiceover(
+        "สคริปต์เดิม",
+        "run_a",
+        "talk",
+        NullTTSEngine(duration_seconds=2.0),
+        root_dir=tmp_path,
+    )
+    assert blob.stat().st_ino == wav_b.stat().st_ino
+    assert blob.stat().st_size < wav_a.stat().st_size
+
+
+def test_gc_removes_only_unreferenced_blobs(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("PIPELINE_ENABLED", "true")
+    voiceover_dir = tmp_path / "data" / "voiceovers"
+    store = VoiceoverStore(tmp_path / "data" / "voiceover_store")
+    for run_id, script in (("run_a", "หนึ่ง"), ("run_b", "หนึ่ง"), ("run_c", "สอง")):
+        generate_voiceover(script, run_id, "talk", root_dir=tmp_path, store=store)
+    # run ที่อ้างถึงด้วย symlink (เช่น ข้าม filesystem) ก็นับว่าอ้างถึง
+    shutil.rmtree(voiceover_dir / "run_c")
+    (voiceover_dir / "run_d").mkdir()
+    key_two = compute_voiceover_key(
+        compute_input_sha256("สอง"),
+        engine_name="null",
+        params=NullTTSEngine().cache_params,
+    )
+    (voiceover_dir / "run_d" / "talk.wav").symlink_to(store.blob_path(key_two))
+
+    assert store.gc([voiceover_dir]).removed == []
+
+    shutil.rmtree(voiceover_dir / "run_a")
+    shutil.rmtree(voiceover_dir / "run_d")
+    dry = store.gc([voiceover_dir], dry_run=True)
+    assert dry.removed == [key_two]
+    assert store.lookup(key_two) is not None
+
+    report = store.gc([voiceover_dir])
+    assert report.removed == [key_two]
+    assert report.kept == 1
+    assert report.freed_bytes > 0
+    assert store.lookup(key_two) is None
+    assert not store.record_path(key_two).exists()
+
+
+def test_parse_voiceover_store_enabled_defaults_on():
+    assert parse_voiceover_store_enabled(None) is True
+    assert parse_voiceover_store_enabled("Off") is False
@@ -7,16 +7,21 @@
 - การสร้างไฟล์ WAV ที่ถูกต้องตามมาตรฐาน
 - schema ของ metadata ที่มีความเสถียร
 - การป้องกัน path traversal
+- การสังเคราะห์แบบแบ่ง segment ผ่าน engine pool และเวลาของแต่ละ segment
 """
 
 from __future__ import annotations
 
 import re
+import threading
+import time
 import wave
 from pathlib import Path
+from typing import IO
 
 import pytest
 
+from automation_core.tts_cache import TTSCache
 from automation_core.voiceover_tts import (
     MAX_SCRIPT_LENGTH,
     METADATA_SCHEMA_VERSION,
@@ -26,11 +31,13 @@ from automation_core.voiceover_tts import (
     WAV_SAMPLE_RATE,
     WAV_SAMPLE_WIDTH_BYTES,
     NullTTSEngine,
+    TTSEnginePool,
     build_voiceover_paths,
     cli_main,
     compute_input_sha256,
     generate_voiceover,
     normalize_script_text,
+    split_script_segments,
 )
 
 
@@ -220,7 +227,7 @@ def test_metadata_schema_stable(tmp_path, monkeypatch):
         "duration_seconds",
         "engine_name",
     }
-    optional = {"voice", "style", "created_utc"}
+    optional = {"voice", "style", "created_utc", "segments"}
     assert required.issubset(metadata.keys())
     assert set(metadata.keys()).issubset(required | optional)
     assert isinstance(metadata["schema_version"], str)
@@ -265,3 +272,131 @@ def test_max_length_guard(tmp_path, monkeypatch):
     script_text = "a" * (MAX_SCRIPT_LENGTH + 1)
     with pytest.raises(ValueError):
         generate_voiceover(script_text, "run_005", "too_long", root_dir=tmp_path)
+
+
+class _CountingEngine:
+    """เอนจินจำลองที่เขียนเสียงยาวตามจำนวนคำ และบันทึกจำนวน segment ที่รันพร้อมกัน"""
+
+    name = "counting"
+    sample_rate = 1000
+    active = 0
+    max_active = 0
+    lock = threading.Lock()
+
+    @property
+    def cache_params(self) -> dict[str, object]:
+        return {"sample_rate": self.sample_rate}
+
+    def synthesize_segment(self, text: str, sink: IO[bytes]) -> None:
+        cls = type(self)
+        with cls.lock:
+            cls.active += 1
+            cls.max_active = max(cls.max_active, cls.active)
+        # segment แรกช้าที่สุด เพื่อให้เสร็จไม่ตรงลำดับ
+        time.sleep(0.05 if text.startswith("one") else 0.01)
+        for _ in text.split():
+            sink.write(b"\x01\x00" * 500)
+        with cls.lock:
+            cls.active -= 1
+
+
+def test_split_script_segments_by_paragraph_and_sentence():
+    text = "First one. Second one!\nThird?\n\n  \nNext paragraph.\n"
+
+    assert split_script_segments(text) == [
+        "First one. Second one!\nThird?",
+        "Next paragraph.",
+    ]
+    assert split_script_segments(text, "sentence") == [
+        "First one.",
+        "Second one!",
+        "Third?",
+        "Next paragraph.",
+    ]
+    with pytest.raises(ValueError):
+        split_script_segments(text, "word")
+
+
+def test_engine_pool_streams_segments_in_order_with_timings(tmp_path, monkeypatch):
+    monkeypatch.setenv("PIPELINE_ENABLED", "true")
+    monkeypatch.setattr(_CountingEngine, "max_active", 0)
+    created: list[_CountingEngine] = []
+
+    def _factory() -> _CountingEngine:
+        created.append(_CountingEngine())
+        return created[-1]
+
+    metadata = generate_voiceover(
+        "one two three\n\nfour\n\nfive six",
+        "run_006",
+        "segments",
+        root_dir=tmp_path,
+        engine_pool=TTSEnginePool(_factory, size=2),
+    )
+
+    assert metadata is not None
+    assert metadata["engine_name"] == "counting"
+    assert metadata["duration_seconds"] == 3.0
+    assert [(s["start_seconds"], s["end_seconds"]) for s in metadata["segments"]] == [
+        (0.0, 1.5),
+        (1.5, 2.0),
+        (2.0, 3.0),
+    ]
+    assert [s["index"] for s in metadata["segments"]] == [0, 1, 2]
+    assert len(created) == 2
+    assert _CountingEngine.max_active == 2
+    wav_path = tmp_path / str(metadata["output_wav_path"])
+    with wave.open(str(wav_path), "rb") as wav_file:
+        assert wav_file.getframerate() == 1000
+        assert wav_file.getnframes() == 3000
+    assert list(wav_path.parent.glob("*.tmp.*")) == []
+
+
+def test_engine_pool_caches_audio_per_segment(tmp_path, monkeypatch):
+    monkeypatch.setenv("PIPELINE_ENABLED", "true")
+    cache = TTSCache(tmp_path / "cache")
+    calls: list[str] = []
+
+    class _Engine(_CountingEngine):
+        def synthesize_segment(self, text: str, sink: IO[bytes]) -> None:
+            calls.append(text)
+            super().synthesize_segment(text, sink)
+
+    kwargs = {"root_dir": tmp_path, "cache": cache, "segment_unit": "sentence"}
+    first = generate_voiceover(
+        "one. two three.",
+        "run_007",
+        "cached",
+        engine_pool=TTSEnginePool(_Engine),
+        **kwargs,
+    )
+    second = generate_voiceover(
+        "one. two three.",
+        "run_008",
+        "cached",
+        engine_pool=TTSEnginePool(_Engine),
+        **kwargs,
+    )
+    edited = generate_voiceover(
+        "one. two three four.",
+        "run_008",
+        "edited",
+        engine_pool=TTSEnginePool(_Engine),
+        **kwargs,
+    )
+
+    assert first is not None and second is not None and edited is not None
+    assert calls == ["one.", "two three.", "two three four."]
+    assert second["segments"] == first["segments"]
+    assert [s["end_seconds"] for s in edited["segments"]] == [0.5, 2.0]
+    first_wav = (tmp_path / str(first["output_wav_path"])).read_bytes()
+    assert (tmp_path / str(second["output_wav_path"])).read_bytes() == first_wav
+    with pytest.raises(ValueError):
+        generate_voiceover(
+            "text",
+            "run_009",
+            "both",
+            NullTTSEngine(),
+            root_dir=tmp_path,
+            engine_pool=TTSEnginePool(NullTTSEngine),
+        )
@@ -0,0 +1,304 @@
+"""ทดสอบ worker แบบ daemon (work --daemon --concurrency N)"""
+
+import importlib.util
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from types import ModuleType
+
+import pytest
+
+from automation_core.queue import FileQueue, JobSpec
+from automation_core.queue_watch import InotifyWatcher
+
+
+def _utc_iso(value: datetime) -> str:
+    return value.astimezone(UTC).isoformat().replace("+00:00", "Z")
+
+
+def _build_job(job_id: str, minute: int, params: dict | None = None) -> JobSpec:
+    return JobSpec(
+        schema_version="v1",
+        job_id=job_id,
+        created_at=_utc_iso(datetime.now(UTC)),
+        scheduled_for=_utc_iso(
+            datetime(2026, 1, 1, 0, 0, tzinfo=UTC) + timedelta(minutes=minute)
+        ),
+        pipeline_path="pipeline.web.yml",
+        run_id=f"run-{job_id}",
+        params=params,
+        status="pending",
+        attempts=0,
+        last_error=None,
+    )
+
+
+def _load_runner() -> ModuleType:
+    runner_path = Path(__file__).parent.parent / "scripts" / "scheduler_runner.py"
+    spec = importlib.util.spec_from_file_location("scheduler_runner", runner_path)
+    module = importlib.util.module_from_spec(spec)
+    assert spec.loader is not None
+    spec.loader.exec_module(module)
+    return module
+
+
+def _inotify_available() -> bool:
+    try:
+        InotifyWatcher(Path(".")).close()
+    except OSError:
+        return False
+    return True
+
+
+@pytest.fixture(autouse=True)
+def _set_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("PIPELINE_ENABLED", "true")
+    monkeypatch.setenv("WORKER_ENABLED", "true")
+
+
+def test_daemon_drains_backlog_concurrently(tmp_path: Path) -> None:
+    runner = _load_runner()
+    queue = FileQueue(tmp_path / "queue")
+    for i, job_id in enumerate(["job-a", "job-b", "job-c"]):
+        queue.enqueue(_build_job(job_id, i, params={"n": i}))
+
+    barrier = threading.Barrier(2, timeout=5)
+    calls: list[tuple[str, str, dict | None]] = []
+
+    def _job_runner(pipeline_path: str, run_id: str, params: dict | None) -> None:
+        calls.append((Path(pipeline_path).name, run_id, params))
+        if run_id in ("run-job-a", "run-job-b"):
+            # สองงานแรกต้องรันพร้อมกันจึงจะผ่าน barrier ได้
+            barrier.wait()
+        if run_id == "run-job-b":
+            raise RuntimeError("render failed")
+
+    summaries = runner.run_daemon(
+        queue_dir="queue",
+        concurrency=2,
+        base_dir=tmp_path,
+        until_empty=True,
+        executor_factory=lambda n: ThreadPoolExecutor(max_workers=n),
+        job_runner=_job_runner,
+    )
+
+    assert summaries is not None
+    decisions = {s["job_id"]: s["decision"] for s in summaries}
+    assert decisions == {"job-a": "done", "job-b": "failed", "job-c": "done"}
+    assert sorted(c[1] for c in calls) == ["run-job-a", "run-job-b", "run-job-c"]
+    assert ("pipeline.web.yml", "run-job-c", {"n": 2}) in calls
+    assert queue.list_pending() == []
+    failed_summary = json.loads(
+        (
+            tmp_path / "output" / "worker" / "artifacts" / "worker_summary_job-b.json"
+        ).read_text(encoding="utf-8")
+    )
+    assert failed_summary["error"] == {
+        "code": "orchestrator_failed",
+        "message": "render failed",
+    }
+
+
+def test_stop_event_drains_in_flight_without_taking_new_jobs(tmp_path: Path) -> None:
+    runner = _load_runner()
+    queue = FileQueue(tmp_path / "queue")
+    queue.enqueue(_build_job("job-1", 0))
+    queue.enqueue(_build_job("job-2", 1))
+    stop = threading.Event()
+
+    def _job_runner(pipeline_path: str, run_id: str, params: dict | None) -> None:
+        # จำลอง SIGTERM ระหว่างที่งานแรกกำลังรัน
+        stop.set()
+
+    summaries = runner.run_daemon(
+        queue_dir="queue",
+        concurrency=1,
+        base_dir=tmp_path,
+        poll_interval=0.01,
+        stop_event=stop,
+        executor_factory=lambda n: ThreadPoolExecutor(max_workers=n),
+        job_runner=_job_runner,
+    )
+
+    assert [s["job_id"] for s in summaries] == ["job-1"]
+    assert summaries[0]["decision"] == "done"
+    assert [item.job_id for item in queue.list_pending()] == ["job-2"]
+
+
+def test_daemon_respects_worker_kill_switch(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    runner = _load_runner()
+    monkeypatch.setenv("WORKER_ENABLED", "false")
+
+    assert runner.run_daemon(queue_dir="queue", base_dir=tmp_path) is None
+
+
+def test_daemon_rejects_dry_run_flag() -> None:
+    runner = _load_runner()
+
+    assert runner.main(["work", "--daemon", "--dry-run"]) == 1
+
+
+def _build_job_at(job_id: str, scheduled_for: datetime) -> JobSpec:
+    return _build_job(job_id, 0).model_copy(
+        update={"scheduled_for": _utc_iso(scheduled_for)}
+    )
+
+
+@pytest.mark.skipif(
+    not _inotify_available(), reason="inotify is not available on this platform"
+)
+def test_idle_daemon_wakes_on_new_job_file(tmp_path: Path) -> None:
+    runner = _load_runner()
+    queue = FileQueue(tmp_path / "queue")
+    stop = threading.Event()
+    started = threading.Event()
+    calls: list[str] = []
+
+    def _job_runner(pipeline_path: str, run_id: str, params: dict | None) -> None:
+        calls.append(run_id)
+        stop.set()
+
+    def _run() -> None:
+        started.set()
+        runner.run_daemon(
+            queue_dir="queue",
+            base_dir=tmp_path,
+            # poll_interval ยาวมาก: ถ้ายัง polling อยู่ งานจะไม่ถูกหยิบภายในเวลาทดสอบ
+            poll_interval=600,
+            stop_event=stop,
+            executor_factory=lambda n: ThreadPoolExecutor(max_workers=n),
+            job_runner=_job_runner,
+        )
+
+    thread = threading.Thread(target=_run)
+    thread.start()
+    started.wait(5)
+    time.sleep(0.2)
+    queue.enqueue(_build_job("job-late", 0))
+    thread.join(10)
+
+    assert not thread.is_alive()
+    assert calls == ["run-job-late"]
+
+
+def test_hold_until_scheduled_waits_for_scheduled_time(tmp_path: Path) -> None:
+    runner = _load_runner()
+    queue = FileQueue(tmp_path / "queue")
+    now = datetime.now(UTC)
+    scheduled = now.replace(microsecond=0) + timedelta(seconds=2)
+    queue.enqueue(_build_job_at("job-due", now - timedelta(minutes=1)))
+    queue.enqueue(_build_job_at("job-soon", scheduled))
+    stop = threading.Event()
+    started_at: dict[str, datetime] = {}
+
+    def _job_runner(pipeline_path: str, run_id: str, params: dict | None) -> None:
+        started_at[run_id] = datetime.now(UTC)
+        if run_id == "run-job-soon":
+            stop.set()
+
+    summaries = runner.run_daemon(
+        queue_dir="queue",
+        base_dir=tmp_path,
+        poll_interval=600,
+        stop_event=stop,
+        executor_factory=lambda n: ThreadPoolExecutor(max_workers=n),
+        job_runner=_job_runner,
+        hold_until_scheduled=True,
+    )
+
+    assert [s["job_id"] for s in summaries] == ["job-due", "job-soon"]
+    assert started_at["run-job-due"] < scheduled
+    assert started_at["run-job-soon"] >= scheduled
+
+
+def test_hold_until_scheduled_does_not_spin_on_saturated_class(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    runner = _load_runner()
+    queue = FileQueue(tmp_path / "queue")
+    past = datetime.now(UTC) - timedelta(minutes=1)
+    for job_id in ("job-render-1", "job-render-2"):
+        queue.enqueue(
+            _build_job_at(job_id, past).model_copy(
+                update={"concurrency_class": "render"}
+            )
+        )
+    dequeue_calls: list[float] = []
+    original_dequeue = FileQueue.dequeue_next
+
+    def _counting_dequeue(self, *args, **kwargs):
+        dequeue_calls.append(time.monotonic())
+        return original_dequeue(self, *args, **kwargs)
+
+    monkeypatch.setattr(FileQueue, "dequeue_next", _counting_dequeue)
+    stop = threading.Event()
+    ran: list[str] = []
+
+    def _job_runner(pipeline_path: str, run_id: str, params: dict | None) -> None:
+        ran.append(run_id)
+        if len(ran) == 1:
+            # งานแรกถือ class render ไว้ 1 วินาที งานที่สองถึงกำหนดแต่ claim ไม่ได้
+            time.sleep(1.0)
+        else:
+            stop.set()
+
+    runner.run_daemon(
+        queue_dir="queue",
+        base_dir=tmp_path,
+        concurrency=2,
+        poll_interval=0.2,
+        stop_event=stop,
+        executor_factory=lambda n: ThreadPoolExecutor(max_workers=n),
+        job_runner=_job_runner,
+        lease_ttl=0.6,
+        watch="poll",
+        hold_until_scheduled=True,
+        class_limits={"render": 1},
+    )
+
+    assert ran == ["run-job-render-1", "run-job-render-2"]
+    # tick = 0.2 วินาที: ราว 5 รอบระหว่างรองานแรก (ไม่ใช่วนถามคิวนับพันครั้ง)
+    assert len(dequeue_calls) < 30
+
+
+def test_heartbeat_survives_transient_sqlite_errors(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture
+) -> None:
+    runner = _load_runner()
+    queue = FileQueue(tmp_path / "queue")
+    queue.enqueue(_build_job("job-slow", 0, params=None))
+    beats: list[str] = []
+    original_heartbeat = FileQueue.heartbeat
+
+    def _flaky_heartbeat(self, item):
+        beats.append(item.job_id)
+        if len(beats) == 1:
+            raise sqlite3.OperationalError("database is locked")
+        return original_heartbeat(self, item)
+
+    monkeypatch.setattr(FileQueue, "heartbeat", _flaky_heartbeat)
+
+    def _job_runner(pipeline_path: str, run_id: str, params: dict | None) -> None:
+        time.sleep(0.8)
+
+    summaries = runner.run_daemon(
+        queue_dir="queue",
+        base_dir=tmp_path,
+        until_empty=True,
+        poll_interval=0.2,
+        executor_factory=lambda n: ThreadPoolExecutor(max_workers=n),
+        job_runner=_job_runner,
+        lease_ttl=0.6,
+    )
+
+    assert [s["decision"] for s in summaries] == ["done"]
+    assert len(beats) >= 2
+    assert (
+        "heartbeat failed for job-slow: database is locked" in capsys.readouterr().out
+    )
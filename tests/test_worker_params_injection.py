@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import contextlib
 import importlib.util
 import os
 from datetime import UTC, datetime
@@ -220,14 +221,20 @@ def test_params_not_json_serializable_marks_failed_and_restores_env(
     created_queue: dict[str, Any] = {}
 
     class _FakeQueue:
-        def __init__(self, _queue_dir: Path | str) -> None:
+        def __init__(self, _queue_dir: Path | str, **_options: Any) -> None:
             created_queue["instance"] = self
             self.mark_failed_called = False
             self.last_error: str | None = None
 
-        def dequeue_next(self) -> QueueItem | None:
+        def reap_expired(self) -> list[QueueItem]:
+            return []
+
+        def dequeue_next(self, **_options: Any) -> QueueItem | None:
             return item
 
+        def hold_lease(self, _item: QueueItem) -> contextlib.AbstractContextManager:
+            return contextlib.nullcontext()
+
         def mark_failed(self, _item: QueueItem, error: Any | None = None) -> QueueItem:
             self.mark_failed_called = True
             self.last_error = getattr(error, "code", None)